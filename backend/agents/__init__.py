@@ -1,43 +1,59 @@
-# Legacy agents (for backward compatibility)
-from .base_agent import BaseAgent
-from .prd_authoring_agent import PRDAuthoringAgent
-from .ideation_agent import IdeationAgent
-from .jira_agent import JiraAgent
-from .research_agent import ResearchAgent
-from .analysis_agent import AnalysisAgent
-from .validation_agent import ValidationAgent
-from .strategy_agent import StrategyAgent
-from .coordinator_agent import CoordinatorAgent
-from .orchestrator import AgenticOrchestrator
+"""
+Agent package.
+
+Agent classes are imported on first attribute access (PEP 562) so importing
+backend.agents - or any submodule - does not load every agent, the Agno framework
+and the provider SDKs behind them.
+"""
+import importlib
+import importlib.util
+
+# Agno framework availability, checked without importing it
+AGNO_AVAILABLE = importlib.util.find_spec("agno") is not None
+
+_LAZY_EXPORTS = {
+    # Legacy agents (for backward compatibility)
+    "BaseAgent": "base_agent",
+    "PRDAuthoringAgent": "prd_authoring_agent",
+    "IdeationAgent": "ideation_agent",
+    "JiraAgent": "jira_agent",
+    "ResearchAgent": "research_agent",
+    "AnalysisAgent": "analysis_agent",
+    "ValidationAgent": "validation_agent",
+    "StrategyAgent": "strategy_agent",
+    "CoordinatorAgent": "coordinator_agent",
+    "AgenticOrchestrator": "orchestrator",
+    # Agno framework agents
+    "AgnoBaseAgent": "agno_base_agent",
+    "AgnoPRDAuthoringAgent": "agno_prd_authoring_agent",
+    "AgnoRequirementsAgent": "agno_requirements_agent",
+    "AgnoIdeationAgent": "agno_ideation_agent",
+    "AgnoResearchAgent": "agno_research_agent",
+    "AgnoAnalysisAgent": "agno_analysis_agent",
+    "AgnoStrategyAgent": "agno_strategy_agent",
+    "RAGAgent": "rag_agent",
+    "AgnoCoordinatorAgent": "agno_coordinator_agent",
+    "AgnoAgenticOrchestrator": "agno_orchestrator",
+}
+_AGNO_EXPORTS = {name for name in _LAZY_EXPORTS if name.startswith("Agno") or name == "RAGAgent"}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name in _AGNO_EXPORTS and not AGNO_AVAILABLE:
+        # Placeholder if Agno is not available
+        value = None
+    else:
+        value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
 
-# Agno framework agents
-try:
-    from .agno_base_agent import AgnoBaseAgent
-    from .agno_prd_authoring_agent import AgnoPRDAuthoringAgent
-    from .agno_requirements_agent import AgnoRequirementsAgent
-    from .agno_ideation_agent import AgnoIdeationAgent
-    from .agno_research_agent import AgnoResearchAgent
-    from .agno_analysis_agent import AgnoAnalysisAgent
-    from .agno_strategy_agent import AgnoStrategyAgent
-    from .rag_agent import RAGAgent
-    from .agno_coordinator_agent import AgnoCoordinatorAgent
-    from .agno_orchestrator import AgnoAgenticOrchestrator
-    AGNO_AVAILABLE = True
-except ImportError:
-    AGNO_AVAILABLE = False
-    # Define placeholders if Agno is not available
-    AgnoBaseAgent = None
-    AgnoPRDAuthoringAgent = None
-    AgnoRequirementsAgent = None
-    AgnoIdeationAgent = None
-    AgnoResearchAgent = None
-    AgnoAnalysisAgent = None
-    AgnoStrategyAgent = None
-    AgnoValidationAgent = None
-    AgnoExportAgent = None
-    RAGAgent = None
-    AgnoCoordinatorAgent = None
-    AgnoAgenticOrchestrator = None
 
 __all__ = [
     # Legacy
@@ -5,11 +5,11 @@ Integrates with Atlassian MCP server for Confluence document access
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import structlog
-import httpx
 
 from backend.agents.agno_base_agent import AgnoBaseAgent
 from backend.models.schemas import AgentMessage, AgentResponse
 from backend.config import settings
+from backend.services.integration_http import content_unchanged, fetch, fetch_all, mark_content_processed
 from backend.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -143,7 +143,6 @@ Always provide clear, structured responses with source information.
             # The MCP server should be configured and accessible
             # For now, we'll use direct API call as fallback until MCP client is properly integrated
             import base64
-            import httpx
             
             # Construct Confluence API URL
             # For Confluence Cloud, use: https://{site}.atlassian.net/wiki/api/v2/pages/{id}
@@ -153,117 +152,124 @@ Always provide clear, structured responses with source information.
             # Use Basic auth with email:API token for Confluence Cloud
             auth_header = base64.b64encode(f"{atlassian_email}:{atlassian_token}".encode()).decode()
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Fetch page using Confluence API v2
-                # First, try to get page with expand parameter to get body content
-                response = await client.get(
-                    f"{confluence_base_url}/pages/{page_id}",
-                    headers={
-                        "Authorization": f"Basic {auth_header}",
-                        "Accept": "application/json"
-                    },
-                    params={
-                        "body-format": "atlas_doc_format,storage,view"
-                    }
-                )
+            # Fetch page using Confluence API v2
+            # First, try to get page with expand parameter to get body content
+            response = await fetch(
+                "GET",
+                f"{confluence_base_url}/pages/{page_id}",
+                headers={
+                    "Authorization": f"Basic {auth_header}",
+                    "Accept": "application/json"
+                },
+                params={
+                    "body-format": "atlas_doc_format,storage,view"
+                }
+            )
+            
+            if response.status_code == 200:
+                page_data = response.json()
                 
-                if response.status_code == 200:
-                    page_data = response.json()
-                    
-                    # Extract content from response
-                    content = ""
-                    if "body" in page_data:
-                        body_obj = page_data["body"]
-                        # Try different body formats in order of preference
-                        if "atlas_doc_format" in body_obj:
-                            # Convert atlas_doc_format to markdown (simplified - just extract text)
-                            atlas_doc = body_obj["atlas_doc_format"]
-                            if isinstance(atlas_doc, dict):
-                                # Try to extract text from atlas_doc_format structure
-                                content = str(atlas_doc)
-                            else:
-                                content = str(atlas_doc)
-                        elif "storage" in body_obj:
-                            # Storage format (HTML-like)
-                            storage_obj = body_obj["storage"]
-                            if isinstance(storage_obj, dict) and "value" in storage_obj:
-                                content = storage_obj["value"]
-                            else:
-                                content = str(storage_obj)
-                        elif "view" in body_obj:
-                            # View format (rendered HTML)
-                            view_obj = body_obj["view"]
-                            if isinstance(view_obj, dict) and "value" in view_obj:
-                                content = view_obj["value"]
-                            else:
-                                content = str(view_obj)
+                # Extract content from response
+                content = ""
+                if "body" in page_data:
+                    body_obj = page_data["body"]
+                    # Try different body formats in order of preference
+                    if "atlas_doc_format" in body_obj:
+                        # Convert atlas_doc_format to markdown (simplified - just extract text)
+                        atlas_doc = body_obj["atlas_doc_format"]
+                        if isinstance(atlas_doc, dict):
+                            # Try to extract text from atlas_doc_format structure
+                            content = str(atlas_doc)
                         else:
-                            # Fallback: use entire body object as string
-                            content = str(body_obj)
-                    
-                    # If still no content, try fetching with different format
-                    if not content or len(content.strip()) < 10:
-                        # Try fetching with storage format explicitly
-                        storage_response = await client.get(
-                            f"{confluence_base_url}/pages/{page_id}",
-                            headers={
-                                "Authorization": f"Basic {auth_header}",
-                                "Accept": "application/json"
-                            },
-                            params={
-                                "body-format": "storage"
-                            }
-                        )
-                        if storage_response.status_code == 200:
-                            storage_data = storage_response.json()
-                            if "body" in storage_data and "storage" in storage_data["body"]:
-                                storage_value = storage_data["body"]["storage"]
-                                if isinstance(storage_value, dict) and "value" in storage_value:
-                                    content = storage_value["value"]
-                    
-                    # If no content extracted, use title as fallback
-                    if not content or len(content.strip()) < 10:
-                        content = page_data.get("title", "No content available")
-                    
-                    page_title = page_data.get("title", "Confluence Page")
-                    page_url = page_data.get("_links", {}).get("webui", "")
-                    
-                    # Add to knowledge base if RAG is enabled
-                    if hasattr(self, 'agno_agent') and self.agno_agent and hasattr(self.agno_agent, 'knowledge') and self.agno_agent.knowledge:
-                        metadata = {
-                            "source": "confluence",
-                            "page_id": page_id,
-                            "product_id": product_id
-                        }
-                        self.add_to_knowledge_base(content, metadata)
-                    
-                    return {
-                        "success": True,
-                        "content": content,
-                        "metadata": {
-                            "page_id": page_id,
-                            "title": page_title,
-                            "url": page_url,
-                            "space_id": page_data.get("spaceId"),
-                            "version": page_data.get("version", {}).get("number", 1)
+                            content = str(atlas_doc)
+                    elif "storage" in body_obj:
+                        # Storage format (HTML-like)
+                        storage_obj = body_obj["storage"]
+                        if isinstance(storage_obj, dict) and "value" in storage_obj:
+                            content = storage_obj["value"]
+                        else:
+                            content = str(storage_obj)
+                    elif "view" in body_obj:
+                        # View format (rendered HTML)
+                        view_obj = body_obj["view"]
+                        if isinstance(view_obj, dict) and "value" in view_obj:
+                            content = view_obj["value"]
+                        else:
+                            content = str(view_obj)
+                    else:
+                        # Fallback: use entire body object as string
+                        content = str(body_obj)
+                
+                # If still no content, try fetching with different format
+                if not content or len(content.strip()) < 10:
+                    # Try fetching with storage format explicitly
+                    storage_response = await fetch(
+                        "GET",
+                        f"{confluence_base_url}/pages/{page_id}",
+                        headers={
+                            "Authorization": f"Basic {auth_header}",
+                            "Accept": "application/json"
+                        },
+                        params={
+                            "body-format": "storage"
                         }
+                    )
+                    if storage_response.status_code == 200:
+                        storage_data = storage_response.json()
+                        if "body" in storage_data and "storage" in storage_data["body"]:
+                            storage_value = storage_data["body"]["storage"]
+                            if isinstance(storage_value, dict) and "value" in storage_value:
+                                content = storage_value["value"]
+                
+                # If no content extracted, use title as fallback
+                if not content or len(content.strip()) < 10:
+                    content = page_data.get("title", "No content available")
+                
+                page_title = page_data.get("title", "Confluence Page")
+                page_url = page_data.get("_links", {}).get("webui", "")
+                
+                knowledge_scope = f"confluence:{product_id}:{cloud_id}:{page_id}"
+                # Add to knowledge base if RAG is enabled (skipped when the page is unchanged since it was last embedded)
+                if (
+                    hasattr(self, 'agno_agent') and self.agno_agent and hasattr(self.agno_agent, 'knowledge') and self.agno_agent.knowledge
+                    and not await content_unchanged(knowledge_scope, response.content_hash)
+                ):
+                    metadata = {
+                        "source": "confluence",
+                        "page_id": page_id,
+                        "product_id": product_id
+                    }
+                    if await self.add_to_knowledge_base(content, metadata):
+                        await mark_content_processed(knowledge_scope, response.content_hash)
+                
+                return {
+                    "success": True,
+                    "content": content,
+                    "metadata": {
+                        "page_id": page_id,
+                        "title": page_title,
+                        "url": page_url,
+                        "space_id": page_data.get("spaceId"),
+                        "version": page_data.get("version", {}).get("number", 1),
+                        "not_modified": response.not_modified
                     }
-                elif response.status_code == 401:
-                    error_detail = response.text
-                    self_logger.error("confluence_auth_failed", status_code=401, error=error_detail, cloud_id=cloud_id, page_id=page_id)
-                    raise ValueError("Atlassian authentication failed. Please verify your API token in Settings → Integrations.")
-                elif response.status_code == 403:
-                    error_detail = response.text
-                    self_logger.error("confluence_forbidden", status_code=403, error=error_detail, cloud_id=cloud_id, page_id=page_id)
-                    raise ValueError("Access forbidden. Please verify your API token has permission to access this Confluence page.")
-                elif response.status_code == 404:
-                    error_detail = response.text
-                    self_logger.error("confluence_page_not_found", status_code=404, error=error_detail, cloud_id=cloud_id, page_id=page_id, url=confluence_url)
-                    raise ValueError(f"Confluence page {page_id} not found. Please verify the page ID or URL. URL used: {confluence_url or 'N/A'}, Cloud ID: {cloud_id}")
-                else:
-                    error_text = response.text
-                    self_logger.error("confluence_api_error", status_code=response.status_code, error=error_text, cloud_id=cloud_id, page_id=page_id)
-                    raise Exception(f"Failed to fetch Confluence page: HTTP {response.status_code} - {error_text[:200]}")
+                }
+            elif response.status_code == 401:
+                error_detail = response.text
+                self_logger.error("confluence_auth_failed", status_code=401, error=error_detail, cloud_id=cloud_id, page_id=page_id)
+                raise ValueError("Atlassian authentication failed. Please verify your API token in Settings → Integrations.")
+            elif response.status_code == 403:
+                error_detail = response.text
+                self_logger.error("confluence_forbidden", status_code=403, error=error_detail, cloud_id=cloud_id, page_id=page_id)
+                raise ValueError("Access forbidden. Please verify your API token has permission to access this Confluence page.")
+            elif response.status_code == 404:
+                error_detail = response.text
+                self_logger.error("confluence_page_not_found", status_code=404, error=error_detail, cloud_id=cloud_id, page_id=page_id, url=confluence_url)
+                raise ValueError(f"Confluence page {page_id} not found. Please verify the page ID or URL. URL used: {confluence_url or 'N/A'}, Cloud ID: {cloud_id}")
+            else:
+                error_text = response.text
+                self_logger.error("confluence_api_error", status_code=response.status_code, error=error_text, cloud_id=cloud_id, page_id=page_id)
+                raise Exception(f"Failed to fetch Confluence page: HTTP {response.status_code} - {error_text[:200]}")
         
         except ValueError as e:
             self_logger.error("confluence_fetch_validation_error", error=str(e))
@@ -320,13 +326,17 @@ Always provide clear, structured responses with source information.
             user_id = context.get("user_id", "")
             product_id = context.get("product_id")
             
-            for page_id in confluence_refs:
-                try:
-                    fetched_data = await self.fetch_confluence_page(page_id, user_id, product_id)
-                    if fetched_data.get("success"):
-                        context[f"confluence_content_{page_id}"] = fetched_data
-                except Exception as e:
-                    self.logger.warning("failed_to_fetch_confluence_page", page_id=page_id, error=str(e))
+            # Fetch referenced pages concurrently (bounded) over the shared client
+            page_ids = list(dict.fromkeys(confluence_refs))
+            results = await fetch_all(
+                page_ids,
+                lambda page_id: self.fetch_confluence_page(page_id, user_id, product_id, context=context),
+            )
+            for page_id, fetched_data in zip(page_ids, results):
+                if isinstance(fetched_data, BaseException):
+                    self.logger.warning("failed_to_fetch_confluence_page", page_id=page_id, error=str(fetched_data))
+                elif fetched_data.get("success"):
+                    context[f"confluence_content_{page_id}"] = fetched_data
         
         return await super().process(messages, context)
 
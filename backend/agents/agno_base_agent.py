@@ -4,7 +4,7 @@ Provides a consistent pattern for all agents using Agno framework
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, TYPE_CHECKING, Union
+from typing import List, Dict, Any, Optional, TYPE_CHECKING, Tuple, Union
 from datetime import datetime
 from uuid import UUID
 import structlog
@@ -16,7 +16,6 @@ try:
     from agno.agent import Agent
     from agno.models.openai import OpenAIChat
     from agno.models.anthropic import Claude
-    from agno.models.google import Gemini
     from agno.knowledge.knowledge import Knowledge
     from agno.vectordb.pgvector import PgVector, SearchType
 
@@ -93,7 +92,6 @@ try:
     OpenAIEmbedder = None
     KBOpenAIEmbedder = None
     AnthropicEmbedder = None
-    GoogleEmbedder = None
 
     try:
         from agno.knowledge.embedder.openai import OpenAIEmbedder
@@ -106,11 +104,6 @@ try:
         from agno.knowledge.embedder.anthropic import AnthropicEmbedder
     except ImportError as e:
         structlog.get_logger().warning("anthropic_embedder_not_available", error=str(e))
-
-    try:
-        from agno.knowledge.embedder.google import GoogleEmbedder
-    except ImportError as e:
-        structlog.get_logger().warning("google_embedder_not_available", error=str(e))
     AGNO_AVAILABLE = True
 except ImportError as e:
     AGNO_AVAILABLE = False
@@ -119,6 +112,25 @@ except ImportError as e:
 from backend.models.schemas import AgentMessage, AgentResponse, AgentInteraction
 from backend.services.provider_registry import provider_registry
 from backend.services.redis_cache import get_cache
+from backend.services.vector_index import build_vector_index
+from backend.services.context_packer import (
+    CONTEXT_KEY_PRIORITIES,
+    ContextPacker,
+    ContextSection,
+    PackedContext,
+    count_tokens,
+    get_context_budget,
+    sections_from_context,
+)
+from backend.services.llm_scheduler import model_call_slot
+from backend.models.routing_model import RoutingModel, route_name, routing_trace
+from backend.services.prompt_layout import (
+    PromptLayout,
+    cache_control_enabled,
+    current_prompt_layout,
+    extract_cache_usage,
+    request_context_blocks,
+)
 from backend.config import settings
 
 if TYPE_CHECKING:
@@ -128,6 +140,13 @@ if TYPE_CHECKING:
 logger = structlog.get_logger()
 
 
+def gemini_model(**kwargs):
+    """Agno Gemini model. google.genai takes seconds to import, so it is loaded on first use."""
+    from agno.models.google import Gemini
+
+    return Gemini(**kwargs)
+
+
 class AgnoBaseAgent(ABC):
     """
     Extensible base agent using Agno framework.
@@ -202,7 +221,7 @@ class AgnoBaseAgent(ABC):
             "total_time": 0.0,
             "avg_time": 0.0,
             "tool_calls": 0,
-            "token_usage": {"input": 0, "output": 0},
+            "token_usage": {"input": 0, "output": 0, "cached": 0, "cache_write": 0},
             "cache_hits": 0,
             "cache_misses": 0,
         }
@@ -257,6 +276,57 @@ class AgnoBaseAgent(ABC):
             )
 
     def _get_agno_model(self, model_tier: str = "fast"):
+        """Get the Agno model for a tier: the primary provider's model, wrapped in a
+        RoutingModel with the other configured providers as fallbacks when model
+        routing is enabled (with a single provider the wrapper still applies its
+        circuit breaker and adaptive timeout).
+        """
+        primary = self._get_primary_agno_model(model_tier=model_tier)
+        if primary is None or not settings.model_routing_enabled:
+            return primary
+        candidates = [primary] + self._get_fallback_agno_models(model_tier, exclude=route_name(primary).split(":")[0])
+        return RoutingModel(candidates)
+
+    def _get_fallback_agno_models(self, model_tier: str, exclude: str) -> List[Any]:
+        """Models of the same tier from every other provider with credentials (failover order)."""
+        fallbacks = []
+        use_ai_gateway = (
+            getattr(settings, "ai_gateway_enabled", False)
+            and provider_registry.has_ai_gateway()
+        )
+        try:
+            base_url = getattr(settings, "ai_gateway_openai_base_url", None)
+            # With the gateway enabled the stored OpenAI key is the gateway client id, not a usable key
+            if exclude != "openai" and not use_ai_gateway and provider_registry.has_openai_key() \
+                    and not (base_url and "ai-gateway" in base_url):
+                api_key = provider_registry.get_openai_key()
+                model_id = {
+                    "fast": getattr(settings, "agent_model_fast", None),
+                    "standard": getattr(settings, "agent_model_standard", None),
+                }.get(model_tier, getattr(settings, "agent_model_premium", None)) or settings.agent_model_primary
+                if api_key:
+                    fallbacks.append(OpenAIChat(
+                        id=model_id, api_key=api_key, base_url=base_url,
+                        max_completion_tokens=2000 if model_tier == "fast" else 4000,
+                    ))
+            if exclude != "gemini" and provider_registry.has_gemini_key():
+                api_key = provider_registry.get_gemini_key()
+                model_id = {"fast": "gemini-1.5-flash", "standard": "gemini-1.5-pro"}.get(model_tier, "gemini-3-pro")
+                if api_key:
+                    fallbacks.append(gemini_model(id=model_id, api_key=api_key))
+            if exclude != "claude" and provider_registry.has_claude_key():
+                api_key = provider_registry.get_claude_key()
+                model_id = {
+                    "fast": "claude-3-haiku-20240307",
+                    "standard": "claude-3-5-sonnet-20241022",
+                }.get(model_tier, "claude-opus-4.5-20251124")
+                if api_key:
+                    fallbacks.append(Claude(id=model_id, api_key=api_key))
+        except Exception as e:
+            self.logger.warning("fallback_model_creation_failed", error=str(e), model_tier=model_tier)
+        return fallbacks
+
+    def _get_primary_agno_model(self, model_tier: str = "fast"):
         """Get appropriate Agno model based on provider registry and tier.
 
         Model Tiers (Updated November 2025):
@@ -426,7 +496,7 @@ class AgnoBaseAgent(ABC):
             elif provider_registry.has_gemini_key():
                 api_key = provider_registry.get_gemini_key()
                 if api_key:
-                    return Gemini(id="gemini-1.5-flash", api_key=api_key)
+                    return gemini_model(id="gemini-1.5-flash", api_key=api_key)
             elif provider_registry.has_claude_key():
                 api_key = provider_registry.get_claude_key()
                 if api_key:
@@ -482,7 +552,7 @@ class AgnoBaseAgent(ABC):
             elif provider_registry.has_gemini_key():
                 api_key = provider_registry.get_gemini_key()
                 if api_key:
-                    return Gemini(id="gemini-1.5-pro", api_key=api_key)
+                    return gemini_model(id="gemini-1.5-pro", api_key=api_key)
             elif provider_registry.has_claude_key():
                 api_key = provider_registry.get_claude_key()
                 if api_key:
@@ -545,9 +615,9 @@ class AgnoBaseAgent(ABC):
                 if api_key:
                     # Use Gemini 3 Pro (Nov 2025) or fallback to gemini-3.0-pro
                     try:
-                        return Gemini(id="gemini-3-pro", api_key=api_key)
+                        return gemini_model(id="gemini-3-pro", api_key=api_key)
                     except:
-                        return Gemini(
+                        return gemini_model(
                             id=settings.agent_model_tertiary, api_key=api_key
                         )  # gemini-3.0-pro
             elif provider_registry.has_claude_key():
@@ -657,6 +727,61 @@ class AgnoBaseAgent(ABC):
                     table_name=self.rag_table_name,
                 )
 
+    def _build_embedder(self) -> Optional[Any]:
+        """Embedder for the first configured provider (OpenAI/AI Gateway, Anthropic, Gemini)."""
+        embedder = None
+        if provider_registry.has_openai_key() and OpenAIEmbedder:
+            try:
+                api_key = provider_registry.get_openai_key()
+                base_url = getattr(settings, "ai_gateway_openai_base_url", None)
+
+                if base_url and "ai-gateway" in base_url:
+                    from openai import OpenAI, AsyncOpenAI
+
+                    sync_client = OpenAI(
+                        base_url=base_url,
+                        api_key="sk-proj-dummy",
+                        default_headers={"Authorization": f"Bearer {api_key}"},
+                    )
+                    async_client = AsyncOpenAI(
+                        base_url=base_url,
+                        api_key="sk-proj-dummy",
+                        default_headers={"Authorization": f"Bearer {api_key}"},
+                    )
+                    embedder = OpenAIEmbedder(
+                        openai_client=sync_client, async_client=async_client
+                    )
+                else:
+                    try:
+                        embedder = OpenAIEmbedder(api_key=api_key)
+                    except TypeError:
+                        embedder = OpenAIEmbedder()
+            except Exception as e:
+                self.logger.warning("openai_embedder_init_failed", error=str(e))
+        elif provider_registry.has_claude_key() and AnthropicEmbedder:
+            try:
+                api_key = provider_registry.get_claude_key()
+                try:
+                    embedder = AnthropicEmbedder(api_key=api_key)
+                except TypeError:
+                    embedder = AnthropicEmbedder()
+            except Exception as e:
+                self.logger.warning(
+                    "anthropic_embedder_init_failed", error=str(e)
+                )
+        elif provider_registry.has_gemini_key():
+            try:
+                from agno.knowledge.embedder.google import GoogleEmbedder
+
+                api_key = provider_registry.get_gemini_key()
+                try:
+                    embedder = GoogleEmbedder(api_key=api_key)
+                except TypeError:
+                    embedder = GoogleEmbedder()
+            except Exception as e:
+                self.logger.warning("google_embedder_init_failed", error=str(e))
+        return embedder
+
     def _create_knowledge_base(self, table_name: str) -> Optional[Any]:
         """Create knowledge base with pgvector for RAG.
 
@@ -672,55 +797,7 @@ class AgnoBaseAgent(ABC):
         for attempt in range(max_retries):
             try:
                 # Get embedder based on available provider
-                embedder = None
-                if provider_registry.has_openai_key() and OpenAIEmbedder:
-                    try:
-                        api_key = provider_registry.get_openai_key()
-                        base_url = getattr(settings, "ai_gateway_openai_base_url", None)
-
-                        if base_url and "ai-gateway" in base_url:
-                            from openai import OpenAI, AsyncOpenAI
-
-                            sync_client = OpenAI(
-                                base_url=base_url,
-                                api_key="sk-proj-dummy",
-                                default_headers={"Authorization": f"Bearer {api_key}"},
-                            )
-                            async_client = AsyncOpenAI(
-                                base_url=base_url,
-                                api_key="sk-proj-dummy",
-                                default_headers={"Authorization": f"Bearer {api_key}"},
-                            )
-                            embedder = OpenAIEmbedder(
-                                openai_client=sync_client, async_client=async_client
-                            )
-                        else:
-                            try:
-                                embedder = OpenAIEmbedder(api_key=api_key)
-                            except TypeError:
-                                embedder = OpenAIEmbedder()
-                    except Exception as e:
-                        self.logger.warning("openai_embedder_init_failed", error=str(e))
-                elif provider_registry.has_claude_key() and AnthropicEmbedder:
-                    try:
-                        api_key = provider_registry.get_claude_key()
-                        try:
-                            embedder = AnthropicEmbedder(api_key=api_key)
-                        except TypeError:
-                            embedder = AnthropicEmbedder()
-                    except Exception as e:
-                        self.logger.warning(
-                            "anthropic_embedder_init_failed", error=str(e)
-                        )
-                elif provider_registry.has_gemini_key() and GoogleEmbedder:
-                    try:
-                        api_key = provider_registry.get_gemini_key()
-                        try:
-                            embedder = GoogleEmbedder(api_key=api_key)
-                        except TypeError:
-                            embedder = GoogleEmbedder()
-                    except Exception as e:
-                        self.logger.warning("google_embedder_init_failed", error=str(e))
+                embedder = self._build_embedder()
 
                 if not embedder:
                     self.logger.warning(
@@ -738,6 +815,7 @@ class AgnoBaseAgent(ABC):
                     db_url=settings.database_url,
                     search_type=SearchType.vector,  # Use vector search for PgVector
                     embedder=embedder,  # Embedder goes to vector_db, not Knowledge
+                    vector_index=build_vector_index(),  # HNSW m/ef_construction/ef_search from settings
                 )
 
                 # Create knowledge base
@@ -811,6 +889,10 @@ class AgnoBaseAgent(ABC):
 
             # Get the current model type and ID
             current_model = self.agno_agent.model
+            if isinstance(current_model, RoutingModel):
+                # Rebuild every route with current credentials (route stats are process-wide)
+                self.agno_agent.model = self._get_agno_model(model_tier=self.model_tier) or current_model
+                return
             model_id = None
             if hasattr(current_model, "id"):
                 model_id = current_model.id
@@ -883,7 +965,7 @@ class AgnoBaseAgent(ABC):
             elif provider_registry.has_gemini_key():
                 api_key = provider_registry.get_gemini_key()
                 if api_key:
-                    new_model = Gemini(
+                    new_model = gemini_model(
                         id=model_id or settings.agent_model_tertiary, api_key=api_key
                     )
 
@@ -993,11 +1075,15 @@ Your response MUST show that you've used this context. Generic responses that ig
 
         # Option E Enhancement: Build enhanced system prompt if context is provided
         original_instructions = None
+        packed_context = None
+        layout_token = None
         if context and hasattr(self, "agno_agent") and self.agno_agent:
             # Build enhanced prompt with messages and context
-            enhanced_prompt = self._build_enhanced_system_prompt(
+            prompt_layout, packed_context = self._pack_enhanced_system_prompt(
                 self.system_prompt, messages, context
             )
+            layout_token = current_prompt_layout.set(prompt_layout)
+            enhanced_prompt = self._apply_prompt_caching(prompt_layout)
             # Temporarily update agent instructions
             original_instructions = (
                 self.agno_agent.instructions
@@ -1052,30 +1138,36 @@ Your response MUST show that you've used this context. Generic responses that ig
             import asyncio
 
             try:
-                # Check if Agno agent has async run method
-                if hasattr(self.agno_agent, "arun"):
-                    # Use async run if available (fully async, no timeout needed)
-                    response = await self.agno_agent.arun(query)
-                elif hasattr(self.agno_agent, "run_async"):
-                    # Alternative async method name
-                    response = await self.agno_agent.run_async(query)
-                else:
-                    # Fallback to thread pool for sync run (non-blocking)
-                    # Use a very high timeout since job runs in background
-                    # Set timeout to 30 minutes (1800s) for background jobs
-                    # This allows complex multi-agent operations to complete
-                    from backend.config import settings
-
-                    # Use configurable timeout, default to 30 minutes for background jobs
-                    timeout_seconds = (
-                        float(settings.agent_response_timeout)
-                        if hasattr(settings, "agent_response_timeout")
-                        else 1800.0
-                    )
-                    response = await asyncio.wait_for(
-                        asyncio.to_thread(self.agno_agent.run, query),
-                        timeout=timeout_seconds,
-                    )
+                # Routing decisions (failover, hedging) of the model calls in this run
+                with routing_trace() as routing_decisions:
+                    # Wait for a slot under the provider/model rate limits (priority and tenant fair share)
+                    async with model_call_slot(
+                        self.agno_agent.model, self._estimate_call_tokens(query)
+                    ) as scheduler_slot:
+                        # Check if Agno agent has async run method
+                        if hasattr(self.agno_agent, "arun"):
+                            # Use async run if available (fully async, no timeout needed)
+                            response = await self.agno_agent.arun(query)
+                        elif hasattr(self.agno_agent, "run_async"):
+                            # Alternative async method name
+                            response = await self.agno_agent.run_async(query)
+                        else:
+                            # Fallback to thread pool for sync run (non-blocking)
+                            # Use a very high timeout since job runs in background
+                            # Set timeout to 30 minutes (1800s) for background jobs
+                            # This allows complex multi-agent operations to complete
+                            from backend.config import settings
+
+                            # Use configurable timeout, default to 30 minutes for background jobs
+                            timeout_seconds = (
+                                float(settings.agent_response_timeout)
+                                if hasattr(settings, "agent_response_timeout")
+                                else 1800.0
+                            )
+                            response = await asyncio.wait_for(
+                                asyncio.to_thread(self.agno_agent.run, query),
+                                timeout=timeout_seconds,
+                            )
             except asyncio.TimeoutError:
                 # Log timeout but raise exception so job can be marked as failed
                 timeout_seconds = (
@@ -1422,6 +1514,14 @@ Your response MUST show that you've used this context. Generic responses that ig
                     self.metrics["token_usage"]["input"] += input_tokens
                     self.metrics["token_usage"]["output"] += output_tokens
 
+            if scheduler_slot is not None:
+                scheduler_slot.record_usage(input_tokens + output_tokens)
+
+            # Provider prompt-cache usage (cached input tokens are billed at a discount)
+            cache_usage = extract_cache_usage(getattr(response, "metrics", None))
+            self.metrics["token_usage"]["cached"] += cache_usage["cached"]
+            self.metrics["token_usage"]["cache_write"] += cache_usage["cache_write"]
+
             # Extract metadata with performance metrics
             metadata = {
                 "has_context": context is not None,
@@ -1437,9 +1537,16 @@ Your response MUST show that you've used this context. Generic responses that ig
                     "input": input_tokens,
                     "output": output_tokens,
                     "total": input_tokens + output_tokens,
+                    "cached": cache_usage["cached"],
+                    "cache_write": cache_usage["cache_write"],
                 },
                 "cache_hit": cache_hit,  # Already determined above
             }
+            if packed_context is not None:
+                # Tokens spent per context section in the system prompt
+                metadata["context_tokens"] = packed_context.report()
+            if routing_decisions:
+                metadata["routing"] = routing_decisions
 
             # Add tool calls if available (optimize: limit tool call history)
             if hasattr(response, "tool_calls") and response.tool_calls:
@@ -1512,6 +1619,20 @@ Your response MUST show that you've used this context. Generic responses that ig
             ):
                 if hasattr(self.agno_agent, "instructions"):
                     self.agno_agent.instructions = original_instructions
+            if layout_token is not None:
+                current_prompt_layout.reset(layout_token)
+
+    def _estimate_call_tokens(self, query: str) -> int:
+        """Tokens a model call is expected to use: instructions + query + reserved output."""
+        model_id = getattr(self.agno_agent.model, "id", None)
+        instructions = getattr(self.agno_agent, "instructions", None) or ""
+        if isinstance(instructions, (list, tuple)):
+            instructions = "\n".join(str(item) for item in instructions)
+        return (
+            count_tokens(str(instructions), model_id)
+            + count_tokens(query, model_id)
+            + settings.llm_scheduler_output_tokens
+        )
 
     def _format_messages_to_query(
         self, messages: List[AgentMessage], context: Optional[Dict[str, Any]]
@@ -1687,6 +1808,8 @@ Your response MUST show that you've used this context. Generic responses that ig
 
         Note: This method processes documents one at a time. For batch operations,
         consider using add_contents_async if available.
+
+        Returns True when the content was added.
         """
         # Ensure knowledge base is created (lazy creation)
         if self.enable_rag:
@@ -1719,10 +1842,12 @@ Your response MUST show that you've used this context. Generic responses that ig
                     agent=self.name,
                     content_length=len(content),
                 )
+                return True
             except Exception as e:
                 self.logger.error("failed_to_add_to_knowledge_base", error=str(e))
         else:
             self.logger.warning("knowledge_base_not_available", agent=self.name)
+        return False
 
     async def add_multiple_to_knowledge_base(self, contents: List[Dict[str, Any]]):
         """Add multiple documents to knowledge base in parallel for better performance.
@@ -1857,63 +1982,53 @@ Your response MUST show that you've used this context. Generic responses that ig
         This method enhances the base system prompt with explicit instructions
         to use ALL provided context, ensuring no critical information is lost.
         """
-        enhanced_parts = [base_prompt]
+        layout, _ = self._pack_enhanced_system_prompt(base_prompt, messages, context)
+        return layout.render()
+
+    def _pack_enhanced_system_prompt(
+        self,
+        base_prompt: str,
+        messages: List[AgentMessage],
+        context: Optional[Dict[str, Any]],
+    ) -> Tuple[PromptLayout, Optional[PackedContext]]:
+        """Build the enhanced system prompt within the model's context token budget.
+
+        Conversation summary and context keys become sections ranked by priority and
+        recency and packed greedily with compact serialization. The prompt is laid out
+        as static prefix (base prompt + instructions), product context, then request
+        context so provider prompt caches can reuse the stable prefix. Returns the
+        layout and the packing report (tokens per section) for response metadata.
+        """
+        if not context and not messages:
+            return PromptLayout(static=base_prompt), None
+
+        model_id = self._get_model_id()
+        sections = []
 
         # Add detailed conversation summary from messages
         if messages:
             conversation_summary = self._summarize_context(messages)
             if conversation_summary:
-                enhanced_parts.append(
-                    f"\n=== CONVERSATION HISTORY SUMMARY ===\n{conversation_summary}"
+                sections.append(
+                    ContextSection(
+                        name="conversation_summary",
+                        body=conversation_summary,
+                        header="=== CONVERSATION HISTORY SUMMARY ===",
+                        priority=CONTEXT_KEY_PRIORITIES["conversation_summary"],
+                    )
                 )
 
         # Add other relevant context from the coordinator or direct call
         if context:
-            context_summary_parts = []
-            for key, value in context.items():
-                if (
-                    key
-                    not in [
-                        "messages",
-                        "query",
-                        "user_id",
-                        "product_id",
-                        "session_ids",
-                        "db",
-                    ]
-                    and value
-                ):
-                    # Option E: Preserve full form_data content (no truncation for form_data)
-                    if key == "form_data" and isinstance(value, dict):
-                        # Include full form_data without truncation to preserve all user details
-                        form_data_str = "\n".join(
-                            [
-                                f"  {k.replace('_', ' ').title()}: {str(v)}"
-                                for k, v in value.items()
-                                if v
-                            ]
-                        )
-                        context_summary_parts.append(
-                            f"{key.replace('_', ' ').title()}:\n{form_data_str}"
-                        )
-                    elif isinstance(value, (dict, list)):
-                        context_summary_parts.append(
-                            f"{key.replace('_', ' ').title()}: {json.dumps(value, indent=2)[:2000]}"
-                        )  # Increased from 500
-                    else:
-                        # Increase limit for other context values too (Option E)
-                        context_summary_parts.append(
-                            f"{key.replace('_', ' ').title()}: {str(value)[:2000]}"
-                        )  # Increased from 500
-            if context_summary_parts:
-                enhanced_parts.append(
-                    f"\n=== ADDITIONAL CONTEXT ===\n" + "\n".join(context_summary_parts)
+            sections.extend(
+                sections_from_context(
+                    context,
+                    exclude=["messages", "query", "user_id", "product_id", "session_ids", "db"],
                 )
+            )
 
         # Add critical context usage instructions
-        if context or messages:
-            enhanced_parts.append(
-                """
+        instructions = """
 === CRITICAL CONTEXT USAGE INSTRUCTIONS ===
 You MUST use ALL provided context in your response. This includes:
 - Conversation history and previous messages
@@ -1930,9 +2045,54 @@ CRITICAL REQUIREMENTS:
 - Demonstrate context awareness by referencing specific details from the provided context
 
 Your response MUST show that you've used this context. Generic responses that ignore context are not acceptable."""
+
+        # The budget covers the packed context; base prompt and instructions are a fixed cost on top
+        budget = get_context_budget(model_id)
+        packed = ContextPacker(budget, model=model_id).pack(sections)
+        if packed.dropped:
+            self.logger.info(
+                "context_sections_dropped",
+                agent=self.name,
+                model=model_id,
+                budget=budget,
+                dropped=packed.dropped,
             )
 
-        return "\n\n".join(enhanced_parts)
+        product_text = packed.tier_text.get("product")
+        request_text = packed.tier_text.get("request")
+        layout = PromptLayout(
+            static=f"{base_prompt}\n\n{instructions.strip()}",
+            product=f"=== PRODUCT CONTEXT ===\n{product_text}" if product_text else "",
+            request=f"=== REQUEST CONTEXT ===\n{request_text}" if request_text else "",
+        )
+        return layout, packed
+
+    def _apply_prompt_caching(self, layout: PromptLayout) -> str:
+        """Configure provider prompt caching for this call and return the agent instructions.
+
+        Direct Claude models cache the stable prefix (and tool schemas) via cache_control
+        and receive the request tier as an uncached system block. Other models get the
+        whole layout; OpenAI caches the stable prefix automatically and AIGatewayModel
+        adds cache_control parts for Claude models when enabled.
+        """
+        model = getattr(self.agno_agent, "model", None)
+        if isinstance(model, RoutingModel) and len(model.routes) == 1:
+            model = model.routes[0]
+        if (
+            AGNO_AVAILABLE
+            and isinstance(model, Claude)
+            and cache_control_enabled(getattr(model, "id", None))
+        ):
+            model.cache_system_prompt = True
+            model.cache_tools = True
+            model.system_prompt_blocks = request_context_blocks
+            return layout.stable_prefix
+        return layout.render()
+
+    def _get_model_id(self) -> Optional[str]:
+        """Model id of the underlying Agno model, used for tokenizer and budget lookup."""
+        model = getattr(getattr(self, "agno_agent", None), "model", None)
+        return getattr(model, "id", None) if model is not None else None
 
     def _summarize_context(self, messages: List[AgentMessage]) -> str:
         """Summarize older message context for history limiting.
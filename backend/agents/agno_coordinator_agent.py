@@ -10,14 +10,13 @@ try:
     from agno.agent import Agent
     from agno.models.openai import OpenAIChat
     from agno.models.anthropic import Claude
-    from agno.models.google import Gemini
     AGNO_AVAILABLE = True
 except ImportError as e:
     AGNO_AVAILABLE = False
     import structlog
     structlog.get_logger().warning("agno_framework_not_available", error=str(e))
 
-from backend.agents.agno_base_agent import AgnoBaseAgent
+from backend.agents.agno_base_agent import AgnoBaseAgent, gemini_model
 from backend.agents.agno_prd_authoring_agent import AgnoPRDAuthoringAgent
 from backend.agents.agno_ideation_agent import AgnoIdeationAgent
 from backend.agents.agno_research_agent import AgnoResearchAgent
@@ -100,7 +99,7 @@ class AgnoCoordinatorAgent:
             elif provider_registry.has_gemini_key():
                 api_key = provider_registry.get_gemini_key()
                 if api_key:
-                    return Gemini(id="gemini-1.5-flash", api_key=api_key)
+                    return gemini_model(id="gemini-1.5-flash", api_key=api_key)
             elif provider_registry.has_claude_key():
                 api_key = provider_registry.get_claude_key()
                 if api_key:
@@ -114,7 +113,7 @@ class AgnoCoordinatorAgent:
             elif provider_registry.has_gemini_key():
                 api_key = provider_registry.get_gemini_key()
                 if api_key:
-                    return Gemini(id="gemini-1.5-pro", api_key=api_key)
+                    return gemini_model(id="gemini-1.5-pro", api_key=api_key)
             elif provider_registry.has_claude_key():
                 api_key = provider_registry.get_claude_key()
                 if api_key:
@@ -132,7 +131,7 @@ class AgnoCoordinatorAgent:
             elif provider_registry.has_gemini_key():
                 api_key = provider_registry.get_gemini_key()
                 if api_key:
-                    return Gemini(id=settings.agent_model_tertiary, api_key=api_key)
+                    return gemini_model(id=settings.agent_model_tertiary, api_key=api_key)
             elif provider_registry.has_claude_key():
                 api_key = provider_registry.get_claude_key()
                 if api_key:
@@ -8,9 +8,6 @@ import structlog
 
 try:
     from agno.agent import Agent
-    from agno.models.openai import OpenAIChat
-    from agno.models.anthropic import Claude
-    from agno.models.google import Gemini
     AGNO_AVAILABLE = True
 except ImportError as e:
     AGNO_AVAILABLE = False
@@ -18,23 +15,16 @@ except ImportError as e:
     structlog.get_logger().warning("agno_framework_not_available", error=str(e))
 
 from backend.agents.agno_base_agent import AgnoBaseAgent
-from backend.agents.agno_prd_authoring_agent import AgnoPRDAuthoringAgent
-from backend.agents.agno_ideation_agent import AgnoIdeationAgent
-from backend.agents.agno_research_agent import AgnoResearchAgent
-from backend.agents.agno_requirements_agent import AgnoRequirementsAgent
-from backend.agents.agno_analysis_agent import AgnoAnalysisAgent
-from backend.agents.agno_summary_agent import AgnoSummaryAgent
-from backend.agents.agno_scoring_agent import AgnoScoringAgent
-from backend.agents.agno_strategy_agent import AgnoStrategyAgent
-from backend.agents.agno_validation_agent import AgnoValidationAgent
-from backend.agents.agno_export_agent import AgnoExportAgent
-from backend.agents.agno_v0_agent import AgnoV0Agent
-from backend.agents.agno_lovable_agent import AgnoLovableAgent
-from backend.agents.agno_atlassian_agent import AgnoAtlassianAgent
-from backend.agents.rag_agent import RAGAgent
+from backend.agents.registry import LazyAgentRegistry, registered_agent
 from backend.models.schemas import AgentMessage, AgentResponse, AgentInteraction, AgentCapability
-from backend.services.provider_registry import provider_registry
-from backend.config import settings
+from backend.services.context_packer import (
+    CONTEXT_KEY_PRIORITIES,
+    ContextPacker,
+    ContextSection,
+    compact_serialize,
+    get_context_budget,
+)
+from backend.services.resilience import UPSTREAM_RAG, get_breaker
 
 logger = structlog.get_logger()
 
@@ -44,50 +34,50 @@ class AgnoEnhancedCoordinator:
     Enhanced Coordinator with heavy contextualization.
     Agents coordinate and share context before providing full responses.
     """
+
+    research_agent = registered_agent("research")
+    analysis_agent = registered_agent("analysis")
+    ideation_agent = registered_agent("ideation")
+    requirements_agent = registered_agent("requirements")
+    prd_agent = registered_agent("prd_authoring")
+    summary_agent = registered_agent("summary")
+    scoring_agent = registered_agent("scoring")
+    strategy_agent = registered_agent("strategy")
+    validation_agent = registered_agent("validation")
+    export_agent = registered_agent("export")
+    v0_agent = registered_agent("v0")
+    lovable_agent = registered_agent("lovable")
+    atlassian_agent = registered_agent("atlassian_mcp")
+    rag_agent = registered_agent("rag")
     
     def __init__(self, enable_rag: bool = True):
         """Initialize Enhanced Coordinator with all agents."""
         if not AGNO_AVAILABLE:
             raise ImportError("Agno framework is not available. Install with: pip install agno")
         
-        # Initialize all agents
+        # Register all agents; each is imported and built the first time it is used
         # CRITICAL: Enable RAG for all lifecycle agents to ensure knowledge base is used across all phases
-        self.research_agent = AgnoResearchAgent(enable_rag=True)  # Always enable RAG for research
-        self.analysis_agent = AgnoAnalysisAgent(enable_rag=True)  # Always enable RAG for analysis
-        self.ideation_agent = AgnoIdeationAgent(enable_rag=True)  # Always enable RAG for ideation
-        self.requirements_agent = AgnoRequirementsAgent(enable_rag=True)  # Always enable RAG for requirements
-        self.prd_agent = AgnoPRDAuthoringAgent(enable_rag=True)  # Always enable RAG for PRD authoring
-        self.summary_agent = AgnoSummaryAgent(enable_rag=enable_rag)
-        self.scoring_agent = AgnoScoringAgent(enable_rag=enable_rag)
-        self.strategy_agent = AgnoStrategyAgent(enable_rag=enable_rag)
-        self.validation_agent = AgnoValidationAgent(enable_rag=True)  # Always enable RAG for validation/review
-        self.export_agent = AgnoExportAgent(enable_rag=True)  # Always enable RAG for export
-        self.v0_agent = AgnoV0Agent(enable_rag=enable_rag)
-        self.lovable_agent = AgnoLovableAgent(enable_rag=enable_rag)
-        self.atlassian_agent = AgnoAtlassianAgent(enable_rag=enable_rag)
-        self.rag_agent = RAGAgent()
-        
-        # Register all agents
-        self.agents: Dict[str, AgnoBaseAgent] = {
-            "research": self.research_agent,
-            "analysis": self.analysis_agent,
-            "ideation": self.ideation_agent,
-            "requirements": self.requirements_agent,
-            "prd_authoring": self.prd_agent,
-            "summary": self.summary_agent,
-            "scoring": self.scoring_agent,
-            "strategy": self.strategy_agent,
-            "validation": self.validation_agent,
-            "export": self.export_agent,
-            "v0": self.v0_agent,
-            "lovable": self.lovable_agent,
-            "atlassian_mcp": self.atlassian_agent,
-            "rag": self.rag_agent,
-        }
-        
-        # Set coordinator reference
-        for agent in self.agents.values():
-            agent.set_coordinator(self)
+        always_rag = {"enable_rag": True}
+        self.agents: LazyAgentRegistry = LazyAgentRegistry(
+            {
+                "research": ("backend.agents.agno_research_agent:AgnoResearchAgent", always_rag),
+                "analysis": ("backend.agents.agno_analysis_agent:AgnoAnalysisAgent", always_rag),
+                "ideation": ("backend.agents.agno_ideation_agent:AgnoIdeationAgent", always_rag),
+                "requirements": ("backend.agents.agno_requirements_agent:AgnoRequirementsAgent", always_rag),
+                "prd_authoring": ("backend.agents.agno_prd_authoring_agent:AgnoPRDAuthoringAgent", always_rag),
+                "summary": ("backend.agents.agno_summary_agent:AgnoSummaryAgent", {"enable_rag": enable_rag}),
+                "scoring": ("backend.agents.agno_scoring_agent:AgnoScoringAgent", {"enable_rag": enable_rag}),
+                "strategy": ("backend.agents.agno_strategy_agent:AgnoStrategyAgent", {"enable_rag": enable_rag}),
+                "validation": ("backend.agents.agno_validation_agent:AgnoValidationAgent", always_rag),
+                "export": ("backend.agents.agno_export_agent:AgnoExportAgent", always_rag),
+                "v0": ("backend.agents.agno_v0_agent:AgnoV0Agent", {"enable_rag": enable_rag}),
+                "lovable": ("backend.agents.agno_lovable_agent:AgnoLovableAgent", {"enable_rag": enable_rag}),
+                "atlassian_mcp": ("backend.agents.agno_atlassian_agent:AgnoAtlassianAgent", {"enable_rag": enable_rag}),
+                "rag": ("backend.agents.rag_agent:RAGAgent", {}),
+            },
+            # Set coordinator reference
+            on_create=lambda _agent_type, agent: agent.set_coordinator(self),
+        )
         
         # Create enhanced teams with heavy coordination
         self._create_enhanced_teams()
@@ -102,65 +92,20 @@ class AgnoEnhancedCoordinator:
             "user_inputs": []  # All user inputs from chatbot
         }
     
-    def _get_agno_model(self, model_tier: str = "standard"):
-        """Get appropriate Agno model based on provider registry and tier.
-        
-        Model Tiers:
-        - fast: gpt-5.1-chat-latest, claude-3-haiku, gemini-1.5-flash
-        - standard: gpt-5.1, claude-3.5-sonnet, gemini-1.5-pro (for coordinators)
-        - premium: gpt-5.1, claude-4-sonnet, gemini-3.0-pro
+    def _switch_model_tier(self, agent: Any, model_tier: str) -> Optional[tuple]:
+        """Move an agent to another model tier for one call; returns what to restore (None if unchanged).
+
+        The model is built by the agent itself (AgnoBaseAgent._get_agno_model), so it keeps the
+        RoutingModel failover, hedging, circuit breakers and attempt timeout, and the agent's
+        model_tier is switched too so the per-call API key refresh rebuilds the same tier.
         """
-        api_key = None
-        
-        if model_tier == "fast":
-            if provider_registry.has_openai_key():
-                api_key = provider_registry.get_openai_key()
-                if api_key:
-                    # GPT-5.1 models require max_completion_tokens instead of max_tokens
-                    # Use fast model from settings (env.kind), fallback to agent_model_primary
-                    fast_model_id = getattr(settings, "agent_model_fast", None) or getattr(settings, "agent_model_primary", "gpt-5.1")
-                    return OpenAIChat(id=fast_model_id, api_key=api_key, max_completion_tokens=2000)
-            elif provider_registry.has_gemini_key():
-                api_key = provider_registry.get_gemini_key()
-                if api_key:
-                    return Gemini(id="gemini-1.5-flash", api_key=api_key)
-            elif provider_registry.has_claude_key():
-                api_key = provider_registry.get_claude_key()
-                if api_key:
-                    return Claude(id="claude-3-haiku-20240307", api_key=api_key)
-        elif model_tier == "standard":
-            if provider_registry.has_openai_key():
-                api_key = provider_registry.get_openai_key()
-                if api_key:
-                    # GPT-5.1 models require max_completion_tokens instead of max_tokens
-                    return OpenAIChat(id="gpt-5.1", api_key=api_key, max_completion_tokens=4000)
-            elif provider_registry.has_gemini_key():
-                api_key = provider_registry.get_gemini_key()
-                if api_key:
-                    return Gemini(id="gemini-1.5-pro", api_key=api_key)
-            elif provider_registry.has_claude_key():
-                api_key = provider_registry.get_claude_key()
-                if api_key:
-                    return Claude(id="claude-3-5-sonnet-20241022", api_key=api_key)
-        elif model_tier == "premium":
-            if provider_registry.has_openai_key():
-                api_key = provider_registry.get_openai_key()
-                if api_key:
-                    model_id = settings.agent_model_primary
-                    # GPT-5.1 models require max_completion_tokens instead of max_tokens
-                    if 'gpt-5.1' in model_id.lower() or 'gpt-5' in model_id.lower():
-                        return OpenAIChat(id=model_id, api_key=api_key, max_completion_tokens=4000)
-                    else:
-                        return OpenAIChat(id=model_id, api_key=api_key)
-            elif provider_registry.has_gemini_key():
-                api_key = provider_registry.get_gemini_key()
-                if api_key:
-                    return Gemini(id=settings.agent_model_tertiary, api_key=api_key)
-            elif provider_registry.has_claude_key():
-                api_key = provider_registry.get_claude_key()
-                if api_key:
-                    return Claude(id=settings.agent_model_secondary, api_key=api_key)
-        raise ValueError("No AI provider configured")
+        model = agent._get_agno_model(model_tier=model_tier)
+        if model is None:
+            return None
+        original = (agent.model_tier, agent.agno_agent.model)
+        agent.model_tier = model_tier
+        agent.agno_agent.model = model
+        return original
     
     def _create_enhanced_teams(self):
         """Create enhanced coordination logic.
@@ -497,84 +442,117 @@ class AgnoEnhancedCoordinator:
         return context
     
     def _build_system_content(self, context: Dict[str, Any]) -> str:
-        """Build system content from context - separate from user prompt for better structure."""
-        import json
-        
-        system_parts = []
+        """Build system content from context - separate from user prompt for better structure.
+
+        Sections are packed into the context token budget by priority, so large previous
+        phase submissions or long histories no longer grow the prompt without bound.
+        """
+        header_parts = []
         
         # Product context
         if context.get("product_id"):
-            system_parts.append(f"Product ID: {context['product_id']}")
+            header_parts.append(f"Product ID: {context['product_id']}")
         
         if context.get("phase_id"):
-            system_parts.append(f"Phase ID: {context['phase_id']}")
+            header_parts.append(f"Phase ID: {context['phase_id']}")
         
         if context.get("phase_name"):
-            system_parts.append(f"Phase: {context['phase_name']}")
+            header_parts.append(f"Phase: {context['phase_name']}")
         
         # Section-specific context (for phase forms)
         if context.get("current_field"):
             field_name = ' '.join([w.capitalize() for w in str(context['current_field']).split('_')])
-            system_parts.append(f"Current Section/Field: {field_name}")
+            header_parts.append(f"Current Section/Field: {field_name}")
         
         if context.get("section_name"):
-            system_parts.append(f"Section Name: {context['section_name']}")
+            header_parts.append(f"Section Name: {context['section_name']}")
         
         if context.get("current_prompt"):
-            system_parts.append(f"Section Question: {context['current_prompt']}")
+            header_parts.append(f"Section Question: {context['current_prompt']}")
         
         if context.get("session_ids"):
-            system_parts.append(f"Relevant Sessions: {', '.join(context['session_ids'])}")
+            header_parts.append(f"Relevant Sessions: {', '.join(context['session_ids'])}")
         
-        # Conversation history - structured for system context (Option E: increased limits)
+        sections = [ContextSection(name="header", body="\n".join(header_parts), required=True)]
+        
+        # Conversation history - structured for system context, newest messages kept first
         if context.get("conversation_history"):
-            system_parts.append("\n=== CONVERSATION HISTORY ===")
-            for msg in context["conversation_history"][-20:]:  # Last 20 messages (increased from 15 - Option E)
+            history_lines = []
+            for msg in context["conversation_history"][-20:]:
                 role = msg.get("role", "unknown")
                 content = msg.get("content", "")
                 agent_name = msg.get("agent_name", "")
                 if content:
                     agent_label = f" ({agent_name})" if agent_name else ""
-                    system_parts.append(f"{role.upper()}{agent_label}: {content[:600]}")  # Increased from 400 - Option E
+                    history_lines.append(f"{role.upper()}{agent_label}: {content[:600]}")
+            sections.append(ContextSection(
+                name="conversation_history",
+                body=history_lines,
+                header="=== CONVERSATION HISTORY ===",
+                priority=CONTEXT_KEY_PRIORITIES["conversation_history"],
+            ))
         
-        # Ideation from chat (Option E: increased limit)
+        # Ideation from chat
         if context.get("ideation_from_chat"):
-            system_parts.append("\n=== IDEATION FROM CHATBOT ===")
-            system_parts.append(context["ideation_from_chat"][:2500])  # Increased from 1500 - Option E
+            sections.append(ContextSection(
+                name="ideation_from_chat",
+                body=context["ideation_from_chat"],
+                header="=== IDEATION FROM CHATBOT ===",
+                priority=CONTEXT_KEY_PRIORITIES["ideation_from_chat"],
+                tier="product",
+            ))
         
-        # Previous phase submissions (CRITICAL: Include ALL previous phase data)
+        # Previous phase submissions (CRITICAL: Include ALL previous phase data that fits)
         if context.get("previous_phases"):
-            system_parts.append("\n=== PREVIOUS PHASE SUBMISSIONS ===")
-            system_parts.append("CRITICAL: Use ALL information from previous phases. Reference specific details from ideation, market research, and other completed phases.")
-            system_parts.append(context["previous_phases"])
+            sections.append(ContextSection(
+                name="previous_phases",
+                body=context["previous_phases"],
+                header="=== PREVIOUS PHASE SUBMISSIONS ===\nCRITICAL: Use ALL information from previous phases. Reference specific details from ideation, market research, and other completed phases.",
+                priority=CONTEXT_KEY_PRIORITIES["previous_phases"],
+                tier="product",
+            ))
         
-        # Form data context (exclude current field to avoid duplication) (Option E: increased limit)
+        # Form data context (exclude current field to avoid duplication)
         if context.get("form_data"):
             current_field = context.get("current_field")
             form_data_filtered = {k: v for k, v in context["form_data"].items() if k != current_field and v and str(v).strip()}
             if form_data_filtered:
-                system_parts.append("\n=== OTHER FORM FIELDS (Already Filled) ===")
-                form_summary = "\n".join([f"{k.replace('_', ' ').title()}: {str(v)[:500]}" for k, v in form_data_filtered.items()])  # Increased from 200 - Option E
-                system_parts.append(form_summary)
-        
-        # Knowledge base (Option E: increased limit)
+                sections.append(ContextSection(
+                    name="form_data",
+                    body=compact_serialize(form_data_filtered),
+                    header="=== OTHER FORM FIELDS (Already Filled) ===",
+                    priority=CONTEXT_KEY_PRIORITIES["form_data"],
+                    tier="product",
+                ))
+        
+        # Knowledge base
         if context.get("knowledge_base"):
-            system_parts.append("\n=== KNOWLEDGE BASE ===")
-            for kb_item in context["knowledge_base"][:10]:  # Increased from 5 - Option E
-                kb_content = kb_item.get('content', '')[:500]  # Increased from 300 - Option E
-                system_parts.append(f"- {kb_content}")
+            sections.append(ContextSection(
+                name="knowledge_base",
+                body=[f"- {kb_item.get('content', '')[:500]}" for kb_item in context["knowledge_base"][:10]],
+                header="=== KNOWLEDGE BASE ===",
+                priority=CONTEXT_KEY_PRIORITIES["knowledge_base"],
+                tier="product",
+            ))
         
         # Shared context
         if context.get("shared_context"):
             shared = context["shared_context"]
             if shared.get("last_query") or shared.get("last_response"):
-                system_parts.append("\n=== PREVIOUS INTERACTIONS ===")
+                interaction_lines = []
                 if shared.get("last_query"):
-                    system_parts.append(f"Last Query: {shared['last_query'][:150]}")
+                    interaction_lines.append(f"Last Query: {shared['last_query'][:150]}")
                 if shared.get("last_response"):
-                    system_parts.append(f"Last Response: {shared['last_response'][:150]}")
-        
-        return "\n".join(system_parts)
+                    interaction_lines.append(f"Last Response: {shared['last_response'][:150]}")
+                sections.append(ContextSection(
+                    name="shared_context",
+                    body="\n".join(interaction_lines),
+                    header="=== PREVIOUS INTERACTIONS ===",
+                    priority=CONTEXT_KEY_PRIORITIES["shared_context"],
+                ))
+        
+        packed = ContextPacker(get_context_budget()).pack(sections)
+        return packed.text
     
     def _enhance_query_with_context(self, query: str, context: Dict[str, Any]) -> str:
         """Enhance query with context - optimized structure using system/user prompt separation.
@@ -1452,16 +1430,21 @@ Answer ONLY the specific question asked. Do NOT generate full PRD sections or ot
                     # - Handling cases with 10+ documents in knowledge base
                     # Note: RAG search itself is fast (vector similarity search), but processing
                     # multiple retrieved documents and generating embeddings can take time
+                    # The timeout adapts to recent RAG latency (at most 60s), and repeated
+                    # timeouts open the RAG circuit so queries skip it instead of waiting
+                    rag_breaker = get_breaker(UPSTREAM_RAG)
+                    rag_timeout = rag_breaker.timeout(60.0)
                     try:
-                        rag_response = await asyncio.wait_for(
-                            self.rag_agent.process(
-                                [AgentMessage(role="user", content=enhanced_query, timestamp=datetime.utcnow())],
-                                enhanced_context
-                            ),
-                            timeout=60.0  # 60 second timeout for RAG (increased from 30s to handle 10+ documents)
-                        )
+                        async with rag_breaker.guard():
+                            rag_response = await asyncio.wait_for(
+                                self.rag_agent.process(
+                                    [AgentMessage(role="user", content=enhanced_query, timestamp=datetime.utcnow())],
+                                    enhanced_context
+                                ),
+                                timeout=rag_timeout
+                            )
                     except asyncio.TimeoutError as e:
-                        error_msg = "RAG agent timed out after 60 seconds. Proceeding without RAG context."
+                        error_msg = f"RAG agent timed out after {int(rag_timeout)} seconds. Proceeding without RAG context."
                         self.logger.warning("rag_agent_timeout", query=enhanced_query[:100], error=error_msg)
                         from backend.models.schemas import AgentResponse
                         rag_response = AgentResponse(
@@ -1789,58 +1772,18 @@ Answer ONLY the specific question. Do NOT generate full PRD sections."""
                 
                 # Determine model tier based on query type
                 # Use fast model for phase form help, standard for regular chat queries (quality priority)
+                primary_agent = self.agents[primary]
                 original_model = None
-                should_use_fast_model = use_fast_model and is_phase_form_help
-                
-                # For regular chat queries, use standard tier for better quality
-                if not should_use_fast_model and hasattr(self.agents[primary], 'agno_agent') and self.agents[primary].agno_agent:
-                    # Check current model tier - if it's fast, upgrade to standard for quality
-                    current_model = self.agents[primary].agno_agent.model
-                    current_model_id = getattr(current_model, 'id', '') if current_model else ''
-                    
-                    # If using fast model (gpt-5.1-chat-latest, haiku, flash), upgrade to standard
-                    is_fast_model = any(fast_id in current_model_id.lower() for fast_id in [
-                        'gpt-5.1-chat-latest', 'haiku', 'flash'
-                    ])
-                    
-                    if is_fast_model:
-                        # Temporarily switch to standard model for better quality
-                        original_model = current_model
-                        from backend.services.provider_registry import provider_registry
-                        
-                        standard_model = None
-                        if provider_registry.has_openai_key():
-                            # Use GPT-5.1 (standard tier) for quality responses
-                            standard_model = OpenAIChat(id="gpt-5.1", api_key=provider_registry.get_openai_key(), max_completion_tokens=4000)
-                        elif provider_registry.has_claude_key():
-                            standard_model = Claude(id="claude-3.5-sonnet-20241022", api_key=provider_registry.get_claude_key())
-                        elif provider_registry.has_gemini_key():
-                            standard_model = Gemini(id="gemini-1.5-pro", api_key=provider_registry.get_gemini_key())
-                        
-                        if standard_model:
-                            self.agents[primary].agno_agent.model = standard_model
-                            self.logger.info("upgraded_to_standard_model", agent=primary, model=standard_model.id if hasattr(standard_model, 'id') else str(type(standard_model)), reason="quality_priority_for_chat")
-                
-                # Force fast model if requested (for phase form help only)
-                if should_use_fast_model and hasattr(self.agents[primary], 'agno_agent') and self.agents[primary].agno_agent:
-                    # Temporarily switch to fast model
-                    original_model = self.agents[primary].agno_agent.model
-                    from backend.services.provider_registry import provider_registry
-                    
-                    fast_model = None
-                    if provider_registry.has_openai_key():
-                        # GPT-5.1 models require max_completion_tokens instead of max_tokens
-                        # Use fast model from settings (env.kind), fallback to agent_model_primary
-                        fast_model_id = getattr(settings, "agent_model_fast", None) or getattr(settings, "agent_model_primary", "gpt-5.1")
-                        fast_model = OpenAIChat(id=fast_model_id, api_key=provider_registry.get_openai_key(), max_completion_tokens=2000)
-                    elif provider_registry.has_gemini_key():
-                        fast_model = Gemini(id="gemini-1.5-flash", api_key=provider_registry.get_gemini_key())
-                    elif provider_registry.has_claude_key():
-                        fast_model = Claude(id="claude-3-haiku-20240307", api_key=provider_registry.get_claude_key())
-                    
-                    if fast_model:
-                        self.agents[primary].agno_agent.model = fast_model
-                        self.logger.info("switched_to_fast_model", agent=primary, model=fast_model.id if hasattr(fast_model, 'id') else str(type(fast_model)))
+                if hasattr(primary_agent, 'agno_agent') and primary_agent.agno_agent:
+                    if use_fast_model and is_phase_form_help:
+                        original_model = self._switch_model_tier(primary_agent, "fast")
+                        if original_model:
+                            self.logger.info("switched_to_fast_model", agent=primary, model=getattr(primary_agent.agno_agent.model, 'id', None))
+                    elif getattr(primary_agent, 'model_tier', None) == "fast":
+                        # Agents on the fast tier answer regular chat with the standard tier for quality
+                        original_model = self._switch_model_tier(primary_agent, "standard")
+                        if original_model:
+                            self.logger.info("upgraded_to_standard_model", agent=primary, model=getattr(primary_agent.agno_agent.model, 'id', None), reason="quality_priority_for_chat")
                 
                 try:
                     prd_response = await self.agents[primary].process(
@@ -1848,9 +1791,9 @@ Answer ONLY the specific question. Do NOT generate full PRD sections."""
                         enhanced_context
                     )
                 finally:
-                    # Restore original model if we switched to fast model
+                    # Restore the agent's own tier and model
                     if original_model:
-                        self.agents[primary].agno_agent.model = original_model
+                        primary_agent.model_tier, primary_agent.agno_agent.model = original_model
                         self.logger.info("restored_original_model", agent=primary)
                 
                 # CRITICAL: Do NOT truncate responses - store full response asynchronously
@@ -3,11 +3,340 @@ Export Agent using Agno Framework
 Generates comprehensive PRD documents using all available context
 Includes review and missing content detection
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from datetime import datetime
 
 from backend.agents.agno_base_agent import AgnoBaseAgent
+from backend.config import settings
 from backend.models.schemas import AgentMessage, AgentResponse
+from backend.services.llm_scheduler import PRIORITY_EXPORT, current_priority, request_class
+from backend.services.prd_section_cache import (
+    PRDSectionCache,
+    compute_section_input_hash,
+    get_section_semaphore,
+)
+from backend.services.section_context import (
+    SLICED_SOURCES,
+    EmbedFn,
+    SectionContextIndex,
+    build_chunks,
+)
+
+# Conversation messages per chunk when slicing the corpus for section prompts
+CONVERSATION_CHUNK_MESSAGES = 6
+
+
+# PRD sections generated in parallel by the agent army, in document order.
+# Each prompt_template is formatted with the product name/description and the
+# formatted phase submissions, conversation history, knowledge base and mockups.
+PRD_SECTIONS: List[Dict[str, str]] = [
+    {
+        "section": "EXECUTIVE SUMMARY",
+        "agent_type": "summary",
+        "prompt_template": """Generate the Executive Summary section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Executive Summary including:
+- Product Overview
+- Business Objectives
+- Key Success Metrics
+- Target Timeline
+
+Be concise but comprehensive. Use information from all available sources."""
+    },
+    {
+        "section": "PROBLEM STATEMENT & OPPORTUNITY",
+        "agent_type": "research",
+        "prompt_template": """Generate the Problem Statement & Opportunity section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Problem Statement & Opportunity section including:
+- Market Problem
+- User Pain Points
+- Business Opportunity
+- Market Size & Opportunity Assessment
+
+Use research insights and market analysis. Reference specific data from conversations and knowledge base."""
+    },
+    {
+        "section": "PRODUCT VISION & STRATEGY",
+        "agent_type": "strategy",
+        "prompt_template": """Generate the Product Vision & Strategy section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Product Vision & Strategy section including:
+- Product Vision Statement
+- Strategic Goals
+- Product Positioning
+- Competitive Differentiation
+
+Focus on strategic alignment and long-term vision. Use strategy insights."""
+    },
+    {
+        "section": "USER PERSONAS & USE CASES",
+        "agent_type": "ideation",
+        "prompt_template": """Generate the User Personas & Use Cases section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive User Personas & Use Cases section including:
+- Primary Personas (ICAgile: User-Centered Design)
+- Secondary Personas
+- User Journeys
+- Use Case Scenarios
+
+Extract user insights from conversations and phase data."""
+    },
+    {
+        "section": "FUNCTIONAL REQUIREMENTS",
+        "agent_type": "prd_authoring",
+        "prompt_template": """Generate the Functional Requirements section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Functional Requirements section including:
+- Core Features
+- User Stories (ICAgile: INVEST criteria)
+- Acceptance Criteria (ICAgile: Definition of Done)
+- User Flows
+- Edge Cases
+
+Be detailed and actionable for engineering teams."""
+    },
+    {
+        "section": "NON-FUNCTIONAL REQUIREMENTS",
+        "agent_type": "validation",
+        "prompt_template": """Generate the Non-Functional Requirements section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Non-Functional Requirements section including:
+- Performance Requirements
+- Security Requirements
+- Scalability Requirements
+- Accessibility Requirements
+- Compliance Requirements
+
+Focus on quality attributes and constraints."""
+    },
+    {
+        "section": "TECHNICAL ARCHITECTURE",
+        "agent_type": "analysis",
+        "prompt_template": """Generate the Technical Architecture section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Design Mockups:
+{design_mockups}
+
+Generate a comprehensive Technical Architecture section including:
+- System Architecture Overview
+- Technology Stack
+- Integration Requirements
+- Data Requirements
+- API Specifications
+
+Reference design mockups and technical discussions from conversations."""
+    },
+    {
+        "section": "SUCCESS METRICS & KPIs",
+        "agent_type": "scoring",
+        "prompt_template": """Generate the Success Metrics & KPIs section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Success Metrics & KPIs section including:
+- North Star Metric
+- Leading Indicators
+- Lagging Indicators
+- Success Criteria
+- Measurement Plan
+
+Focus on measurable outcomes and success criteria."""
+    },
+    {
+        "section": "GO-TO-MARKET STRATEGY",
+        "agent_type": "strategy",
+        "prompt_template": """Generate the Go-To-Market Strategy section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Go-To-Market Strategy section including:
+- Target Market Segments
+- Launch Strategy
+- Marketing Requirements
+- Sales Enablement
+
+Focus on market entry and growth strategy."""
+    },
+    {
+        "section": "TIMELINE & MILESTONES",
+        "agent_type": "prd_authoring",
+        "prompt_template": """Generate the Timeline & Milestones section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Timeline & Milestones section including:
+- Release Plan (ICAgile: Release Planning)
+- Key Milestones
+- Dependencies
+- Critical Path
+
+Extract timeline information from phase data and conversations."""
+    },
+    {
+        "section": "RISKS & MITIGATIONS",
+        "agent_type": "analysis",
+        "prompt_template": """Generate the Risks & Mitigations section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Risks & Mitigations section including:
+- Technical Risks
+- Market Risks
+- Execution Risks
+- Risk Mitigation Strategies
+
+Identify risks from analysis and provide mitigation strategies."""
+    },
+    {
+        "section": "STAKEHOLDER ALIGNMENT",
+        "agent_type": "strategy",
+        "prompt_template": """Generate the Stakeholder Alignment section for this PRD.
+
+Product: {product_name}
+Description: {product_description}
+
+Phase Submissions:
+{phase_submissions}
+
+Conversation History:
+{conversation_history}
+
+Knowledge Base:
+{knowledge_base}
+
+Generate a comprehensive Stakeholder Alignment section including:
+- Stakeholder Map
+- Communication Plan
+- Approval Requirements
+
+Focus on stakeholder management and alignment."""
+    }
+]
 
 
 class AgnoExportAgent(AgnoBaseAgent):
@@ -149,6 +478,7 @@ Your output should:
                 "missing content detection"
             ]
         )
+        self.section_cache = PRDSectionCache()
 
     async def review_content_before_export(
         self,
@@ -619,7 +949,8 @@ For each missing section, create a section header and include:
             }
         }
 
-        return await self.process(messages, enhanced_context)
+        with request_class(priority=PRIORITY_EXPORT):
+            return await self.process(messages, enhanced_context)
 
     def _format_phase_submissions(self, submissions: List[Dict[str, Any]]) -> str:
         """Format phase submissions for export prompt."""
@@ -708,8 +1039,133 @@ For each missing section, create a section header and include:
             formatted.append(f"❌ Phase {phase_order}: {phase_name} - {description}")
         
         return '\n'.join(formatted)
-    
-    async def _generate_prd_with_agent_army(
+
+    def _format_design_mockups(self, design_mockups: Optional[List[Dict[str, Any]]]) -> str:
+        """Format design mockups for section prompts and appendices."""
+        if not design_mockups:
+            return ""
+        design_mockups_text = "\n**Design Prototypes:**\n"
+        for mockup in design_mockups:
+            provider = mockup.get('provider', 'unknown').upper()
+            status = mockup.get('project_status', 'unknown')
+            project_url = mockup.get('project_url', '')
+            thumbnail_url = mockup.get('thumbnail_url') or mockup.get('image_url', '')
+            prompt = mockup.get('prompt', '')
+            design_mockups_text += f"""
+- **{provider} Prototype:**
+  - Status: {status}
+  - Prototype URL: {project_url}
+  - Thumbnail: {thumbnail_url if thumbnail_url else 'N/A'}
+  - Prompt Used: {prompt[:200] if prompt else 'N/A'}...
+"""
+        return design_mockups_text
+
+    def _format_export_sources(
+        self,
+        phase_data: List[Dict[str, Any]],
+        conversation_history: List[Dict[str, Any]],
+        knowledge_base: List[Dict[str, Any]],
+        design_mockups: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, str]:
+        """Format all export sources once so every section prompt can share them."""
+        return {
+            "phase_submissions": self._format_phase_submissions(phase_data),
+            "conversation_history": self._format_conversation_history(conversation_history[:50]),  # Limit to 50 messages
+            "knowledge_base": self._format_knowledge_articles(knowledge_base[:20]),  # Limit to 20 articles
+            "design_mockups": self._format_design_mockups(design_mockups),
+        }
+
+    def _section_embed_fn(self) -> Tuple[Optional[EmbedFn], str]:
+        """Batch embedding function for section context selection (None without an embedder)."""
+        embedder = self._build_embedder()
+        if embedder is None:
+            return None, ""
+
+        async def embed(texts: List[str]) -> List[List[float]]:
+            if hasattr(embedder, "async_get_embeddings_batch_and_usage"):
+                vectors, _usage = await embedder.async_get_embeddings_batch_and_usage(texts)
+                return vectors
+            return [await embedder.async_get_embedding(text) for text in texts]
+
+        return embed, str(getattr(embedder, "id", type(embedder).__name__))
+
+    async def _build_section_context_index(
+        self,
+        phase_data: List[Dict[str, Any]],
+        conversation_history: List[Dict[str, Any]],
+        knowledge_base: List[Dict[str, Any]]
+    ) -> SectionContextIndex:
+        """Chunk this export's corpus (same formatting and limits as the full sources) and index it."""
+        conversation = conversation_history[:50]
+        chunks = build_chunks({
+            "phase_submissions": [self._format_phase_submissions([submission]) for submission in phase_data],
+            "conversation_history": [
+                self._format_conversation_history(conversation[i:i + CONVERSATION_CHUNK_MESSAGES])
+                for i in range(0, len(conversation), CONVERSATION_CHUNK_MESSAGES)
+            ],
+            "knowledge_base": [self._format_knowledge_articles([article]) for article in knowledge_base[:20]],
+        })
+        budget = settings.prd_section_context_tokens
+        embed, embed_key = self._section_embed_fn() if sum(c.tokens for c in chunks) > budget else (None, "")
+        return await SectionContextIndex.build(chunks, budget, embed, embed_key)
+
+    async def _section_sources(
+        self,
+        context_index: SectionContextIndex,
+        section_def: Dict[str, Any],
+        sources: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Corpus fields for one section prompt, limited to the chunks relevant to it."""
+        selected = await context_index.select(section_def, settings.prd_section_context_tokens)
+        indexed = {chunk.source for chunk in context_index.chunks}
+        values = {}
+        for source in SLICED_SOURCES:
+            if source in selected:
+                values[source] = "\n".join(selected[source])
+            elif source in indexed:
+                values[source] = "No entries relevant to this section."
+            else:
+                values[source] = sources[source]
+        return values
+
+    def _format_prd_header(self, product_id: str, product_info: Dict[str, Any]) -> str:
+        """Build the title block that opens every agent-army PRD."""
+        return f"""# Product Requirements Document
+
+## Product: {product_info.get('name', 'Unknown Product')}
+
+**Product ID:** {product_id}  
+**Generated:** {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}  
+**Description:** {product_info.get('description', '')}
+
+---
+
+"""
+
+    def _format_prd_appendices(self, sources: Dict[str, str]) -> str:
+        """Build the appendices that close every agent-army PRD."""
+        return f"""
+## APPENDICES
+
+### Phase Submissions Summary
+{sources["phase_submissions"]}
+
+### Design Prototypes
+{sources["design_mockups"] if sources["design_mockups"] else "No design prototypes available."}
+
+### Knowledge Base References
+{sources["knowledge_base"] if sources["knowledge_base"] else "No knowledge base articles referenced."}
+
+### Conversation History Summary
+*Note: Full conversation history is available in the system. This is a summary of key discussions.*
+
+---
+
+**Document Generated by IdeaForge AI - Agentic Product Management Platform**  
+**Generated using parallel agent army for comprehensive coverage**
+"""
+
+    async def _iter_prd_sections_with_agent_army(
         self,
         product_id: str,
         product_info: Dict[str, Any],
@@ -719,11 +1175,13 @@ For each missing section, create a section header and include:
         design_mockups: Optional[List[Dict[str, Any]]],
         context: Optional[Dict[str, Any]],
         override_missing: bool,
-        coordinator: Any
-    ) -> str:
+        coordinator: Any,
+        sources: Dict[str, str]
+    ) -> AsyncIterator[Tuple[str, str]]:
         """
-        Generate PRD using agent army - parallel section generation.
-        Each section is generated by a specialized agent in parallel.
+        Generate PRD sections in parallel and yield them in document order.
+        All sections start immediately; each one is yielded as soon as it and every
+        section before it has finished, so callers can stream the document.
         """
         import asyncio
         
@@ -739,346 +1197,54 @@ For each missing section, create a section header and include:
             **(context or {})
         }
         
-        # Format context for agents
-        phase_submissions_text = self._format_phase_submissions(phase_data)
-        conversation_text = self._format_conversation_history(conversation_history[:50])  # Limit to 50 messages
-        knowledge_text = self._format_knowledge_articles(knowledge_base[:20])  # Limit to 20 articles
+        prompt_values = {
+            "product_name": product_info.get("name", "Unknown Product"),
+            "product_description": product_info.get("description", ""),
+            **sources
+        }
         
-        # Define PRD sections and their assigned agents
-        prd_sections = [
-            {
-                "section": "EXECUTIVE SUMMARY",
-                "agent_type": "summary",
-                "prompt_template": """Generate the Executive Summary section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Executive Summary including:
-- Product Overview
-- Business Objectives
-- Key Success Metrics
-- Target Timeline
-
-Be concise but comprehensive. Use information from all available sources."""
-            },
-            {
-                "section": "PROBLEM STATEMENT & OPPORTUNITY",
-                "agent_type": "research",
-                "prompt_template": """Generate the Problem Statement & Opportunity section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Problem Statement & Opportunity section including:
-- Market Problem
-- User Pain Points
-- Business Opportunity
-- Market Size & Opportunity Assessment
-
-Use research insights and market analysis. Reference specific data from conversations and knowledge base."""
-            },
-            {
-                "section": "PRODUCT VISION & STRATEGY",
-                "agent_type": "strategy",
-                "prompt_template": """Generate the Product Vision & Strategy section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Product Vision & Strategy section including:
-- Product Vision Statement
-- Strategic Goals
-- Product Positioning
-- Competitive Differentiation
-
-Focus on strategic alignment and long-term vision. Use strategy insights."""
-            },
-            {
-                "section": "USER PERSONAS & USE CASES",
-                "agent_type": "ideation",
-                "prompt_template": """Generate the User Personas & Use Cases section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive User Personas & Use Cases section including:
-- Primary Personas (ICAgile: User-Centered Design)
-- Secondary Personas
-- User Journeys
-- Use Case Scenarios
-
-Extract user insights from conversations and phase data."""
-            },
-            {
-                "section": "FUNCTIONAL REQUIREMENTS",
-                "agent_type": "prd_authoring",
-                "prompt_template": """Generate the Functional Requirements section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Functional Requirements section including:
-- Core Features
-- User Stories (ICAgile: INVEST criteria)
-- Acceptance Criteria (ICAgile: Definition of Done)
-- User Flows
-- Edge Cases
-
-Be detailed and actionable for engineering teams."""
-            },
-            {
-                "section": "NON-FUNCTIONAL REQUIREMENTS",
-                "agent_type": "validation",
-                "prompt_template": """Generate the Non-Functional Requirements section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Non-Functional Requirements section including:
-- Performance Requirements
-- Security Requirements
-- Scalability Requirements
-- Accessibility Requirements
-- Compliance Requirements
-
-Focus on quality attributes and constraints."""
-            },
-            {
-                "section": "TECHNICAL ARCHITECTURE",
-                "agent_type": "analysis",
-                "prompt_template": """Generate the Technical Architecture section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Design Mockups:
-{design_mockups}
-
-Generate a comprehensive Technical Architecture section including:
-- System Architecture Overview
-- Technology Stack
-- Integration Requirements
-- Data Requirements
-- API Specifications
-
-Reference design mockups and technical discussions from conversations."""
-            },
-            {
-                "section": "SUCCESS METRICS & KPIs",
-                "agent_type": "scoring",
-                "prompt_template": """Generate the Success Metrics & KPIs section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Success Metrics & KPIs section including:
-- North Star Metric
-- Leading Indicators
-- Lagging Indicators
-- Success Criteria
-- Measurement Plan
-
-Focus on measurable outcomes and success criteria."""
-            },
-            {
-                "section": "GO-TO-MARKET STRATEGY",
-                "agent_type": "strategy",
-                "prompt_template": """Generate the Go-To-Market Strategy section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Go-To-Market Strategy section including:
-- Target Market Segments
-- Launch Strategy
-- Marketing Requirements
-- Sales Enablement
-
-Focus on market entry and growth strategy."""
-            },
-            {
-                "section": "TIMELINE & MILESTONES",
-                "agent_type": "prd_authoring",
-                "prompt_template": """Generate the Timeline & Milestones section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Timeline & Milestones section including:
-- Release Plan (ICAgile: Release Planning)
-- Key Milestones
-- Dependencies
-- Critical Path
-
-Extract timeline information from phase data and conversations."""
-            },
-            {
-                "section": "RISKS & MITIGATIONS",
-                "agent_type": "analysis",
-                "prompt_template": """Generate the Risks & Mitigations section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Risks & Mitigations section including:
-- Technical Risks
-- Market Risks
-- Execution Risks
-- Risk Mitigation Strategies
-
-Identify risks from analysis and provide mitigation strategies."""
-            },
-            {
-                "section": "STAKEHOLDER ALIGNMENT",
-                "agent_type": "strategy",
-                "prompt_template": """Generate the Stakeholder Alignment section for this PRD.
-
-Product: {product_name}
-Description: {product_description}
-
-Phase Submissions:
-{phase_submissions}
-
-Conversation History:
-{conversation_history}
-
-Knowledge Base:
-{knowledge_base}
-
-Generate a comprehensive Stakeholder Alignment section including:
-- Stakeholder Map
-- Communication Plan
-- Approval Requirements
-
-Focus on stakeholder management and alignment."""
+        # Each section reads only the corpus chunks relevant to it, not the whole corpus
+        section_values = {section_def["section"]: prompt_values for section_def in PRD_SECTIONS}
+        if settings.prd_section_slicing_enabled:
+            context_index = await self._build_section_context_index(phase_data, conversation_history, knowledge_base)
+            selections = await asyncio.gather(*(
+                self._section_sources(context_index, section_def, sources) for section_def in PRD_SECTIONS
+            ))
+            section_values = {
+                section_def["section"]: {**prompt_values, **selected}
+                for section_def, selected in zip(PRD_SECTIONS, selections)
+            }
+            shared_context = {
+                key: value for key, value in shared_context.items()
+                if key not in ("phase_data", "conversation_history", "knowledge_base")
             }
-        ]
         
-        # Format design mockups text
-        design_mockups_text = ""
-        if design_mockups:
-            design_mockups_text = "\n**Design Prototypes:**\n"
-            for mockup in design_mockups:
-                provider = mockup.get('provider', 'unknown').upper()
-                status = mockup.get('project_status', 'unknown')
-                project_url = mockup.get('project_url', '')
-                thumbnail_url = mockup.get('thumbnail_url') or mockup.get('image_url', '')
-                prompt = mockup.get('prompt', '')
-                design_mockups_text += f"""
-- **{provider} Prototype:**
-  - Status: {status}
-  - Prototype URL: {project_url}
-  - Thumbnail: {thumbnail_url if thumbnail_url else 'N/A'}
-  - Prompt Used: {prompt[:200] if prompt else 'N/A'}...
-"""
+        # Hashed over what each prompt actually reads, so an edit only regenerates the sections it reaches
+        input_hashes = {
+            section_def["section"]: compute_section_input_hash(section_def, section_values[section_def["section"]])
+            for section_def in PRD_SECTIONS
+        }
+        cached_sections = await self.section_cache.get_many(product_id, input_hashes)
+        self.logger.info(
+            "prd_section_cache_lookup",
+            product_id=product_id,
+            cached=len(cached_sections),
+            to_generate=len(PRD_SECTIONS) - len(cached_sections)
+        )
+        semaphore = get_section_semaphore()
         
-        # Generate all sections in parallel using agent army
-        async def generate_section(section_def: Dict[str, Any]) -> tuple[str, str]:
+        async def generate_section(section_def: Dict[str, Any]) -> Tuple[str, str]:
             """Generate a single PRD section using the assigned agent."""
             section_name = section_def["section"]
             agent_type = section_def["agent_type"]
             prompt_template = section_def["prompt_template"]
             
+            if section_name in cached_sections:
+                return section_name, cached_sections[section_name]
+            
+            # Each section runs in its own task (and context), so this does not leak to the caller
+            current_priority.set(PRIORITY_EXPORT)
+            
             try:
                 # Get the appropriate agent from coordinator
                 agent = coordinator.agents.get(agent_type)
@@ -1088,14 +1254,7 @@ Focus on stakeholder management and alignment."""
                     self.logger.warning("agent_not_found_using_export", agent_type=agent_type, section=section_name)
                 
                 # Format the prompt with context
-                prompt = prompt_template.format(
-                    product_name=product_info.get("name", "Unknown Product"),
-                    product_description=product_info.get("description", ""),
-                    phase_submissions=phase_submissions_text,
-                    conversation_history=conversation_text,
-                    knowledge_base=knowledge_text,
-                    design_mockups=design_mockups_text
-                )
+                prompt = prompt_template.format(**section_values[section_name])
                 
                 # Generate section using agent
                 messages = [
@@ -1112,10 +1271,12 @@ Focus on stakeholder management and alignment."""
                     "section": section_name
                 }
                 
-                response = await agent.process(messages, enhanced_context)
+                async with semaphore:
+                    response = await agent.process(messages, enhanced_context)
                 section_content = response.response if hasattr(response, 'response') else str(response)
                 
                 self.logger.info("section_generated", section=section_name, agent=agent_type, length=len(section_content))
+                await self.section_cache.put(product_id, section_name, agent_type, input_hashes[section_name], section_content)
                 return section_name, section_content
                 
             except Exception as e:
@@ -1123,76 +1284,119 @@ Focus on stakeholder management and alignment."""
                 # Return placeholder for failed section
                 return section_name, f"## {section_name}\n\n*[Section generation failed: {str(e)}]*\n\n*This section requires manual completion.*"
         
-        # Generate all sections in parallel
-        self.logger.info("starting_parallel_section_generation", sections_count=len(prd_sections))
-        section_results = await asyncio.gather(
-            *[generate_section(section_def) for section_def in prd_sections],
-            return_exceptions=True
-        )
-        
-        # Process results and handle exceptions
-        sections = {}
-        for result in section_results:
-            if isinstance(result, Exception):
-                self.logger.error("section_generation_exception", error=str(result))
-                continue
-            section_name, section_content = result
-            sections[section_name] = section_content
-        
-        # Build final PRD document
-        prd_content = f"""# Product Requirements Document
-
-## Product: {product_info.get('name', 'Unknown Product')}
-
-**Product ID:** {product_id}  
-**Generated:** {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}  
-**Description:** {product_info.get('description', '')}
-
----
+        # Start all sections in parallel, then await them in document order
+        self.logger.info("starting_parallel_section_generation", sections_count=len(PRD_SECTIONS))
+        tasks = [asyncio.ensure_future(generate_section(section_def)) for section_def in PRD_SECTIONS]
+        try:
+            for task in tasks:
+                try:
+                    yield await task
+                except Exception as e:
+                    self.logger.error("section_generation_exception", error=str(e))
+        finally:
+            # Consumer went away (e.g. client disconnected) - stop remaining generations
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
-"""
-        
-        # Add all sections in order
-        section_order = [
-            "EXECUTIVE SUMMARY",
-            "PROBLEM STATEMENT & OPPORTUNITY",
-            "PRODUCT VISION & STRATEGY",
-            "USER PERSONAS & USE CASES",
-            "FUNCTIONAL REQUIREMENTS",
-            "NON-FUNCTIONAL REQUIREMENTS",
-            "TECHNICAL ARCHITECTURE",
-            "SUCCESS METRICS & KPIs",
-            "GO-TO-MARKET STRATEGY",
-            "TIMELINE & MILESTONES",
-            "RISKS & MITIGATIONS",
-            "STAKEHOLDER ALIGNMENT"
-        ]
+    async def _generate_prd_with_agent_army(
+        self,
+        product_id: str,
+        product_info: Dict[str, Any],
+        phase_data: List[Dict[str, Any]],
+        conversation_history: List[Dict[str, Any]],
+        knowledge_base: List[Dict[str, Any]],
+        design_mockups: Optional[List[Dict[str, Any]]],
+        context: Optional[Dict[str, Any]],
+        override_missing: bool,
+        coordinator: Any
+    ) -> str:
+        """
+        Generate PRD using agent army - parallel section generation.
+        Each section is generated by a specialized agent in parallel.
+        """
+        sources = self._format_export_sources(phase_data, conversation_history, knowledge_base, design_mockups)
         
-        for section_name in section_order:
-            if section_name in sections:
-                prd_content += f"\n{sections[section_name]}\n\n---\n\n"
+        # Build final PRD document
+        parts = [self._format_prd_header(product_id, product_info)]
+        sections_count = 0
+        async for _section_name, section_content in self._iter_prd_sections_with_agent_army(
+            product_id=product_id,
+            product_info=product_info,
+            phase_data=phase_data,
+            conversation_history=conversation_history,
+            knowledge_base=knowledge_base,
+            design_mockups=design_mockups,
+            context=context,
+            override_missing=override_missing,
+            coordinator=coordinator,
+            sources=sources
+        ):
+            parts.append(f"\n{section_content}\n\n---\n\n")
+            sections_count += 1
         
         # Add appendices section
-        prd_content += f"""
-## APPENDICES
-
-### Phase Submissions Summary
-{phase_submissions_text}
-
-### Design Prototypes
-{design_mockups_text if design_mockups_text else "No design prototypes available."}
-
-### Knowledge Base References
-{knowledge_text if knowledge_text else "No knowledge base articles referenced."}
-
-### Conversation History Summary
-*Note: Full conversation history is available in the system. This is a summary of key discussions.*
-
----
-
-**Document Generated by IdeaForge AI - Agentic Product Management Platform**  
-**Generated using parallel agent army for comprehensive coverage**
-"""
+        parts.append(self._format_prd_appendices(sources))
+        prd_content = "".join(parts)
         
-        self.logger.info("prd_generation_complete", product_id=product_id, sections_count=len(sections), total_length=len(prd_content))
+        self.logger.info("prd_generation_complete", product_id=product_id, sections_count=sections_count, total_length=len(prd_content))
         return prd_content
+
+    async def stream_comprehensive_prd(
+        self,
+        product_id: str,
+        product_info: Dict[str, Any],
+        phase_data: List[Dict[str, Any]],
+        conversation_history: List[Dict[str, Any]],
+        knowledge_base: List[Dict[str, Any]],
+        design_mockups: Optional[List[Dict[str, Any]]] = None,
+        context: Optional[Dict[str, Any]] = None,
+        override_missing: bool = False,
+        coordinator: Optional[Any] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of generate_comprehensive_prd.
+        Yields the PRD markdown piece by piece: the header immediately, then each
+        section as soon as it (and every section before it) is generated, then the
+        appendices. Without a coordinator the single-agent export is yielded whole.
+        """
+        if not override_missing:
+            review_result = await self.review_content_before_export(
+                product_id=product_id,
+                phase_data=phase_data,
+                conversation_history=conversation_history,
+                knowledge_base=knowledge_base,
+                design_mockups=design_mockups,
+                context=context
+            )
+            context = context or {}
+            context["review_result"] = review_result
+        
+        if not (coordinator and hasattr(coordinator, 'agents')):
+            response = await self.export_prd(
+                product_id=product_id,
+                phase_submissions=phase_data,
+                conversation_history=conversation_history,
+                knowledge_articles=knowledge_base,
+                context={**(context or {}), "product_info": product_info, "override_missing": override_missing, "design_mockups": design_mockups or []}
+            )
+            yield response.response
+            return
+        
+        self.logger.info("streaming_agent_army_export", product_id=product_id)
+        sources = self._format_export_sources(phase_data, conversation_history, knowledge_base, design_mockups)
+        yield self._format_prd_header(product_id, product_info)
+        async for _section_name, section_content in self._iter_prd_sections_with_agent_army(
+            product_id=product_id,
+            product_info=product_info,
+            phase_data=phase_data,
+            conversation_history=conversation_history,
+            knowledge_base=knowledge_base,
+            design_mockups=design_mockups,
+            context=context,
+            override_missing=override_missing,
+            coordinator=coordinator,
+            sources=sources
+        ):
+            yield f"\n{section_content}\n\n---\n\n"
+        yield self._format_prd_appendices(sources)
@@ -5,11 +5,11 @@ Integrates with GitHub MCP server for repository and file access
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import structlog
-import httpx
 
 from backend.agents.agno_base_agent import AgnoBaseAgent
 from backend.models.schemas import AgentMessage, AgentResponse
 from backend.config import settings
+from backend.services.integration_http import content_unchanged, fetch, fetch_all, mark_content_processed
 from backend.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -86,48 +86,52 @@ Always provide clear, structured responses with source information.
             
             repo_name = f"{owner}/{repo}"
             
-            # Call MCP server to get file content
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Use MCP server's get_file_content tool
-                mcp_response = await client.post(
-                    f"{self.mcp_server_url}/tools/get_file_content",
-                    json={
-                        "repo_name": repo_name,
-                        "file_path": file_path,
-                        "branch": branch
-                    },
-                    headers={"Authorization": f"Bearer {user_id}"}  # Use user_id as auth for now
-                )
+            # Call MCP server's get_file_content tool over the shared pooled client
+            mcp_response = await fetch(
+                "POST",
+                f"{self.mcp_server_url}/tools/get_file_content",
+                json_body={
+                    "repo_name": repo_name,
+                    "file_path": file_path,
+                    "branch": branch
+                },
+                headers={"Authorization": f"Bearer {user_id}"}  # Use user_id as auth for now
+            )
+            
+            if mcp_response.status_code == 200:
+                file_data = mcp_response.json()
+                
+                knowledge_scope = f"github:{product_id}:{github_url}"
+                # Add to knowledge base if RAG is enabled (skipped when the file is unchanged since the last fetch)
+                if (
+                    hasattr(self.agno_agent, 'knowledge') and self.agno_agent.knowledge
+                    and not await content_unchanged(knowledge_scope, mcp_response.content_hash)
+                ):
+                    content = file_data.get("content", "")
+                    metadata = {
+                        "source": "github",
+                        "url": github_url,
+                        "repo": repo_name,
+                        "path": file_path,
+                        "branch": branch,
+                        "product_id": product_id
+                    }
+                    if await self.add_to_knowledge_base(content, metadata):
+                        await mark_content_processed(knowledge_scope, mcp_response.content_hash)
                 
-                if mcp_response.status_code == 200:
-                    file_data = mcp_response.json()
-                    
-                    # Add to knowledge base if RAG is enabled
-                    if hasattr(self.agno_agent, 'knowledge') and self.agno_agent.knowledge:
-                        content = file_data.get("content", "")
-                        metadata = {
-                            "source": "github",
-                            "url": github_url,
-                            "repo": repo_name,
-                            "path": file_path,
-                            "branch": branch,
-                            "product_id": product_id
-                        }
-                        self.add_to_knowledge_base(content, metadata)
-                    
-                    return {
-                        "success": True,
-                        "content": file_data.get("content", ""),
-                        "metadata": {
-                            "url": github_url,
-                            "repo": repo_name,
-                            "path": file_path,
-                            "branch": branch,
-                            "size": file_data.get("size", 0)
-                        }
+                return {
+                    "success": True,
+                    "content": file_data.get("content", ""),
+                    "metadata": {
+                        "url": github_url,
+                        "repo": repo_name,
+                        "path": file_path,
+                        "branch": branch,
+                        "size": file_data.get("size", 0)
                     }
-                else:
-                    raise Exception(f"MCP server error: {mcp_response.status_code}")
+                }
+            else:
+                raise Exception(f"MCP server error: {mcp_response.status_code}")
         
         except Exception as e:
             self_logger.error("github_fetch_error", error=str(e))
@@ -149,18 +153,18 @@ Always provide clear, structured responses with source information.
             List of repository dictionaries
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                mcp_response = await client.post(
-                    f"{self.mcp_server_url}/tools/list_repositories",
-                    json={"org": org} if org else {},
-                    headers={"Authorization": f"Bearer {user_id}"} if user_id else {}
-                )
-                
-                if mcp_response.status_code == 200:
-                    data = mcp_response.json()
-                    return data.get("repositories", [])
-                else:
-                    raise Exception(f"MCP server error: {mcp_response.status_code}")
+            mcp_response = await fetch(
+                "POST",
+                f"{self.mcp_server_url}/tools/list_repositories",
+                json_body={"org": org} if org else {},
+                headers={"Authorization": f"Bearer {user_id}"} if user_id else {}
+            )
+            
+            if mcp_response.status_code == 200:
+                data = mcp_response.json()
+                return data.get("repositories", [])
+            else:
+                raise Exception(f"MCP server error: {mcp_response.status_code}")
         
         except Exception as e:
             self.logger.error("list_repositories_error", error=str(e))
@@ -184,14 +188,15 @@ Always provide clear, structured responses with source information.
             user_id = context.get("user_id", "")
             product_id = context.get("product_id")
             
-            for url in github_urls:
-                try:
-                    fetched_data = await self.fetch_from_github_url(url, user_id, product_id)
-                    if fetched_data.get("success"):
-                        # Add fetched content to the message context
-                        context[f"github_content_{url}"] = fetched_data
-                except Exception as e:
-                    self.logger.warning("failed_to_fetch_github_url", url=url, error=str(e))
+            # Fetch all referenced URLs concurrently (bounded) over the shared client
+            urls = list(dict.fromkeys(github_urls))
+            results = await fetch_all(urls, lambda url: self.fetch_from_github_url(url, user_id, product_id))
+            for url, fetched_data in zip(urls, results):
+                if isinstance(fetched_data, BaseException):
+                    self.logger.warning("failed_to_fetch_github_url", url=url, error=str(fetched_data))
+                elif fetched_data.get("success"):
+                    # Add fetched content to the message context
+                    context[f"github_content_{url}"] = fetched_data
         
         return await super().process(messages, context)
 
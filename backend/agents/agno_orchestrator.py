@@ -7,23 +7,7 @@ from datetime import datetime
 from uuid import UUID
 import structlog
 
-from backend.agents.agno_coordinator_agent import AgnoCoordinatorAgent
-from backend.agents.agno_enhanced_coordinator import AgnoEnhancedCoordinator
-from backend.agents.agno_prd_authoring_agent import AgnoPRDAuthoringAgent
-from backend.agents.agno_requirements_agent import AgnoRequirementsAgent
-from backend.agents.agno_ideation_agent import AgnoIdeationAgent
-from backend.agents.agno_research_agent import AgnoResearchAgent
-from backend.agents.agno_analysis_agent import AgnoAnalysisAgent
-from backend.agents.agno_summary_agent import AgnoSummaryAgent
-from backend.agents.agno_scoring_agent import AgnoScoringAgent
-from backend.agents.agno_strategy_agent import AgnoStrategyAgent
-from backend.agents.agno_validation_agent import AgnoValidationAgent
-from backend.agents.agno_export_agent import AgnoExportAgent
-from backend.agents.agno_github_agent import AgnoGitHubAgent
-from backend.agents.agno_atlassian_agent import AgnoAtlassianAgent
-from backend.agents.agno_v0_agent import AgnoV0Agent
-from backend.agents.agno_lovable_agent import AgnoLovableAgent
-from backend.agents.rag_agent import RAGAgent
+from backend.agents.registry import LazyAgentRegistry, load_object
 from backend.models.schemas import AgentMessage, AgentResponse, MultiAgentRequest, MultiAgentResponse, AgentInteraction
 
 logger = structlog.get_logger()
@@ -40,29 +24,41 @@ class AgnoAgenticOrchestrator:
         self.logger = logger.bind(component="agno_orchestrator")
     
     def _initialize_components(self):
-        """Initialize coordinator and agents. Can be called to reinitialize."""
-        if self.use_enhanced:
-            self.coordinator = AgnoEnhancedCoordinator(enable_rag=self.enable_rag)
-        else:
-            self.coordinator = AgnoCoordinatorAgent(enable_rag=self.enable_rag)
-        
-        self.agents: Dict[str, Any] = {
-            "research": AgnoResearchAgent(enable_rag=self.enable_rag),
-            "analysis": AgnoAnalysisAgent(enable_rag=self.enable_rag),
-            "prd_authoring": AgnoPRDAuthoringAgent(enable_rag=self.enable_rag),
-            "requirements": AgnoRequirementsAgent(enable_rag=self.enable_rag),  # Dedicated requirements agent
-            "ideation": AgnoIdeationAgent(enable_rag=self.enable_rag),
-            "summary": AgnoSummaryAgent(enable_rag=self.enable_rag),
-            "scoring": AgnoScoringAgent(enable_rag=self.enable_rag),
-            "strategy": AgnoStrategyAgent(enable_rag=self.enable_rag),
-            "validation": AgnoValidationAgent(enable_rag=self.enable_rag),
-            "export": AgnoExportAgent(enable_rag=self.enable_rag),
-            "github_mcp": AgnoGitHubAgent(enable_rag=self.enable_rag),
-            "atlassian_mcp": AgnoAtlassianAgent(enable_rag=self.enable_rag),
-            "v0": AgnoV0Agent(enable_rag=self.enable_rag),
-            "lovable": AgnoLovableAgent(enable_rag=self.enable_rag),
-            "rag": RAGAgent(),  # RAG agent always has RAG enabled
-        }
+        """Register coordinator and agents. Can be called to reinitialize.
+
+        Nothing is imported or constructed here: the coordinator is built on first
+        access and each agent on its first lookup, so startup does not pay for them.
+        """
+        self._coordinator = None
+        agent_kwargs = {"enable_rag": self.enable_rag}
+        self.agents: LazyAgentRegistry = LazyAgentRegistry({
+            "research": ("backend.agents.agno_research_agent:AgnoResearchAgent", agent_kwargs),
+            "analysis": ("backend.agents.agno_analysis_agent:AgnoAnalysisAgent", agent_kwargs),
+            "prd_authoring": ("backend.agents.agno_prd_authoring_agent:AgnoPRDAuthoringAgent", agent_kwargs),
+            "requirements": ("backend.agents.agno_requirements_agent:AgnoRequirementsAgent", agent_kwargs),  # Dedicated requirements agent
+            "ideation": ("backend.agents.agno_ideation_agent:AgnoIdeationAgent", agent_kwargs),
+            "summary": ("backend.agents.agno_summary_agent:AgnoSummaryAgent", agent_kwargs),
+            "scoring": ("backend.agents.agno_scoring_agent:AgnoScoringAgent", agent_kwargs),
+            "strategy": ("backend.agents.agno_strategy_agent:AgnoStrategyAgent", agent_kwargs),
+            "validation": ("backend.agents.agno_validation_agent:AgnoValidationAgent", agent_kwargs),
+            "export": ("backend.agents.agno_export_agent:AgnoExportAgent", agent_kwargs),
+            "github_mcp": ("backend.agents.agno_github_agent:AgnoGitHubAgent", agent_kwargs),
+            "atlassian_mcp": ("backend.agents.agno_atlassian_agent:AgnoAtlassianAgent", agent_kwargs),
+            "v0": ("backend.agents.agno_v0_agent:AgnoV0Agent", agent_kwargs),
+            "lovable": ("backend.agents.agno_lovable_agent:AgnoLovableAgent", agent_kwargs),
+            "rag": ("backend.agents.rag_agent:RAGAgent", {}),  # RAG agent always has RAG enabled
+        })
+    
+    @property
+    def coordinator(self):
+        """Coordinator, built on first use."""
+        if self._coordinator is None:
+            if self.use_enhanced:
+                coordinator_cls = load_object("backend.agents.agno_enhanced_coordinator:AgnoEnhancedCoordinator")
+            else:
+                coordinator_cls = load_object("backend.agents.agno_coordinator_agent:AgnoCoordinatorAgent")
+            self._coordinator = coordinator_cls(enable_rag=self.enable_rag)
+        return self._coordinator
     
     def reinitialize(self):
         """Reinitialize all agents and coordinator with current API keys.
@@ -36,13 +36,6 @@ except ImportError:
     HTTPX_AVAILABLE = False
     logger.warning("httpx_not_available", message="httpx not available")
 
-try:
-    from bs4 import BeautifulSoup
-    BEAUTIFULSOUP_AVAILABLE = True
-except ImportError:
-    BEAUTIFULSOUP_AVAILABLE = False
-    logger.warning("beautifulsoup4_not_available", message="beautifulsoup4 not available")
-
 try:
     from playwright.async_api import async_playwright, Browser, Page
     PLAYWRIGHT_AVAILABLE = True
@@ -67,94 +60,26 @@ class LovableDocumentationCrawler:
         self.visited_urls = set()
         self.documentation_content = []
         
-    async def crawl_page(self, url: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
-        """Crawl a single page and extract content."""
-        if url in self.visited_urls:
-            return None
-            
-        self.visited_urls.add(url)
-        
-        try:
-            logger.info("crawling_page", url=url)
-            response = await client.get(url, timeout=30.0, follow_redirects=True)
-            response.raise_for_status()
-            
-            if BEAUTIFULSOUP_AVAILABLE:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract main content
-                content = ""
-                main_content = soup.find('main') or soup.find('article') or soup.find('div', class_='content')
-                if main_content:
-                    content = main_content.get_text(separator='\n', strip=True)
-                else:
-                    content = soup.get_text(separator='\n', strip=True)
-                
-                # Extract title
-                title = ""
-                title_tag = soup.find('title') or soup.find('h1')
-                if title_tag:
-                    title = title_tag.get_text(strip=True)
-                
-                # Extract links for further crawling
-                links = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if href.startswith('/'):
-                        full_url = f"{self.base_url}{href}"
-                    elif href.startswith('http') and self.base_url in href:
-                        full_url = href
-                    else:
-                        continue
-                    
-                    if '/integrations/' in full_url or '/docs/' in full_url:
-                        links.append(full_url)
-                
-                return {
-                    "url": url,
-                    "title": title,
-                    "content": content,
-                    "links": links,
-                    "html_length": len(response.text)
-                }
-            else:
-                return {
-                    "url": url,
-                    "title": "",
-                    "content": response.text[:50000],
-                    "links": [],
-                    "html_length": len(response.text)
-                }
-                
-        except Exception as e:
-            logger.warning("crawl_page_error", url=url, error=str(e))
-            return None
-    
+    def _is_doc_link(self, url: str) -> bool:
+        return url.startswith(self.base_url) and ('/integrations/' in url or '/docs/' in url)
+
     async def deep_crawl(self, max_pages: int = 20) -> List[Dict[str, Any]]:
-        """Perform deep crawl of Lovable.dev documentation."""
+        """Perform deep crawl of Lovable.dev documentation (concurrent, cached; see services/web_crawler)."""
         if not HTTPX_AVAILABLE:
             logger.error("httpx_not_available_for_crawling")
             return []
-        
+        from backend.services.web_crawler import WebCrawler
+
         logger.info("starting_deep_crawl", start_url=self.start_url, max_pages=max_pages)
-        
-        async with httpx.AsyncClient(timeout=30.0, verify=True) as client:
-            to_crawl = [self.start_url]
-            all_content = []
-            
-            while to_crawl and len(all_content) < max_pages:
-                current_url = to_crawl.pop(0)
-                page_data = await self.crawl_page(current_url, client)
-                if page_data:
-                    all_content.append(page_data)
-                    for link in page_data.get("links", [])[:5]:
-                        if link not in self.visited_urls and link not in to_crawl:
-                            to_crawl.append(link)
-                    await asyncio.sleep(1)
-            
-            self.documentation_content = all_content
-            logger.info("crawl_complete", pages_crawled=len(all_content))
-            return all_content
+        started = time.monotonic()
+        crawler = WebCrawler(link_filter=self._is_doc_link, links_per_page=5)
+        all_content = await crawler.crawl(self.start_url, max_pages=max_pages)
+
+        self.visited_urls |= crawler.visited_urls
+        self.documentation_content = all_content
+        logger.info("crawl_complete", pages_crawled=len(all_content),
+                    duration_ms=round((time.monotonic() - started) * 1000), **crawler.stats)
+        return all_content
     
     def get_combined_content(self) -> str:
         """Get combined content from all crawled pages."""
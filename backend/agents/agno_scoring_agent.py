@@ -9,6 +9,20 @@ import json
 from backend.agents.agno_base_agent import AgnoBaseAgent
 from backend.models.schemas import AgentMessage, AgentResponse
 
+# Dimension -> (title, sub-criteria) for per-dimension scoring
+SCORING_DIMENSIONS = {
+    "market_opportunity": ("Market Opportunity", [
+        "market_size", "competitive_landscape", "market_timing", "market_accessibility"]),
+    "user_value": ("User Value", [
+        "problem_solution_fit", "pain_point_severity", "adoption_likelihood", "ux_potential"]),
+    "business_value": ("Business Value", [
+        "revenue_potential", "strategic_alignment", "business_model_viability", "roi_potential"]),
+    "technical_feasibility": ("Technical Feasibility", [
+        "technical_complexity", "resource_requirements", "technology_readiness", "implementation_timeline"]),
+    "risk_assessment": ("Risk Assessment", [
+        "market_risks", "technical_risks", "execution_risks", "competitive_risks"]),
+}
+
 
 class AgnoScoringAgent(AgnoBaseAgent):
     """Product Idea Scoring Agent based on industry standards."""
@@ -203,19 +217,7 @@ Ensure scores are realistic and based on the provided context."""
         
         # Parse JSON response
         try:
-            # Extract JSON from response (might have markdown formatting)
-            response_text = response.response
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            
-            scoring_result = json.loads(response_text)
-            return scoring_result
+            return self._parse_json(response.response)
         except json.JSONDecodeError as e:
             self.logger.error("failed_to_parse_scoring", error=str(e), response=response.response)
             # Return a fallback structure
@@ -226,6 +228,77 @@ Ensure scores are realistic and based on the provided context."""
                 "raw_response": response.response
             }
     
+    async def score_dimension(self, dimension: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Score a single dimension from only the inputs it depends on."""
+        title, criteria = SCORING_DIMENSIONS[dimension]
+        sections = []
+        if inputs.get("product_summary"):
+            sections.append(f"Product Summary:\n{inputs['product_summary']}")
+        if inputs.get("market_context"):
+            sections.append(f"Market Context:\n{json.dumps(inputs['market_context'], indent=2)}")
+        if inputs.get("user_feedback"):
+            sections.append("User Feedback:\n" + "\n".join(f"- {fb}" for fb in inputs["user_feedback"]))
+        if inputs.get("technical_context"):
+            sections.append(f"Technical Context:\n{json.dumps(inputs['technical_context'], indent=2)}")
+        sub_scores = ",\n".join(f'            "{name}": <0-25>' for name in criteria)
+
+        prompt = f"""Score only the {title} dimension of this product idea (0-100), following industry
+standards (BCS, ICAgile, AIPMM, Pragmatic Institute):
+
+{chr(10).join(sections)}
+
+Respond in JSON format with the following structure:
+{{
+    "score": <0-100>,
+    "success_probability": <0-100, how likely this dimension is not to block the product's success>,
+    "rationale": "<detailed explanation>",
+    "sub_scores": {{
+{sub_scores}
+    }},
+    "recommendations": [
+        {{
+            "priority": "<high|medium|low>",
+            "recommendation": "<specific actionable recommendation>",
+            "expected_impact": "<expected score improvement>"
+        }}
+    ],
+    "success_factors": ["<key factor that contributes to success>"],
+    "risk_factors": ["<key risk that could impact success>"]
+}}
+
+Ensure the score is realistic and based on the provided context."""
+
+        message = AgentMessage(
+            role="user",
+            content=prompt,
+            timestamp=datetime.utcnow()
+        )
+
+        response = await self.process([message], context={"dimension": dimension})
+        try:
+            return self._parse_json(response.response)
+        except json.JSONDecodeError as e:
+            self.logger.error("failed_to_parse_dimension_score", dimension=dimension, error=str(e))
+            return {
+                "score": 50,
+                "success_probability": 50,
+                "error": "Failed to parse scoring response",
+                "raw_response": response.response
+            }
+
+    @staticmethod
+    def _parse_json(response_text: str) -> Dict[str, Any]:
+        """Parse a JSON reply that may be wrapped in markdown code fences."""
+        if "```json" in response_text:
+            json_start = response_text.find("```json") + 7
+            json_end = response_text.find("```", json_start)
+            response_text = response_text[json_start:json_end].strip()
+        elif "```" in response_text:
+            json_start = response_text.find("```") + 3
+            json_end = response_text.find("```", json_start)
+            response_text = response_text[json_start:json_end].strip()
+        return json.loads(response_text)
+
     async def get_scoring_criteria(self) -> Dict[str, Any]:
         """Get the scoring criteria and methodology."""
         prompt = """Provide a detailed explanation of the scoring criteria and methodology used,
@@ -93,6 +93,81 @@ Provide a structured summary following the standard format."""
         response = await self.process([message], context=context)
         return response.response
     
+    async def update_session_summary(
+        self,
+        session_id: str,
+        previous_summary: str,
+        new_messages: List[Dict[str, Any]]
+    ) -> str:
+        """Fold messages added to a session into its existing summary."""
+        context = {
+            "session_id": session_id,
+            "message_count": len(new_messages)
+        }
+
+        prompt = f"""Update this conversation session summary with the messages added since it was written:
+
+Session ID: {session_id}
+
+Current summary:
+{previous_summary}
+
+New messages:
+{self._format_conversation(new_messages)}
+
+Return the complete updated summary in the standard format. Keep everything from the current
+summary that is still valid and integrate new decisions, requirements and action items."""
+
+        message = AgentMessage(
+            role="user",
+            content=prompt,
+            timestamp=datetime.utcnow()
+        )
+
+        response = await self.process([message], context=context)
+        return response.response
+
+    async def combine_session_summaries(
+        self,
+        summaries: List[Dict[str, Any]],
+        product_context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Reduce per-session summaries into one unified summary."""
+        context = {
+            "session_count": len(summaries),
+            "product_context": product_context or {}
+        }
+
+        summaries_text = "\n\n".join(
+            f"=== Session: {item.get('title') or item.get('session_id', 'Unknown')} ===\n{item.get('summary', '')}"
+            for item in summaries
+        )
+
+        product_context_text = ""
+        if product_context:
+            product_context_text = f"\n\nProduct Context:\n{product_context}\n"
+
+        prompt = f"""Create a comprehensive summary from these summaries of {len(summaries)} conversation sessions:
+{product_context_text}
+{summaries_text}
+
+Provide a unified summary that:
+1. Identifies common themes across all sessions
+2. Highlights key decisions and requirements
+3. Shows evolution of ideas and requirements
+4. Consolidates action items and next steps
+5. Identifies any conflicts or inconsistencies
+6. Provides a complete picture of the product vision"""
+
+        message = AgentMessage(
+            role="user",
+            content=prompt,
+            timestamp=datetime.utcnow()
+        )
+
+        response = await self.process([message], context=context)
+        return response.response
+
     async def create_multi_session_summary(
         self,
         sessions: List[Dict[str, Any]],
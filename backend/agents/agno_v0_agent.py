@@ -11,6 +11,7 @@ import asyncio
 from backend.agents.agno_base_agent import AgnoBaseAgent
 from backend.models.schemas import AgentMessage, AgentResponse
 from backend.config import settings
+from backend.services.resilience import UPSTREAM_V0, resilient_client
 from backend.services.provider_registry import provider_registry
 
 logger = structlog.get_logger()
@@ -141,7 +142,7 @@ Important:
                 
                 async def _create_project():
                     # Disable SSL verification for V0 API (as requested)
-                    async with httpx.AsyncClient(timeout=180.0, verify=False) as client:
+                    async with resilient_client(UPSTREAM_V0, timeout=180.0, verify=False) as client:
                         response = await client.post(
                             "https://api.v0.dev/v1/chats",
                             headers={
@@ -205,7 +206,7 @@ Important:
                 
                 async def _generate_code():
                     # Disable SSL verification for V0 API (as requested)
-                    async with httpx.AsyncClient(timeout=120.0, verify=False) as client:
+                    async with resilient_client(UPSTREAM_V0, timeout=120.0, verify=False) as client:
                         response = await client.post(
                             "https://api.v0.dev/v1/chat/completions",
                             headers={
@@ -666,7 +667,7 @@ Instructions:
         Poll V0 chat status until prototype is ready or timeout.
         Returns chat data with prototype URLs when ready.
         """
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+        async with resilient_client(UPSTREAM_V0, verify=False) as client:
             request_headers = {
                 "Authorization": f"Bearer {api_key.strip()}",
                 "Content-Type": "application/json"
@@ -811,7 +812,7 @@ Instructions:
         
         try:
             if not project_id:
-                async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+                async with resilient_client(UPSTREAM_V0, verify=False) as client:
                     headers = {
                         "Authorization": f"Bearer {api_key}",
                         "Content-Type": "application/json"
@@ -999,7 +1000,7 @@ Instructions:
             raise ValueError("project_id is required")
         
         # Submit chat with SHORT timeout (10 seconds) - don't wait for generation
-        async with httpx.AsyncClient(timeout=10.0, verify=False) as client:
+        async with resilient_client(UPSTREAM_V0, timeout=10.0, verify=False) as client:
             try:
                 response = await client.post(
                     "https://api.v0.dev/v1/chats",
@@ -1138,7 +1139,7 @@ Instructions:
         try:
             # If no existing project_id, get or create one using the same logic as test workflow
             if not project_id:
-                async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+                async with resilient_client(UPSTREAM_V0, verify=False) as client:
                     headers = {
                         "Authorization": f"Bearer {api_key}",
                         "Content-Type": "application/json"
@@ -1358,7 +1359,7 @@ Instructions:
         if not project_id:
             raise ValueError("Cannot submit chat: project_id is required but was not created/retrieved")
         
-        async with httpx.AsyncClient(timeout=10.0, verify=False) as client:  # Short timeout
+        async with resilient_client(UPSTREAM_V0, timeout=10.0, verify=False) as client:  # Short timeout
             try:
                 # Log the request
                 logger.info("v0_api_request",
@@ -1616,7 +1617,7 @@ Instructions:
         if not project_id:
             raise ValueError("project_id is required")
         
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+        async with resilient_client(UPSTREAM_V0, verify=False) as client:
             headers = {
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
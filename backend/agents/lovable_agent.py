@@ -6,6 +6,7 @@ import structlog
 from backend.agents.base_agent import BaseAgent
 from backend.models.schemas import AgentMessage, AgentResponse
 from backend.config import settings
+from backend.services.resilience import UPSTREAM_LOVABLE, resilient_client
 
 logger = structlog.get_logger()
 
@@ -208,7 +209,7 @@ The prompt should be ready to paste directly into Lovable for generating prototy
         
         # Lovable AI API endpoint (official API)
         # Documentation: https://docs.lovable.dev/api
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with resilient_client(UPSTREAM_LOVABLE, timeout=120.0) as client:
             try:
                 # Lovable API for generating applications
                 response = await client.post(
@@ -4,10 +4,13 @@ Uses pgvector for semantic search and knowledge retrieval
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import structlog
 
 from backend.agents.agno_base_agent import AgnoBaseAgent
+from backend.config import settings
 from backend.models.schemas import AgentMessage, AgentResponse
+from backend.services.vector_index import ef_search_override, resolve_ef_search
 
 logger = structlog.get_logger()
 
@@ -65,7 +68,8 @@ Your responses should be:
         self,
         query: str,
         top_k: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search the knowledge base for relevant information.
@@ -74,6 +78,9 @@ Your responses should be:
             query: Search query
             top_k: Number of results to return
             filters: Optional metadata filters
+            ef_search: HNSW candidate list size for this query (defaults to
+                VECTOR_HNSW_EF_SEARCH; raised to top_k). Larger values trade
+                latency for recall, e.g. for narrow product filters.
             
         Returns:
             List of relevant documents with metadata
@@ -96,22 +103,24 @@ Your responses should be:
             # Use Agno's knowledge base search
             # Note: Agno Knowledge.search() may use different parameter names
             # Try with limit parameter first, fallback to query only
-            try:
-                results = self.agno_agent.knowledge.search(
-                    query=query,
-                    limit=top_k,
-                    filters=filters if filters else {}
-                )
-            except TypeError:
-                # Fallback: try without filters or with different parameter names
+            vector_db = getattr(self.agno_agent.knowledge, "vector_db", None)
+            with ef_search_override(vector_db, resolve_ef_search(top_k, ef_search)):
                 try:
-                    results = self.agno_agent.knowledge.search(query=query, limit=top_k)
+                    results = self.agno_agent.knowledge.search(
+                        query=query,
+                        limit=top_k,
+                        filters=filters if filters else {}
+                    )
                 except TypeError:
-                    # Last fallback: just query
-                    results = self.agno_agent.knowledge.search(query=query)
-                    # Limit results manually if needed
-                    if len(results) > top_k:
-                        results = results[:top_k]
+                    # Fallback: try without filters or with different parameter names
+                    try:
+                        results = self.agno_agent.knowledge.search(query=query, limit=top_k)
+                    except TypeError:
+                        # Last fallback: just query
+                        results = self.agno_agent.knowledge.search(query=query)
+                        # Limit results manually if needed
+                        if len(results) > top_k:
+                            results = results[:top_k]
             
             # Format results
             formatted_results = []
@@ -156,6 +165,30 @@ Your responses should be:
             self.logger.error("failed_to_add_knowledge", error=str(e))
             return False
     
+    async def remove_knowledge(self, metadata: Dict[str, Any]) -> bool:
+        """
+        Remove every knowledge base entry whose metadata contains the given values.
+        
+        Args:
+            metadata: Metadata to match (e.g., {"article_id": ...})
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self._ensure_knowledge_base()
+            vector_db = getattr(getattr(self.agno_agent, "knowledge", None), "vector_db", None)
+            if vector_db is None or not hasattr(vector_db, "delete_by_metadata"):
+                self.logger.warning("knowledge_removal_not_supported")
+                return False
+            # The vector store's delete is synchronous
+            removed = await asyncio.to_thread(vector_db.delete_by_metadata, metadata)
+            self.logger.info("knowledge_removed", metadata=metadata, removed=removed)
+            return bool(removed)
+        except Exception as e:
+            self.logger.error("failed_to_remove_knowledge", error=str(e))
+            return False
+    
     async def process(
         self,
         messages: List[AgentMessage],
@@ -178,8 +211,14 @@ Your responses should be:
             filters["product_id"] = str(context.get("product_id"))
             self.logger.info("rag_filtering_by_product_id", product_id=context.get("product_id"))
         
-        # Search knowledge base first with product_id filter
-        knowledge_results = await self.search_knowledge(query, top_k=5, filters=filters if filters else None)
+        # Search knowledge base first with product_id filter. The filter is applied to the
+        # ANN candidates, so search wider to keep recall for products with few documents.
+        knowledge_results = await self.search_knowledge(
+            query,
+            top_k=5,
+            filters=filters if filters else None,
+            ef_search=settings.vector_filtered_ef_search if filters else None
+        )
         
         # If no knowledge results, return empty response immediately (don't process)
         if not knowledge_results:
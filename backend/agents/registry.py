@@ -0,0 +1,80 @@
+"""
+Lazy agent registry.
+
+Agents are registered as "module:Class" specs and only imported and constructed the
+first time they are looked up, so building an orchestrator (and importing the API)
+does not pay for every agent module, provider SDK and knowledge base up front.
+"""
+import importlib
+from threading import RLock
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+def load_object(spec: str) -> Any:
+    """Import "package.module:Attribute" and return the attribute."""
+    module_path, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_path), attr)
+
+
+class LazyAgentRegistry(Mapping[str, Any]):
+    """
+    Read-only mapping of agent type -> agent instance, built on first access.
+
+    Membership tests and keys() never instantiate agents; item access, values() and
+    items() build the agents they touch. Instances are cached until reset().
+    """
+
+    def __init__(
+        self,
+        specs: Dict[str, Tuple[str, Dict[str, Any]]],
+        on_create: Optional[Callable[[str, Any], None]] = None,
+    ):
+        self._specs = dict(specs)
+        self._instances: Dict[str, Any] = {}
+        self._on_create = on_create
+        self._lock = RLock()
+
+    def __getitem__(self, agent_type: str) -> Any:
+        instance = self._instances.get(agent_type)
+        if instance is not None:
+            return instance
+        if agent_type not in self._specs:
+            raise KeyError(agent_type)
+        with self._lock:
+            instance = self._instances.get(agent_type)
+            if instance is None:
+                spec, kwargs = self._specs[agent_type]
+                instance = load_object(spec)(**kwargs)
+                if self._on_create is not None:
+                    self._on_create(agent_type, instance)
+                self._instances[agent_type] = instance
+                logger.debug("agent_instantiated", agent_type=agent_type, spec=spec)
+        return instance
+
+    def __contains__(self, agent_type: object) -> bool:
+        return agent_type in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @property
+    def loaded(self) -> Dict[str, Any]:
+        """Agents instantiated so far."""
+        return dict(self._instances)
+
+    def reset(self) -> None:
+        """Drop cached instances so the next lookup rebuilds them (e.g. after key changes)."""
+        with self._lock:
+            self._instances.clear()
+
+
+def registered_agent(agent_type: str) -> property:
+    """Class attribute exposing self.agents[agent_type] (built on first access)."""
+    return property(lambda self: self.agents[agent_type], doc=f"The {agent_type!r} agent.")
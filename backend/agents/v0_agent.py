@@ -6,6 +6,7 @@ import structlog
 from backend.agents.base_agent import BaseAgent
 from backend.models.schemas import AgentMessage, AgentResponse
 from backend.config import settings
+from backend.services.resilience import UPSTREAM_V0, resilient_client
 
 logger = structlog.get_logger()
 
@@ -353,7 +354,7 @@ The prompt should be ready to paste directly into V0 for generating prototypes."
                    prompt_length=len(v0_prompt) if v0_prompt else 0)
         
         # Disable SSL verification for V0 API (as requested)
-        async with httpx.AsyncClient(timeout=180.0, verify=False) as client:
+        async with resilient_client(UPSTREAM_V0, timeout=180.0, verify=False) as client:
             try:
                 # Step 1: Create V0 chat and post prompt in one async call
                 # This creates a new project and generates the prototype
@@ -316,7 +316,9 @@ async def get_agent_usage_stats(
             
             # Get agent metrics from orchestrator if available
             if hasattr(orchestrator, 'agents'):
-                for agent_name, agent_instance in orchestrator.agents.items():
+                # Lazily registered agents that were never used have no metrics; don't build them here
+                loaded_agents = getattr(orchestrator.agents, 'loaded', orchestrator.agents)
+                for agent_name, agent_instance in loaded_agents.items():
                     if hasattr(agent_instance, 'metrics'):
                         # Use agent's role if available, otherwise derive from name
                         agent_role = getattr(agent_instance, 'role', None) or agent_name
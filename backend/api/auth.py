@@ -6,7 +6,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Optional
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from uuid import UUID
 import structlog
@@ -22,12 +21,6 @@ router = APIRouter(prefix="/api/auth", tags=["authentication"])
 # This is needed because McKinsey SSO redirects to /auth/mckinsey/callback (not /api/auth/mckinsey/callback)
 callback_router = APIRouter(prefix="/auth", tags=["authentication"])
 
-# Password hashing
-# Use bcrypt directly to avoid passlib compatibility issues
-import bcrypt
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
-
 # Security
 security = HTTPBearer(auto_error=False)
 
@@ -67,34 +60,10 @@ class RegisterRequest(BaseModel):
 
 # Token storage using Redis for distributed access across multiple backend pods
 from backend.services.token_storage import get_token_storage
-
-
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
-    if not hashed_password:
-        return False
-
-    try:
-        # Convert hashed_password to bytes if it's a string
-        if isinstance(hashed_password, str):
-            hashed_bytes = hashed_password.encode("utf-8")
-        else:
-            hashed_bytes = hashed_password
-
-        # Use bcrypt directly to avoid passlib issues
-        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_bytes)
-    except Exception as e:
-        # Fallback to passlib if bcrypt fails
-        try:
-            return pwd_context.verify(plain_password, hashed_password)
-        except Exception:
-            logger.warning("password_verification_failed", error=str(e))
-            return False
+from backend.services.llm_scheduler import current_tenant
+from backend.services.cpu_executor import CPUPoolBusyError
+# Hashing runs in the CPU pool; the sync functions stay importable from here
+from backend.services.passwords import hash_password, verify_password, verify_password_async
 
 
 def generate_token() -> str:
@@ -134,6 +103,18 @@ async def get_current_user(
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
+    return await authenticate_token(db, token)
+
+
+async def authenticate_token(db: AsyncSession, token: str) -> dict:
+    """Validate a session token (expiry and active user) and return the user it belongs to.
+
+    Shared by get_current_user and the WebSocket endpoint, which receives its token in
+    the query string.
+
+    Raises:
+        HTTPException: If the token is invalid, expired or its user is inactive (401)
+    """
     # Check token in Redis or fallback storage
     # This works for both password-based and McKinsey SSO sessions
     token_storage = await get_token_storage()
@@ -173,6 +154,9 @@ async def get_current_user(
         await token_storage.delete_token(token)
         raise HTTPException(status_code=401, detail="User not found or inactive")
 
+    # Model calls made for this request share capacity fairly across tenants
+    current_tenant.set(str(row[3]))
+
     return {
         "id": str(row[0]),
         "email": row[1],
@@ -225,7 +209,7 @@ async def login(
             raise HTTPException(status_code=403, detail="User account is inactive")
 
         # Verify password
-        if not password_hash or not verify_password(request.password, password_hash):
+        if not password_hash or not await verify_password_async(request.password, password_hash):
             logger.warning(
                 "login_failed",
                 email=request.email.lower(),
@@ -297,7 +281,8 @@ async def login(
             expires_at=expires_at.isoformat(),
         )
 
-    except HTTPException:
+    except (HTTPException, CPUPoolBusyError):
+        # CPUPoolBusyError becomes a 503 with Retry-After in main.py
         raise
     except Exception as e:
         logger.error(
@@ -8,6 +8,7 @@ import structlog
 
 from backend.database import get_db
 from backend.api.auth import get_current_user
+from backend.utils.pagination import InvalidCursorError, apply_cursor, clamp_limit, split_page
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/conversations", tags=["conversations"])
@@ -17,12 +18,14 @@ router = APIRouter(prefix="/api/conversations", tags=["conversations"])
 async def get_conversation_history(
     product_id: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get conversation history for current user or specific product."""
+    """Get conversation history for current user or specific product, newest first, paginated by cursor."""
     try:
         await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
+        page_size = clamp_limit(limit)
         
         if product_id:
             # Verify product access
@@ -44,25 +47,32 @@ async def get_conversation_history(
             if not access_result.fetchone():
                 raise HTTPException(status_code=403, detail="Access denied to product")
             
-            query = text("""
+            params = {
+                "product_id": product_id,
+                "tenant_id": current_user["tenant_id"],
+                "limit": page_size + 1
+            }
+            keyset_clause = apply_cursor(cursor, params, "ch.created_at", "ch.id")
+            query = text(f"""
                 SELECT ch.id, ch.message_type, ch.agent_name, ch.agent_role, 
                        ch.content, ch.formatted_content, ch.created_at,
                        cs.title as session_title
                 FROM conversation_history ch
                 LEFT JOIN conversation_sessions cs ON ch.session_id = cs.id
                 WHERE ch.product_id = :product_id
-                AND ch.tenant_id = :tenant_id
-                ORDER BY ch.created_at DESC
+                AND ch.tenant_id = :tenant_id{keyset_clause}
+                ORDER BY ch.created_at DESC, ch.id DESC
                 LIMIT :limit
             """)
+        else:
+            # Get all conversations for user
             params = {
-                "product_id": product_id,
+                "user_id": current_user["id"],
                 "tenant_id": current_user["tenant_id"],
-                "limit": limit
+                "limit": page_size + 1
             }
-        else:
-            # Get all conversations for user
-            query = text("""
+            keyset_clause = apply_cursor(cursor, params, "ch.created_at", "ch.id")
+            query = text(f"""
                 SELECT ch.id, ch.message_type, ch.agent_name, ch.agent_role,
                        ch.content, ch.formatted_content, ch.created_at,
                        cs.title as session_title, ch.product_id,
@@ -77,18 +87,13 @@ async def get_conversation_history(
                     SELECT product_id FROM product_shares
                     WHERE shared_with_user_id = :user_id
                   )
-                )
-                ORDER BY ch.created_at DESC
+                ){keyset_clause}
+                ORDER BY ch.created_at DESC, ch.id DESC
                 LIMIT :limit
             """)
-            params = {
-                "user_id": current_user["id"],
-                "tenant_id": current_user["tenant_id"],
-                "limit": limit
-            }
         
         result = await db.execute(query, params)
-        rows = result.fetchall()
+        rows, next_cursor = split_page(result.fetchall(), page_size, sort_index=6)
         
         conversations = [
             {
@@ -106,9 +111,11 @@ async def get_conversation_history(
             for row in rows
         ]
         
-        return {"conversations": conversations, "count": len(conversations)}
+        return {"conversations": conversations, "count": len(conversations), "next_cursor": next_cursor}
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("get_conversation_history_error", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get conversation history")
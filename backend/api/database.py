@@ -9,6 +9,7 @@ import structlog
 
 from backend.database import get_db, AsyncSessionLocal
 from backend.api.auth import get_current_user
+from backend.utils.pagination import InvalidCursorError, apply_cursor, clamp_limit, split_page
 from backend.models.schemas import (
     Product,
     PRDDocument,
@@ -58,10 +59,11 @@ async def get_knowledge_articles(
     product_id: Optional[str] = None,
     search: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get knowledge articles (tenant-isolated)."""
+    """Get knowledge articles (tenant-isolated), newest first, paginated by cursor."""
     try:
         # Set user context for RLS
         await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
@@ -105,11 +107,13 @@ async def get_knowledge_articles(
             query += " AND (ka.title ILIKE :search OR ka.content ILIKE :search)"
             params["search"] = f"%{search}%"
         
-        query += " ORDER BY ka.created_at DESC LIMIT :limit"
-        params["limit"] = limit
+        page_size = clamp_limit(limit)
+        query += apply_cursor(cursor, params, "ka.created_at", "ka.id")
+        query += " ORDER BY ka.created_at DESC, ka.id DESC LIMIT :limit"
+        params["limit"] = page_size + 1
         
         result = await db.execute(text(query), params)
-        rows = result.fetchall()
+        rows, next_cursor = split_page(result.fetchall(), page_size, sort_index=6)
         
         articles = [
             {
@@ -123,9 +127,11 @@ async def get_knowledge_articles(
             }
             for row in rows
         ]
-        return {"articles": articles}
+        return {"articles": articles, "next_cursor": next_cursor}
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("error_getting_knowledge_articles", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -136,10 +142,11 @@ async def get_conversation_history(
     session_id: Optional[str] = None,
     product_id: Optional[str] = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get conversation history (tenant-isolated)."""
+    """Get conversation history (tenant-isolated), oldest first, paginated by cursor."""
     try:
         # Set user context for RLS
         await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
@@ -179,11 +186,13 @@ async def get_conversation_history(
             query += " AND product_id = :product_id"
             params["product_id"] = product_id
         
-        query += " ORDER BY created_at ASC LIMIT :limit"
-        params["limit"] = limit
+        page_size = clamp_limit(limit)
+        query += apply_cursor(cursor, params, "created_at", "id", descending=False)
+        query += " ORDER BY created_at ASC, id ASC LIMIT :limit"
+        params["limit"] = page_size + 1
         
         result = await db.execute(text(query), params)
-        rows = result.fetchall()
+        rows, next_cursor = split_page(result.fetchall(), page_size, sort_index=11)
         
         messages = [
             {
@@ -202,9 +211,11 @@ async def get_conversation_history(
             }
             for row in rows
         ]
-        return {"messages": messages}
+        return {"messages": messages, "next_cursor": next_cursor}
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("error_getting_conversation_history", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,5 @@
 """Design API endpoints for V0 and Lovable integration."""
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Dict, Any, Optional, AsyncGenerator
@@ -14,9 +13,9 @@ from backend.database import get_db
 from backend.api.auth import get_current_user
 from backend.agents.v0_agent import V0Agent
 from backend.agents.lovable_agent import LovableAgent
-from backend.agents.agno_v0_agent import AgnoV0Agent
-from backend.agents.agno_lovable_agent import AgnoLovableAgent
 from backend.config import settings
+from backend.services.resilience import UPSTREAM_V0, resilient_client
+from backend.services.sse import resume_response, sse_response
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/design", tags=["design"])
@@ -214,6 +213,7 @@ async def stream_design_prompt_generation(
         if request.provider == "v0":
             from backend.agents import AGNO_AVAILABLE
             if AGNO_AVAILABLE:
+                from backend.agents.agno_v0_agent import AgnoV0Agent
                 agno_v0_agent = AgnoV0Agent()
                 v0_key = user_keys.get("v0") or settings.v0_api_key
                 if v0_key:
@@ -339,6 +339,7 @@ async def stream_design_prompt_generation(
                 yield f"data: {json.dumps({'type': 'complete', 'prompt': prompt})}\n\n"
                 
         elif request.provider == "lovable":
+            from backend.agents.agno_lovable_agent import AgnoLovableAgent
             agno_lovable_agent = AgnoLovableAgent()
             
             # Get phase data efficiently
@@ -607,6 +608,7 @@ async def generate_design_prompt(
             # Use AgnoV0Agent when Agno is available, otherwise use legacy V0Agent
             from backend.agents import AGNO_AVAILABLE
             if AGNO_AVAILABLE:
+                from backend.agents.agno_v0_agent import AgnoV0Agent
                 agno_v0_agent = AgnoV0Agent()
                 # Set V0 API key if user has one, otherwise use global settings
                 # Note: V0 API key is needed if agent tools are invoked, but not for prompt generation
@@ -732,6 +734,7 @@ async def generate_design_prompt(
                 )
         elif request.provider == "lovable":
             # Use Agno Lovable agent for prompt generation
+            from backend.agents.agno_lovable_agent import AgnoLovableAgent
             agno_lovable_agent = AgnoLovableAgent()
             
             # Get phase data efficiently (limit to essential info)
@@ -851,23 +854,18 @@ async def generate_design_prompt(
 @router.post("/generate-prompt/stream")
 async def stream_generate_design_prompt(
     request: GeneratePromptRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Stream prompt generation for V0 or Lovable. Returns Server-Sent Events for smooth UX."""
-    from fastapi.responses import StreamingResponse
+    resumed = await resume_response(http_request, current_user)
+    if resumed is not None:
+        return resumed
     
     user_id = str(current_user["id"])
     
-    return StreamingResponse(
-        stream_design_prompt_generation(request, user_id, db),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        }
-    )
+    return sse_response(stream_design_prompt_generation(request, user_id, db), owner=user_id)
 
 
 async def poll_v0_status_background(
@@ -887,7 +885,6 @@ async def poll_v0_status_background(
     import asyncio
     from backend.database import AsyncSessionLocal
     from sqlalchemy import text
-    import httpx
     
     start_time = asyncio.get_event_loop().time()
     poll_count = 0
@@ -902,7 +899,7 @@ async def poll_v0_status_background(
                 
                 try:
                     # Check V0 API status
-                    async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+                    async with resilient_client(UPSTREAM_V0, verify=False) as client:
                         response = await client.get(
                             f"https://api.v0.dev/v1/chats/{v0_chat_id}",
                             headers={
@@ -1012,6 +1009,7 @@ async def generate_design_mockup(
                 raise HTTPException(status_code=400, detail="V0 API key is not configured. Please configure it in Settings.")
             
             # Step 1: Create/get project
+            from backend.agents.agno_v0_agent import AgnoV0Agent
             agno_v0_agent = AgnoV0Agent()
             agno_v0_agent.set_v0_api_key(v0_key.strip())
             project_result = await agno_v0_agent.get_or_create_v0_project(
@@ -1569,8 +1567,7 @@ async def check_project_status(
                         agno_v0_agent.set_v0_api_key(v0_key)
                         
                         # Check status using V0 agent
-                        import httpx
-                        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+                        async with resilient_client(UPSTREAM_V0, verify=False) as client:
                             response = await client.get(
                                 f"https://api.v0.dev/v1/chats/{v0_chat_id}",
                                 headers={
@@ -1,18 +1,31 @@
 """API endpoints for document upload and management."""
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from pydantic import BaseModel
+import asyncio
+import json
+from contextlib import aclosing
+import os
 import structlog
 import re
+import uuid
 from uuid import UUID
-import io
 
-from backend.database import get_db
+from backend.config import settings
+from backend.database import get_db, AsyncSessionLocal
 from backend.api.auth import get_current_user
-from backend.agents.agno_github_agent import AgnoGitHubAgent
-from backend.agents.agno_atlassian_agent import AgnoAtlassianAgent
+from backend.api.product_permissions import check_product_permission
+from backend.services.cpu_executor import CPUPoolBusyError
+from backend.services.document_extraction import (
+    PDFExtractionError,
+    UploadTooLargeError,
+    extract_pdf_pages_streaming,
+    spool_upload,
+)
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/documents", tags=["documents"])
@@ -28,19 +41,200 @@ class ConfluenceUploadRequest(BaseModel):
     product_id: Optional[str] = None
 
 
-def extract_text_from_pdf(content: bytes) -> str:
-    """Extract text content from PDF bytes."""
+def _is_pdf(content_type: str, filename: Optional[str]) -> bool:
+    return content_type == "application/pdf" or bool(filename and filename.lower().endswith('.pdf'))
+
+
+def _decode_text(content: bytes, content_type: str, filename: Optional[str]) -> str:
+    """Decode a non-PDF upload."""
+    if content_type.startswith("text/") or content_type in ["application/json", "application/xml"]:
+        # Decode text files
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            # Try other encodings
+            try:
+                return content.decode('latin-1')
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Failed to decode text file: {str(e)}")
+    # For other file types, try to decode as text, but log a warning
+    try:
+        content_str = content.decode('utf-8', errors='replace')
+        logger.warning("non_text_file_uploaded", filename=filename, content_type=content_type)
+        return content_str
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Please upload PDF or text files. Error: {str(e)}"
+        )
+
+
+async def _spool(file: UploadFile) -> tuple:
+    """Spool the upload to a temp file; returns (path, size)."""
+    try:
+        path = await spool_upload(file, suffix=os.path.splitext(file.filename or "")[1])
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return path, os.path.getsize(path)
+
+
+async def _check_upload_product(product_id: Optional[str], user_id: str) -> None:
+    """Reject a missing, malformed or inaccessible product before the upload is spooled."""
+    # knowledge_articles requires product_id
+    if not product_id:
+        raise HTTPException(status_code=400, detail="product_id is required for knowledge articles")
+    try:
+        product_uuid = UUID(product_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid product_id")
+    async with AsyncSessionLocal() as db:
+        if not await check_product_permission(db, product_uuid, user_id, "edit"):
+            raise HTTPException(status_code=403, detail="Access denied to product")
+
+
+async def _discard_upload(document_id: UUID, user_id: str, rag_agent: Any, index_tasks: List[asyncio.Task]) -> None:
+    """Delete the article row and every segment already indexed for an upload that failed."""
+    for task in index_tasks:
+        task.cancel()
+    await asyncio.gather(*index_tasks, return_exceptions=True)
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT set_config('app.current_user_id', :user_id, true)"), {"user_id": user_id})
+            await db.execute(text("DELETE FROM knowledge_articles WHERE id = :id"), {"id": document_id})
+            await db.commit()
+    except Exception as e:
+        logger.error("failed_upload_article_delete_failed", document_id=str(document_id), error=str(e))
+    if rag_agent is not None and index_tasks:
+        if not await rag_agent.remove_knowledge({"article_id": str(document_id)}):
+            logger.warning("failed_upload_segments_not_removed", document_id=str(document_id))
+
+
+async def _ingest_local_upload(
+    path: str,
+    filename: Optional[str],
+    content_type: str,
+    size: int,
+    product_id: str,
+    user_id: str,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Extract, store and index a spooled upload, yielding progress events.
+
+    The article row is inserted first, so every indexed segment refers to an existing
+    article. PDF pages arrive from the CPU pool in page order; every
+    DOCUMENT_SEGMENT_CHARS of text is handed to the RAG knowledge base (chunking +
+    embedding) right away, while later pages are still being extracted. The row's
+    content is filled in once all text is known. If the upload fails or is abandoned,
+    the row and the segments indexed so far are deleted.
+    """
+    title = filename or "Untitled Document"
+    document_id = uuid.uuid4()
+    base_metadata = {
+        "filename": filename,
+        "content_type": content_type,
+        "size": size,
+        "user_id": user_id,
+    }
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT set_config('app.current_user_id', :user_id, true)"), {"user_id": user_id})
+        await db.execute(text("""
+            INSERT INTO knowledge_articles (id, product_id, title, content, source, metadata)
+            VALUES (:id, :product_id, :title, '', 'local_upload', :metadata)
+        """), {
+            "id": document_id,
+            "product_id": UUID(product_id),
+            "title": title,
+            "metadata": json.dumps(base_metadata),
+        })
+        await db.commit()
+    yield {"type": "start", "filename": filename, "size": size}
+
+    rag_agent = None
     try:
-        from pypdf import PdfReader
-        pdf_file = io.BytesIO(content)
-        reader = PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        from backend.agents.rag_agent import RAGAgent
+        rag_agent = RAGAgent()
     except Exception as e:
-        logger.error("pdf_extraction_failed", error=str(e))
-        raise HTTPException(status_code=400, detail=f"Failed to extract text from PDF: {str(e)}")
+        logger.error("failed_to_add_uploaded_doc_to_rag_vector_db", document_id=str(document_id),
+                     product_id=product_id, error=str(e))
+
+    index_slots = asyncio.Semaphore(2)
+    index_tasks: List[asyncio.Task] = []
+
+    async def index_segment(segment: str, pages: Optional[tuple]) -> bool:
+        # Prepare content with title for better context, and metadata with product_id for filtering
+        header = f"Title: {title}" + (f" (pages {pages[0] + 1}-{pages[1]})" if pages else "")
+        rag_metadata = {
+            "product_id": str(product_id),
+            "article_id": str(document_id),
+            "title": title,
+            "source": "local_upload",
+            **base_metadata,
+        }
+        if pages:
+            rag_metadata.update({"page_start": pages[0] + 1, "page_end": pages[1]})
+        async with index_slots:
+            return await rag_agent.add_knowledge(f"{header}\n\n{segment}", rag_metadata)
+
+    def submit(segment: str, pages: Optional[tuple] = None) -> None:
+        if rag_agent is not None and segment.strip():
+            index_tasks.append(asyncio.create_task(index_segment(segment, pages)))
+
+    parts: List[str] = []
+    stored = False
+    try:
+        if _is_pdf(content_type, filename):
+            segment: List[str] = []
+            segment_chars, segment_start, pages_done = 0, 0, 0
+            try:
+                async for batch in extract_pdf_pages_streaming(path):
+                    pages_done = batch.end
+                    parts.append(batch.text)
+                    segment.append(batch.text)
+                    segment_chars += len(batch.text)
+                    if segment_chars >= settings.document_segment_chars:
+                        submit("\n".join(segment), (segment_start, batch.end))
+                        segment, segment_chars, segment_start = [], 0, batch.end
+                    yield {"type": "progress", "pages_done": batch.end, "total_pages": batch.total_pages}
+            except PDFExtractionError as e:
+                logger.error("pdf_extraction_failed", error=str(e))
+                raise HTTPException(status_code=400, detail=f"Failed to extract text from PDF: {str(e)}")
+            if segment:
+                submit("\n".join(segment), (segment_start, pages_done))
+            content_str = "\n".join(parts).strip()
+        else:
+            with open(path, "rb") as f:
+                content_str = _decode_text(f.read(), content_type, filename)
+            submit(content_str)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT set_config('app.current_user_id', :user_id, true)"), {"user_id": user_id})
+            await db.execute(text("UPDATE knowledge_articles SET content = :content WHERE id = :id"), {
+                "id": document_id,
+                "content": content_str,
+            })
+            await db.commit()
+        stored = True
+        logger.info("document_uploaded", user_id=user_id, document_id=str(document_id))
+
+        # The document is stored; indexing failures are logged but don't fail the upload
+        results = await asyncio.gather(*index_tasks, return_exceptions=True)
+        indexed = sum(1 for result in results if result is True)
+        if index_tasks and indexed == len(index_tasks):
+            logger.info("uploaded_document_added_to_rag", document_id=str(document_id), product_id=product_id,
+                        filename=filename, segments=indexed)
+        elif index_tasks:
+            logger.warning("uploaded_document_rag_add_failed", document_id=str(document_id), product_id=product_id,
+                           segments=len(index_tasks), indexed=indexed)
+        yield {"type": "complete", "document_id": str(document_id), "message": "File uploaded successfully",
+               "segments_indexed": indexed}
+    finally:
+        if stored:
+            for task in index_tasks:
+                if not task.done():
+                    task.cancel()
+        else:
+            # Shielded: a disconnected stream's cancellation must not interrupt the cleanup
+            await asyncio.shield(asyncio.ensure_future(_discard_upload(document_id, user_id, rag_agent, index_tasks)))
 
 
 @router.post("/upload")
@@ -48,123 +242,59 @@ async def upload_local_file(
     file: UploadFile = File(...),
     product_id: Optional[str] = Form(None),
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
 ):
     """Upload a local file to the knowledge base."""
+    await _check_upload_product(product_id, str(current_user["id"]))
+    path, size = await _spool(file)
     try:
-        await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
-        
-        # Read file content
-        content = await file.read()
-        
-        # Extract text based on file type
-        content_type = file.content_type or ""
-        if content_type == "application/pdf" or (file.filename and file.filename.lower().endswith('.pdf')):
-            # Extract text from PDF
-            content_str = extract_text_from_pdf(content)
-        elif content_type.startswith("text/") or content_type in ["application/json", "application/xml"]:
-            # Decode text files
-            try:
-                content_str = content.decode('utf-8')
-            except UnicodeDecodeError:
-                # Try other encodings
-                try:
-                    content_str = content.decode('latin-1')
-                except Exception as e:
-                    raise HTTPException(status_code=400, detail=f"Failed to decode text file: {str(e)}")
-        else:
-            # For other file types, try to decode as text, but log a warning
-            try:
-                content_str = content.decode('utf-8', errors='replace')
-                logger.warning("non_text_file_uploaded", filename=file.filename, content_type=content_type)
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Unsupported file type. Please upload PDF or text files. Error: {str(e)}"
-                )
-        
-        # Save to knowledge base
-        # Note: knowledge_articles table requires product_id, so if no product_id, we'll need to handle it
-        if not product_id:
-            raise HTTPException(status_code=400, detail="product_id is required for knowledge articles")
-        
-        query = text("""
-            INSERT INTO knowledge_articles (product_id, title, content, source, metadata)
-            VALUES (:product_id, :title, :content, 'local_upload', :metadata)
-            RETURNING id
-        """)
-        
-        metadata = {
-            "filename": file.filename,
-            "content_type": content_type,
-            "size": len(content),
-            "user_id": str(current_user["id"])
-        }
-        
-        import json
-        result = await db.execute(query, {
-            "product_id": UUID(product_id),
-            "title": file.filename or "Untitled Document",
-            "content": content_str,
-            "metadata": json.dumps(metadata)
-        })
-        
-        document_id = result.scalar_one()
-        await db.commit()
-        
-        logger.info("document_uploaded", user_id=str(current_user["id"]), document_id=str(document_id))
-        
-        # CRITICAL: Also add to RAG agent's vector database for semantic search
-        # This ensures the document is available for RAG retrieval
-        try:
-            from backend.agents.rag_agent import RAGAgent
-            rag_agent = RAGAgent()
-            
-            # Prepare content with title for better context
-            title = file.filename or "Untitled Document"
-            full_content = f"Title: {title}\n\n{content_str}"
-            
-            # Prepare metadata with product_id for filtering
-            rag_metadata = {
-                "product_id": str(product_id),
-                "article_id": str(document_id),
-                "title": title,
-                "source": "local_upload",
-                "filename": file.filename,
-                "content_type": content_type,
-                "size": len(content),
-                "user_id": str(current_user["id"])
-            }
-            
-            # Add to vector database
-            success = await rag_agent.add_knowledge(full_content, rag_metadata)
-            if success:
-                logger.info("uploaded_document_added_to_rag",
-                          document_id=str(document_id),
-                          product_id=product_id,
-                          filename=file.filename)
-            else:
-                logger.warning("uploaded_document_rag_add_failed",
-                             document_id=str(document_id),
-                             product_id=product_id)
-        except Exception as e:
-            # Log error but don't fail the request - document is still in database
-            logger.error("failed_to_add_uploaded_doc_to_rag_vector_db",
-                        document_id=str(document_id),
-                        product_id=product_id,
-                        error=str(e))
-        
-        return {
-            "document_id": str(document_id),
-            "message": "File uploaded successfully"
-        }
-    
-    except HTTPException:
+        events = _ingest_local_upload(path, file.filename, file.content_type or "", size,
+                                      product_id, str(current_user["id"]))
+        async with aclosing(events):
+            async for event in events:
+                if event["type"] == "complete":
+                    return {"document_id": event["document_id"], "message": event["message"]}
+    except (HTTPException, CPUPoolBusyError):
         raise
     except Exception as e:
-        await db.rollback()
         logger.error("document_upload_failed", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
+    finally:
+        os.unlink(path)
+
+
+@router.post("/upload/stream")
+async def upload_local_file_stream(
+    file: UploadFile = File(...),
+    product_id: Optional[str] = Form(None),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Upload a local file to the knowledge base, streaming progress as Server-Sent Events:
+    start, progress (pages_done / total_pages, PDFs only), then complete or error.
+    """
+    await _check_upload_product(product_id, str(current_user["id"]))
+    path, size = await _spool(file)
+    filename, content_type, user_id = file.filename, file.content_type or "", str(current_user["id"])
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in _ingest_local_upload(path, filename, content_type, size, product_id, user_id):
+                yield f"data: {json.dumps(event)}\n\n"
+        except HTTPException as e:
+            yield f"data: {json.dumps({'type': 'error', 'error': e.detail, 'status': e.status_code})}\n\n"
+        except CPUPoolBusyError as e:
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e), 'status': 503, 'retry_after': e.retry_after})}\n\n"
+        except Exception as e:
+            logger.error("document_upload_failed", error=str(e))
+            yield f"data: {json.dumps({'type': 'error', 'error': f'Failed to upload file: {str(e)}', 'status': 500})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs once the stream ends or the client disconnects
+        background=BackgroundTask(os.unlink, path),
+    )
 
 
 @router.post("/upload-from-github")
@@ -178,6 +308,7 @@ async def upload_from_github(
         await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
         
         # Initialize GitHub agent
+        from backend.agents.agno_github_agent import AgnoGitHubAgent
         github_agent = AgnoGitHubAgent(enable_rag=True)
         
         # Fetch content from GitHub
@@ -290,6 +421,7 @@ async def upload_from_confluence(
         }
         
         # Initialize Atlassian agent
+        from backend.agents.agno_atlassian_agent import AgnoAtlassianAgent
         atlassian_agent = AgnoAtlassianAgent(enable_rag=True)
         
         # Fetch content from Confluence with credentials in context
@@ -3,15 +3,17 @@ Export API endpoints for generating PRD documents in HTML and Markdown formats
 Includes content review, missing content detection, and Confluence publishing
 """
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from uuid import UUID
 from datetime import datetime
 import structlog
-import markdown
 import base64
+import hashlib
+import html
 import json
 from pydantic import BaseModel
 
@@ -21,19 +23,31 @@ from backend.api.product_permissions import check_product_permission
 from backend.agents import AGNO_AVAILABLE
 from backend.services.provider_registry import provider_registry
 from backend.services.api_key_loader import load_user_api_keys_from_db
+from backend.services.admission import KIND_EXPORT, AdmissionRejectedError, AdmissionTicket, admit_run, context_size
+from backend.services.markdown_renderer import IncrementalMarkdownRenderer, render_markdown_cached
+from backend.services.redis_cache import RedisCache
+from backend.services.resilience import UPSTREAM_CONFLUENCE, CircuitOpenError, resilient_client
+from backend.config import settings
 
 router = APIRouter(prefix="/api/products", tags=["export"])
 logger = structlog.get_logger()
 
-# Initialize export agent conditionally
+# Export agent, built on first use (None if Agno is unavailable or initialization fails)
 export_agent = None
+_export_agent_attempted = False
 
-if AGNO_AVAILABLE:
-    try:
-        from backend.agents.agno_export_agent import AgnoExportAgent
-        export_agent = AgnoExportAgent(enable_rag=True)
-    except Exception as e:
-        logger.warning("export_agent_initialization_failed", error=str(e))
+
+def get_export_agent():
+    """Build the export agent on first call; later calls return the same instance."""
+    global export_agent, _export_agent_attempted
+    if not _export_agent_attempted and AGNO_AVAILABLE:
+        _export_agent_attempted = True
+        try:
+            from backend.agents.agno_export_agent import AgnoExportAgent
+            export_agent = AgnoExportAgent(enable_rag=True)
+        except Exception as e:
+            logger.warning("export_agent_initialization_failed", error=str(e))
+    return export_agent
 
 
 async def ensure_export_agent_initialized(db: AsyncSession, user_id: str) -> bool:
@@ -42,8 +56,7 @@ async def ensure_export_agent_initialized(db: AsyncSession, user_id: str) -> boo
     Tries user API keys from database first, then falls back to environment keys.
     Returns True if agent is ready, False otherwise.
     """
-    global export_agent
-    
+    export_agent = get_export_agent()
     if not AGNO_AVAILABLE or export_agent is None:
         return False
     
@@ -696,228 +709,10 @@ async def review_prd_content(
         raise HTTPException(status_code=500, detail=f"Failed to review PRD: {str(e)}")
 
 
-@router.post("/{product_id}/export-prd")
-async def export_prd_document(
-    product_id: UUID,
-    request: ExportRequest,
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Export PRD document in HTML or Markdown format from conversation history and product data."""
-    try:
-        # Check permission
-        has_permission = await check_product_permission(db, product_id, current_user["id"], "view")
-        if not has_permission:
-            raise HTTPException(status_code=403, detail="Access denied to product")
-        
-        # Get product info
-        product_query = text("SELECT name, description, metadata FROM products WHERE id = :product_id")
-        product_result = await db.execute(product_query, {"product_id": str(product_id)})
-        product_row = product_result.fetchone()
-        
-        if not product_row:
-            raise HTTPException(status_code=404, detail="Product not found")
-        
-        product_info = {
-            "name": product_row[0] or "",
-            "description": product_row[1] or "",
-            "metadata": product_row[2] or {}
-        }
-        
-        # Get all phase submissions
-        phase_query = text("""
-            SELECT ps.form_data, ps.generated_content, plp.phase_name, plp.phase_order
-            FROM phase_submissions ps
-            JOIN product_lifecycle_phases plp ON ps.phase_id = plp.id
-            WHERE ps.product_id = :product_id
-            ORDER BY plp.phase_order ASC
-        """)
-        phase_result = await db.execute(phase_query, {"product_id": str(product_id)})
-        phase_rows = phase_result.fetchall()
-        
-        phase_data = []
-        for row in phase_rows:
-            phase_data.append({
-                "phase_name": row[2],
-                "phase_order": row[3],
-                "form_data": row[0] or {},
-                "generated_content": row[1] or ""
-            })
-        
-        # Get conversation history if not provided
-        conversation_history = request.conversation_history
-        if not conversation_history:
-            conv_query = text("""
-                SELECT ch.message_type, ch.content, ch.agent_name, ch.created_at
-                FROM conversation_history ch
-                WHERE ch.product_id = :product_id
-                ORDER BY ch.created_at ASC
-            """)
-            conv_result = await db.execute(conv_query, {"product_id": str(product_id)})
-            conv_rows = conv_result.fetchall()
-            conversation_history = [
-                {
-                    "role": row[0],
-                    "content": row[1],
-                    "agent_name": row[2],
-                    "timestamp": row[3].isoformat() if row[3] else None
-                }
-                for row in conv_rows
-            ]
-        
-        # Get knowledge base articles
-        # Handle case where table might not exist or has different schema
-        knowledge_base = []
-        try:
-            kb_query = text("""
-                SELECT title, content, source, metadata
-                FROM knowledge_articles
-                WHERE product_id = :product_id
-                ORDER BY created_at DESC
-                LIMIT 50
-            """)
-            kb_result = await db.execute(kb_query, {"product_id": str(product_id)})
-            kb_rows = kb_result.fetchall()
-            
-            knowledge_base = [
-                {
-                    "title": row[0],
-                    "content": row[1],
-                    "source_type": row[2] or "manual",  # source column
-                    "source_url": row[3].get("source_url", "") if isinstance(row[3], dict) else ""  # from metadata
-                }
-                for row in kb_rows
-            ]
-        except Exception as e:
-            # If knowledge_articles table doesn't exist or query fails, continue without it
-            logger.warning(f"Could not fetch knowledge articles: {str(e)}")
-            knowledge_base = []
-        
-        # Get design mockups/prototypes
-        design_mockups = []
-        try:
-            mockup_query = text("""
-                SELECT id, provider, prompt, project_url, v0_chat_id, v0_project_id,
-                       project_status, thumbnail_url, image_url, metadata, created_at
-                FROM design_mockups
-                WHERE product_id = :product_id
-                ORDER BY created_at DESC
-            """)
-            mockup_result = await db.execute(mockup_query, {"product_id": str(product_id)})
-            mockup_rows = mockup_result.fetchall()
-            
-            design_mockups = [
-                {
-                    "id": str(row[0]),
-                    "provider": row[1],
-                    "prompt": row[2],
-                    "project_url": row[3],
-                    "v0_chat_id": row[4] if len(row) > 4 else None,
-                    "v0_project_id": row[5] if len(row) > 5 else None,
-                    "project_status": row[6] if len(row) > 6 else None,
-                    "thumbnail_url": row[7] if len(row) > 7 else None,
-                    "image_url": row[8] if len(row) > 8 else None,
-                    "metadata": row[9] if len(row) > 9 and row[9] else {},
-                    "created_at": row[10].isoformat() if len(row) > 10 and row[10] else None
-                }
-                for row in mockup_rows
-            ]
-        except Exception as e:
-            # If design_mockups table doesn't exist or query fails, continue without it
-            logger.warning(f"Could not fetch design mockups: {str(e)}")
-            design_mockups = []
-        
-        # Generate PRD using export agent with coordinator for agent army
-        if export_agent:
-            # Try to get coordinator for agent army parallel generation
-            coordinator = None
-            try:
-                from backend.agents.agno_enhanced_coordinator import AgnoEnhancedCoordinator
-                coordinator = AgnoEnhancedCoordinator(enable_rag=True)
-                logger.info("using_agent_army_for_export", product_id=str(product_id))
-            except Exception as e:
-                logger.warning("coordinator_not_available_fallback", error=str(e), product_id=str(product_id))
-                # Continue without coordinator - will use single agent fallback
-            
-            prd_content = await export_agent.generate_comprehensive_prd(
-                product_id=str(product_id),
-                product_info=product_info,
-                phase_data=phase_data,
-                conversation_history=conversation_history,
-                knowledge_base=knowledge_base,
-                design_mockups=design_mockups,
-                override_missing=request.override_missing,
-                coordinator=coordinator  # Pass coordinator for agent army
-            )
-        else:
-            # Fallback: generate basic PRD
-            prd_content = f"""# Product Requirements Document
-
-## Product: {product_info['name']}
-
-### Description
-{product_info['description']}
-
-## Phase Submissions
-"""
-            for phase in phase_data:
-                prd_content += f"\n### {phase['phase_name']}\n"
-                if phase['form_data']:
-                    for key, value in phase['form_data'].items():
-                        prd_content += f"- **{key.replace('_', ' ').title()}**: {value}\n"
-                if phase['generated_content']:
-                    prd_content += f"\n{phase['generated_content']}\n"
-            
-            # Add design prototypes section
-            if design_mockups:
-                prd_content += "\n## Design Prototypes\n"
-                for mockup in design_mockups:
-                    provider = mockup.get('provider', 'unknown').upper()
-                    status = mockup.get('project_status', 'unknown')
-                    project_url = mockup.get('project_url', '')
-                    thumbnail_url = mockup.get('thumbnail_url') or mockup.get('image_url', '')
-                    
-                    prd_content += f"\n### {provider} Prototype\n"
-                    prd_content += f"- **Status**: {status}\n"
-                    if project_url:
-                        prd_content += f"- **Prototype URL**: [{project_url}]({project_url})\n"
-                    if thumbnail_url:
-                        prd_content += f"- **Thumbnail**: ![Prototype Thumbnail]({thumbnail_url})\n"
-                    if mockup.get('prompt'):
-                        prd_content += f"- **Prompt Used**: {mockup['prompt'][:200]}...\n"
-            
-            prd_content += "\n## Conversation History\n"
-            for msg in conversation_history:
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                prd_content += f"\n### {role.title()}\n{content}\n"
-        
-        # Return based on format
-        if request.format == "markdown":
-            # Return markdown directly
-            return Response(
-                content=prd_content,
-                media_type="text/markdown",
-                headers={
-                    "Content-Disposition": f'attachment; filename="PRD_{product_info["name"].replace(" ", "_")}_{datetime.utcnow().strftime("%Y%m%d")}.md"'
-                }
-            )
-        else:
-            # Convert markdown to HTML
-            html_content = markdown.markdown(
-                prd_content,
-                extensions=['extra', 'codehilite', 'tables', 'toc']
-            )
-            
-            # Create styled HTML document
-            styled_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>PRD - {product_info['name']}</title>
-    <style>
-        body {{
+# Stylesheet for exported PRD documents. Built once at import time and reused by
+# both the buffered and the streaming export instead of re-rendering per request.
+PRD_EXPORT_CSS = """
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             line-height: 1.6;
             color: #333;
@@ -925,79 +720,101 @@ async def export_prd_document(
             margin: 0 auto;
             padding: 20px;
             background: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             background: white;
             padding: 40px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #2563eb;
             border-bottom: 3px solid #2563eb;
             padding-bottom: 10px;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #1e40af;
             margin-top: 30px;
             border-bottom: 2px solid #e5e7eb;
             padding-bottom: 5px;
-        }}
-        h3 {{
+        }
+        h3 {
             color: #3b82f6;
             margin-top: 20px;
-        }}
-        .to-be-defined {{
+        }
+        .to-be-defined {
             background: #fef3c7;
             border-left: 4px solid #f59e0b;
             padding: 15px;
             margin: 20px 0;
-        }}
-        .to-be-defined h3 {{
+        }
+        .to-be-defined h3 {
             color: #d97706;
-        }}
-        code {{
+        }
+        code {
             background: #f3f4f6;
             padding: 2px 6px;
             border-radius: 3px;
             font-family: 'Courier New', monospace;
-        }}
-        pre {{
+        }
+        pre {
             background: #1f2937;
             color: #f9fafb;
             padding: 15px;
             border-radius: 5px;
             overflow-x: auto;
-        }}
-        table {{
+        }
+        table {
             border-collapse: collapse;
             width: 100%;
             margin: 20px 0;
-        }}
-        th, td {{
+        }
+        th, td {
             border: 1px solid #e5e7eb;
             padding: 12px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background: #f9fafb;
             font-weight: 600;
-        }}
-        .metadata {{
+        }
+        .metadata {
             background: #f0f9ff;
             border-left: 4px solid #2563eb;
             padding: 15px;
             margin: 20px 0;
-        }}
-        .footer {{
+        }
+        .footer {
             margin-top: 40px;
             padding-top: 20px;
             border-top: 1px solid #e5e7eb;
             text-align: center;
             color: #6b7280;
             font-size: 0.9em;
-        }}
-    </style>
+        }
+"""
+
+PRD_HTML_TAIL = """
+        <div class="footer">
+            <p>Generated by IdeaForge AI - Agentic Product Management Platform</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
+# Generated PRD markdown keyed by product id and a fingerprint of its export inputs
+_prd_artifact_cache = RedisCache(ttl=settings.prd_export_cache_ttl, prefix="prd_export:")
+
+
+def _render_prd_html_head(product_name: str, product_id: UUID) -> str:
+    """Build the HTML shell up to (and including) the metadata block."""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>PRD - {html.escape(product_name)}</title>
+    <style>{PRD_EXPORT_CSS}    </style>
 </head>
 <body>
     <div class="container">
@@ -1006,30 +823,406 @@ async def export_prd_document(
             <strong>Product ID:</strong> {product_id}<br>
             <strong>Format:</strong> HTML (rendered from Markdown)
         </div>
-        {html_content}
-        <div class="footer">
-            <p>Generated by IdeaForge AI - Agentic Product Management Platform</p>
-        </div>
-    </div>
-</body>
-</html>"""
+"""
+
+
+def _export_filename(product_name: str, extension: str) -> str:
+    return f'PRD_{product_name.replace(" ", "_")}_{datetime.utcnow().strftime("%Y%m%d")}.{extension}'
+
+
+async def _load_export_inputs(
+    db: AsyncSession,
+    product_id: UUID,
+    conversation_history: Optional[List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Load product info, phase submissions, conversations, knowledge and mockups for an export."""
+    # Get product info
+    product_query = text("SELECT name, description, metadata FROM products WHERE id = :product_id")
+    product_result = await db.execute(product_query, {"product_id": str(product_id)})
+    product_row = product_result.fetchone()
+    
+    if not product_row:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    product_info = {
+        "name": product_row[0] or "",
+        "description": product_row[1] or "",
+        "metadata": product_row[2] or {}
+    }
+    
+    # Get all phase submissions
+    phase_query = text("""
+        SELECT ps.form_data, ps.generated_content, plp.phase_name, plp.phase_order
+        FROM phase_submissions ps
+        JOIN product_lifecycle_phases plp ON ps.phase_id = plp.id
+        WHERE ps.product_id = :product_id
+        ORDER BY plp.phase_order ASC
+    """)
+    phase_result = await db.execute(phase_query, {"product_id": str(product_id)})
+    phase_rows = phase_result.fetchall()
+    
+    phase_data = []
+    for row in phase_rows:
+        phase_data.append({
+            "phase_name": row[2],
+            "phase_order": row[3],
+            "form_data": row[0] or {},
+            "generated_content": row[1] or ""
+        })
+    
+    # Get conversation history if not provided
+    if not conversation_history:
+        conv_query = text("""
+            SELECT ch.message_type, ch.content, ch.agent_name, ch.created_at
+            FROM conversation_history ch
+            WHERE ch.product_id = :product_id
+            ORDER BY ch.created_at ASC
+        """)
+        conv_result = await db.execute(conv_query, {"product_id": str(product_id)})
+        conv_rows = conv_result.fetchall()
+        conversation_history = [
+            {
+                "role": row[0],
+                "content": row[1],
+                "agent_name": row[2],
+                "timestamp": row[3].isoformat() if row[3] else None
+            }
+            for row in conv_rows
+        ]
+    
+    # Get knowledge base articles
+    # Handle case where table might not exist or has different schema
+    knowledge_base = []
+    try:
+        kb_query = text("""
+            SELECT title, content, source, metadata
+            FROM knowledge_articles
+            WHERE product_id = :product_id
+            ORDER BY created_at DESC
+            LIMIT 50
+        """)
+        kb_result = await db.execute(kb_query, {"product_id": str(product_id)})
+        kb_rows = kb_result.fetchall()
+        
+        knowledge_base = [
+            {
+                "title": row[0],
+                "content": row[1],
+                "source_type": row[2] or "manual",  # source column
+                "source_url": row[3].get("source_url", "") if isinstance(row[3], dict) else ""  # from metadata
+            }
+            for row in kb_rows
+        ]
+    except Exception as e:
+        # If knowledge_articles table doesn't exist or query fails, continue without it
+        logger.warning(f"Could not fetch knowledge articles: {str(e)}")
+        knowledge_base = []
+    
+    # Get design mockups/prototypes
+    design_mockups = []
+    try:
+        mockup_query = text("""
+            SELECT id, provider, prompt, project_url, v0_chat_id, v0_project_id,
+                   project_status, thumbnail_url, image_url, metadata, created_at
+            FROM design_mockups
+            WHERE product_id = :product_id
+            ORDER BY created_at DESC
+        """)
+        mockup_result = await db.execute(mockup_query, {"product_id": str(product_id)})
+        mockup_rows = mockup_result.fetchall()
+        
+        design_mockups = [
+            {
+                "id": str(row[0]),
+                "provider": row[1],
+                "prompt": row[2],
+                "project_url": row[3],
+                "v0_chat_id": row[4] if len(row) > 4 else None,
+                "v0_project_id": row[5] if len(row) > 5 else None,
+                "project_status": row[6] if len(row) > 6 else None,
+                "thumbnail_url": row[7] if len(row) > 7 else None,
+                "image_url": row[8] if len(row) > 8 else None,
+                "metadata": row[9] if len(row) > 9 and row[9] else {},
+                "created_at": row[10].isoformat() if len(row) > 10 and row[10] else None
+            }
+            for row in mockup_rows
+        ]
+    except Exception as e:
+        # If design_mockups table doesn't exist or query fails, continue without it
+        logger.warning(f"Could not fetch design mockups: {str(e)}")
+        design_mockups = []
+    
+    return {
+        "product_info": product_info,
+        "phase_data": phase_data,
+        "conversation_history": conversation_history,
+        "knowledge_base": knowledge_base,
+        "design_mockups": design_mockups,
+    }
+
+
+def _prd_artifact_key(product_id: UUID, inputs: Dict[str, Any], override_missing: bool) -> str:
+    """Version a generated PRD by a fingerprint of everything the export agent reads."""
+    fingerprint = hashlib.sha256(
+        json.dumps({**inputs, "override_missing": override_missing}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{product_id}:{fingerprint}"
+
+
+def _build_fallback_prd(inputs: Dict[str, Any]) -> str:
+    """Generate a basic PRD without the export agent."""
+    product_info = inputs["product_info"]
+    design_mockups = inputs["design_mockups"]
+    prd_content = f"""# Product Requirements Document
+
+## Product: {product_info['name']}
+
+### Description
+{product_info['description']}
+
+## Phase Submissions
+"""
+    for phase in inputs["phase_data"]:
+        prd_content += f"\n### {phase['phase_name']}\n"
+        if phase['form_data']:
+            for key, value in phase['form_data'].items():
+                prd_content += f"- **{key.replace('_', ' ').title()}**: {value}\n"
+        if phase['generated_content']:
+            prd_content += f"\n{phase['generated_content']}\n"
+    
+    # Add design prototypes section
+    if design_mockups:
+        prd_content += "\n## Design Prototypes\n"
+        for mockup in design_mockups:
+            provider = mockup.get('provider', 'unknown').upper()
+            status = mockup.get('project_status', 'unknown')
+            project_url = mockup.get('project_url', '')
+            thumbnail_url = mockup.get('thumbnail_url') or mockup.get('image_url', '')
+            
+            prd_content += f"\n### {provider} Prototype\n"
+            prd_content += f"- **Status**: {status}\n"
+            if project_url:
+                prd_content += f"- **Prototype URL**: [{project_url}]({project_url})\n"
+            if thumbnail_url:
+                prd_content += f"- **Thumbnail**: ![Prototype Thumbnail]({thumbnail_url})\n"
+            if mockup.get('prompt'):
+                prd_content += f"- **Prompt Used**: {mockup['prompt'][:200]}...\n"
+    
+    prd_content += "\n## Conversation History\n"
+    for msg in inputs["conversation_history"]:
+        role = msg.get('role', 'user')
+        content = msg.get('content', '')
+        prd_content += f"\n### {role.title()}\n{content}\n"
+    return prd_content
+
+
+def _get_export_coordinator(product_id: UUID) -> Optional[Any]:
+    """Get the coordinator whose agent army generates PRD sections in parallel."""
+    try:
+        from backend.agents.agno_enhanced_coordinator import AgnoEnhancedCoordinator
+        coordinator = AgnoEnhancedCoordinator(enable_rag=True)
+        logger.info("using_agent_army_for_export", product_id=str(product_id))
+        return coordinator
+    except Exception as e:
+        logger.warning("coordinator_not_available_fallback", error=str(e), product_id=str(product_id))
+        # Continue without coordinator - will use single agent fallback
+        return None
+
+
+async def _stream_prd_markdown(
+    product_id: UUID, inputs: Dict[str, Any], override_missing: bool, cached: Optional[str]
+) -> AsyncIterator[str]:
+    """
+    Yield the PRD markdown piece by piece.
+    The cached artifact (looked up by _admit_export) is replayed in one piece; otherwise
+    sections are yielded as the export agent produces them and the assembled document
+    is cached afterwards.
+    """
+    export_agent = get_export_agent()
+    if not export_agent:
+        yield _build_fallback_prd(inputs)
+        return
+    
+    if cached:
+        logger.info("prd_export_cache_hit", product_id=str(product_id))
+        yield cached
+        return
+    
+    artifact_key = _prd_artifact_key(product_id, inputs, override_missing)    
+    pieces = []
+    async for piece in export_agent.stream_comprehensive_prd(
+        product_id=str(product_id),
+        product_info=inputs["product_info"],
+        phase_data=inputs["phase_data"],
+        conversation_history=inputs["conversation_history"],
+        knowledge_base=inputs["knowledge_base"],
+        design_mockups=inputs["design_mockups"],
+        override_missing=override_missing,
+        coordinator=_get_export_coordinator(product_id)  # Pass coordinator for agent army
+    ):
+        pieces.append(piece)
+        yield piece
+    
+    await _prd_artifact_cache.set(artifact_key, "".join(pieces))
+
+
+async def _generate_prd_markdown(
+    product_id: UUID, inputs: Dict[str, Any], override_missing: bool, cached: Optional[str]
+) -> str:
+    """Generate the full PRD markdown for a product, or reuse the artifact _admit_export found."""
+    export_agent = get_export_agent()
+    if not export_agent:
+        return _build_fallback_prd(inputs)
+    
+    if cached:
+        logger.info("prd_export_cache_hit", product_id=str(product_id))
+        return cached
+    
+    artifact_key = _prd_artifact_key(product_id, inputs, override_missing)    
+    prd_content = await export_agent.generate_comprehensive_prd(
+        product_id=str(product_id),
+        product_info=inputs["product_info"],
+        phase_data=inputs["phase_data"],
+        conversation_history=inputs["conversation_history"],
+        knowledge_base=inputs["knowledge_base"],
+        design_mockups=inputs["design_mockups"],
+        override_missing=override_missing,
+        coordinator=_get_export_coordinator(product_id)  # Pass coordinator for agent army
+    )
+    await _prd_artifact_cache.set(artifact_key, prd_content)
+    return prd_content
+
+
+async def _admit_export(
+    product_id: UUID, inputs: Dict[str, Any], override_missing: bool, current_user: dict
+) -> Tuple[Optional[AdmissionTicket], Optional[str]]:
+    """
+    Admit an export against the tenant's agent budget; cached and fallback exports run no agents.
+    Returns (ticket, cached artifact), so the artifact is fetched only once per export.
+    """
+    if not get_export_agent():
+        return None, None
+    cached = await _prd_artifact_cache.get(_prd_artifact_key(product_id, inputs, override_missing))
+    if cached:
+        return None, cached
+    tenant = current_user.get("tenant_id") or f"user:{current_user['id']}"
+    return await admit_run(str(tenant), KIND_EXPORT, context_size(inputs)), None
+
+
+@router.post("/{product_id}/export-prd")
+async def export_prd_document(
+    product_id: UUID,
+    request: ExportRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Export PRD document in HTML or Markdown format from conversation history and product data."""
+    try:
+        # Check permission
+        has_permission = await check_product_permission(db, product_id, current_user["id"], "view")
+        if not has_permission:
+            raise HTTPException(status_code=403, detail="Access denied to product")
+        
+        inputs = await _load_export_inputs(db, product_id, request.conversation_history)
+        product_info = inputs["product_info"]
+        
+        # Generate PRD using export agent with coordinator for agent army
+        ticket, cached = await _admit_export(product_id, inputs, request.override_missing, current_user)
+        try:
+            prd_content = await _generate_prd_markdown(product_id, inputs, request.override_missing, cached)
+        finally:
+            if ticket is not None:
+                await ticket.release()
+        
+        # Return based on format
+        if request.format == "markdown":
+            # Return markdown directly
+            return Response(
+                content=prd_content,
+                media_type="text/markdown",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{_export_filename(product_info["name"], "md")}"'
+                }
+            )
+        else:
+            # Convert markdown to HTML (single-pass renderer, cached by content hash)
+            html_content = render_markdown_cached(prd_content, theme="export")
+            styled_html = _render_prd_html_head(product_info["name"], product_id) + html_content + PRD_HTML_TAIL
             
             # Return HTML response
             return Response(
                 content=styled_html,
                 media_type="text/html",
                 headers={
-                    "Content-Disposition": f'attachment; filename="PRD_{product_info["name"].replace(" ", "_")}_{datetime.utcnow().strftime("%Y%m%d")}.html"'
+                    "Content-Disposition": f'attachment; filename="{_export_filename(product_info["name"], "html")}"'
                 }
             )
         
-    except HTTPException:
+    except (HTTPException, AdmissionRejectedError):
         raise
     except Exception as e:
         logger.error("export_prd_error", error=str(e), product_id=str(product_id))
         raise HTTPException(status_code=500, detail=f"Failed to export PRD: {str(e)}")
 
 
+@router.post("/{product_id}/export-prd/stream")
+async def stream_export_prd_document(
+    product_id: UUID,
+    request: ExportRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream the PRD export instead of buffering the whole document.
+    The HTML shell is sent immediately and each section follows as soon as the export
+    agent finishes it. Unchanged products replay the cached artifact.
+    """
+    # Permission and data loading happen before streaming so failures keep proper status codes
+    has_permission = await check_product_permission(db, product_id, current_user["id"], "view")
+    if not has_permission:
+        raise HTTPException(status_code=403, detail="Access denied to product")
+    
+    inputs = await _load_export_inputs(db, product_id, request.conversation_history)
+    product_name = inputs["product_info"]["name"]
+    is_markdown = request.format == "markdown"
+    # Admitted before streaming too, so a shed export still gets a 429 with Retry-After
+    ticket, cached = await _admit_export(product_id, inputs, request.override_missing, current_user)
+    
+    async def generate() -> AsyncIterator[str]:
+        try:
+            renderer = None if is_markdown else IncrementalMarkdownRenderer(theme="export")
+            if renderer:
+                yield _render_prd_html_head(product_name, product_id)
+            try:
+                async for piece in _stream_prd_markdown(product_id, inputs, request.override_missing, cached):
+                    if renderer:
+                        piece = renderer.feed(piece)
+                    if piece:
+                        yield piece
+                if renderer:
+                    yield renderer.close() + PRD_HTML_TAIL
+            except Exception as e:
+                # Headers are already sent - report the failure inside the document
+                logger.error("export_prd_stream_error", error=str(e), product_id=str(product_id))
+                message = f"Failed to export PRD: {str(e)}"
+                yield f"\n\n> {message}\n" if is_markdown else f"<p><strong>{html.escape(message)}</strong></p>{PRD_HTML_TAIL}"
+        finally:
+            if ticket is not None:
+                await ticket.release()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/markdown" if is_markdown else "text/html",
+        headers={
+            "Content-Disposition": f'attachment; filename="{_export_filename(product_name, "md" if is_markdown else "html")}"',
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+        # Also runs when the client leaves before the body is iterated (release is idempotent)
+        background=BackgroundTask(ticket.release) if ticket is not None else None,
+    )
+
+
 @router.post("/{product_id}/publish-to-confluence")
 async def publish_prd_to_confluence(
     product_id: UUID,
@@ -1112,7 +1305,7 @@ async def publish_prd_to_confluence(
             if request.parent_page_id:
                 payload["parentId"] = request.parent_page_id
             
-            async with httpx.AsyncClient() as client:
+            async with resilient_client(UPSTREAM_CONFLUENCE, timeout=30.0) as client:
                 response = await client.post(
                     confluence_url,
                     headers=headers,
@@ -1161,7 +1354,7 @@ async def publish_prd_to_confluence(
                 detail="Confluence publishing via MCP server not yet implemented. Please use the REST API approach."
             )
         
-    except HTTPException:
+    except (HTTPException, CircuitOpenError):
         raise
     except Exception as e:
         logger.error("publish_confluence_error", error=str(e), product_id=str(product_id))
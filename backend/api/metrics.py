@@ -8,6 +8,12 @@ from datetime import datetime
 
 from backend.database import get_db, engine
 from backend.api.auth import get_current_user
+from backend.services.llm_scheduler import get_llm_scheduler
+from backend.models.routing_model import routing_stats
+from backend.services.resilience import breaker_states
+from backend.services.cpu_executor import get_cpu_executor
+from backend.services.admission import get_admission_controller
+from backend.services.websocket_hub import get_websocket_hub
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
@@ -164,6 +170,90 @@ async def get_cache_stats(
         }
 
 
+@router.get("/llm-scheduler")
+async def get_llm_scheduler_metrics(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Model call scheduler metrics: queue depth by priority class, wait times,
+    in-flight calls and remaining rate-limit capacity per provider/model lane.
+    """
+    try:
+        metrics = get_llm_scheduler().snapshot()
+        metrics["timestamp"] = datetime.utcnow().isoformat()
+        return metrics
+    except Exception as e:
+        logger.error("llm_scheduler_metrics_error", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to get scheduler metrics: {str(e)}")
+
+
+@router.get("/model-routing")
+async def get_model_routing_metrics(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Model routing health: rolling error rate, p95 latency and whether each
+    provider route is currently preferred or demoted.
+    """
+    return {
+        "routes": routing_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@router.get("/circuit-breakers")
+async def get_circuit_breaker_metrics(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Circuit breaker state per upstream (closed/open/half_open), consecutive failures,
+    fast-failed calls and the latency percentiles behind the adaptive timeouts.
+    """
+    return {
+        "upstreams": breaker_states(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@router.get("/cpu-pool")
+async def get_cpu_pool_metrics(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    CPU pool (password hashing) admission: running and waiting jobs, rejected
+    jobs and average queue wait and run time for this worker.
+    """
+    metrics = get_cpu_executor().snapshot()
+    metrics["timestamp"] = datetime.utcnow().isoformat()
+    return metrics
+
+
+@router.get("/admission")
+async def get_admission_metrics(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Agent run admission: runs admitted, queued and shed (by reason), runs in flight
+    by kind and queue time percentiles for this worker.
+    """
+    metrics = get_admission_controller().snapshot()
+    metrics["timestamp"] = datetime.utcnow().isoformat()
+    return metrics
+
+
+@router.get("/websockets")
+async def get_websocket_metrics(
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    WebSocket hub: open sockets, topic subscriptions, queued and dropped messages,
+    slow clients closed and send latency percentiles for this worker.
+    """
+    metrics = get_websocket_hub().snapshot()
+    metrics["timestamp"] = datetime.utcnow().isoformat()
+    return metrics
+
+
 @router.get("/agent-metrics")
 async def get_agent_metrics(
     current_user: dict = Depends(get_current_user)
@@ -2,8 +2,7 @@
 API endpoint for single-agent phase form help queries.
 Provides quick, focused responses for phase form questions using a single expert agent.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, Any, AsyncGenerator
 from uuid import UUID
@@ -18,11 +17,12 @@ from datetime import datetime
 
 from backend.database import get_db
 from backend.api.auth import get_current_user
-from backend.agents.agno_base_agent import AgnoBaseAgent
 from backend.agents.agno_orchestrator import AgnoAgenticOrchestrator
 from backend.models.schemas import AgentMessage
 from backend.services.provider_registry import provider_registry
 from backend.services.api_key_loader import load_user_api_keys_from_db
+from backend.services.markdown_renderer import render_markdown
+from backend.services.sse import resume_response, sse_response
 from backend.config import settings
 
 # Import orchestrator using dependency injection pattern (avoid circular import)
@@ -985,85 +985,25 @@ def extract_plain_text(content: str) -> str:
 
 def markdown_to_html(markdown: str) -> str:
     """Convert markdown to HTML with proper formatting for textarea display."""
-    import html as html_escape
-    html = markdown
-    
-    # Escape HTML first to prevent XSS
-    html = html_escape.escape(html)
-    
-    # Headers (with styling classes)
-    html = re.sub(r'^### (.*)$', r'<h3 class="text-xl font-semibold mt-4 mb-2">\1</h3>', html, flags=re.MULTILINE)
-    html = re.sub(r'^## (.*)$', r'<h2 class="text-2xl font-semibold mt-6 mb-3">\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^# (.*)$', r'<h1 class="text-3xl font-bold mt-8 mb-4">\1</h1>', html, flags=re.MULTILINE)
-    
-    # Bold
-    html = re.sub(r'\*\*(.*?)\*\*', r'<strong class="font-semibold">\1</strong>', html)
-    
-    # Italic
-    html = re.sub(r'\*(.*?)\*', r'<em class="italic">\1</em>', html)
-    
-    # Lists (unordered)
-    html = re.sub(r'^\* (.*)$', r'<li class="ml-4 mb-1">\1</li>', html, flags=re.MULTILINE)
-    html = re.sub(r'^- (.*)$', r'<li class="ml-4 mb-1">\1</li>', html, flags=re.MULTILINE)
-    
-    # Lists (ordered)
-    html = re.sub(r'^\d+\. (.*)$', r'<li class="ml-4 mb-1">\1</li>', html, flags=re.MULTILINE)
-    
-    # Wrap consecutive list items in ul/ol
-    html = re.sub(r'(<li class="ml-4 mb-1">.*?</li>\n?)+', lambda m: f'<ul class="list-disc my-3">{m.group(0)}</ul>', html, flags=re.DOTALL)
-    
-    # Code blocks (with styling)
-    html = re.sub(r'```(\w+)?\n(.*?)```', r'<pre class="bg-gray-100 p-3 rounded my-2 overflow-x-auto"><code class="text-sm">\2</code></pre>', html, flags=re.DOTALL)
-    
-    # Inline code
-    html = re.sub(r'`([^`]+)`', r'<code class="bg-gray-100 px-1 rounded text-sm">\1</code>', html)
-    
-    # Links
-    html = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2" class="text-blue-600 underline" target="_blank">\1</a>', html)
-    
-    # Paragraphs (with styling)
-    lines = html.split('\n')
-    html_lines = []
-    for line in lines:
-        trimmed = line.strip()
-        if trimmed and not trimmed.startswith('<'):
-            html_lines.append(f'<p class="mb-3 leading-relaxed">\1</p>')
-        else:
-            html_lines.append(line)
-    html = '\n'.join(html_lines)
-    
-    # Paragraphs: wrap standalone text lines (not already wrapped in HTML tags)
-    lines = html.split('\n')
-    html_lines = []
-    for line in lines:
-        trimmed = line.strip()
-        if trimmed and not trimmed.startswith('<') and not trimmed.startswith('&'):
-            html_lines.append(f'<p class="mb-3 leading-relaxed">{trimmed}</p>')
-        else:
-            html_lines.append(line)
-    html = '\n'.join(html_lines)
-    
-    return html
+    return render_markdown(markdown, theme="tailwind")
 
 
 @router.post("/stream")
 async def stream_phase_form_help_endpoint(
     request: PhaseFormHelpRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Stream phase form help response."""
+    """Stream phase form help response (resumable with Last-Event-ID)."""
+    headers = {
+        "X-Accel-Charset": "utf-8",
+        # Force HTTP/1.1 for streaming to avoid HTTP/2 protocol errors
+        "Upgrade": "",
+    }
+    resumed = await resume_response(http_request, current_user, headers)
+    if resumed is not None:
+        return resumed
     user_id = UUID(str(current_user["id"]))
-    return StreamingResponse(
-        stream_phase_form_help(request, user_id, db),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-            "X-Accel-Charset": "utf-8",
-            # Force HTTP/1.1 for streaming to avoid HTTP/2 protocol errors
-            "Upgrade": "",
-        }
-    )
+    return sse_response(stream_phase_form_help(request, user_id, db), headers, owner=str(user_id))
 
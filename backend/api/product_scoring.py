@@ -11,31 +11,34 @@ import structlog
 
 from backend.database import get_db
 from backend.api.auth import get_current_user
+from backend.utils.pagination import InvalidCursorError, apply_cursor, clamp_limit, split_page
 from backend.api.product_permissions import check_product_permission, get_product_permission
 from backend.agents import AGNO_AVAILABLE
+from backend.agents.registry import LazyAgentRegistry
+from backend.services.product_scores import refresh_tenant_scores, score_incrementally
+from backend.services.websocket_hub import publish
+from backend.services.session_summaries import HierarchicalSummarizer
 
 router = APIRouter(prefix="/api/products", tags=["product-scoring"])
 logger = structlog.get_logger()
 
-# Initialize agents conditionally
-enhanced_coordinator = None
-summary_agent = None
-scoring_agent = None
-prd_agent = None
+# Agno agents used by these endpoints, imported and built on first use
+_agents = LazyAgentRegistry({
+    "enhanced_coordinator": ("backend.agents.agno_enhanced_coordinator:AgnoEnhancedCoordinator", {"enable_rag": True}),
+    "summary": ("backend.agents.agno_summary_agent:AgnoSummaryAgent", {"enable_rag": True}),
+    "scoring": ("backend.agents.agno_scoring_agent:AgnoScoringAgent", {"enable_rag": True}),
+})
 
-if AGNO_AVAILABLE:
+
+def _get_agent(agent_type: str):
+    """Agent instance, or None when Agno is unavailable or the agent fails to initialize."""
+    if not AGNO_AVAILABLE:
+        return None
     try:
-        from backend.agents.agno_enhanced_coordinator import AgnoEnhancedCoordinator
-        from backend.agents.agno_summary_agent import AgnoSummaryAgent
-        from backend.agents.agno_scoring_agent import AgnoScoringAgent
-        from backend.agents.agno_prd_authoring_agent import AgnoPRDAuthoringAgent
-        
-        enhanced_coordinator = AgnoEnhancedCoordinator(enable_rag=True)
-        summary_agent = AgnoSummaryAgent(enable_rag=True)
-        scoring_agent = AgnoScoringAgent(enable_rag=True)
-        prd_agent = AgnoPRDAuthoringAgent(enable_rag=True)
+        return _agents[agent_type]
     except Exception as e:
-        logger.warning("agno_agents_initialization_failed", error=str(e))
+        logger.warning("agno_agents_initialization_failed", agent_type=agent_type, error=str(e))
+        return None
 
 
 @router.get("/{product_id}/sessions")
@@ -90,28 +93,42 @@ async def create_product_summary(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a summary from selected sessions."""
+    summary_agent = _get_agent("summary")
     if not summary_agent:
         raise HTTPException(status_code=503, detail="Summary agent not available. Agno framework required.")
     try:
-        # Fetch messages from selected sessions
+        summarizer = HierarchicalSummarizer(summary_agent)
+        cached = await summarizer.cache.get_many([str(sid) for sid in session_ids])
+        
+        # Fetch messages from selected sessions; sessions with a cached summary only from
+        # the last message it covers on (the summarizer folds in the ones after it)
         query = text("""
+            WITH covered AS (
+                SELECT m.session_id, m.created_at, m.id
+                FROM agent_messages m
+                WHERE m.id = ANY(CAST(:covered_ids AS uuid[]))
+            )
             SELECT 
                 am.session_id,
                 am.role,
                 am.content,
                 am.agent_role,
                 am.created_at,
-                cs.title as session_title
+                cs.title as session_title,
+                am.id
             FROM agent_messages am
             JOIN conversation_sessions cs ON cs.id = am.session_id
+            LEFT JOIN covered ON covered.session_id = am.session_id
             WHERE am.session_id = ANY(:session_ids)
             AND cs.product_id = :product_id
-            ORDER BY am.created_at ASC
+            AND (covered.id IS NULL OR (am.created_at, am.id) >= (covered.created_at, covered.id))
+            ORDER BY am.created_at ASC, am.id ASC
         """)
         
         result = await db.execute(query, {
             "session_ids": [str(sid) for sid in session_ids],
-            "product_id": str(product_id)
+            "product_id": str(product_id),
+            "covered_ids": [entry["last_message_id"] for entry in cached.values()],
         })
         rows = result.fetchall()
         
@@ -128,6 +145,7 @@ async def create_product_summary(
                 }
             
             sessions_data[session_id]["messages"].append({
+                "id": str(row[6]),
                 "role": row[1],
                 "content": row[2],
                 "agent_role": row[3],
@@ -147,10 +165,11 @@ async def create_product_summary(
             for data in sessions_data.values()
         ]
         
-        # Create summary using agent
-        summary_content = await summary_agent.create_multi_session_summary(
+        # Summarize each session (cached, incremental) and combine the session summaries
+        summary_content = await summarizer.summarize(
             sessions=sessions_list,
-            product_context={"product_id": str(product_id)}
+            product_context={"product_id": str(product_id)},
+            cached=cached,
         )
         
         # Save summary to database
@@ -192,6 +211,7 @@ async def score_product_idea(
     db: AsyncSession = Depends(get_db)
 ):
     """Score a product idea based on summary and context."""
+    scoring_agent = _get_agent("scoring")
     if not scoring_agent:
         raise HTTPException(status_code=503, detail="Scoring agent not available. Agno framework required.")
     try:
@@ -237,13 +257,44 @@ async def score_product_idea(
             "status": product_row[3] if product_row else "ideation"
         }
         
-        # Score the product idea
-        scoring_result = await scoring_agent.score_product_idea(
-            product_summary=summary_content or product_info.get("description", ""),
-            market_context=product_info.get("metadata", {}).get("market_context"),
-            technical_context=product_info.get("metadata", {}).get("technical_context")
+        # Latest score: dimensions whose inputs are unchanged are carried over
+        previous_query = text("""
+            SELECT id, scoring_data, created_at
+            FROM product_idea_scores
+            WHERE product_id = :product_id
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+        """)
+        previous_result = await db.execute(previous_query, {"product_id": str(product_id)})
+        previous_row = previous_result.fetchone()
+        
+        # Score the product idea (only dimensions whose inputs changed)
+        metadata = product_info.get("metadata") or {}
+        scoring_result = await score_incrementally(
+            scoring_agent,
+            {
+                "product_summary": summary_content or product_info.get("description", ""),
+                "market_context": metadata.get("market_context"),
+                "user_feedback": metadata.get("user_feedback"),
+                "technical_context": metadata.get("technical_context"),
+            },
+            previous_dimensions=previous_row[1] if previous_row else None,
         )
         
+        if previous_row and not scoring_result["rescored"]:
+            # Nothing changed since the latest score: return it instead of storing a copy
+            return {
+                "score_id": str(previous_row[0]),
+                "overall_score": scoring_result.get("overall_score"),
+                "success_probability": scoring_result.get("success_probability"),
+                "dimensions": scoring_result.get("dimensions", {}),
+                "recommendations": scoring_result.get("recommendations", []),
+                "success_factors": scoring_result.get("success_factors", []),
+                "risk_factors": scoring_result.get("risk_factors", []),
+                "rescored_dimensions": [],
+                "created_at": previous_row[2].isoformat() if previous_row[2] else None
+            }
+        
         # Save score to database
         insert_query = text("""
             INSERT INTO product_idea_scores
@@ -267,8 +318,16 @@ async def score_product_idea(
             "created_by": current_user["id"]
         })
         
-        await db.commit()
         row = result.fetchone()
+        await db.commit()
+        await refresh_tenant_scores()
+        await publish(f"product:{product_id}", {
+            "type": "product_scored",
+            "product_id": str(product_id),
+            "score_id": str(row[0]),
+            "overall_score": scoring_result.get("overall_score"),
+            "rescored_dimensions": scoring_result["rescored"],
+        })
         
         return {
             "score_id": str(row[0]),
@@ -278,6 +337,7 @@ async def score_product_idea(
             "recommendations": scoring_result.get("recommendations", []),
             "success_factors": scoring_result.get("success_factors", []),
             "risk_factors": scoring_result.get("risk_factors", []),
+            "rescored_dimensions": scoring_result["rescored"],
             "created_at": row[1].isoformat() if row[1] else None
         }
         
@@ -352,6 +412,7 @@ Idea Score and Analysis:
 Generate a complete PRD following the standard template with all sections."""
 
         # Use enhanced coordinator for contextualized PRD generation
+        enhanced_coordinator = _get_agent("enhanced_coordinator")
         if not enhanced_coordinator:
             raise HTTPException(status_code=503, detail="Enhanced coordinator not available. Agno framework required.")
         response = await enhanced_coordinator.process_with_context(
@@ -478,32 +539,69 @@ async def get_product_scores(
 @router.get("/tenant/{tenant_id}/scores")
 async def get_tenant_scores(
     tenant_id: UUID,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    history: bool = False,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all product scores for a tenant (Idea Score Dashboard)."""
+    """Get the latest score of each product for a tenant (Idea Score Dashboard), newest first, paginated by cursor.
+
+    Served from the tenant_product_scores materialized view, refreshed whenever a score is written.
+    history=true returns every scoring run instead, as this endpoint did before the view.
+    Product names are joined at read time, so renames show up without a refresh.
+    """
     try:
-        query = text("""
-            SELECT 
-                pis.id,
-                pis.product_id,
-                p.name as product_name,
-                pis.overall_score,
-                pis.success_probability,
-                pis.scoring_data,
-                pis.recommendations,
-                pis.success_factors,
-                pis.risk_factors,
-                pis.created_at,
-                pis.updated_at
-            FROM product_idea_scores pis
-            JOIN products p ON p.id = pis.product_id
-            WHERE pis.tenant_id = :tenant_id
-            ORDER BY pis.created_at DESC
-        """)
+        page_size = clamp_limit(limit)
+        params = {"tenant_id": str(tenant_id), "limit": page_size + 1}
+        if history:
+            keyset_clause = apply_cursor(cursor, params, "pis.created_at", "pis.id")
+            query = text(f"""
+                SELECT 
+                    pis.id,
+                    pis.product_id,
+                    p.name as product_name,
+                    pis.overall_score,
+                    pis.success_probability,
+                    pis.scoring_data,
+                    pis.recommendations,
+                    pis.success_factors,
+                    pis.risk_factors,
+                    pis.created_at,
+                    pis.updated_at,
+                    (SELECT count(*) FROM product_idea_scores runs
+                     WHERE runs.product_id = pis.product_id AND runs.tenant_id = pis.tenant_id) as score_count
+                FROM product_idea_scores pis
+                JOIN products p ON p.id = pis.product_id
+                WHERE pis.tenant_id = :tenant_id{keyset_clause}
+                ORDER BY pis.created_at DESC, pis.id DESC
+                LIMIT :limit
+            """)
+        else:
+            keyset_clause = apply_cursor(cursor, params, "tps.created_at", "tps.id")
+            query = text(f"""
+                SELECT 
+                    tps.id,
+                    tps.product_id,
+                    p.name as product_name,
+                    tps.overall_score,
+                    tps.success_probability,
+                    tps.scoring_data,
+                    tps.recommendations,
+                    tps.success_factors,
+                    tps.risk_factors,
+                    tps.created_at,
+                    tps.updated_at,
+                    tps.score_count
+                FROM tenant_product_scores tps
+                JOIN products p ON p.id = tps.product_id
+                WHERE tps.tenant_id = :tenant_id{keyset_clause}
+                ORDER BY tps.created_at DESC, tps.id DESC
+                LIMIT :limit
+            """)
         
-        result = await db.execute(query, {"tenant_id": str(tenant_id)})
-        rows = result.fetchall()
+        result = await db.execute(query, params)
+        rows, next_cursor = split_page(result.fetchall(), page_size, sort_index=9)
         
         scores = [
             {
@@ -517,12 +615,15 @@ async def get_tenant_scores(
                 "success_factors": row[7] or [],
                 "risk_factors": row[8] or [],
                 "created_at": row[9].isoformat() if row[9] else None,
-                "updated_at": row[10].isoformat() if row[10] else None
+                "updated_at": row[10].isoformat() if row[10] else None,
+                "score_count": row[11]
             }
             for row in rows
         ]
         
-        return {"scores": scores, "tenant_id": str(tenant_id)}
+        return {"scores": scores, "tenant_id": str(tenant_id), "next_cursor": next_cursor}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("error_getting_tenant_scores", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
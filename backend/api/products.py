@@ -9,6 +9,7 @@ import structlog
 
 from backend.database import get_db
 from backend.api.auth import get_current_user
+from backend.utils.pagination import InvalidCursorError, apply_cursor, clamp_limit, split_page
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/products", tags=["products"])
@@ -30,41 +31,100 @@ class ShareProductRequest(BaseModel):
     permission: str = "view"  # view, edit, admin
 
 
+def build_list_products_query(keyset_clause: str = "") -> str:
+    """Products owned by or shared with a user, newest first, one page at a time."""
+    return f"""
+        SELECT p.id, p.name, p.description, p.status, p.user_id, 
+               up.email as owner_email, up.full_name as owner_name,
+               p.created_at, p.updated_at,
+               CASE 
+                 WHEN p.user_id = :user_id THEN 'owner'
+                 WHEN ps.id IS NOT NULL THEN ps.permission
+                 ELSE 'view'
+               END as access_level
+        FROM products p
+        JOIN user_profiles up ON p.user_id = up.id
+        LEFT JOIN product_shares ps ON p.id = ps.product_id AND ps.shared_with_user_id = :user_id
+        WHERE p.tenant_id = :tenant_id
+        AND (
+          p.user_id = :user_id
+          OR ps.id IS NOT NULL
+        ){keyset_clause}
+        ORDER BY p.updated_at DESC, p.id DESC
+        LIMIT :limit
+    """
+
+
+def build_portfolio_query(keyset_clause: str = "") -> str:
+    """
+    Tenant portfolio page. The page of products is selected first (index range scan on
+    tenant_id, updated_at, id) and share counts are aggregated only for those rows,
+    with a single pass over product_shares per product.
+    """
+    return f"""
+        WITH page AS (
+            SELECT p.id, p.name, p.description, p.status, p.user_id, p.created_at, p.updated_at
+            FROM products p
+            WHERE p.tenant_id = :tenant_id{keyset_clause}
+            ORDER BY p.updated_at DESC, p.id DESC
+            LIMIT :limit
+        )
+        SELECT 
+          page.id, page.name, page.description, page.status, page.user_id,
+          up.email as owner_email, up.full_name as owner_name,
+          page.created_at, page.updated_at,
+          COALESCE(shares.share_count, 0) as share_count,
+          COALESCE(shares.shared_with_me, false) as shared_with_me
+        FROM page
+        JOIN user_profiles up ON page.user_id = up.id
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) as share_count,
+                   BOOL_OR(ps.shared_with_user_id = :user_id) as shared_with_me
+            FROM product_shares ps
+            WHERE ps.product_id = page.id
+        ) shares ON true
+        ORDER BY page.updated_at DESC, page.id DESC
+    """
+
+
+# Portfolio totals per status for the whole tenant, returned with the first page so the
+# stats do not depend on how many pages the client has loaded
+PORTFOLIO_STATS_QUERY = """
+    SELECT p.status,
+           COUNT(*) as total,
+           COUNT(*) FILTER (WHERE p.user_id = :user_id) as mine,
+           COUNT(*) FILTER (WHERE EXISTS (
+               SELECT 1 FROM product_shares ps
+               WHERE ps.product_id = p.id AND ps.shared_with_user_id = :user_id
+           )) as shared
+    FROM products p
+    WHERE p.tenant_id = :tenant_id
+    GROUP BY p.status
+"""
+
+
 @router.get("")
 async def list_products(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all products accessible to current user (own + shared)."""
+    """List products accessible to current user (own + shared), paginated by cursor."""
     try:
         # Set user context for RLS
         await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
         
-        query = text("""
-            SELECT p.id, p.name, p.description, p.status, p.user_id, 
-                   up.email as owner_email, up.full_name as owner_name,
-                   p.created_at, p.updated_at,
-                   CASE 
-                     WHEN p.user_id = :user_id THEN 'owner'
-                     WHEN ps.id IS NOT NULL THEN ps.permission
-                     ELSE 'view'
-                   END as access_level
-            FROM products p
-            JOIN user_profiles up ON p.user_id = up.id
-            LEFT JOIN product_shares ps ON p.id = ps.product_id AND ps.shared_with_user_id = :user_id
-            WHERE p.tenant_id = :tenant_id
-            AND (
-              p.user_id = :user_id
-              OR ps.id IS NOT NULL
-            )
-            ORDER BY p.updated_at DESC
-        """)
-        
-        result = await db.execute(query, {
+        page_size = clamp_limit(limit)
+        params = {
             "user_id": current_user["id"],
-            "tenant_id": current_user["tenant_id"]
-        })
-        rows = result.fetchall()
+            "tenant_id": current_user["tenant_id"],
+            "limit": page_size + 1
+        }
+        keyset_clause = apply_cursor(cursor, params, "p.updated_at", "p.id")
+        
+        result = await db.execute(text(build_list_products_query(keyset_clause)), params)
+        rows, next_cursor = split_page(result.fetchall(), page_size, sort_index=8)
         
         products = [
             {
@@ -82,7 +142,9 @@ async def list_products(
             for row in rows
         ]
         
-        return {"products": products}
+        return {"products": products, "next_cursor": next_cursor}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("list_products_error", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to list products")
@@ -90,35 +152,25 @@ async def list_products(
 
 @router.get("/portfolio")
 async def get_portfolio(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get portfolio of all products in the tenant."""
+    """Get portfolio of products in the tenant, paginated by cursor (the first page also carries tenant-wide stats)."""
     try:
         await db.execute(text(f"SET LOCAL app.current_user_id = '{current_user['id']}'"))
         
-        query = text("""
-            SELECT 
-              p.id, p.name, p.description, p.status, p.user_id,
-              up.email as owner_email, up.full_name as owner_name,
-              p.created_at, p.updated_at,
-              COUNT(DISTINCT ps.id) as share_count,
-              COUNT(DISTINCT ps2.id) as shared_with_me
-            FROM products p
-            JOIN user_profiles up ON p.user_id = up.id
-            LEFT JOIN product_shares ps ON p.id = ps.product_id
-            LEFT JOIN product_shares ps2 ON p.id = ps2.product_id AND ps2.shared_with_user_id = :user_id
-            WHERE p.tenant_id = :tenant_id
-            GROUP BY p.id, p.name, p.description, p.status, p.user_id, 
-                     up.email, up.full_name, p.created_at, p.updated_at
-            ORDER BY p.updated_at DESC
-        """)
-        
-        result = await db.execute(query, {
+        page_size = clamp_limit(limit)
+        params = {
             "user_id": current_user["id"],
-            "tenant_id": current_user["tenant_id"]
-        })
-        rows = result.fetchall()
+            "tenant_id": current_user["tenant_id"],
+            "limit": page_size + 1
+        }
+        keyset_clause = apply_cursor(cursor, params, "p.updated_at", "p.id")
+        
+        result = await db.execute(text(build_portfolio_query(keyset_clause)), params)
+        rows, next_cursor = split_page(result.fetchall(), page_size, sort_index=8)
         
         portfolio = [
             {
@@ -132,12 +184,26 @@ async def get_portfolio(
                 "created_at": row[7].isoformat() if row[7] else None,
                 "updated_at": row[8].isoformat() if row[8] else None,
                 "share_count": row[9],
-                "shared_with_me": row[10] > 0,
+                "shared_with_me": bool(row[10]),
             }
             for row in rows
         ]
         
-        return {"portfolio": portfolio, "tenant_id": current_user["tenant_id"]}
+        response = {"portfolio": portfolio, "tenant_id": current_user["tenant_id"], "next_cursor": next_cursor}
+        if cursor is None:
+            stats_rows = (await db.execute(
+                text(PORTFOLIO_STATS_QUERY),
+                {"user_id": current_user["id"], "tenant_id": current_user["tenant_id"]},
+            )).fetchall()
+            response["stats"] = {
+                "total": sum(row[1] for row in stats_rows),
+                "mine": sum(row[2] for row in stats_rows),
+                "shared": sum(row[3] for row in stats_rows),
+                "by_status": {row[0]: row[1] for row in stats_rows},
+            }
+        return response
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("get_portfolio_error", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get portfolio")
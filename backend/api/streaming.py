@@ -2,8 +2,7 @@
 Streaming API endpoints for real-time multi-agent responses.
 Supports Server-Sent Events (SSE) and WebSocket streaming.
 """
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncGenerator, Dict, Any, Optional, TYPE_CHECKING
 from uuid import UUID
@@ -13,9 +12,14 @@ import structlog
 from datetime import datetime
 
 from backend.database import get_db
-from backend.api.auth import get_current_user
+from backend.api.auth import authenticate_token, get_current_user
 from backend.models.schemas import MultiAgentRequest, AgentInteraction
 from backend.services.provider_registry import provider_registry
+from backend.services.lifecycle import is_draining
+from backend.services.admission import KIND_CHAT, admit_run, context_size
+from backend.services.sse import resume_response, sse_response
+from backend.services.websocket_hub import get_websocket_hub, is_valid_topic
+from backend.services.persistence_queue import ConversationMessage, ConversationWrite, enqueue_conversation_write
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/streaming", tags=["streaming"])
@@ -130,7 +134,8 @@ class StreamingEvent:
 async def stream_multi_agent_response(
     request: MultiAgentRequest,
     user_id: UUID,
-    db: AsyncSession
+    db: AsyncSession,
+    tenant_id: Optional[str] = None
 ) -> AsyncGenerator[str, None]:
     """
     Stream multi-agent response using SSE.
@@ -239,10 +244,8 @@ async def stream_multi_agent_response(
                 )
                 break
         
-        # Save conversation to database asynchronously (don't block streaming)
-        asyncio.create_task(save_conversation_async(
-            user_id, request, accumulated_response, interactions, db
-        ))
+        # Queue the exchange for the write-behind writer (waits only when the queue is full)
+        await save_conversation_async(user_id, request, accumulated_response, interactions, tenant_id)
         
     except Exception as e:
         import traceback
@@ -280,180 +283,78 @@ async def save_conversation_async(
     request: MultiAgentRequest,
     response: str,
     interactions: list,
-    db: AsyncSession
+    tenant_id: Optional[str] = None
 ):
-    """Save conversation to database asynchronously."""
+    """Queue the user message and response for batched persistence (see persistence_queue)."""
     try:
-        from sqlalchemy import text
-        import uuid
-        
-        # Get session_id from request context or create one
-        session_id = request.context.get("session_id") if request.context else None
-        product_id_str = str(request.product_id) if request.product_id else None
-        
-        # Get user tenant_id
-        user_query = text("""
-            SELECT tenant_id FROM user_profiles WHERE id = :user_id
-        """)
-        user_result = await db.execute(user_query, {"user_id": str(user_id)})
-        user_row = user_result.fetchone()
-        tenant_id = str(user_row[0]) if user_row and user_row[0] else None
-        
-        # Create or get session_id if not provided
-        if not session_id:
-            if product_id_str:
-                # Check if a session exists for this product and user
-                session_check_query = text("""
-                    SELECT id FROM conversation_sessions
-                    WHERE product_id = :product_id
-                    AND user_id = :user_id
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                """)
-                session_result = await db.execute(session_check_query, {
-                    "product_id": product_id_str,
-                    "user_id": str(user_id)
-                })
-                existing_session = session_result.fetchone()
-                
-                if existing_session:
-                    session_id = str(existing_session[0])
-                else:
-                    # Create a new session
-                    session_id = str(uuid.uuid4())
-                    session_create_query = text("""
-                        INSERT INTO conversation_sessions (id, user_id, product_id, tenant_id, title)
-                        VALUES (:id, :user_id, :product_id, :tenant_id, :title)
-                    """)
-                    await db.execute(session_create_query, {
-                        "id": session_id,
-                        "user_id": str(user_id),
-                        "product_id": product_id_str,
-                        "tenant_id": tenant_id,
-                        "title": f"Product {product_id_str[:8]}..." if product_id_str else "New Conversation"
-                    })
-            else:
-                # Create a new session without product
-                session_id = str(uuid.uuid4())
-                session_create_query = text("""
-                    INSERT INTO conversation_sessions (id, user_id, tenant_id, title)
-                    VALUES (:id, :user_id, :tenant_id, :title)
-                """)
-                await db.execute(session_create_query, {
-                    "id": session_id,
-                    "user_id": str(user_id),
-                    "tenant_id": tenant_id,
-                    "title": "New Conversation"
-                })
-        
-        # Save user message
-        user_message_id = str(uuid.uuid4())
-        await db.execute(
-            text("""
-                INSERT INTO conversation_history 
-                (id, session_id, product_id, message_type, content, agent_name, tenant_id, created_at)
-                VALUES (:id, :session_id, :product_id, 'user', :content, NULL, :tenant_id, NOW())
-            """),
-            {
-                "id": user_message_id,
-                "session_id": session_id,
-                "product_id": product_id_str,
-                "content": request.query,
-                "tenant_id": tenant_id
-            }
-        )
-        
-        # Save assistant response
-        assistant_message_id = str(uuid.uuid4())
-        await db.execute(
-            text("""
-                INSERT INTO conversation_history 
-                (id, session_id, product_id, message_type, content, agent_name, agent_role, tenant_id, created_at)
-                VALUES (:id, :session_id, :product_id, 'agent', :content, :agent_name, :agent_role, :tenant_id, NOW())
-            """),
-            {
-                "id": assistant_message_id,
-                "session_id": session_id,
-                "product_id": product_id_str,
-                "content": response,
-                "agent_name": request.primary_agent or "multi-agent",
-                "agent_role": request.primary_agent or "coordinator",
-                "tenant_id": tenant_id
-            }
-        )
-        
-        await db.commit()
-        logger.info("conversation_saved", user_id=str(user_id), session_id=session_id, message_count=2)
+        await enqueue_conversation_write(ConversationWrite(
+            user_id=str(user_id),
+            product_id=str(request.product_id) if request.product_id else None,
+            session_id=request.context.get("session_id") if request.context else None,
+            tenant_id=tenant_id,
+            messages=[
+                ConversationMessage(message_type="user", content=request.query),
+                ConversationMessage(
+                    message_type="agent",
+                    content=response,
+                    agent_name=request.primary_agent or "multi-agent",
+                    agent_role=request.primary_agent or "coordinator",
+                ),
+            ],
+        ))
     except Exception as e:
         logger.error("failed_to_save_conversation", error=str(e))
-        await db.rollback()
 
 
 @router.post("/multi-agent/stream")
 async def stream_multi_agent(
     request: MultiAgentRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Stream multi-agent response using Server-Sent Events (SSE).
     Returns a streaming response that sends events as agents process.
+    A reconnect with Last-Event-ID resumes the earlier run instead of starting a new one.
     """
+    if is_draining():
+        # This worker is shutting down; the client retries and lands on another one
+        raise HTTPException(status_code=503, detail="Server is restarting, please retry",
+                            headers={"Retry-After": "1"})
+    resumed = await resume_response(http_request, current_user)
+    if resumed is not None:
+        return resumed
     user_id = UUID(str(current_user["id"]))
+    tenant_id = str(current_user["tenant_id"]) if current_user.get("tenant_id") else None
+    # Admitted before the response starts, so a shed run still gets a 429 with Retry-After
+    ticket = await admit_run(tenant_id or f"user:{user_id}", KIND_CHAT, context_size(request.query, request.context))
     
-    return StreamingResponse(
-        stream_multi_agent_response(request, user_id, db),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        }
+    return sse_response(
+        stream_multi_agent_response(request, user_id, db, tenant_id=tenant_id),
+        on_close=ticket.release if ticket is not None else None,
+        owner=str(user_id),
     )
 
 
-class ConnectionManager:
-    """Manages WebSocket connections."""
-    
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-    
-    async def connect(self, websocket: WebSocket, connection_id: str):
-        """Accept and store WebSocket connection."""
-        await websocket.accept()
-        self.active_connections[connection_id] = websocket
-        logger.info("websocket_connected", connection_id=connection_id)
-    
-    def disconnect(self, connection_id: str):
-        """Remove WebSocket connection."""
-        if connection_id in self.active_connections:
-            del self.active_connections[connection_id]
-            logger.info("websocket_disconnected", connection_id=connection_id)
-    
-    async def send_personal_message(self, message: dict, connection_id: str):
-        """Send message to specific connection."""
-        if connection_id in self.active_connections:
-            try:
-                await self.active_connections[connection_id].send_json(message)
-            except Exception as e:
-                logger.error("websocket_send_error", connection_id=connection_id, error=str(e))
-                self.disconnect(connection_id)
-    
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connections."""
-        disconnected = []
-        for connection_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error("websocket_broadcast_error", connection_id=connection_id, error=str(e))
-                disconnected.append(connection_id)
-        
-        for conn_id in disconnected:
-            self.disconnect(conn_id)
+async def _can_subscribe(topic: str, user_id: Optional[UUID]) -> bool:
+    """Product topics need view permission on the product; job topics need to be the job's owner."""
+    if user_id is None or not is_valid_topic(topic):
+        return False
+    kind, _, resource_id = topic.partition(":")
+    try:
+        if kind == "product":
+            from backend.database import AsyncSessionLocal
+            from backend.api.product_permissions import check_product_permission
 
+            async with AsyncSessionLocal() as db:
+                return await check_product_permission(db, UUID(resource_id), str(user_id), "view")
+        from backend.services.job_service import job_service
 
-manager = ConnectionManager()
+        return await job_service.get_job_user(resource_id) == str(user_id)
+    except Exception as e:
+        logger.warning("websocket_subscribe_check_failed", topic=topic, error=str(e))
+        return False
 
 
 @router.websocket("/ws/{connection_id}")
@@ -463,32 +364,34 @@ async def websocket_endpoint(
 ):
     """
     WebSocket endpoint for bidirectional real-time communication.
-    Supports streaming multi-agent responses and receiving user messages.
+    Supports streaming multi-agent responses, receiving user messages and
+    subscribing to product/job topics (delivered from any pod through the hub).
     """
-    await manager.connect(websocket, connection_id)
+    hub = get_websocket_hub()
+    await hub.connect(websocket, connection_id)
+    connected = True
     
     try:
-        # Authenticate via token in query params or first message
+        # Authenticate via token in query params (same checks as get_current_user)
         user_id = None
-        # Get token from query params
-        from fastapi import Query
         token = websocket.query_params.get("token")
         if token:
-            # Validate token and get user_id
+            from backend.database import AsyncSessionLocal
+
             try:
-                from backend.api.auth import get_user_from_token
-                user_data = await get_user_from_token(token)
-                user_id = UUID(str(user_data["id"]))
-            except Exception as e:
-                await websocket.send_json({
+                async with AsyncSessionLocal() as db:
+                    user = await authenticate_token(db, token)
+            except HTTPException:
+                await hub.send(connection_id, {
                     "type": "error",
                     "error": "Authentication failed"
                 })
-                manager.disconnect(connection_id)
                 return
+            user_id = UUID(user["id"])
+            hub.set_user(connection_id, str(user_id))
         
         # Send connection confirmation
-        await websocket.send_json({
+        await hub.send(connection_id, {
             "type": "connected",
             "connection_id": connection_id,
             "timestamp": datetime.utcnow().isoformat()
@@ -500,22 +403,35 @@ async def websocket_endpoint(
             message_type = data.get("type")
             
             if message_type == "multi_agent_request":
+                if user_id is None:
+                    await hub.send(connection_id, {"type": "error", "error": "Authentication required"})
+                    continue
                 # Process multi-agent request and stream response
                 request_data = data.get("request", {})
                 multi_agent_request = MultiAgentRequest(**request_data)
                 
-                # Stream response back
+                # Stream response back (waits while this socket's queue is full)
                 orchestrator = get_orchestrator()
                 async for event in orchestrator.stream_multi_agent_request(
-                    user_id=user_id or UUID(str(data.get("user_id", "00000000-0000-0000-0000-000000000000"))),
+                    user_id=user_id,
                     request=multi_agent_request,
                     db=None  # WebSocket doesn't have direct DB access, use connection pool
                 ):
-                    await websocket.send_json(event)
+                    if not await hub.send(connection_id, event):
+                        return
+            
+            elif message_type in ("subscribe", "unsubscribe"):
+                topic = str(data.get("topic", ""))
+                if message_type == "unsubscribe":
+                    await hub.unsubscribe(connection_id, topic)
+                elif await _can_subscribe(topic, user_id) and await hub.subscribe(connection_id, topic):
+                    await hub.send(connection_id, {"type": "subscribed", "topic": topic})
+                else:
+                    await hub.send(connection_id, {"type": "error", "error": f"Cannot subscribe to {topic}"})
             
             elif message_type == "ping":
                 # Heartbeat
-                await websocket.send_json({
+                await hub.send(connection_id, {
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat()
                 })
@@ -524,15 +440,13 @@ async def websocket_endpoint(
                 break
     
     except WebSocketDisconnect:
-        manager.disconnect(connection_id)
+        connected = False
     except Exception as e:
         logger.error("websocket_error", connection_id=connection_id, error=str(e))
-        try:
-            await websocket.send_json({
-                "type": "error",
-                "error": str(e)
-            })
-        except:
-            pass
-        manager.disconnect(connection_id)
-
+        await hub.send(connection_id, {
+            "type": "error",
+            "error": str(e)
+        })
+    finally:
+        # Deliver queued replies (e.g. an error) before the socket closes
+        await hub.disconnect(connection_id, flush=connected)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
+import json
 import os
 
 
@@ -111,12 +112,143 @@ class Settings(BaseSettings):
     github_token: str = os.getenv("GITHUB_TOKEN", "")
     github_org: str = os.getenv("GITHUB_ORG", "")
 
+    # Shared HTTP client for integration fetches (Confluence, GitHub MCP)
+    integration_http_timeout: float = float(os.getenv("INTEGRATION_HTTP_TIMEOUT", "30.0"))
+    integration_http_max_connections: int = int(os.getenv("INTEGRATION_HTTP_MAX_CONNECTIONS", "20"))
+    integration_http_max_keepalive: int = int(os.getenv("INTEGRATION_HTTP_MAX_KEEPALIVE", "10"))
+    integration_fetch_concurrency: int = int(os.getenv("INTEGRATION_FETCH_CONCURRENCY", "5"))  # Pages fetched at once per request
+    # ETag/Last-Modified validators and bodies for conditional GETs (Redis)
+    integration_cache_enabled: bool = os.getenv("INTEGRATION_CACHE_ENABLED", "true").lower() == "true"
+    integration_cache_ttl: int = int(os.getenv("INTEGRATION_CACHE_TTL", "604800"))
+
+    # Documentation crawler: concurrent fetches, polite per host, pages revalidated through the cache above
+    crawl_concurrency: int = int(os.getenv("CRAWL_CONCURRENCY", "5"))
+    crawl_host_rate: float = float(os.getenv("CRAWL_HOST_RATE", "5"))  # Requests per second per host
+    crawl_host_burst: int = int(os.getenv("CRAWL_HOST_BURST", "5"))
+
     # Design Tool Integration
     v0_api_key: Optional[str] = os.getenv("V0_API_KEY")
     lovable_api_key: Optional[str] = os.getenv("LOVABLE_API_KEY")
 
     # Redis Configuration
     redis_url: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))  # per pod, split across workers
+    redis_pool_timeout: float = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))  # wait for a free connection
+
+    # Rate limiting (GCRA in Redis, one round trip per request); budgets are in cost units
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_user_budget: str = os.getenv("RATE_LIMIT_USER_BUDGET", "600/minute")
+    rate_limit_tenant_budget: str = os.getenv("RATE_LIMIT_TENANT_BUDGET", "5000/minute")
+    rate_limit_local_max_keys: int = int(os.getenv("RATE_LIMIT_LOCAL_MAX_KEYS", "10000"))  # Local pre-check buckets per worker
+
+    # Admission control for agent runs (chat, PRD export): per-tenant budgets shared in Redis
+    admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    admission_tenant_concurrency: int = int(os.getenv("ADMISSION_TENANT_CONCURRENCY", "4"))  # Runs in flight per tenant
+    admission_tenant_tpm: int = int(os.getenv("ADMISSION_TENANT_TPM", "200000"))  # Estimated tokens admitted per tenant per minute
+    admission_max_wait: float = float(os.getenv("ADMISSION_MAX_WAIT", "20"))  # Seconds a run may queue before it is shed
+    admission_max_queued: int = int(os.getenv("ADMISSION_MAX_QUEUED", "20"))  # Queued runs per tenant and worker
+    admission_lease_seconds: int = int(os.getenv("ADMISSION_LEASE_SECONDS", "900"))  # A run's slot expires unless renewed
+    admission_chat_output_tokens: int = int(os.getenv("ADMISSION_CHAT_OUTPUT_TOKENS", "4000"))  # Expected output of a chat run
+    admission_export_output_tokens: int = int(os.getenv("ADMISSION_EXPORT_OUTPUT_TOKENS", "40000"))  # Expected output of a PRD export
+
+    # Server-sent events: per-connection send queue, heartbeats, Last-Event-ID replay in Redis
+    sse_queue_events: int = int(os.getenv("SSE_QUEUE_EVENTS", "256"))  # Events buffered per connection before the producer waits
+    sse_coalesce_bytes: int = int(os.getenv("SSE_COALESCE_BYTES", "16384"))  # Queued events sent together in one write up to this size
+    sse_heartbeat_seconds: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))  # Comment line sent after this long without events
+    sse_stall_timeout: float = float(os.getenv("SSE_STALL_TIMEOUT", "60"))  # Drop a client that has not read for this long
+    sse_replay_events: int = int(os.getenv("SSE_REPLAY_EVENTS", "1000"))  # Events kept per stream for resume (0 disables)
+    sse_replay_ttl: int = int(os.getenv("SSE_REPLAY_TTL", "300"))  # Seconds a finished stream stays resumable
+    sse_resume_grace: float = float(os.getenv("SSE_RESUME_GRACE", "10"))  # Seconds a run continues after its client left
+
+    # WebSocket hub: per-socket send queues, cross-pod fan-out over Redis pub/sub
+    ws_queue_size: int = int(os.getenv("WS_QUEUE_SIZE", "256"))  # Messages queued per socket
+    ws_drop_policy: str = os.getenv("WS_DROP_POLICY", "drop_oldest")  # drop_oldest, drop_newest or disconnect when a queue is full
+    ws_send_timeout: float = float(os.getenv("WS_SEND_TIMEOUT", "10"))  # Close a socket that accepts nothing for this long
+
+    # Server processes (set by backend.serve for each worker)
+    backend_workers: int = int(os.getenv("BACKEND_WORKERS", "1"))
+    # Proxies whose X-Forwarded-For/-Proto headers are trusted (comma-separated IPs/CIDRs, uvicorn's default)
+    forwarded_allow_ips: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+    # Markdown rendering (PRD export / phase form help)
+    markdown_render_cache_size: int = int(os.getenv("MARKDOWN_RENDER_CACHE_SIZE", "128"))
+    # Generated PRD artifacts are reused while the product inputs are unchanged
+    prd_export_cache_ttl: int = int(os.getenv("PRD_EXPORT_CACHE_TTL", "86400"))
+    # Agent-army sections are memoized in Postgres by a hash of their prompt inputs
+    prd_section_cache_enabled: bool = os.getenv("PRD_SECTION_CACHE_ENABLED", "true").lower() == "true"
+    prd_section_max_concurrency: int = int(os.getenv("PRD_SECTION_MAX_CONCURRENCY", "6"))  # In-flight section generations per pod
+    # Each section prompt gets only the artifact chunks most relevant to it (embedding retrieval)
+    prd_section_slicing_enabled: bool = os.getenv("PRD_SECTION_SLICING_ENABLED", "true").lower() == "true"
+    prd_section_context_tokens: int = int(os.getenv("PRD_SECTION_CONTEXT_TOKENS", "3000"))  # Artifact tokens per section prompt
+    # Multi-session summaries: per-session summaries (cached in Postgres) reduced into one
+    summary_cache_enabled: bool = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    summary_session_token_budget: int = int(os.getenv("SUMMARY_SESSION_TOKEN_BUDGET", "6000"))  # Conversation tokens per model call
+    summary_max_concurrency: int = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4"))  # Session summaries generated in parallel
+
+    # Vector index for RAG knowledge bases (pgvector >= 0.5 for HNSW)
+    vector_index_type: str = os.getenv("VECTOR_INDEX_TYPE", "hnsw")  # hnsw | ivfflat
+    vector_hnsw_m: int = int(os.getenv("VECTOR_HNSW_M", "16"))
+    vector_hnsw_ef_construction: int = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "64"))
+    vector_hnsw_ef_search: int = int(os.getenv("VECTOR_HNSW_EF_SEARCH", "40"))  # Default per-query candidate list size
+    vector_filtered_ef_search: int = int(os.getenv("VECTOR_FILTERED_EF_SEARCH", "200"))  # Product-filtered searches
+
+    # Prompt context packing: token budget for context in agent system prompts
+    context_token_budget: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))
+    # Per-model overrides as JSON, matched by substring of the model id (longest wins)
+    context_token_budgets: Dict[str, int] = json.loads(
+        os.getenv("CONTEXT_TOKEN_BUDGETS", '{"gpt-5-mini": 4000, "gpt-5-nano": 2000}')
+    )
+
+    # Emit Anthropic cache_control breakpoints on the stable system prompt tiers
+    prompt_cache_control_enabled: bool = os.getenv("PROMPT_CACHE_CONTROL_ENABLED", "false").lower() == "true"
+
+    # Model call scheduler: per provider/model token buckets, priority classes, tenant fair share
+    llm_scheduler_enabled: bool = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+    llm_scheduler_default_rpm: int = int(os.getenv("LLM_SCHEDULER_DEFAULT_RPM", "500"))
+    llm_scheduler_default_tpm: int = int(os.getenv("LLM_SCHEDULER_DEFAULT_TPM", "400000"))
+    # Per-lane overrides as JSON, matched by substring of "provider:model" (longest wins)
+    llm_scheduler_limits: Dict[str, Dict[str, int]] = json.loads(
+        os.getenv("LLM_SCHEDULER_LIMITS", '{"claude": {"rpm": 50, "tpm": 80000}}')
+    )
+    llm_scheduler_output_tokens: int = int(os.getenv("LLM_SCHEDULER_OUTPUT_TOKENS", "1500"))  # Output reserved per call until usage is known
+
+    # Model routing: fail over across configured providers, optionally hedge slow calls
+    model_routing_enabled: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    model_routing_attempt_timeout: float = float(os.getenv("MODEL_ROUTING_ATTEMPT_TIMEOUT", "120"))  # Seconds before an attempt fails over
+    model_routing_window: int = int(os.getenv("MODEL_ROUTING_WINDOW", "50"))  # Recent calls kept per route
+    model_routing_error_threshold: float = float(os.getenv("MODEL_ROUTING_ERROR_THRESHOLD", "0.5"))  # Error rate that demotes a route
+    model_hedging_enabled: bool = os.getenv("MODEL_HEDGING_ENABLED", "false").lower() == "true"
+    model_hedge_min_delay: float = float(os.getenv("MODEL_HEDGE_MIN_DELAY", "2.0"))
+    model_hedge_default_delay: float = float(os.getenv("MODEL_HEDGE_DEFAULT_DELAY", "30.0"))  # Until a route has a p95
+    model_routing_min_timeout: float = float(os.getenv("MODEL_ROUTING_MIN_TIMEOUT", "30"))  # Floor for adaptive attempt timeouts
+
+    # Circuit breakers per upstream (open state shared across pods via Redis) and adaptive timeouts
+    circuit_breaker_enabled: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    circuit_breaker_failure_threshold: int = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))  # Consecutive failures
+    circuit_breaker_cooldown: float = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "30"))
+    circuit_breaker_max_cooldown: float = float(os.getenv("CIRCUIT_BREAKER_MAX_COOLDOWN", "300"))  # Caps upstream Retry-After
+    circuit_breaker_sync_interval: float = float(os.getenv("CIRCUIT_BREAKER_SYNC_INTERVAL", "2"))  # Seconds between shared-state reads
+    adaptive_timeouts_enabled: bool = os.getenv("ADAPTIVE_TIMEOUTS_ENABLED", "true").lower() == "true"
+    adaptive_timeout_multiplier: float = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "3"))  # Times the p99 latency
+    adaptive_timeout_min: float = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "5"))
+    adaptive_timeout_window: int = int(os.getenv("ADAPTIVE_TIMEOUT_WINDOW", "200"))  # Recent successful calls kept
+    upstream_http_timeout: float = float(os.getenv("UPSTREAM_HTTP_TIMEOUT", "30"))  # Ceiling for adaptive HTTP timeouts
+
+    # Write-behind persistence of conversation messages (batched multi-row inserts)
+    persistence_batch_size: int = int(os.getenv("PERSISTENCE_BATCH_SIZE", "200"))  # Messages per flush
+    persistence_flush_interval_ms: int = int(os.getenv("PERSISTENCE_FLUSH_INTERVAL_MS", "200"))
+    persistence_queue_max_size: int = int(os.getenv("PERSISTENCE_QUEUE_MAX_SIZE", "1000"))  # Queued writes before enqueue waits
+    persistence_shutdown_timeout: float = float(os.getenv("PERSISTENCE_SHUTDOWN_TIMEOUT", "10"))
+
+    # CPU-bound work (password hashing) runs in a process pool behind admission control
+    cpu_pool_workers: int = int(os.getenv("CPU_POOL_WORKERS", "0"))  # 0 = this worker's share of the CPU quota
+    cpu_pool_max_queue: int = int(os.getenv("CPU_POOL_MAX_QUEUE", "64"))  # Waiting jobs before new ones are rejected
+    cpu_pool_queue_timeout: float = float(os.getenv("CPU_POOL_QUEUE_TIMEOUT", "10"))  # Max seconds a job waits for a slot
+
+    # Document uploads: spooled to disk, PDF pages extracted in the CPU pool and indexed as they complete
+    document_upload_max_bytes: int = int(os.getenv("DOCUMENT_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+    pdf_pages_per_task: int = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+    document_segment_chars: int = int(os.getenv("DOCUMENT_SEGMENT_CHARS", "20000"))  # Text per knowledge-base add
 
     # Session Configuration
     session_secret: str = os.getenv(
@@ -184,6 +316,10 @@ class Settings(BaseSettings):
     # SSL Verification (for API key verification)
     verify_ssl: bool = os.getenv("VERIFY_SSL", "false").lower() == "true"
 
+    # Cursor pagination for list endpoints
+    pagination_default_limit: int = int(os.getenv("PAGINATION_DEFAULT_LIMIT", "100"))
+    pagination_max_limit: int = int(os.getenv("PAGINATION_MAX_LIMIT", "500"))
+
     # Enterprise Settings
     tenant_mode: str = os.getenv("TENANT_MODE", "multi")
     max_products_per_user: int = int(os.getenv("MAX_PRODUCTS_PER_USER", "10"))
@@ -203,3 +339,8 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+
+def per_worker(total: int) -> int:
+    """A worker's share of a per-pod budget (pool sizes, rate limits) when backend.serve runs several."""
+    return max(1, total // max(1, settings.backend_workers))
@@ -7,6 +7,8 @@ from sqlalchemy.orm import declarative_base
 from sqlalchemy import text
 import structlog
 
+from backend.config import per_worker
+
 logger = structlog.get_logger()
 
 # Database URL from environment
@@ -33,14 +35,15 @@ else:
 # For kind cluster: Reduced pool size to fit within PostgreSQL max_connections=100
 # With 3 backend pods: 3 × (5 + 5) = 30 max connections (leaves room for system connections)
 # For production: Increase pool_size and max_overflow based on PostgreSQL max_connections
-pool_size = int(os.getenv("DB_POOL_SIZE", "5"))  # Reduced from 10 to 5 for kind to prevent connection exhaustion
-max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "5"))  # Reduced from 10 to 5 for kind
+# Both are per pod: with backend.serve running several worker processes each gets its share
+pool_size = per_worker(int(os.getenv("DB_POOL_SIZE", "5")))  # Reduced from 10 to 5 for kind to prevent connection exhaustion
+max_overflow = per_worker(int(os.getenv("DB_MAX_OVERFLOW", "5")))  # Reduced from 10 to 5 for kind
 
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=pool_size,  # Base pool size per pod
+    pool_size=pool_size,  # Base pool size per worker process
     max_overflow=max_overflow,  # Additional connections beyond pool_size
     pool_recycle=1800,  # Recycle connections after 30 minutes (reduced from 1 hour)
     pool_timeout=10,  # Timeout for getting connection from pool (reduced from 15)
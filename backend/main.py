@@ -17,16 +17,6 @@ import json
 
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from openai import AsyncOpenAI
-from openai import AuthenticationError as OpenAIAuthenticationError
-from openai import APIError as OpenAIAPIError
-from openai import APIConnectionError as OpenAIConnectionError
-from anthropic import AsyncAnthropic
-from anthropic import AuthenticationError as ClaudeAuthenticationError
-from anthropic import APIError as ClaudeAPIError
-from anthropic import APIConnectionError as ClaudeConnectionError
-import google.generativeai as genai
-from google.api_core.exceptions import GoogleAPIError, PermissionDenied, Unauthenticated
 
 from backend.config import settings
 from backend.models.schemas import (
@@ -59,8 +49,12 @@ from backend.api.streaming import router as streaming_router
 from backend.api.metrics import router as metrics_router
 from backend.api.agent_stats import router as agent_stats_router
 from backend.api.phase_form_help import router as phase_form_help_router
-from backend.services.provider_registry import provider_registry
+from backend.services.provider_registry import provider_registry, import_provider_sdk, loaded_provider_sdk
 from backend.services.job_service import job_service
+from backend.services.resilience import CircuitOpenError, breaker_states
+from backend.services.lifecycle import is_draining
+from backend.services.cpu_executor import CPUPoolBusyError
+from backend.services.admission import KIND_CHAT, AdmissionRejectedError, admitted_run, context_size
 from fastapi import BackgroundTasks
 
 structlog.configure(
@@ -133,25 +127,45 @@ def reinitialize_orchestrator():
             logger.warning("orchestrator_reinitialize_failed", error=str(e))
 
 
+def _provider_errors(provider: str, *names: str) -> tuple:
+    """
+    Exception classes from a provider SDK. An SDK that was never imported cannot have
+    raised, so it is not imported just to run isinstance checks.
+    """
+    module = loaded_provider_sdk(provider)
+    if module is None:
+        return ()
+    return tuple(getattr(module, name) for name in names if hasattr(module, name))
+
+
 def _map_provider_exception(exc: Exception):
     """Translate upstream LLM provider errors into actionable HTTP responses."""
-    if isinstance(exc, OpenAIAuthenticationError):
+    openai_auth_errors = _provider_errors("openai", "AuthenticationError")
+    openai_api_errors = _provider_errors("openai", "APIError")
+    openai_connection_errors = _provider_errors("openai", "APIConnectionError")
+    claude_auth_errors = _provider_errors("claude", "AuthenticationError")
+    claude_api_errors = _provider_errors("claude", "APIError")
+    claude_connection_errors = _provider_errors("claude", "APIConnectionError")
+    google_auth_errors = _provider_errors("gemini_errors", "PermissionDenied", "Unauthenticated")
+    google_api_errors = _provider_errors("gemini_errors", "GoogleAPIError")
+
+    if isinstance(exc, openai_auth_errors):
         raise HTTPException(
             status_code=401,
             detail="OpenAI rejected the API key. Please verify the key in Settings → Providers."
         )
-    if isinstance(exc, ClaudeAuthenticationError):
+    if isinstance(exc, claude_auth_errors):
         raise HTTPException(
             status_code=401,
             detail="Anthropic Claude rejected the API key. Please verify the key in Settings → Providers."
         )
-    if isinstance(exc, (PermissionDenied, Unauthenticated)):
+    if isinstance(exc, google_auth_errors):
         raise HTTPException(
             status_code=401,
             detail="Google Gemini rejected the API key. Please verify the key in Settings → Providers."
         )
     # Handle quota/rate limit errors with helpful messages
-    if isinstance(exc, OpenAIAPIError):
+    if isinstance(exc, openai_api_errors):
         error_str = str(exc).lower()
         if "quota" in error_str or "429" in error_str or "insufficient_quota" in error_str or "rate limit" in error_str:
             # Check if other providers are available
@@ -171,7 +185,7 @@ def _map_provider_exception(exc: Exception):
                     status_code=429,
                     detail="OpenAI API quota exceeded. Please check your OpenAI billing details or configure an alternative provider (Anthropic Claude or Google Gemini) in Settings → Providers."
                 )
-    if isinstance(exc, ClaudeAPIError):
+    if isinstance(exc, claude_api_errors):
         error_str = str(exc).lower()
         if "quota" in error_str or "429" in error_str or "rate limit" in error_str:
             available_providers = []
@@ -190,7 +204,7 @@ def _map_provider_exception(exc: Exception):
                     status_code=429,
                     detail="Anthropic Claude API quota exceeded. Please check your Anthropic billing details or configure an alternative provider (OpenAI or Google Gemini) in Settings → Providers."
                 )
-    if isinstance(exc, (OpenAIConnectionError, ClaudeConnectionError, GoogleAPIError, OpenAIAPIError, ClaudeAPIError)):
+    if isinstance(exc, openai_connection_errors + claude_connection_errors + google_api_errors + openai_api_errors + claude_api_errors):
         raise HTTPException(
             status_code=502,
             detail="Unable to reach the configured LLM provider. Please retry or update the provider settings."
@@ -242,6 +256,10 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("database_initialization_failed", status="warning")
     
+    # tiktoken downloads its BPE files on first use; load them here, off the event loop
+    from backend.services.context_packer import preload_encodings
+    await run_in_threadpool(preload_encodings)
+    
     # Log provider status at startup (from environment variables/Kubernetes secrets)
     # Provider registry is initialized from .env file via Settings class
     configured_providers = provider_registry.get_configured_providers()
@@ -342,6 +360,14 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    from backend.services.websocket_hub import shutdown_websocket_hub
+    await shutdown_websocket_hub()
+    from backend.services.persistence_queue import shutdown_persistence_queue
+    await shutdown_persistence_queue()
+    from backend.services.integration_http import close_integration_client
+    await close_integration_client()
+    from backend.services.cpu_executor import shutdown_cpu_executor
+    shutdown_cpu_executor()
     logger.info("application_shutdown")
 
 
@@ -380,6 +406,10 @@ if cors_origins:
 else:
     logger.warning("cors_origins_empty", message="No CORS origins configured. Set FRONTEND_URL or CORS_ORIGINS environment variable.")
 
+# Setup rate limiting (Redis-based for distributed rate limiting); added before CORS so
+# CORS stays outermost and 429 responses still carry CORS headers
+setup_rate_limiting(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -389,8 +419,36 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Setup rate limiting (Redis-based for distributed rate limiting)
-setup_rate_limiting(app)
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request, exc: CircuitOpenError):
+    """Fast-fail while an upstream's circuit is open; clients should retry after the cooldown."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "upstream": exc.upstream, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(CPUPoolBusyError)
+async def cpu_pool_busy_handler(request, exc: CPUPoolBusyError):
+    """Shed CPU-bound work (e.g. login bursts) once the pool's queue is full."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request, exc: AdmissionRejectedError):
+    """Shed agent runs once a tenant's concurrency or token budget cannot admit them in time."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "reason": exc.reason, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 # Include routers
 from backend.api.api_keys import router as api_keys_router
@@ -438,6 +496,9 @@ async def root():
 
 @app.get("/health", response_model=HealthCheckResponse, tags=["health"])
 async def health_check():
+    if is_draining():
+        # Shutting down: fail readiness so no new traffic is routed here while streams finish
+        return JSONResponse(status_code=503, content={"status": "draining"})
     db_healthy = await check_db_health()
     
     services = {
@@ -453,7 +514,8 @@ async def health_check():
         status="healthy" if db_healthy and services["api"] else "degraded",
         timestamp=datetime.utcnow(),
         version="1.0.0",
-        services=services
+        services=services,
+        circuits={name: state["state"] for name, state in breaker_states().items()},
     )
 
 
@@ -805,10 +867,12 @@ async def process_multi_agent_request(
         # Use copy of request but with authenticated user ID
         authenticated_request = request.model_copy(update={"user_id": authenticated_user_id})
 
-        response = await orchestrator.process_multi_agent_request(
-            user_id=authenticated_user_id,
-            request=authenticated_request
-        )
+        admission_tenant = current_user.get("tenant_id") or f"user:{authenticated_user_id}"
+        async with admitted_run(str(admission_tenant), KIND_CHAT, context_size(request.query, request.context)):
+            response = await orchestrator.process_multi_agent_request(
+                user_id=authenticated_user_id,
+                request=authenticated_request
+            )
 
         # Save conversation messages to database for historical access
         try:
@@ -959,7 +1023,7 @@ async def process_multi_agent_request(
 
         return response
 
-    except HTTPException:
+    except (HTTPException, AdmissionRejectedError):
         raise
     except ValueError as e:
         logger.error("invalid_multi_agent_request", error=str(e))
@@ -1113,7 +1177,7 @@ async def verify_provider_key(payload: APIKeyVerificationRequest):
     """Verify that an API key is valid for the selected provider."""
     try:
         if payload.provider == "openai":
-            client = AsyncOpenAI(api_key=payload.api_key)
+            client = import_provider_sdk("openai").AsyncOpenAI(api_key=payload.api_key)
             await client.models.list()
             return APIKeyVerificationResponse(
                 provider="openai",
@@ -1122,7 +1186,7 @@ async def verify_provider_key(payload: APIKeyVerificationRequest):
             )
 
         if payload.provider == "claude":
-            client = AsyncAnthropic(api_key=payload.api_key)
+            client = import_provider_sdk("claude").AsyncAnthropic(api_key=payload.api_key)
             await client.models.list()
             return APIKeyVerificationResponse(
                 provider="claude",
@@ -1132,6 +1196,7 @@ async def verify_provider_key(payload: APIKeyVerificationRequest):
 
         if payload.provider == "gemini":
             def verify_gemini_key() -> bool:
+                genai = import_provider_sdk("gemini")
                 genai.configure(api_key=payload.api_key)
                 # Listing models is sufficient to validate the key
                 next(genai.list_models())
@@ -1,36 +1,30 @@
-"""Rate limiting middleware for FastAPI using slowapi and Redis."""
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from fastapi import Request, HTTPException
+"""Rate limiting middleware: per-user, per-tenant and per-endpoint buckets in Redis.
+
+Requests are keyed by the authenticated user (and their tenant) when they carry a
+session token, otherwise by client IP (uvicorn resolves X-Forwarded-For from nginx).
+Each request is checked against up to three buckets in one Redis round trip
+(services.rate_limiter):
+- for writes only, the endpoint's RATE_LIMITS budget for this user (requests),
+- the user's overall RATE_LIMIT_USER_BUDGET (cost units),
+- the tenant's RATE_LIMIT_TENANT_BUDGET (cost units),
+where expensive operations cost more units than a chat message (REQUEST_COSTS).
+Reads only count against the user and tenant budgets: one page load issues many
+GETs under the same prefix (products, sessions, progress, history).
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import Request
 from fastapi.responses import JSONResponse
 import structlog
 from backend.config import settings
-from backend.services.redis_cache import get_cache
+from backend.services.rate_limiter import Limit, get_rate_limiter, retry_after_header
 
 logger = structlog.get_logger()
 
-# Initialize rate limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["1000/hour", "100/minute"],  # Default limits
-    storage_uri=settings.redis_url,  # Use Redis for distributed rate limiting
-    headers_enabled=True  # Include rate limit headers in response
-)
-
-
-def get_user_id(request: Request) -> str:
-    """Get user ID from request for per-user rate limiting."""
-    # Try to get user from auth token
-    try:
-        from backend.api.auth import get_current_user
-        # This would need to be called in a dependency, but for now use IP
-        return get_remote_address(request)
-    except:
-        return get_remote_address(request)
-
-
-# Per-endpoint rate limits
+# Per-endpoint rate limits of writes (reads are covered by the user and tenant budgets)
 RATE_LIMITS = {
     "/api/multi-agent/process": "10/minute",  # Multi-agent processing
     "/api/streaming/multi-agent/stream": "20/minute",  # Streaming
@@ -42,46 +36,159 @@ RATE_LIMITS = {
     "/api/products": "30/minute",  # Product operations
     "/api/conversations": "50/minute",  # Conversation operations
 }
+DEFAULT_RATE_LIMIT = "100/minute"
+READ_METHODS = ("GET", "HEAD")
 
+# Cost units of write requests against the user and tenant budgets (reads and others cost 1)
+REQUEST_COSTS = {
+    "/export-prd": 10,  # PRD export (many agent calls)
+    "/generate-prd": 10,
+    "/generate-mockup": 10,
+    "/generate-thumbnails": 5,
+    "/summarize": 5,
+    "/score": 5,
+    "/upload": 5,
+    "/multi-agent": 2,  # Chat through the agent team
+}
 
-def get_rate_limit_for_path(path: str) -> str:
-    """Get rate limit for a specific path."""
+EXEMPT_PATHS = {"/", "/health", "/docs", "/openapi.json", "/redoc"}
+
+# Token -> (expires, user_id, tenant_id): saves a token lookup per request
+IDENTITY_CACHE_TTL = 60
+IDENTITY_CACHE_SIZE = 10000
+_identities: "OrderedDict[str, Tuple[float, Optional[str], Optional[str]]]" = OrderedDict()
+
+
+def match_endpoint(path: str) -> Tuple[str, str]:
+    """(endpoint key, rate) of the first RATE_LIMITS entry contained in the path."""
     for endpoint, limit in RATE_LIMITS.items():
         if endpoint in path:
-            return limit
-    return "100/minute"  # Default limit
-
-
-@limiter.limit("100/minute")
-async def rate_limit_middleware(request: Request, call_next):
-    """Rate limiting middleware."""
-    try:
-        # Apply endpoint-specific limits
-        path = request.url.path
-        limit = get_rate_limit_for_path(path)
-        
-        # Check rate limit
-        response = await call_next(request)
-        return response
-    except RateLimitExceeded as e:
-        logger.warning("rate_limit_exceeded", path=request.url.path, ip=get_remote_address(request))
-        return JSONResponse(
-            status_code=429,
-            content={
-                "error": {
-                    "code": "RATE_LIMIT_EXCEEDED",
-                    "message": "Too many requests. Please wait a moment and try again.",
-                    "details": {
-                        "retry_after": getattr(e, "retry_after", 60)
+            return endpoint, limit
+    return "default", DEFAULT_RATE_LIMIT
+
+
+def get_rate_limit_for_path(path: str) -> str:
+    """Get rate limit for a specific path."""
+    return match_endpoint(path)[1]
+
+
+def request_cost(method: str, path: str) -> int:
+    if method in READ_METHODS:
+        return 1
+    for marker, cost in REQUEST_COSTS.items():
+        if marker in path:
+            return cost
+    return 1
+
+
+def _request_token(request: Request) -> Optional[str]:
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        return auth_header[7:]
+    return request.cookies.get("session_token")
+
+
+async def resolve_identity(request: Request) -> Tuple[str, Optional[str]]:
+    """(subject, tenant_id) to key the buckets by: the user when authenticated, else the client IP."""
+    token = _request_token(request)
+    if token:
+        token_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        cached = _identities.get(token_key)
+        if cached is None or cached[0] < now:
+            user_id = tenant_id = None
+            try:
+                from backend.services.token_storage import get_token_storage
+
+                token_data = await (await get_token_storage()).get_token(token)
+                if token_data:
+                    user_id, tenant_id = token_data.get("user_id"), token_data.get("tenant_id")
+            except Exception as e:
+                logger.debug("rate_limit_identity_failed", error=str(e))
+            cached = (now + IDENTITY_CACHE_TTL, user_id, tenant_id)
+            _identities[token_key] = cached
+            if len(_identities) > IDENTITY_CACHE_SIZE:
+                _identities.popitem(last=False)
+        if cached[1]:
+            return f"user:{cached[1]}", cached[2]
+    client = request.client.host if request.client else "unknown"
+    return f"ip:{client}", None
+
+
+async def limits_for_request(request: Request) -> list:
+    path = request.url.path
+    subject, tenant_id = await resolve_identity(request)
+    cost = request_cost(request.method, path)
+    limits = [Limit.from_rate(subject, settings.rate_limit_user_budget, cost)]
+    if request.method not in READ_METHODS:
+        endpoint, rate = match_endpoint(path)
+        limits.insert(0, Limit.from_rate(f"endpoint:{endpoint}:{subject}", rate))
+    if tenant_id:
+        limits.append(Limit.from_rate(f"tenant:{tenant_id}", settings.rate_limit_tenant_budget, cost))
+    return limits
+
+
+class RateLimitMiddleware:
+    """Rate limiting middleware (plain ASGI, so allowed requests pay only for the check)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.rate_limit_enabled
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        limits = await limits_for_request(request)
+        result = await get_rate_limiter().check(limits)
+        if not result.allowed:
+            logger.warning(
+                "rate_limit_exceeded",
+                path=request.url.path,
+                bucket=result.limit.key if result.limit else None,
+                source=result.source,
+            )
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error": {
+                        "code": "RATE_LIMIT_EXCEEDED",
+                        "message": "Too many requests. Please wait a moment and try again.",
+                        "details": {
+                            "retry_after": round(result.retry_after, 3)
+                        }
                     }
-                }
-            }
-        )
+                },
+                headers={
+                    "Retry-After": retry_after_header(result.retry_after),
+                    "X-RateLimit-Limit": str(result.limit.limit) if result.limit else "",
+                    "X-RateLimit-Remaining": "0",
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        if result.remaining is None:
+            await self.app(scope, receive, send)
+            return
+
+        remaining = str(result.remaining).encode("latin-1")
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-ratelimit-remaining", remaining)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 def setup_rate_limiting(app):
     """Setup rate limiting for FastAPI app."""
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    logger.info("rate_limiting_configured", redis_url=settings.redis_url)
-
+    app.add_middleware(RateLimitMiddleware)
+    logger.info("rate_limiting_configured", enabled=settings.rate_limit_enabled, redis_url=settings.redis_url)
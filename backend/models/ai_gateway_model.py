@@ -6,6 +6,7 @@ from typing import Optional, List, Dict, Any, AsyncIterator, Iterator, Union, Ty
 import structlog
 import asyncio
 from backend.services.ai_gateway_client import AIGatewayClient
+from backend.services.prompt_layout import extract_cache_usage, system_content_parts
 
 logger = structlog.get_logger()
 
@@ -207,9 +208,10 @@ class AIGatewayModel(Model):
             if role == 'system':
                 # System messages are typically handled separately
                 # For AI Gateway, we'll include them as user messages with a prefix
+                # (split into cache_control parts for Claude when prompt caching is enabled)
                 formatted.append({
                     'role': 'user',
-                    'content': f"[System]: {content}"
+                    'content': system_content_parts(f"[System]: {content}", self.id)
                 })
             elif role in ['user', 'assistant']:
                 formatted.append({
@@ -245,7 +247,7 @@ class AIGatewayModel(Model):
             if role == 'system':
                 formatted.append({
                     'role': 'user',
-                    'content': f"[System]: {content}"
+                    'content': system_content_parts(f"[System]: {content}", self.id)
                 })
             elif role in ['user', 'assistant']:
                 formatted.append({
@@ -307,11 +309,14 @@ class AIGatewayModel(Model):
             # Add usage information as response_usage (Metrics object)
             if usage:
                 try:
-                    from agno.models.metrics import Metrics
-                    response_kwargs['response_usage'] = Metrics(
-                        prompt_tokens=usage.get('prompt_tokens', 0),
-                        completion_tokens=usage.get('completion_tokens', 0),
-                        total_tokens=usage.get('total_tokens', 0)
+                    from agno.metrics import MessageMetrics
+                    cache_usage = extract_cache_usage(usage)
+                    response_kwargs['response_usage'] = MessageMetrics(
+                        input_tokens=usage.get('prompt_tokens', 0),
+                        output_tokens=usage.get('completion_tokens', 0),
+                        total_tokens=usage.get('total_tokens', 0),
+                        cache_read_tokens=cache_usage['cached'],
+                        cache_write_tokens=cache_usage['cache_write'],
                     )
                 except:
                     # Fallback: store in provider_data if Metrics not available
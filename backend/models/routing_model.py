@@ -0,0 +1,332 @@
+"""
+Agno-compatible model that routes each call across several provider models.
+
+Routes (e.g. AI Gateway, OpenAI, Gemini, Claude) are tried in configured priority
+order, except that routes whose recent error rate is above the threshold are moved
+to the back. A call that errors or exceeds the per-attempt timeout fails over to
+the next route. Each provider API key and base URL also has a circuit breaker (see
+services/resilience): a route whose circuit is open is skipped without a call, and
+the attempt timeout adapts to the provider's recent latency. With hedging enabled, a second route is started when the first has
+not answered by its rolling p95 latency, and whichever succeeds first wins.
+
+Per-route latency and outcomes are kept in a process-wide rolling window, so the
+statistics survive the model being rebuilt with fresh API keys. Every call appends
+its routing decision to the trace installed with routing_trace (see
+AgnoBaseAgent.process, which adds it to the response metadata).
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import structlog
+
+from backend.config import settings
+from backend.services.llm_scheduler import model_lane
+from backend.services.resilience import CircuitBreaker, CircuitOpenError, get_breaker, is_upstream_failure
+
+logger = structlog.get_logger()
+
+try:
+    from agno.models.base import Model
+    from agno.models.message import Message
+    from agno.models.response import ModelResponse
+    AGNO_MODEL_AVAILABLE = True
+except ImportError:
+    Model = object
+    Message = Any
+    ModelResponse = Any
+    AGNO_MODEL_AVAILABLE = False
+    logger.warning("agno_models_base_not_available", message="RoutingModel will not be recognized as Agno model")
+
+# Routing decisions of the current agent run; a list so decisions made in child tasks are visible
+current_routing_trace: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("current_routing_trace", default=None)
+
+# Below this many successful samples the p95 is not trusted for hedging
+MIN_HEDGE_SAMPLES = 10
+
+
+@contextmanager
+def routing_trace() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the routing decisions of the model calls made inside the block."""
+    trace: List[Dict[str, Any]] = []
+    token = current_routing_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_routing_trace.reset(token)
+
+
+def route_name(model: Any) -> str:
+    provider, model_id = model_lane(model)
+    return f"{provider}:{model_id}"
+
+
+def route_breaker(route: Any) -> CircuitBreaker:
+    """Breaker of the route's provider, API key and base URL (one user's key cannot open it for others)."""
+    provider = route_name(route).split(":", 1)[0]
+    base_url = getattr(route, "base_url", None)
+    return get_breaker(provider, getattr(route, "api_key", None), urlparse(str(base_url)).netloc if base_url else None)
+
+
+class RouteStats:
+    """Rolling latency and outcome window for one route."""
+
+    def __init__(self, window: int):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=max(1, window))
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((latency, ok))
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def p95(self) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if len(latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def healthy(self) -> bool:
+        # A handful of failures is not enough evidence to demote a route
+        return len(self.samples) < 5 or self.error_rate < settings.model_routing_error_threshold
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "samples": len(self.samples),
+            "error_rate": round(self.error_rate, 3),
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "healthy": self.healthy(),
+        }
+
+
+_route_stats: Dict[str, RouteStats] = {}
+
+
+def get_route_stats(name: str) -> RouteStats:
+    stats = _route_stats.get(name)
+    if stats is None:
+        stats = RouteStats(settings.model_routing_window)
+        _route_stats[name] = stats
+    return stats
+
+
+def routing_stats() -> Dict[str, Dict[str, Any]]:
+    """Health of every route seen by this process."""
+    return {name: stats.snapshot() for name, stats in sorted(_route_stats.items())}
+
+
+class RoutingModel(Model):
+    """
+    Agno-compatible model that fails over (and optionally hedges) across provider models.
+    Request formatting and response parsing are done by each route's own model.
+    """
+
+    def __init__(self, routes: List[Any], id: Optional[str] = None):
+        if not routes:
+            raise ValueError("RoutingModel needs at least one route")
+        self.routes = list(routes)
+        primary = self.routes[0]
+        self.id = id or getattr(primary, "id", "routing")
+        self.model = self.id
+        self.name = "RoutingModel"
+        self.provider = "RoutingModel"
+        # Capabilities Agno reads from the model follow the primary route
+        for attribute in ("supports_native_structured_outputs", "supports_json_schema_outputs",
+                          "system_prompt", "instructions", "tool_message_role", "assistant_message_role"):
+            if hasattr(primary, attribute):
+                setattr(self, attribute, getattr(primary, attribute))
+
+    def ordered_routes(self) -> List[Any]:
+        """Routes in priority order, with currently unhealthy routes last."""
+        return sorted(self.routes, key=lambda route: not get_route_stats(route_name(route)).healthy())
+
+    def preferred(self) -> Any:
+        """The route the next call will try first (used for rate-limit lanes)."""
+        return self.ordered_routes()[0]
+
+    def _hedge_delay(self, route: Any) -> float:
+        p95 = get_route_stats(route_name(route)).p95()
+        if p95 is None:
+            return settings.model_hedge_default_delay
+        return max(settings.model_hedge_min_delay, p95)
+
+    async def _attempt(self, route: Any, kwargs: Dict[str, Any], attempts: List[Dict[str, Any]]) -> Any:
+        """One call to a route, bounded by the attempt timeout and recorded in its stats and breaker."""
+        name = route_name(route)
+        breaker = route_breaker(route)
+        try:
+            await breaker.before_call()
+        except CircuitOpenError as e:
+            attempts.append({"route": name, "outcome": "circuit_open", "retry_after": e.retry_after})
+            raise
+        timeout = breaker.timeout(settings.model_routing_attempt_timeout, floor=settings.model_routing_min_timeout)
+        start = time.monotonic()
+        outcome = "ok"
+        error = None
+        try:
+            response = await asyncio.wait_for(route.ainvoke(**kwargs), timeout=timeout)
+            await breaker.record_success(time.monotonic() - start)
+            return response
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            await breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            breaker.release()
+            raise
+        except Exception as e:
+            outcome, error = "error", str(e)[:200]
+            if is_upstream_failure(e):
+                await breaker.record_failure()
+            else:
+                await breaker.record_success()
+            raise
+        finally:
+            latency = time.monotonic() - start
+            if outcome != "cancelled":
+                get_route_stats(name).record(latency, outcome == "ok")
+            attempt = {"route": name, "outcome": outcome, "latency_ms": round(latency * 1000)}
+            if error:
+                attempt["error"] = error
+            attempts.append(attempt)
+
+    async def _hedged(self, primary: Any, backup: Any, kwargs: Dict[str, Any],
+                      attempts: List[Dict[str, Any]]) -> Tuple[Any, Any]:
+        """Run primary; start backup if primary is still running at its p95. First success wins."""
+        # The backup populates its own copy of the assistant message so the attempts do not interfere
+        backup_kwargs = dict(kwargs)
+        if kwargs.get("assistant_message") is not None:
+            backup_kwargs["assistant_message"] = kwargs["assistant_message"].model_copy(deep=True)
+
+        tasks = {asyncio.ensure_future(self._attempt(primary, kwargs, attempts)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+        if not done:
+            tasks[asyncio.ensure_future(self._attempt(backup, backup_kwargs, attempts))] = backup
+        last_error: Optional[BaseException] = None
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        if winner is backup and backup_kwargs is not kwargs and kwargs.get("assistant_message") is not None:
+                            kwargs["assistant_message"].metrics = backup_kwargs["assistant_message"].metrics
+                        return task.result(), winner
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def ainvoke(self, **kwargs: Any) -> Any:
+        routes = self.ordered_routes()
+        attempts: List[Dict[str, Any]] = []
+        decision: Dict[str, Any] = {"attempts": attempts, "hedged": False}
+        trace = current_routing_trace.get()
+        if trace is not None:
+            trace.append(decision)
+
+        last_error: Optional[BaseException] = None
+        remaining = list(routes)
+        while remaining:
+            route = remaining.pop(0)
+            try:
+                if settings.model_hedging_enabled and remaining:
+                    decision["hedged"] = True
+                    response, winner = await self._hedged(route, remaining[0], kwargs, attempts)
+                else:
+                    response, winner = await self._attempt(route, kwargs, attempts), route
+                decision["route"] = route_name(winner)
+                if len(attempts) > 1:
+                    logger.info("model_routing_failover", route=decision["route"], attempts=attempts)
+                return response
+            except Exception as e:
+                last_error = e
+                logger.warning("model_route_failed", route=route_name(route), error=str(e)[:200])
+                # A backup that already ran as the hedge is not tried again
+                if remaining and any(a["route"] == route_name(remaining[0]) for a in attempts):
+                    remaining.pop(0)
+        raise last_error
+
+    async def ainvoke_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """Stream from the first route that produces output; fail over only before the first chunk."""
+        attempts: List[Dict[str, Any]] = []
+        decision: Dict[str, Any] = {"attempts": attempts, "hedged": False, "stream": True}
+        trace = current_routing_trace.get()
+        if trace is not None:
+            trace.append(decision)
+
+        last_error: Optional[BaseException] = None
+        for route in self.ordered_routes():
+            name = route_name(route)
+            start = time.monotonic()
+            started = False
+            try:
+                async for chunk in route.ainvoke_stream(**kwargs):
+                    started = True
+                    yield chunk
+                get_route_stats(name).record(time.monotonic() - start, True)
+                attempts.append({"route": name, "outcome": "ok", "latency_ms": round((time.monotonic() - start) * 1000)})
+                decision["route"] = name
+                return
+            except Exception as e:
+                get_route_stats(name).record(time.monotonic() - start, False)
+                attempts.append({"route": name, "outcome": "error", "error": str(e)[:200]})
+                if started:
+                    raise
+                last_error = e
+                logger.warning("model_route_failed", route=name, error=str(e)[:200], stream=True)
+        raise last_error
+
+    def invoke(self, **kwargs: Any) -> Any:
+        last_error: Optional[BaseException] = None
+        for route in self.ordered_routes():
+            start = time.monotonic()
+            try:
+                response = route.invoke(**kwargs)
+                get_route_stats(route_name(route)).record(time.monotonic() - start, True)
+                return response
+            except Exception as e:
+                get_route_stats(route_name(route)).record(time.monotonic() - start, False)
+                last_error = e
+                logger.warning("model_route_failed", route=route_name(route), error=str(e)[:200])
+        raise last_error
+
+    def invoke_stream(self, **kwargs: Any) -> Iterator[Any]:
+        last_error: Optional[BaseException] = None
+        for route in self.ordered_routes():
+            started = False
+            try:
+                for chunk in route.invoke_stream(**kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                last_error = e
+                logger.warning("model_route_failed", route=route_name(route), error=str(e)[:200], stream=True)
+        raise last_error
+
+    def _parse_provider_response(self, response: Any, **kwargs: Any) -> Any:
+        return self.routes[0]._parse_provider_response(response, **kwargs)
+
+    def _parse_provider_response_delta(self, response: Any) -> Any:
+        return self.routes[0]._parse_provider_response_delta(response)
+
+    def __str__(self) -> str:
+        return f"RoutingModel(routes=[{', '.join(route_name(route) for route in self.routes)}])"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -130,6 +130,7 @@ class HealthCheckResponse(BaseModel):
     timestamp: datetime
     version: str
     services: Dict[str, bool]
+    circuits: Dict[str, str] = {}  # Upstream -> circuit breaker state (closed/open/half_open)
 
 
 class AgentInteraction(BaseModel):
@@ -0,0 +1,93 @@
+"""
+Production launcher for the backend API: python -m backend.serve
+
+Runs uvicorn without the reloader and with one worker process per CPU available to
+the container (its cgroup CPU quota, not the host's core count), so SSE streams,
+bcrypt and JSON work are spread over several processes and event loops per pod.
+
+- BACKEND_WORKERS (or WEB_CONCURRENCY) overrides the worker count.
+- The count is exported to the workers as BACKEND_WORKERS; they split the per-pod
+  DB and Redis pool sizes and model-call rate limits by it (see config.per_worker).
+- On SIGTERM each worker stops accepting connections, reports draining on /health,
+  refuses new SSE streams and lets in-flight requests and streams finish for up to
+  SHUTDOWN_GRACE_SECONDS; the lifespan shutdown then flushes queued writes.
+- X-Forwarded-* headers are only trusted from FORWARDED_ALLOW_IPS (default
+  127.0.0.1); set it to the ingress/load balancer addresses.
+
+Local development keeps using `uvicorn backend.main:app --reload`.
+"""
+import argparse
+import math
+import os
+import sys
+from typing import Optional
+
+import structlog
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from backend.config import settings
+from backend.services.lifecycle import available_cpus
+
+logger = structlog.get_logger()
+
+DEFAULT_APP = "backend.main:app"
+
+
+def worker_count(requested: Optional[int] = None) -> int:
+    """Explicit count, else BACKEND_WORKERS / WEB_CONCURRENCY, else one per whole CPU (at least one)."""
+    if requested:
+        return max(1, requested)
+    for name in ("BACKEND_WORKERS", "WEB_CONCURRENCY"):
+        value = os.getenv(name)
+        if value and value.isdigit() and int(value) > 0:
+            return int(value)
+    return max(1, math.floor(available_cpus()))
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn Server that marks the worker as draining as soon as a shutdown signal arrives."""
+
+    def handle_exit(self, sig, frame):
+        from backend.services.lifecycle import mark_draining
+
+        mark_draining()
+        super().handle_exit(sig, frame)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the backend API with multiple worker processes")
+    parser.add_argument("--app", default=DEFAULT_APP, help="ASGI application import string")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: from CPU quota)")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info").lower())
+    args = parser.parse_args(argv)
+
+    workers = worker_count(args.workers)
+    # Workers read this to size their share of the per-pod pools and rate limits
+    os.environ["BACKEND_WORKERS"] = str(workers)
+
+    config = uvicorn.Config(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.forwarded_allow_ips,
+        timeout_keep_alive=int(os.getenv("KEEPALIVE_TIMEOUT_SECONDS", "5")),
+        timeout_graceful_shutdown=int(os.getenv("SHUTDOWN_GRACE_SECONDS", "25")),
+    )
+    server = DrainingServer(config=config)
+    logger.info("backend_serve_starting", workers=workers, cpus=available_cpus(), host=args.host, port=args.port)
+    if workers > 1:
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+    if workers == 1 and not server.started:
+        sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Per-tenant admission control for agent runs (coordinator chat, PRD export).
+
+Model calls are already paced per provider by services.llm_scheduler, but that
+only orders calls once runs are in flight: nothing stopped one tenant from
+starting dozens of streams and exports that fill every lane. Each run now has
+to be admitted before it starts:
+- its token cost is estimated from the size of the assembled context plus an
+  expected output allowance for its kind (estimate_tokens),
+- a tenant may have ADMISSION_TENANT_CONCURRENCY runs in flight and is admitted
+  ADMISSION_TENANT_TPM estimated tokens per minute, counted across pods in Redis
+  (one Lua script per attempt: run leases in a sorted set, tokens in a GCRA bucket),
+- a run that does not fit waits up to ADMISSION_MAX_WAIT seconds (at most
+  ADMISSION_MAX_QUEUED waiters per tenant and worker); when it would have to wait
+  longer it is shed with AdmissionRejectedError carrying a retry-after.
+Without Redis the same budgets are enforced per worker (each worker its share).
+Decisions and queue times are reported by snapshot() (GET /api/metrics/admission).
+"""
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+import structlog
+
+from backend.config import per_worker, settings
+from backend.services.llm_scheduler import TokenBucket
+from backend.services.redis_cache import PerLoop, RedisBackoff
+
+logger = structlog.get_logger()
+
+KIND_CHAT = "chat"
+KIND_EXPORT = "export"
+
+# Recent queue times kept for the percentiles
+WAIT_SAMPLE_SIZE = 500
+# Seconds between re-checks while queued for a concurrency slot held on another worker
+POLL_INTERVAL = 0.5
+
+# KEYS: run leases (sorted set), token bucket. ARGV: run id, max runs, lease ms, tokens, tokens per minute.
+# Returns {admitted, reason (0 ok, 1 concurrency, 2 tokens), runs in flight, retry after ms}.
+ADMIT_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local max_runs = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local tpm = tonumber(ARGV[5])
+local cost = math.min(tonumber(ARGV[4]), tpm)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local running = redis.call('ZCARD', KEYS[1])
+if running >= max_runs then
+  return {0, 1, running, 0}
+end
+local interval = 60000 / tpm
+local tat = tonumber(redis.call('GET', KEYS[2])) or now
+if tat < now then
+  tat = now
+end
+local new_tat = tat + cost * interval
+local allowed_in = new_tat - 60000 - now
+if allowed_in > 0 then
+  return {0, 2, running, math.ceil(allowed_in)}
+end
+redis.call('SET', KEYS[2], tostring(new_tat), 'PX', math.max(1, math.ceil(new_tat - now)))
+redis.call('ZADD', KEYS[1], now + lease, ARGV[1])
+redis.call('PEXPIRE', KEYS[1], lease)
+return {1, 0, running + 1, 0}
+"""
+
+# KEYS: run leases. ARGV: run id, lease ms. Extends the lease of a run that is still held.
+RENEW_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[2]), ARGV[1])
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+REASON_CONCURRENCY = "concurrency"
+REASON_TOKENS = "tokens"
+REASON_QUEUE_FULL = "queue_full"
+REASONS = {1: REASON_CONCURRENCY, 2: REASON_TOKENS}
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a tenant's agent budget cannot admit a run within ADMISSION_MAX_WAIT."""
+
+    def __init__(self, retry_after: float, reason: str):
+        self.retry_after = max(1, int(retry_after + 0.999))
+        self.reason = reason
+        super().__init__(
+            f"Too many agent requests for this workspace ({reason.replace('_', ' ')} budget); "
+            f"retry in {self.retry_after}s"
+        )
+
+
+def context_size(*parts: Any) -> int:
+    """Characters of a run's assembled context (strings as they are, anything else as JSON)."""
+    size = 0
+    for part in parts:
+        if part is None:
+            continue
+        size += len(part) if isinstance(part, str) else len(json.dumps(part, default=str))
+    return size
+
+
+def estimate_tokens(context_chars: int, kind: str) -> int:
+    """Estimated tokens of a run: its assembled context (~4 characters per token) plus expected output."""
+    output = settings.admission_export_output_tokens if kind == KIND_EXPORT else settings.admission_chat_output_tokens
+    return max(1, context_chars // 4) + output
+
+
+class _LocalBudget:
+    """Per-worker stand-in for the Redis budgets of one tenant."""
+
+    def __init__(self):
+        self.running = 0
+        self.tokens = TokenBucket(per_worker(settings.admission_tenant_tpm))
+
+    def try_admit(self, tokens: int) -> Tuple[bool, str, float]:
+        if self.running >= per_worker(settings.admission_tenant_concurrency):
+            return False, REASON_CONCURRENCY, 0.0
+        now = time.monotonic()
+        wait = self.tokens.wait_time(tokens, now)
+        if wait > 0:
+            return False, REASON_TOKENS, wait
+        self.tokens.take(tokens, now)
+        self.running += 1
+        return True, "", 0.0
+
+
+class AdmissionTicket:
+    """An admitted run; release() frees its concurrency slot."""
+
+    def __init__(self, controller: "AdmissionController", tenant: str, kind: str, run_id: str,
+                 tokens: int, wait_seconds: float, local: bool):
+        self.controller = controller
+        self.tenant = tenant
+        self.kind = kind
+        self.run_id = run_id
+        self.tokens = tokens
+        self.wait_seconds = wait_seconds
+        self.local = local
+        self.released = False
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        if self._renewer is not None:
+            self._renewer.cancel()
+        await self.controller._release(self)
+
+
+class AdmissionController:
+    """Admits agent runs against per-tenant concurrency and token budgets."""
+
+    def __init__(self, redis_client: Any = None):
+        self._redis = RedisBackoff(redis_client)
+        self._scripts: Optional[Tuple[Any, Any]] = None
+        self._local: Dict[str, _LocalBudget] = {}
+        self._released: Dict[str, asyncio.Event] = {}
+        self._queued: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {KIND_CHAT: 0, KIND_EXPORT: 0}
+        self.decisions: Dict[str, int] = {"admitted": 0, "queued": 0, "shed": 0}
+        self.shed_by_reason: Dict[str, int] = {}
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def _get_scripts(self) -> Optional[Tuple[Any, Any]]:
+        if self._scripts is None:
+            client = self._redis.client()
+            if client is None:
+                return None
+            self._scripts = (client.register_script(ADMIT_SCRIPT), client.register_script(RENEW_SCRIPT))
+        return self._scripts
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning("admission_redis_failed", error=str(error))
+        self._scripts = None
+        self._redis.failed()
+
+    @staticmethod
+    def _keys(tenant: str) -> list:
+        return [f"admission:{tenant}:runs", f"admission:{tenant}:tokens"]
+
+    async def _try_admit(self, tenant: str, run_id: str, tokens: int) -> Tuple[bool, str, float, bool]:
+        """(admitted, reason, retry after seconds, decided locally)."""
+        scripts = self._get_scripts()
+        if scripts is not None:
+            try:
+                admitted, reason, _, retry_ms = await scripts[0](
+                    keys=self._keys(tenant),
+                    args=[run_id, settings.admission_tenant_concurrency, settings.admission_lease_seconds * 1000,
+                          tokens, settings.admission_tenant_tpm],
+                )
+                return bool(int(admitted)), REASONS.get(int(reason), ""), int(retry_ms) / 1000, False
+            except Exception as e:
+                self._redis_failed(e)
+        budget = self._local.setdefault(tenant, _LocalBudget())
+        admitted, reason, retry_after = budget.try_admit(tokens)
+        return admitted, reason, retry_after, True
+
+    async def admit(self, tenant: str, kind: str, tokens: int) -> AdmissionTicket:
+        """Admit a run, queueing up to ADMISSION_MAX_WAIT; raises AdmissionRejectedError when shed."""
+        run_id = uuid.uuid4().hex
+        start = time.monotonic()
+        deadline = start + settings.admission_max_wait
+        queued = False
+        try:
+            while True:
+                admitted, reason, retry_after, local = await self._try_admit(tenant, run_id, tokens)
+                now = time.monotonic()
+                if admitted:
+                    break
+                wait = retry_after or POLL_INTERVAL
+                if now + (retry_after or 0) > deadline:
+                    self._shed(tenant, kind, reason, retry_after or POLL_INTERVAL * 2)
+                if not queued:
+                    if self._queued.get(tenant, 0) >= settings.admission_max_queued:
+                        self._shed(tenant, kind, REASON_QUEUE_FULL, retry_after or POLL_INTERVAL * 2)
+                    queued = True
+                    self._queued[tenant] = self._queued.get(tenant, 0) + 1
+                    self.decisions["queued"] += 1
+                # Woken early when a run of this tenant finishes on this worker
+                released = self._released.setdefault(tenant, asyncio.Event())
+                try:
+                    await asyncio.wait_for(released.wait(), timeout=max(0.01, min(wait, deadline - now)))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if queued:
+                self._queued[tenant] -= 1
+                if not self._queued[tenant]:
+                    del self._queued[tenant]
+
+        wait_seconds = time.monotonic() - start
+        self.decisions["admitted"] += 1
+        self.waits.append(wait_seconds)
+        self.in_flight[kind] = self.in_flight.get(kind, 0) + 1
+        if queued:
+            logger.info("admission_queued", tenant=tenant, kind=kind, tokens=tokens,
+                        wait_ms=round(wait_seconds * 1000))
+        ticket = AdmissionTicket(self, tenant, kind, run_id, tokens, wait_seconds, local)
+        if not local:
+            ticket._renewer = asyncio.create_task(self._renew(ticket))
+        return ticket
+
+    def _shed(self, tenant: str, kind: str, reason: str, retry_after: float) -> None:
+        self.decisions["shed"] += 1
+        self.shed_by_reason[reason] = self.shed_by_reason.get(reason, 0) + 1
+        logger.warning("admission_shed", tenant=tenant, kind=kind, reason=reason, retry_after=round(retry_after, 1))
+        raise AdmissionRejectedError(retry_after, reason)
+
+    async def _renew(self, ticket: AdmissionTicket) -> None:
+        """Keep a long run's lease alive (a crashed worker's leases expire on their own)."""
+        interval = max(1.0, settings.admission_lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            scripts = self._get_scripts()
+            if scripts is None:
+                return
+            try:
+                await scripts[1](keys=self._keys(ticket.tenant)[:1],
+                                 args=[ticket.run_id, settings.admission_lease_seconds * 1000])
+            except Exception as e:
+                self._redis_failed(e)
+                return
+
+    async def _release(self, ticket: AdmissionTicket) -> None:
+        self.in_flight[ticket.kind] = max(0, self.in_flight.get(ticket.kind, 0) - 1)
+        if ticket.local:
+            budget = self._local.get(ticket.tenant)
+            if budget is not None:
+                budget.running = max(0, budget.running - 1)
+        else:
+            scripts = self._get_scripts()
+            if scripts is not None:
+                try:
+                    await self._redis.client().zrem(self._keys(ticket.tenant)[0], ticket.run_id)
+                except Exception as e:
+                    self._redis_failed(e)
+        event = self._released.pop(ticket.tenant, None)
+        if event is not None:
+            event.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            "enabled": settings.admission_enabled,
+            "backend": "redis" if self._scripts is not None else "local",
+            "decisions": dict(self.decisions),
+            "shed_by_reason": dict(self.shed_by_reason),
+            "in_flight": dict(self.in_flight),
+            "queued": sum(self._queued.values()),
+            "queued_tenants": len(self._queued),
+            "queue_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else 0.0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            },
+            "limits": {
+                "tenant_concurrency": settings.admission_tenant_concurrency,
+                "tenant_tpm": settings.admission_tenant_tpm,
+                "max_wait_s": settings.admission_max_wait,
+            },
+        }
+
+
+# Events and tasks bind to the loop, so keep one controller per loop
+_controllers = PerLoop(AdmissionController)
+
+
+def get_admission_controller() -> AdmissionController:
+    return _controllers.get()
+
+
+async def admit_run(tenant: Optional[str], kind: str, context_chars: int) -> Optional[AdmissionTicket]:
+    """Admit an agent run for a tenant; None when admission control is disabled."""
+    if not settings.admission_enabled:
+        return None
+    return await get_admission_controller().admit(tenant or "default", kind, estimate_tokens(context_chars, kind))
+
+
+@asynccontextmanager
+async def admitted_run(tenant: Optional[str], kind: str, context_chars: int) -> AsyncIterator[Optional[AdmissionTicket]]:
+    """Run the enclosed block as an admitted agent run."""
+    ticket = await admit_run(tenant, kind, context_chars)
+    try:
+        yield ticket
+    finally:
+        if ticket is not None:
+            await ticket.release()
@@ -0,0 +1,296 @@
+"""
+Token-budgeted context packing for agent prompts.
+
+Context sections are ranked by priority (then recency) and packed greedily into a
+per-model token budget. Values are serialized compactly instead of as indented JSON,
+list sections keep their newest items first when they do not fit, and the tokens
+spent on each section are reported so prompt size can be tracked per response.
+
+Sections are tagged with a prompt-cache tier ("product" for context that is stable
+across requests for a product, "request" for volatile context) and packed output is
+grouped by tier so the stable part forms a cacheable prefix (see prompt_layout).
+
+Tokens are counted with tiktoken when installed; otherwise a ~4 characters/token
+estimate is used. preload_encodings() loads the tokenizer files at startup so the
+first prompt does not download them on the event loop.
+"""
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger()
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# Relative importance of well-known context keys (higher is packed first)
+CONTEXT_KEY_PRIORITIES: Dict[str, int] = {
+    "current_prompt": 100,
+    "current_field": 100,
+    "section_name": 95,
+    "phase_name": 95,
+    "form_data": 90,
+    "previous_phases": 80,
+    "ideation_from_chat": 75,
+    "conversation_history": 70,
+    "conversation_summary": 70,
+    "knowledge_results": 65,
+    "knowledge_base": 60,
+    "rag_references": 60,
+    "rag_context": 60,
+    "shared_context": 40,
+}
+DEFAULT_PRIORITY = 30
+
+# Context keys that only change when the product itself changes
+PRODUCT_CONTEXT_KEYS = {
+    "form_data",
+    "previous_phases",
+    "ideation_from_chat",
+    "knowledge_base",
+    "rag_references",
+    "phase_name",
+    "product_info",
+}
+TIERS = ("product", "request")
+
+TRUNCATION_MARKER = " …[truncated]"
+
+# tiktoken encodings used by the supported OpenAI models (others are estimated with o200k_base)
+ENCODINGS = ("o200k_base", "cl100k_base")
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: Optional[str]):
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Unknown model names (gateway aliases, Claude, Gemini) still get a close estimate
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+
+
+def preload_encodings() -> None:
+    """Load (and, on first run, download) the tokenizer files; blocking, so call it off the event loop."""
+    if not TIKTOKEN_AVAILABLE:
+        return
+    for name in ENCODINGS:
+        try:
+            tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.warning("tiktoken_encoding_unavailable", encoding=name, error=str(e))
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens in text using the model's tokenizer (or an estimate without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text to at most max_tokens tokens, marking the cut."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - count_tokens(TRUNCATION_MARKER, model))
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[: budget * 4] + TRUNCATION_MARKER
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:budget]) + TRUNCATION_MARKER
+
+
+def compact_serialize(value: Any) -> str:
+    """Serialize a context value without indentation or redundant whitespace."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict) and all(not isinstance(v, (dict, list)) for v in value.values()):
+        return "\n".join(
+            f"{str(k).replace('_', ' ').title()}: {v}" for k, v in value.items() if v not in (None, "")
+        )
+    if isinstance(value, (dict, list, tuple)):
+        # sort_keys keeps serialization byte-stable for provider prompt caches
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, sort_keys=True, default=str)
+    return str(value)
+
+
+def get_context_budget(model: Optional[str] = None) -> int:
+    """Context token budget for a model (CONTEXT_TOKEN_BUDGETS overrides, longest match wins)."""
+    budgets = settings.context_token_budgets
+    if model and budgets:
+        model_lower = str(model).lower()
+        matches = [name for name in budgets if name.lower() in model_lower]
+        if matches:
+            return int(budgets[max(matches, key=len)])
+    return settings.context_token_budget
+
+
+@dataclass
+class ContextSection:
+    """A block of prompt context. List bodies are ordered oldest → newest."""
+
+    name: str
+    body: Union[str, Sequence[str]]
+    header: Optional[str] = None
+    priority: int = DEFAULT_PRIORITY
+    recency: float = 0.0
+    required: bool = False
+    tier: str = "request"
+
+
+@dataclass
+class PackedContext:
+    """Result of packing sections into a budget."""
+
+    text: str
+    budget: int
+    total_tokens: int
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    tier_text: Dict[str, str] = field(default_factory=dict)
+
+    def report(self) -> Dict[str, Any]:
+        """Compact summary for response metadata."""
+        return {
+            "budget": self.budget,
+            "total": self.total_tokens,
+            "sections": self.section_tokens,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+class ContextPacker:
+    """Greedy priority/recency packer over ContextSections."""
+
+    def __init__(self, budget_tokens: int, model: Optional[str] = None, min_section_tokens: int = 32):
+        self.budget_tokens = max(0, budget_tokens)
+        self.model = model
+        self.min_section_tokens = min_section_tokens
+
+    def _render(self, section: ContextSection, body: str) -> str:
+        return f"{section.header}\n{body}" if section.header else body
+
+    def _fit_items(self, section: ContextSection, items: Sequence[str], remaining: int) -> Optional[str]:
+        """Keep the newest items that fit, in their original order."""
+        header_cost = count_tokens(section.header or "", self.model) + 1
+        kept: List[str] = []
+        used = header_cost
+        for item in reversed(items):
+            cost = count_tokens(item, self.model) + 1
+            if used + cost > remaining:
+                break
+            kept.append(item)
+            used += cost
+        if not kept:
+            return None
+        return "\n".join(reversed(kept))
+
+    def pack(self, sections: Sequence[ContextSection]) -> PackedContext:
+        """Pack sections by (required, priority, recency); output is grouped by tier, then input order."""
+        ranked = sorted(
+            enumerate(sections),
+            key=lambda pair: (pair[1].required, pair[1].priority, pair[1].recency),
+            reverse=True,
+        )
+        remaining = self.budget_tokens
+        chosen: Dict[int, str] = {}
+        section_tokens: Dict[str, int] = {}
+        truncated: List[str] = []
+        dropped: List[str] = []
+
+        for index, section in ranked:
+            items = [section.body] if isinstance(section.body, str) else [i for i in section.body if i]
+            if not any(items):
+                continue
+            rendered = self._render(section, "\n".join(items))
+            cost = count_tokens(rendered, self.model)
+
+            if cost > remaining and not section.required:
+                if remaining < self.min_section_tokens:
+                    dropped.append(section.name)
+                    continue
+                if isinstance(section.body, str):
+                    header_cost = count_tokens(section.header or "", self.model) + 1
+                    body = truncate_to_tokens(section.body, remaining - header_cost, self.model)
+                else:
+                    body = self._fit_items(section, items, remaining)
+                if not body:
+                    dropped.append(section.name)
+                    continue
+                rendered = self._render(section, body)
+                cost = count_tokens(rendered, self.model)
+                truncated.append(section.name)
+
+            chosen[index] = rendered
+            section_tokens[section.name] = cost
+            remaining -= cost
+
+        tier_text = {
+            tier: "\n\n".join(chosen[i] for i in sorted(chosen) if sections[i].tier == tier)
+            for tier in TIERS
+        }
+        text = "\n\n".join(part for part in tier_text.values() if part)
+        total = sum(section_tokens.values())
+        if dropped or truncated:
+            logger.debug("context_packed", budget=self.budget_tokens, total=total, truncated=truncated, dropped=dropped)
+        return PackedContext(
+            text=text,
+            budget=self.budget_tokens,
+            total_tokens=total,
+            section_tokens=section_tokens,
+            truncated=truncated,
+            dropped=dropped,
+            tier_text=tier_text,
+        )
+
+
+def sections_from_context(
+    context: Dict[str, Any],
+    exclude: Sequence[str] = (),
+) -> List[ContextSection]:
+    """
+    Turn an agent context dict into sections; later keys count as more recent.
+
+    Product-tier sections are emitted in key order so the cacheable prefix does not
+    depend on the order callers happened to build the context dict in.
+    """
+    sections = []
+    for position, (key, value) in enumerate(context.items()):
+        if key in exclude or not value:
+            continue
+        if isinstance(value, list):
+            body: Union[str, List[str]] = [compact_serialize(item) for item in value]
+        else:
+            body = compact_serialize(value)
+        sections.append(
+            ContextSection(
+                name=key,
+                body=body,
+                header=f"{key.replace('_', ' ').title()}:",
+                priority=CONTEXT_KEY_PRIORITIES.get(key, DEFAULT_PRIORITY),
+                recency=position,
+                tier="product" if key in PRODUCT_CONTEXT_KEYS else "request",
+            )
+        )
+    return sorted(sections, key=lambda section: (section.tier != "product", section.name if section.tier == "product" else ""))
@@ -0,0 +1,196 @@
+"""
+Process pool for CPU-bound work that would otherwise block the event loop.
+
+Password hashing (bcrypt, ~250 ms per call) and similar synchronous work is sent
+to a pool of worker processes with run_cpu_bound(), so a burst of logins no longer
+freezes every SSE stream served by the same event loop.
+
+- The pool has CPU_POOL_WORKERS processes; by default this server worker's share
+  of the container's CPU quota (see config.per_worker), so several uvicorn workers
+  do not oversubscribe the pod.
+- Admission control: at most one job per pool process runs at a time; further
+  jobs wait in FIFO order. Once CPU_POOL_MAX_QUEUE jobs are waiting, or a job has
+  waited CPU_POOL_QUEUE_TIMEOUT seconds, CPUPoolBusyError is raised and the API
+  answers 503 with Retry-After instead of piling up work.
+- Bulk jobs (run_cpu_bound(..., bulk=True): PDF pages, crawled HTML) hold at most
+  pool_size() - 1 slots, and waiting interactive jobs (password checks) are started
+  before waiting bulk ones, so a large upload or crawl does not hold up logins.
+
+Functions and arguments sent to the pool must be picklable (module-level functions
+in light modules such as services.passwords).
+"""
+import asyncio
+import math
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+import structlog
+
+from backend.config import per_worker, settings
+from backend.services.lifecycle import available_cpus
+from backend.services.redis_cache import PerLoop
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+_pool: Optional[Executor] = None
+
+
+class CPUPoolBusyError(Exception):
+    """Raised when the CPU pool's queue is full or a job waited too long for a slot."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Server is busy; retry after {self.retry_after}s")
+
+
+def pool_size() -> int:
+    if settings.cpu_pool_workers > 0:
+        return settings.cpu_pool_workers
+    return per_worker(max(1, math.floor(available_cpus())))
+
+
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        # spawn: the pool's processes must not inherit the event loop, sockets and threads of the server
+        _pool = ProcessPoolExecutor(max_workers=pool_size(), mp_context=multiprocessing.get_context("spawn"))
+        logger.info("cpu_pool_started", workers=pool_size())
+    return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class CPUExecutor:
+    """Admission control in front of the process pool for one event loop."""
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self.bulk_slots = max(1, self.slots - 1)
+        self.free = self.slots
+        self.bulk_running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._bulk_waiters: Deque[asyncio.Future] = deque()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    def _retry_after(self) -> float:
+        """Rough time to drain the queue at the observed job duration."""
+        avg_run = self.total_run / self.completed if self.completed else 1.0
+        return self.waiting / self.slots * avg_run + 1
+
+    def _available(self, bulk: bool) -> bool:
+        return self.free > 0 and (not bulk or self.bulk_running < self.bulk_slots)
+
+    def _take(self, bulk: bool) -> None:
+        self.free -= 1
+        if bulk:
+            self.bulk_running += 1
+
+    def _release(self, bulk: bool) -> None:
+        self.free += 1
+        if bulk:
+            self.bulk_running -= 1
+        # Hand freed slots to waiting interactive jobs first, then to bulk jobs
+        for queue, queue_bulk in ((self._waiters, False), (self._bulk_waiters, True)):
+            while queue and self._available(queue_bulk):
+                waiter = queue.popleft()
+                if not waiter.done():  # Skip waiters that timed out
+                    self._take(queue_bulk)
+                    waiter.set_result(None)
+
+    async def _acquire(self, bulk: bool = False) -> None:
+        queue = self._bulk_waiters if bulk else self._waiters
+        if not queue and self._available(bulk):
+            self._take(bulk)
+            return
+        if self.waiting >= settings.cpu_pool_max_queue:
+            self.rejected += 1
+            logger.warning("cpu_pool_queue_full", waiting=self.waiting, bulk=bulk)
+            raise CPUPoolBusyError(self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(waiter, timeout=settings.cpu_pool_queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            logger.warning("cpu_pool_queue_timeout", waiting=self.waiting, bulk=bulk)
+            raise CPUPoolBusyError(self._retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(bulk)  # The slot was handed over as we were cancelled
+            raise
+        finally:
+            self.waiting -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, bulk: bool = False) -> T:
+        start = time.monotonic()
+        await self._acquire(bulk)
+        self.total_wait += time.monotonic() - start
+
+        self.running += 1
+        started = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(_get_pool(), partial(fn, *args))
+            except BrokenProcessPool:
+                # A pool process died (e.g. OOM-killed); start a fresh pool and retry once
+                logger.warning("cpu_pool_broken", function=getattr(fn, "__name__", str(fn)))
+                _reset_pool()
+                return await loop.run_in_executor(_get_pool(), partial(fn, *args))
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.total_run += time.monotonic() - started
+            self._release(bulk)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pool_workers": self.slots,
+            "running": self.running,
+            "bulk_running": self.bulk_running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 1) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run / self.completed * 1000, 1) if self.completed else 0.0,
+        }
+
+
+# Waiter futures bind to the loop, so keep one admission controller per loop
+_executors = PerLoop(lambda: CPUExecutor(pool_size()))
+
+
+def get_cpu_executor() -> CPUExecutor:
+    return _executors.get()
+
+
+async def run_cpu_bound(fn: Callable[..., T], *args: Any, bulk: bool = False) -> T:
+    """
+    Run fn(*args) in the CPU pool; raises CPUPoolBusyError when the pool is saturated.
+    bulk=True marks background batch work, which yields to interactive jobs.
+    """
+    return await get_cpu_executor().run(fn, *args, bulk=bulk)
+
+
+def shutdown_cpu_executor() -> None:
+    """Stop the pool's processes (application shutdown)."""
+    _reset_pool()
@@ -0,0 +1,120 @@
+"""
+Streaming text extraction for document uploads.
+
+Uploads are copied to a temporary file in chunks (spool_upload) instead of being
+read into memory, and rejected once they exceed DOCUMENT_UPLOAD_MAX_BYTES. PDF
+pages are extracted in the CPU pool (services.cpu_executor): the page range is split
+into tasks of PDF_PAGES_PER_TASK pages, a window of tasks as large as the pool runs
+in parallel, and extract_pdf_pages_streaming() yields each range's text in page order
+as soon as it is ready, so chunking and embedding can start before the last page is
+parsed and the event loop never runs pypdf.
+"""
+import asyncio
+import os
+import tempfile
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, List, Optional
+
+import structlog
+
+from backend.config import settings
+from backend.services.cpu_executor import pool_size, run_cpu_bound
+
+logger = structlog.get_logger()
+
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds DOCUMENT_UPLOAD_MAX_BYTES."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File is larger than the {max_bytes // (1024 * 1024)} MB upload limit")
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be parsed."""
+
+
+@dataclass
+class PageBatch:
+    """Text of pages [start, end) of a document (0-based, end exclusive)."""
+
+    start: int
+    end: int
+    total_pages: int
+    texts: List[str]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.texts)
+
+
+async def spool_upload(upload: Any, max_bytes: Optional[int] = None, suffix: str = "") -> str:
+    """Copy an UploadFile to a temporary file chunk by chunk; returns its path (the caller deletes it)."""
+    max_bytes = settings.document_upload_max_bytes if max_bytes is None else max_bytes
+    declared = getattr(upload, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while True:
+                chunk = await upload.read(SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                spool.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def pdf_page_count(path: str) -> int:
+    """Number of pages (runs in the CPU pool)."""
+    from pypdf import PdfReader
+
+    try:
+        return len(PdfReader(path).pages)
+    except Exception as e:
+        raise PDFExtractionError(str(e)) from e
+
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:
+    """Text of pages [start, end) (runs in the CPU pool; each task parses the file itself)."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(path)
+        return [(reader.pages[i].extract_text() or "") for i in range(start, min(end, len(reader.pages)))]
+    except Exception as e:
+        raise PDFExtractionError(str(e)) from e
+
+
+async def extract_pdf_pages_streaming(path: str) -> AsyncIterator[PageBatch]:
+    """Yield the PDF's text in page order, one PageBatch per task, while later tasks keep running."""
+    total = await run_cpu_bound(pdf_page_count, path, bulk=True)
+    per_task = max(1, settings.pdf_pages_per_task)
+    ranges = deque((start, min(start + per_task, total)) for start in range(0, total, per_task))
+    # A window as large as the bulk share of the pool keeps it busy without queueing a whole large document
+    window = max(1, pool_size() - 1)
+    pending: Deque[tuple] = deque()
+    try:
+        while ranges or pending:
+            while ranges and len(pending) < window:
+                start, end = ranges.popleft()
+                pending.append((start, end, asyncio.ensure_future(run_cpu_bound(extract_pdf_pages, path, start, end, bulk=True))))
+            start, end, task = pending.popleft()
+            yield PageBatch(start=start, end=end, total_pages=total, texts=await task)
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*(task for _, _, task in pending), return_exceptions=True)
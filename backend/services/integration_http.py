@@ -0,0 +1,216 @@
+"""
+Shared HTTP client for integration fetches (Confluence, GitHub MCP).
+
+- One pooled httpx.AsyncClient per event loop instead of a client per request, so
+  connections (and TLS sessions) to Atlassian/GitHub are reused.
+- Requests pass through the Confluence/GitHub circuit breakers with latency-adaptive
+  read timeouts (see services/resilience).
+- fetch_all() runs a batch of fetches with bounded concurrency.
+- GETs are conditional: ETag / Last-Modified validators are kept in Redis per
+  (credential, URL) and bodies in a content-addressed store, so an unchanged page
+  comes back as 304 and is served from the cache with not_modified=True.
+- content_unchanged() / mark_content_processed() remember the content hash last
+  processed per scope so callers can skip re-embedding pages that did not change.
+
+Credentials are never stored: cache entries are keyed by a hash of the
+Authorization header, so users with different access never share entries.
+"""
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+
+import httpx
+import structlog
+
+from backend.config import settings
+from backend.services.redis_cache import PerLoop, RedisCache
+from backend.services.resilience import credential_hash, resilient_client
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# httpx clients bind their connection pool to the loop that first uses them, so keep one per loop
+def _new_client() -> httpx.AsyncClient:
+    # Requests go through the Confluence/GitHub circuit breakers (chosen by host)
+    return resilient_client(
+        timeout=settings.integration_http_timeout,
+        adaptive=True,
+        limits=httpx.Limits(
+            max_connections=settings.integration_http_max_connections,
+            max_keepalive_connections=settings.integration_http_max_keepalive,
+        ),
+    )
+
+
+_clients = PerLoop(_new_client, stale=lambda client: client.is_closed)
+
+_validator_cache: Optional[RedisCache] = None
+_body_cache: Optional[RedisCache] = None
+
+
+def get_integration_client() -> httpx.AsyncClient:
+    """Pooled client shared by integration fetches on the running loop."""
+    return _clients.get()
+
+
+async def close_integration_client() -> None:
+    """Close the running loop's client (application shutdown)."""
+    client = _clients.pop()
+    if client is not None:
+        await client.aclose()
+
+
+def _get_caches() -> tuple:
+    global _validator_cache, _body_cache
+    if _validator_cache is None:
+        _validator_cache = RedisCache(ttl=settings.integration_cache_ttl, prefix="integration_http:")
+        _body_cache = RedisCache(ttl=settings.integration_cache_ttl, prefix="integration_body:")
+    return _validator_cache, _body_cache
+
+
+def credential_key(headers: Optional[Dict[str, str]]) -> str:
+    """Stable, non-reversible key for the credential a request is made with."""
+    auth = ""
+    for name, value in (headers or {}).items():
+        if name.lower() == "authorization":
+            auth = value
+            break
+    return credential_hash(auth)
+
+
+def request_cache_key(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> str:
+    payload = json.dumps({"url": url, "params": params or {}}, sort_keys=True, default=str)
+    return f"{credential_key(headers)}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+@dataclass
+class IntegrationResponse:
+    """Response from fetch(); not_modified means the cached body was confirmed by a 304."""
+
+    status_code: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    not_modified: bool = False
+    content_hash: Optional[str] = None
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+async def fetch(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    json_body: Optional[Any] = None,
+    conditional: bool = True,
+    follow_redirects: bool = False,
+) -> IntegrationResponse:
+    """
+    Send a request on the shared client.
+
+    GETs with conditional=True revalidate against cached ETag/Last-Modified validators;
+    other methods are sent as-is (conditional headers have precondition semantics there).
+    """
+    headers = dict(headers or {})
+    use_cache = conditional and method.upper() == "GET" and settings.integration_cache_enabled
+    cache_key = request_cache_key(url, params, headers) if use_cache else None
+    cached: Optional[Dict[str, Any]] = None
+
+    if use_cache:
+        validator_cache, _ = _get_caches()
+        cached = await validator_cache.get(cache_key)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = await get_integration_client().request(method, url, headers=headers, params=params, json=json_body,
+                                                      follow_redirects=follow_redirects)
+
+    if use_cache and response.status_code == 304 and cached:
+        _, body_cache = _get_caches()
+        body = await body_cache.get(cached["content_hash"])
+        if body is not None:
+            logger.debug("integration_fetch_not_modified", url=url)
+            return IntegrationResponse(
+                status_code=200,
+                text=body,
+                headers=cached.get("headers", {}),
+                not_modified=True,
+                content_hash=cached["content_hash"],
+            )
+        # Body expired before its validators: fetch it again unconditionally
+        return await fetch(method, url, headers={k: v for k, v in headers.items()
+                                                 if k not in ("If-None-Match", "If-Modified-Since")},
+                           params=params, json_body=json_body, conditional=False,
+                           follow_redirects=follow_redirects)
+
+    text = response.text
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    result = IntegrationResponse(
+        status_code=response.status_code,
+        text=text,
+        headers={"content-type": response.headers.get("content-type", "")},
+        content_hash=content_hash,
+    )
+
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if use_cache and response.status_code == 200 and (etag or last_modified):
+        validator_cache, body_cache = _get_caches()
+        await body_cache.set(content_hash, text)
+        await validator_cache.set(cache_key, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "headers": result.headers,
+        })
+    return result
+
+
+async def fetch_all(
+    items: Iterable[T],
+    fetcher: Callable[[T], Awaitable[R]],
+    concurrency: Optional[int] = None,
+) -> List[Union[R, BaseException]]:
+    """
+    Run fetcher over items with at most `concurrency` in flight.
+    Results keep the input order; failures are returned as exceptions, not raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.integration_fetch_concurrency))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await fetcher(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+def _processed_key(scope: str) -> str:
+    return f"processed:{hashlib.sha256(scope.encode('utf-8')).hexdigest()}"
+
+
+async def content_unchanged(scope: str, content_hash: Optional[str]) -> bool:
+    """
+    Whether content_hash is the hash last marked processed for scope (e.g. a page in a
+    product's knowledge base), so unchanged content is not re-embedded.
+    """
+    if not content_hash or not settings.integration_cache_enabled:
+        return False
+    validator_cache, _ = _get_caches()
+    return await validator_cache.get(_processed_key(scope)) == content_hash
+
+
+async def mark_content_processed(scope: str, content_hash: Optional[str]) -> None:
+    """Record content_hash as processed for scope; call only once the content is stored."""
+    if not content_hash or not settings.integration_cache_enabled:
+        return
+    validator_cache, _ = _get_caches()
+    await validator_cache.set(_processed_key(scope), content_hash)
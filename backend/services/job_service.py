@@ -7,6 +7,9 @@ from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import redis.asyncio as redis
 from backend.config import settings
+from backend.services.redis_cache import create_redis_client
+from backend.services.llm_scheduler import PRIORITY_BACKGROUND, current_priority
+from backend.services.websocket_hub import publish
 from backend.models.schemas import (
     MultiAgentRequest, MultiAgentResponse, 
     JobStatusResponse, JobResultResponse
@@ -32,11 +35,7 @@ class JobService:
         if self._redis_client is None:
             try:
                 redis_url = settings.redis_url
-                self._redis_client = await redis.from_url(
-                    redis_url,
-                    encoding="utf-8",
-                    decode_responses=True
-                )
+                self._redis_client = create_redis_client()
                 await self._redis_client.ping()
                 logger.info("job_service_redis_connected", url=redis_url)
             except Exception as e:
@@ -144,6 +143,12 @@ class JobService:
             completed_at=datetime.fromisoformat(result_dict["completed_at"]) if result_dict.get("completed_at") else None
         )
     
+    async def get_job_user(self, job_id: str) -> Optional[str]:
+        """Id of the user who created the job (None when it does not exist)."""
+        redis_client = await self._get_redis_client()
+        job_data_str = await redis_client.get(f"{JOB_PREFIX}{job_id}")
+        return json.loads(job_data_str).get("user_id") if job_data_str else None
+    
     async def update_job_status(
         self,
         job_id: str,
@@ -190,6 +195,9 @@ class JobService:
             json.dumps(status_data)
         )
         
+        # Push the update to sockets subscribed to this job, on any pod
+        await publish(f"job:{job_id}", {"type": "job_status", "job_id": job_id, **status_data})
+        
         logger.info("job_status_updated", job_id=job_id, status=status, progress=progress)
     
     async def save_job_result(
@@ -264,6 +272,8 @@ class JobService:
         orchestrator: Any
     ):
         """Process job in background (to be called from background task)."""
+        # Queued jobs yield model capacity to interactive requests
+        priority_token = current_priority.set(PRIORITY_BACKGROUND)
         try:
             await self.update_job_status(
                 job_id,
@@ -291,6 +301,8 @@ class JobService:
         except Exception as e:
             logger.error("job_processing_failed", job_id=job_id, error=str(e))
             await self.save_job_result(job_id, error=str(e))
+        finally:
+            current_priority.reset(priority_token)
 
 
 # Global job service instance
@@ -0,0 +1,44 @@
+"""
+Process lifecycle state shared by the server launcher and request handlers.
+
+backend.serve marks the worker as draining when it receives SIGTERM; /health then
+reports it as not ready and new SSE streams are refused, while requests and
+streams already in flight are allowed to finish. available_cpus() sizes the
+worker processes and the CPU pool (services.cpu_executor) from the container's quota.
+"""
+import os
+
+_draining = False
+
+
+def mark_draining() -> None:
+    global _draining
+    _draining = True
+
+
+def is_draining() -> bool:
+    return _draining
+
+
+def available_cpus() -> float:
+    """CPUs this process may use: the cgroup quota when set, else the CPU affinity."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:  # cgroup v2
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:  # cgroup v1
+            quota_us = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period_us = int(f.read())
+        if quota_us > 0 and period_us > 0:
+            return quota_us / period_us
+    except (OSError, ValueError):
+        pass
+    try:
+        return float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return float(os.cpu_count() or 1)
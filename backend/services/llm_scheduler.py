@@ -0,0 +1,324 @@
+"""
+Provider-aware scheduler for model calls.
+
+Every agent model call acquires a slot from the lane of its provider/model before
+it is sent:
+- Each lane has two token buckets, requests per minute and tokens per minute.
+  A call reserves its estimated tokens (prompt + expected output) up front and
+  record_usage() settles the difference once the real usage is known.
+- Waiting calls are served by priority class (interactive > export > background),
+  so a burst of export sections cannot starve chat traffic.
+- Within a class, tenants are served by start-time fair queuing on token cost, so
+  one tenant's large export does not hold back every other tenant.
+
+The priority class and tenant of a call come from ContextVars (see request_class)
+so they follow the request through the agents without changing their signatures.
+Queue depth, wait times and bucket levels are reported by snapshot().
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+from backend.config import per_worker, settings
+from backend.services.redis_cache import PerLoop
+
+logger = structlog.get_logger()
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_EXPORT = "export"
+PRIORITY_BACKGROUND = "background"
+PRIORITY_RANKS: Dict[str, int] = {PRIORITY_INTERACTIVE: 0, PRIORITY_EXPORT: 1, PRIORITY_BACKGROUND: 2}
+
+current_priority: ContextVar[str] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+current_tenant: ContextVar[Optional[str]] = ContextVar("llm_tenant", default=None)
+
+# Recent waits kept per lane for the wait-time percentiles
+WAIT_SAMPLE_SIZE = 500
+
+
+@contextmanager
+def request_class(priority: Optional[str] = None, tenant: Optional[str] = None) -> Iterator[None]:
+    """Run the enclosed model calls with the given priority class and/or tenant."""
+    tokens = []
+    if priority is not None:
+        tokens.append((current_priority, current_priority.set(priority)))
+    if tenant is not None:
+        tokens.append((current_tenant, current_tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def model_lane(model: Any) -> Tuple[str, str]:
+    """(provider, model id) for an Agno model instance (a routing model reports its preferred route)."""
+    if callable(getattr(model, "preferred", None)):
+        model = model.preferred()
+    model_id = str(getattr(model, "id", None) or getattr(model, "model", None) or "default")
+    class_name = type(model).__name__.lower()
+    if "gateway" in class_name:
+        provider = "ai_gateway"
+    elif "claude" in class_name or "anthropic" in class_name:
+        provider = "claude"
+    elif "gemini" in class_name or "google" in class_name:
+        provider = "gemini"
+    elif "openai" in class_name:
+        provider = "openai"
+    else:
+        provider = class_name or "unknown"
+    return provider, model_id
+
+
+def lane_limits(lane: str) -> Tuple[int, int]:
+    """
+    (requests/min, tokens/min) of this worker for a "provider:model" lane (LLM_SCHEDULER_LIMITS,
+    longest match wins). The limits are per pod, so each worker process gets its share.
+    """
+    rpm, tpm = settings.llm_scheduler_default_rpm, settings.llm_scheduler_default_tpm
+    overrides = settings.llm_scheduler_limits or {}
+    matches = [name for name in overrides if name.lower() in lane.lower()]
+    if matches:
+        override = overrides[max(matches, key=len)]
+        rpm = int(override.get("rpm", rpm))
+        tpm = int(override.get("tpm", tpm))
+    return per_worker(rpm), per_worker(tpm)
+
+
+class TokenBucket:
+    """Continuously refilling bucket; capacity is one minute's allowance."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 when available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Settle a reservation: negative delta refunds, positive charges (may go into debt)."""
+        self._refill(time.monotonic())
+        self.level = min(self.capacity, self.level - delta)
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    tag: float
+    seq: int
+    future: asyncio.Future = field(compare=False)
+    tokens: int = field(compare=False)
+    tenant: str = field(compare=False)
+    priority: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+@dataclass
+class ModelSlot:
+    """A granted model call; record_usage() settles the token reservation."""
+
+    lane: "_Lane"
+    reserved_tokens: int
+    wait_seconds: float
+    settled: bool = False
+
+    def record_usage(self, total_tokens: int) -> None:
+        if self.settled or total_tokens <= 0:
+            return
+        self.settled = True
+        self.lane.tpm.adjust(total_tokens - self.reserved_tokens)
+
+
+class _Lane:
+    """Queue and rate limits for one provider/model."""
+
+    def __init__(self, name: str, loop: asyncio.AbstractEventLoop):
+        self.name = name
+        self.loop = loop
+        rpm, tpm = lane_limits(name)
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.queue: List[_Waiter] = []
+        self.seq = itertools.count()
+        # Start-time fair queuing: virtual time and each tenant's last finish tag
+        self.vtime = 0.0
+        self.tenant_finish: Dict[str, float] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.in_flight = 0
+        self.granted = 0
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def enqueue(self, tokens: int, priority: str, tenant: str) -> _Waiter:
+        start = max(self.vtime, self.tenant_finish.get(tenant, 0.0))
+        self.tenant_finish[tenant] = start + tokens
+        waiter = _Waiter(
+            rank=PRIORITY_RANKS.get(priority, PRIORITY_RANKS[PRIORITY_INTERACTIVE]),
+            tag=start,
+            seq=next(self.seq),
+            future=self.loop.create_future(),
+            tokens=tokens,
+            tenant=tenant,
+            priority=priority,
+            enqueued_at=time.monotonic(),
+        )
+        heapq.heappush(self.queue, waiter)
+        self.pump()
+        return waiter
+
+    def pump(self) -> None:
+        """Grant queued calls in order while both buckets allow; otherwise re-arm the timer."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.queue:
+            head = self.queue[0]
+            if head.future.done():  # cancelled while waiting
+                heapq.heappop(self.queue)
+                continue
+            now = time.monotonic()
+            delay = max(self.rpm.wait_time(1, now), self.tpm.wait_time(head.tokens, now))
+            if delay > 0:
+                self.timer = self.loop.call_later(delay, self.pump)
+                return
+            heapq.heappop(self.queue)
+            self.rpm.take(1, now)
+            self.tpm.take(head.tokens, now)
+            self.vtime = max(self.vtime, head.tag)
+            self.granted += 1
+            self.waits.append(now - head.enqueued_at)
+            head.future.set_result(now - head.enqueued_at)
+        # Idle lane: forget the fair-queuing history
+        self.vtime = 0.0
+        self.tenant_finish.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        waiting = [w for w in self.queue if not w.future.done()]
+        by_priority = {name: 0 for name in PRIORITY_RANKS}
+        for waiter in waiting:
+            by_priority[waiter.priority] = by_priority.get(waiter.priority, 0) + 1
+        waits = sorted(self.waits)
+        now = time.monotonic()
+        return {
+            "queue_depth": len(waiting),
+            "queued_by_priority": by_priority,
+            "queued_tenants": len({w.tenant for w in waiting}),
+            "oldest_wait_ms": round((now - min(w.enqueued_at for w in waiting)) * 1000, 1) if waiting else 0.0,
+            "in_flight": self.in_flight,
+            "granted": self.granted,
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else 0.0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            },
+            "limits": {"rpm": int(self.rpm.capacity), "tpm": int(self.tpm.capacity)},
+            "available": {
+                "requests": round(max(0.0, self.rpm.level), 1),
+                "tokens": round(max(0.0, self.tpm.level)),
+            },
+        }
+
+
+class LLMScheduler:
+    """Admits model calls per provider/model lane."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.lanes: Dict[str, _Lane] = {}
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        name = f"{provider}:{model}"
+        lane = self.lanes.get(name)
+        if lane is None:
+            lane = _Lane(name, self.loop)
+            self.lanes[name] = lane
+        return lane
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        provider: str,
+        model: str,
+        estimated_tokens: int,
+        priority: Optional[str] = None,
+        tenant: Optional[str] = None,
+    ) -> AsyncIterator[ModelSlot]:
+        """Wait for a slot in the provider/model lane; the call runs inside the block."""
+        lane = self._lane(provider, model)
+        priority = priority or current_priority.get()
+        tenant = tenant or current_tenant.get() or "default"
+        tokens = max(1, int(estimated_tokens))
+
+        waiter = lane.enqueue(tokens, priority, tenant)
+        try:
+            wait_seconds = await waiter.future
+        except asyncio.CancelledError:
+            if not waiter.future.cancelled() and waiter.future.done():
+                # Granted just as we were cancelled: hand the reservation back
+                lane.rpm.adjust(-1)
+                lane.tpm.adjust(-tokens)
+            else:
+                waiter.future.cancel()
+            lane.pump()
+            raise
+
+        if wait_seconds > 1.0:
+            logger.info("llm_scheduler_wait", lane=lane.name, priority=priority, tenant=tenant,
+                        wait_ms=round(wait_seconds * 1000), tokens=tokens)
+        lane.in_flight += 1
+        try:
+            yield ModelSlot(lane=lane, reserved_tokens=tokens, wait_seconds=wait_seconds)
+        finally:
+            lane.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        lanes = {name: lane.snapshot() for name, lane in sorted(self.lanes.items())}
+        return {
+            "enabled": settings.llm_scheduler_enabled,
+            "lanes": lanes,
+            "totals": {
+                "queue_depth": sum(lane["queue_depth"] for lane in lanes.values()),
+                "in_flight": sum(lane["in_flight"] for lane in lanes.values()),
+                "granted": sum(lane["granted"] for lane in lanes.values()),
+            },
+        }
+
+
+# Futures and timers bind to the loop, so keep one scheduler per loop
+_schedulers = PerLoop(lambda: LLMScheduler(asyncio.get_running_loop()))
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Scheduler for the running loop."""
+    return _schedulers.get()
+
+
+@asynccontextmanager
+async def model_call_slot(model: Any, estimated_tokens: int) -> AsyncIterator[Optional[ModelSlot]]:
+    """Acquire a slot for a call to an Agno model (yields None when the scheduler is disabled)."""
+    if not settings.llm_scheduler_enabled or model is None:
+        yield None
+        return
+    provider, model_id = model_lane(model)
+    async with get_llm_scheduler().acquire(provider, model_id, estimated_tokens) as slot:
+        yield slot
@@ -0,0 +1,483 @@
+"""
+Single-pass Markdown to HTML renderer shared by phase form help and PRD exports.
+
+Block structure is tokenized line by line in one pass and inline spans are rendered
+with a single compiled alternation per block, so rendering cost stays linear in the
+input size. The renderer can also be fed chunk-by-chunk (for SSE streams); each call
+returns the HTML for the blocks that are complete so far.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger()
+
+
+# Tag attributes per theme. "tailwind" matches the classes used by the phase form
+# help UI, "export" produces plain semantic HTML styled by the export stylesheet.
+THEMES: Dict[str, Dict[str, str]] = {
+    "tailwind": {
+        "h1": ' class="text-3xl font-bold mt-8 mb-4"',
+        "h2": ' class="text-2xl font-semibold mt-6 mb-3"',
+        "h3": ' class="text-xl font-semibold mt-4 mb-2"',
+        "h4": ' class="text-lg font-semibold mt-3 mb-2"',
+        "h5": ' class="text-base font-semibold mt-3 mb-1"',
+        "h6": ' class="text-sm font-semibold mt-3 mb-1"',
+        "p": ' class="mb-3 leading-relaxed"',
+        "ul": ' class="list-disc my-3"',
+        "ol": ' class="list-decimal my-3"',
+        "li": ' class="ml-4 mb-1"',
+        "strong": ' class="font-semibold"',
+        "em": ' class="italic"',
+        "pre": ' class="bg-gray-100 p-3 rounded my-2 overflow-x-auto"',
+        "pre_code": ' class="text-sm"',
+        "code": ' class="bg-gray-100 px-1 rounded text-sm"',
+        "a": ' class="text-blue-600 underline" target="_blank" rel="noopener noreferrer"',
+        "blockquote": ' class="border-l-4 border-gray-300 pl-4 my-3 italic"',
+        "table": ' class="table-auto border-collapse my-3"',
+        "hr": ' class="my-4"',
+    },
+    "export": {},
+}
+
+# Themes that keep raw HTML from the source (the PRD export historically passed it
+# through via python-markdown). Everything else is escaped to prevent XSS.
+_RAW_HTML_THEMES = {"export"}
+# Themes that emit id attributes on headings so in-document anchors keep working.
+_HEADING_ID_THEMES = {"export"}
+
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([\w+#.-]*)")
+_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_HR_RE = re.compile(r"^ {0,3}(?:(?:-[ \t]*){3,}|(?:\*[ \t]*){3,}|(?:_[ \t]*){3,})$")
+_LIST_RE = re.compile(r"^([ \t]*)([-*+]|\d{1,9}[.)])[ \t]+(.*)$")
+_QUOTE_RE = re.compile(r"^ {0,3}>[ \t]?(.*)$")
+_TABLE_SEP_RE = re.compile(r"^[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$")
+_HTML_BLOCK_RE = re.compile(
+    r"^ {0,3}</?(?:address|article|aside|blockquote|details|div|dl|fieldset|figure|footer|"
+    r"form|h[1-6]|header|hr|main|nav|ol|p|pre|section|summary|table|ul)\b",
+    re.IGNORECASE,
+)
+
+# Span bodies stop at the next opening delimiter of their own kind (and URLs at
+# whitespace), so a failed match never rescans the rest of the line: unclosed
+# "**" or "[" runs stay linear instead of quadratic. URLs may contain one level
+# of balanced parentheses, e.g. Wikipedia links.
+_URL = r"(?:[^()\s]|\([^()\s]*\))+"
+_INLINE_PATTERN = (
+    r"``(?P<code2>(?:[^`\n]|`(?!`))+?)``"
+    r"|`(?P<code>[^`\n]+)`"
+    r"|!\[(?P<img_alt>[^\[\]\n]*)\]\((?P<img_src>" + _URL + r")(?:[ \t]+\"(?P<img_title>[^\"\n]*)\")?\)"
+    r"|\[(?P<link_text>[^\[\]\n]+)\]\((?P<link_href>" + _URL + r")(?:[ \t]+\"(?P<link_title>[^\"\n]*)\")?\)"
+    r"|<(?P<autolink>https?://[^<>\s]+)>"
+    r"|\*\*(?=\S)(?P<strong>(?:[^*\n]|\*(?!\*))+?)(?<=\S)\*\*"
+    r"|(?<!\w)__(?=\S)(?P<strong_u>(?:[^_\n]|_(?!_))+?)(?<=\S)__(?!\w)"
+    r"|\*(?=[^\s*])(?P<em>[^*\n]+?)(?<=\S)\*"
+    r"|(?<!\w)_(?=[^\s_])(?P<em_u>[^_\n]+?)(?<=\S)_(?!\w)"
+)
+_INLINE_RE = re.compile(_INLINE_PATTERN)
+_INLINE_HTML_RE = re.compile(
+    r"(?P<raw_html></?[A-Za-z][A-Za-z0-9-]*(?:\s[^<>\n]*)?/?>|<!--(?:(?!<!--)[^\n])*?-->)|" + _INLINE_PATTERN
+)
+
+_SLUG_STRIP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SPACE_RE = re.compile(r"[-\s]+")
+_UNSAFE_SCHEMES = ("javascript:", "vbscript:", "data:")
+_HARD_BREAK = "\x00"
+
+
+def _slugify(value: str) -> str:
+    """Build a heading anchor the same way python-markdown's toc extension does."""
+    value = _SLUG_STRIP_RE.sub("", value).strip().lower()
+    return _SLUG_SPACE_RE.sub("-", value)
+
+
+def _safe_url(url: str, allow_data_images: bool = False) -> str:
+    """Neutralize script-capable URL schemes."""
+    lowered = url.strip().lower()
+    if allow_data_images and lowered.startswith("data:image/"):
+        return url
+    if lowered.startswith(_UNSAFE_SCHEMES):
+        return "#"
+    return url
+
+
+def _split_table_row(line: str) -> List[str]:
+    """Split a pipe-table row into cell strings."""
+    row = line.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|") and not row.endswith("\\|"):
+        row = row[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", row)]
+
+
+class IncrementalMarkdownRenderer:
+    """
+    Streaming Markdown renderer.
+
+    Call ``feed`` with arbitrary text chunks; it returns the HTML for every block that
+    has been closed by the new input. ``close`` flushes whatever block is still open.
+    Each line is inspected exactly once, so total work is linear in the input.
+    """
+
+    def __init__(self, theme: str = "tailwind"):
+        if theme not in THEMES:
+            raise ValueError(f"Unknown markdown theme: {theme}")
+        self.theme = theme
+        self._attrs = THEMES[theme]
+        self._raw_html = theme in _RAW_HTML_THEMES
+        self._heading_ids = theme in _HEADING_ID_THEMES
+        self._inline_re = _INLINE_HTML_RE if self._raw_html else _INLINE_RE
+
+        self._pending = ""  # Incomplete trailing line
+        self._out: List[str] = []
+        self._slugs: Dict[str, int] = {}
+
+        # Open block state
+        self._para: List[str] = []
+        self._fence: Optional[Tuple[str, str]] = None  # (marker, language)
+        self._code: List[str] = []
+        self._lists: List[Tuple[int, str]] = []  # Stack of (indent, "ul"|"ol")
+        self._list_blank = False
+        self._quote: List[str] = []
+        self._table_aligns: Optional[List[str]] = None
+
+    # ------------------------------------------------------------------ public API
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk of Markdown and return HTML for newly completed blocks."""
+        if not chunk:
+            return ""
+        data = self._pending + chunk
+        lines = data.split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._line(line.rstrip("\r"))
+        return self._drain()
+
+    def close(self) -> str:
+        """Flush the trailing line and any open block, returning the final HTML."""
+        if self._pending:
+            self._line(self._pending.rstrip("\r"))
+            self._pending = ""
+        if self._fence is not None:
+            self._close_code()
+        self._close_blocks()
+        return self._drain()
+
+    # ---------------------------------------------------------------- tokenization
+
+    def _line(self, line: str) -> None:
+        """Classify one source line and update the block state."""
+        if self._fence is not None:
+            marker = self._fence[0]
+            if line.strip().startswith(marker) and not line.strip().strip(marker[0]):
+                self._close_code()
+            else:
+                self._code.append(line)
+            return
+
+        if not line.strip():
+            if self._lists:
+                self._list_blank = True
+            else:
+                self._close_blocks()
+            return
+
+        fence = _FENCE_RE.match(line)
+        if fence:
+            self._close_blocks()
+            self._fence = (fence.group(1), fence.group(2))
+            return
+
+        if self._table_aligns is not None:
+            if "|" in line:
+                self._table_row(line, "td")
+                return
+            self._close_table()
+
+        quote = _QUOTE_RE.match(line)
+        if quote:
+            if not self._quote:
+                self._close_blocks()
+            self._quote.append(quote.group(1))
+            return
+        if self._quote:
+            self._close_quote()
+
+        item = _LIST_RE.match(line)
+        if item and not _HR_RE.match(line):
+            self._list_item(item)
+            return
+
+        if self._lists:
+            if self._list_blank or not line[:1].isspace():
+                self._close_lists()
+            else:
+                # Lazy continuation of the current list item
+                self._out.append(" " + self._inline(line.strip()))
+                return
+
+        heading = _HEADING_RE.match(line)
+        if heading:
+            self._close_blocks()
+            self._heading(len(heading.group(1)), heading.group(2) or "")
+            return
+
+        if _HR_RE.match(line):
+            if self._para and line.strip().startswith("-"):
+                # Setext-style H2 underline
+                text = " ".join(part.strip() for part in self._para)
+                self._para = []
+                self._heading(2, text)
+                return
+            self._close_blocks()
+            self._out.append(f"<hr{self._attrs.get('hr', '')} />\n")
+            return
+
+        if self._para and _TABLE_SEP_RE.match(line) and "|" in self._para[-1]:
+            header = self._para.pop()
+            self._close_paragraph()
+            self._table_aligns = self._alignments(line)
+            self._out.append(f"<table{self._attrs.get('table', '')}>\n<thead>\n")
+            self._table_row(header, "th")
+            self._out.append("</thead>\n<tbody>\n")
+            return
+
+        if self._raw_html and not self._para and _HTML_BLOCK_RE.match(line):
+            self._out.append(line + "\n")
+            return
+
+        self._para.append(line)
+
+    # ------------------------------------------------------------ block rendering
+
+    def _heading(self, level: int, text: str) -> None:
+        tag = f"h{level}"
+        attrs = self._attrs.get(tag, "")
+        if self._heading_ids:
+            slug = _slugify(text) or "section"
+            count = self._slugs.get(slug, 0)
+            self._slugs[slug] = count + 1
+            if count:
+                slug = f"{slug}_{count}"
+            attrs = f' id="{slug}"{attrs}'
+        self._out.append(f"<{tag}{attrs}>{self._inline(text.strip())}</{tag}>\n")
+
+    def _list_item(self, match: "re.Match[str]") -> None:
+        self._close_paragraph()
+        indent = len(match.group(1).expandtabs(4))
+        tag = "ol" if match.group(2)[0].isdigit() else "ul"
+        self._list_blank = False
+
+        while self._lists and indent < self._lists[-1][0]:
+            self._out.append(f"</li>\n</{self._lists.pop()[1]}>\n")
+
+        if not self._lists or indent > self._lists[-1][0]:
+            if self._lists:
+                self._out.append("\n")
+            self._lists.append((indent, tag))
+            self._out.append(f"<{tag}{self._attrs.get(tag, '')}>\n")
+        elif self._lists[-1][1] != tag:
+            self._out.append(f"</li>\n</{self._lists.pop()[1]}>\n")
+            self._lists.append((indent, tag))
+            self._out.append(f"<{tag}{self._attrs.get(tag, '')}>\n")
+        else:
+            self._out.append("</li>\n")
+
+        self._out.append(f"<li{self._attrs.get('li', '')}>{self._inline(match.group(3).strip())}")
+
+    def _table_row(self, line: str, cell_tag: str) -> None:
+        aligns = self._table_aligns or []
+        cells = _split_table_row(line)
+        parts = ["<tr>"]
+        for index, cell in enumerate(cells):
+            align = aligns[index] if index < len(aligns) else ""
+            style = f' style="text-align: {align};"' if align else ""
+            parts.append(f"<{cell_tag}{style}>{self._inline(cell)}</{cell_tag}>")
+        parts.append("</tr>\n")
+        self._out.append("".join(parts))
+
+    @staticmethod
+    def _alignments(separator: str) -> List[str]:
+        aligns = []
+        for cell in _split_table_row(separator):
+            left, right = cell.startswith(":"), cell.endswith(":")
+            aligns.append("center" if left and right else "right" if right else "left" if left else "")
+        return aligns
+
+    def _close_paragraph(self) -> None:
+        if not self._para:
+            return
+        lines = [line[:-2].rstrip() + _HARD_BREAK if line.endswith("  ") else line.strip() for line in self._para]
+        self._para = []
+        body = self._inline("\n".join(lines)).replace(_HARD_BREAK, "<br />")
+        self._out.append(f"<p{self._attrs.get('p', '')}>{body}</p>\n")
+
+    def _close_code(self) -> None:
+        language = self._fence[1] if self._fence else ""
+        self._fence = None
+        code = escape("\n".join(self._code), quote=False)
+        self._code = []
+        code_attrs = self._attrs.get("pre_code", "")
+        if language:
+            lang_class = f"language-{escape(language)}"
+            if code_attrs.startswith(' class="'):
+                code_attrs = f' class="{lang_class} {code_attrs[8:]}'
+            else:
+                code_attrs = f' class="{lang_class}"{code_attrs}'
+        self._out.append(f"<pre{self._attrs.get('pre', '')}><code{code_attrs}>{code}\n</code></pre>\n")
+
+    def _close_lists(self) -> None:
+        while self._lists:
+            self._out.append(f"</li>\n</{self._lists.pop()[1]}>\n")
+        self._list_blank = False
+
+    def _close_quote(self) -> None:
+        if not self._quote:
+            return
+        inner = IncrementalMarkdownRenderer(self.theme)
+        inner._slugs = self._slugs
+        body = inner.feed("\n".join(self._quote) + "\n") + inner.close()
+        self._quote = []
+        self._out.append(f"<blockquote{self._attrs.get('blockquote', '')}>\n{body}</blockquote>\n")
+
+    def _close_table(self) -> None:
+        if self._table_aligns is None:
+            return
+        self._table_aligns = None
+        self._out.append("</tbody>\n</table>\n")
+
+    def _close_blocks(self) -> None:
+        self._close_paragraph()
+        self._close_lists()
+        self._close_quote()
+        self._close_table()
+
+    def _drain(self) -> str:
+        html = "".join(self._out)
+        self._out = []
+        return html
+
+    # ------------------------------------------------------------ inline rendering
+
+    def _inline(self, text: str, depth: int = 0) -> str:
+        """Render inline spans with one scan of the compiled alternation."""
+        out: List[str] = []
+        pos = 0
+        for match in self._inline_re.finditer(text):
+            out.append(escape(text[pos:match.start()], quote=False))
+            out.append(self._span(match, depth))
+            pos = match.end()
+        out.append(escape(text[pos:], quote=False))
+        return "".join(out)
+
+    def _nested(self, text: str, depth: int) -> str:
+        if depth >= 4:
+            return escape(text, quote=False)
+        return self._inline(text, depth + 1)
+
+    def _span(self, match: "re.Match[str]", depth: int) -> str:
+        group = match.lastgroup
+        value = match.group(group)
+        attrs = self._attrs
+        if group == "raw_html":
+            return value
+        if group in ("code", "code2"):
+            return f"<code{attrs.get('code', '')}>{escape(value.strip(), quote=False)}</code>"
+        if group in ("strong", "strong_u"):
+            return f"<strong{attrs.get('strong', '')}>{self._nested(value, depth)}</strong>"
+        if group in ("em", "em_u"):
+            return f"<em{attrs.get('em', '')}>{self._nested(value, depth)}</em>"
+        if group == "autolink":
+            href = escape(_safe_url(value))
+            return f'<a href="{href}"{attrs.get("a", "")}>{escape(value, quote=False)}</a>'
+        if group in ("img_src", "img_title"):
+            src = escape(_safe_url(match.group("img_src"), allow_data_images=True))
+            alt = escape(match.group("img_alt") or "")
+            title = match.group("img_title")
+            title_attr = f' title="{escape(title)}"' if title else ""
+            return f'<img alt="{alt}" src="{src}"{title_attr} />'
+        if group in ("link_href", "link_title"):
+            href = escape(_safe_url(match.group("link_href")))
+            title = match.group("link_title")
+            title_attr = f' title="{escape(title)}"' if title else ""
+            text = self._nested(match.group("link_text"), depth)
+            return f'<a href="{href}"{title_attr}{attrs.get("a", "")}>{text}</a>'
+        return escape(match.group(0), quote=False)
+
+
+def render_markdown(markdown_text: str, theme: str = "tailwind") -> str:
+    """Render a complete Markdown document to HTML in a single pass."""
+    renderer = IncrementalMarkdownRenderer(theme)
+    return renderer.feed(markdown_text) + renderer.close()
+
+
+class _RenderCache:
+    """Thread-safe LRU of rendered HTML keyed by theme and content hash."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: str, html: str) -> None:
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+_render_cache = _RenderCache(maxsize=settings.markdown_render_cache_size)
+
+
+def content_hash(markdown_text: str) -> str:
+    """Stable hash of Markdown content, used as the render cache key."""
+    return hashlib.sha256(markdown_text.encode("utf-8")).hexdigest()
+
+
+def render_markdown_cached(markdown_text: str, theme: str = "export") -> str:
+    """Render Markdown to HTML, reusing the result for identical content."""
+    key = f"{theme}:{content_hash(markdown_text)}"
+    html = _render_cache.get(key)
+    if html is not None:
+        logger.debug("markdown_render_cache_hit", theme=theme, chars=len(markdown_text))
+        return html
+    html = render_markdown(markdown_text, theme=theme)
+    _render_cache.put(key, html)
+    return html
+
+
+def get_render_cache_stats() -> Dict[str, int]:
+    """Expose render cache counters for metrics endpoints."""
+    return _render_cache.stats()
@@ -0,0 +1,59 @@
+"""
+Password hashing with bcrypt.
+
+Hashing or checking a password at 12 rounds costs about 250 ms of CPU, so request
+handlers use the async variants, which run it in the CPU pool (services.cpu_executor)
+instead of on the event loop. The module only imports bcrypt and passlib, keeping
+the pool's worker processes light.
+"""
+import bcrypt
+import structlog
+from passlib.context import CryptContext
+
+logger = structlog.get_logger()
+
+BCRYPT_ROUNDS = 12
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt (directly, like verify_password, to avoid passlib issues)."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash."""
+    if not hashed_password:
+        return False
+
+    try:
+        # Convert hashed_password to bytes if it's a string
+        if isinstance(hashed_password, str):
+            hashed_bytes = hashed_password.encode("utf-8")
+        else:
+            hashed_bytes = hashed_password
+
+        # Use bcrypt directly to avoid passlib issues
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_bytes)
+    except Exception as e:
+        # Fallback to passlib if bcrypt fails
+        try:
+            return pwd_context.verify(plain_password, hashed_password)
+        except Exception:
+            logger.warning("password_verification_failed", error=str(e))
+            return False
+
+
+async def hash_password_async(password: str) -> str:
+    from backend.services.cpu_executor import run_cpu_bound
+
+    return await run_cpu_bound(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    if not hashed_password:
+        return False
+    from backend.services.cpu_executor import run_cpu_bound
+
+    return await run_cpu_bound(verify_password, plain_password, hashed_password)
@@ -0,0 +1,250 @@
+"""
+Write-behind persistence for conversation messages.
+
+Streamed responses and direct agent calls used to persist every exchange with its
+own tenant lookup, session lookup, optional session insert and two message inserts
+(the streaming path even on the request's session, after the response had ended).
+They now enqueue a ConversationWrite and return. A background writer on the running
+loop persists everything queued so far in one transaction on its own pooled session:
+- tenants and latest sessions are resolved with one query each for the whole batch,
+- missing sessions and all messages are written with multi-row INSERT ... VALUES.
+
+A batch is flushed once PERSISTENCE_BATCH_SIZE messages are queued or
+PERSISTENCE_FLUSH_INTERVAL_MS after its first write. The queue is bounded, so when
+the database falls behind enqueue() waits (backpressure) instead of buffering
+without limit. shutdown_persistence_queue() flushes what is left on shutdown. If a
+batch fails, its writes are retried one by one so one bad row does not drop others.
+"""
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import text
+
+from backend.config import settings
+from backend.services.redis_cache import PerLoop
+
+logger = structlog.get_logger()
+
+# Keeps each statement well below the driver's bind parameter limit
+MAX_ROWS_PER_STATEMENT = 500
+
+
+@dataclass
+class ConversationMessage:
+    message_type: str  # 'user' | 'agent' | 'system'
+    content: str
+    agent_name: Optional[str] = None
+    agent_role: Optional[str] = None
+    interaction_metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class ConversationWrite:
+    """Messages of one exchange; the session is resolved (or created) by the writer."""
+
+    user_id: str
+    messages: List[ConversationMessage]
+    product_id: Optional[str] = None
+    session_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    phase_id: Optional[str] = None
+    session_title: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def _insert_values(table: str, columns: List[str], rows: List[Dict[str, Any]],
+                   casts: Optional[Dict[str, str]] = None) -> Tuple[Any, Dict[str, Any]]:
+    """A multi-row INSERT ... VALUES statement and its parameters."""
+    casts = casts or {}
+    groups, params = [], {}
+    for i, row in enumerate(rows):
+        values = []
+        for column in columns:
+            name = f"{column}_{i}"
+            params[name] = row.get(column)
+            values.append(f"CAST(:{name} AS {casts[column]})" if column in casts else f":{name}")
+        groups.append(f"({', '.join(values)})")
+    return text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(groups)}"), params
+
+
+class PersistenceQueue:
+    """Bounded queue of conversation writes and the background task that flushes it."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        if session_factory is None:
+            from backend.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+        self.session_factory = session_factory
+        self.queue: "asyncio.Queue[ConversationWrite]" = asyncio.Queue(maxsize=max(1, settings.persistence_queue_max_size))
+        self.worker: Optional[asyncio.Task] = None
+        self.closed = False
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+
+    async def enqueue(self, write: ConversationWrite) -> None:
+        """Queue a write; waits while the queue is full. After shutdown the write is flushed directly."""
+        if self.closed:
+            await self._flush([write])
+            return
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+        await self.queue.put(write)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            rows = len(batch[0].messages)
+            deadline = loop.time() + settings.persistence_flush_interval_ms / 1000
+            while rows < settings.persistence_batch_size:
+                try:
+                    write = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        write = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(write)
+                rows += len(write.messages)
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _flush(self, batch: List[ConversationWrite]) -> None:
+        try:
+            async with self.session_factory() as db:
+                await self._write_batch(db, batch)
+                await db.commit()
+            self.batches += 1
+            self.written += sum(len(write.messages) for write in batch)
+            logger.debug("conversation_batch_persisted", writes=len(batch))
+        except Exception as e:
+            if len(batch) > 1:
+                logger.warning("conversation_batch_failed", writes=len(batch), error=str(e))
+                for write in batch:
+                    await self._flush([write])
+            else:
+                self.failed += 1
+                logger.error("failed_to_save_conversation", error=str(e), user_id=batch[0].user_id,
+                             session_id=batch[0].session_id)
+
+    async def _write_batch(self, db: Any, batch: List[ConversationWrite]) -> None:
+        # Tenants of users that were not passed one
+        missing_tenants = sorted({w.user_id for w in batch if not w.tenant_id})
+        tenants: Dict[str, Optional[str]] = {}
+        if missing_tenants:
+            result = await db.execute(
+                text("SELECT id, tenant_id FROM user_profiles WHERE id = ANY(CAST(:ids AS uuid[]))"),
+                {"ids": missing_tenants},
+            )
+            tenants = {str(row[0]): str(row[1]) if row[1] else None for row in result.fetchall()}
+
+        # Latest session per (product, user) for writes without a session
+        keys = sorted({(w.product_id, w.user_id) for w in batch if not w.session_id and w.product_id})
+        latest: Dict[Tuple[str, str], str] = {}
+        if keys:
+            result = await db.execute(
+                text("""
+                    SELECT DISTINCT ON (product_id, user_id) id, product_id, user_id
+                    FROM conversation_sessions
+                    WHERE product_id = ANY(CAST(:product_ids AS uuid[]))
+                    AND user_id = ANY(CAST(:user_ids AS uuid[]))
+                    ORDER BY product_id, user_id, created_at DESC
+                """),
+                {"product_ids": sorted({k[0] for k in keys}), "user_ids": sorted({k[1] for k in keys})},
+            )
+            latest = {(str(row[1]), str(row[2])): str(row[0]) for row in result.fetchall()}
+
+        sessions: List[Dict[str, Any]] = []
+        messages: List[Dict[str, Any]] = []
+        for write in batch:
+            tenant_id = write.tenant_id or tenants.get(write.user_id)
+            session_id = write.session_id
+            if not session_id and write.product_id:
+                session_id = latest.get((write.product_id, write.user_id))
+            if not session_id:
+                session_id = str(uuid.uuid4())
+                if write.product_id:
+                    latest[(write.product_id, write.user_id)] = session_id
+                sessions.append({
+                    "id": session_id,
+                    "user_id": write.user_id,
+                    "product_id": write.product_id,
+                    "tenant_id": tenant_id,
+                    "title": f"Product {write.product_id[:8]}..." if write.product_id
+                    else (write.session_title or "New Conversation"),
+                })
+            for offset, message in enumerate(write.messages):
+                messages.append({
+                    "id": str(uuid.uuid4()),
+                    "session_id": session_id,
+                    "product_id": write.product_id,
+                    "message_type": message.message_type,
+                    "agent_name": message.agent_name,
+                    "agent_role": message.agent_role,
+                    "content": message.content,
+                    "interaction_metadata": json.dumps(message.interaction_metadata or {}, default=str),
+                    "tenant_id": tenant_id,
+                    "phase_id": write.phase_id,
+                    # Keeps the order of an exchange's messages
+                    "created_at": write.created_at + timedelta(microseconds=offset),
+                })
+
+        for start in range(0, len(sessions), MAX_ROWS_PER_STATEMENT):
+            statement, params = _insert_values(
+                "conversation_sessions", ["id", "user_id", "product_id", "tenant_id", "title"],
+                sessions[start:start + MAX_ROWS_PER_STATEMENT],
+            )
+            await db.execute(statement, params)
+        for start in range(0, len(messages), MAX_ROWS_PER_STATEMENT):
+            statement, params = _insert_values(
+                "conversation_history",
+                ["id", "session_id", "product_id", "message_type", "agent_name", "agent_role",
+                 "content", "interaction_metadata", "tenant_id", "phase_id", "created_at"],
+                messages[start:start + MAX_ROWS_PER_STATEMENT],
+                casts={"interaction_metadata": "jsonb"},
+            )
+            await db.execute(statement, params)
+
+    async def close(self) -> None:
+        """Flush queued writes (bounded by PERSISTENCE_SHUTDOWN_TIMEOUT) and stop the writer."""
+        self.closed = True
+        if self.worker is not None and not self.worker.done():
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=settings.persistence_shutdown_timeout)
+            except asyncio.TimeoutError:
+                logger.error("conversation_queue_flush_timeout", pending=self.queue.qsize())
+            self.worker.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"queued": self.queue.qsize(), "batches": self.batches, "written": self.written, "failed": self.failed}
+
+
+# The queue and its writer task bind to the loop, so keep one per loop
+_queues = PerLoop(PersistenceQueue)
+
+
+def get_persistence_queue() -> PersistenceQueue:
+    return _queues.get()
+
+
+async def enqueue_conversation_write(write: ConversationWrite) -> None:
+    await get_persistence_queue().enqueue(write)
+
+
+async def shutdown_persistence_queue() -> None:
+    """Flush the running loop's queue (application shutdown)."""
+    queue = _queues.pop()
+    if queue is not None:
+        await queue.close()
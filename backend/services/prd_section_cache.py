@@ -0,0 +1,112 @@
+"""
+Section-level memoization for agent-army PRD generation.
+
+Every PRD section is keyed by a hash of exactly the inputs its prompt template
+consumes. Generated sections are persisted in Postgres (prd_section_cache) so that
+re-exports after a small edit only regenerate the sections whose inputs changed,
+even across restarts. A per-pod semaphore caps in-flight section generations.
+"""
+import asyncio
+import hashlib
+import json
+from string import Formatter
+from typing import Any, Dict, Set
+
+import structlog
+from sqlalchemy import text
+
+from backend.config import settings
+from backend.services.redis_cache import PerLoop
+
+logger = structlog.get_logger()
+
+# Bump when the way sections are generated changes enough to invalidate stored content
+SECTION_CACHE_VERSION = 1
+
+# asyncio primitives bind to the loop that first waits on them, so keep one per loop
+_section_semaphores = PerLoop(lambda: asyncio.Semaphore(max(1, settings.prd_section_max_concurrency)))
+
+
+def get_section_semaphore() -> asyncio.Semaphore:
+    """Get the per-pod limiter for concurrent section generations."""
+    return _section_semaphores.get()
+
+
+def template_fields(template: str) -> Set[str]:
+    """Return the placeholder names a prompt template formats."""
+    return {field.split(".")[0].split("[")[0] for _, field, _, _ in Formatter().parse(template) if field}
+
+
+def compute_section_input_hash(section_def: Dict[str, str], values: Dict[str, Any]) -> str:
+    """Hash the section definition together with only the values its template reads."""
+    template = section_def["prompt_template"]
+    payload = {
+        "version": SECTION_CACHE_VERSION,
+        "section": section_def["section"],
+        "agent_type": section_def["agent_type"],
+        "template": template,
+        "inputs": {field: values.get(field) for field in sorted(template_fields(template))},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PRDSectionCache:
+    """Postgres-backed store of the latest generated content per (product, section)."""
+
+    async def get_many(self, product_id: str, input_hashes: Dict[str, str]) -> Dict[str, str]:
+        """Return cached content for every section whose stored hash still matches."""
+        if not settings.prd_section_cache_enabled or not input_hashes:
+            return {}
+        try:
+            from backend.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    text("""
+                        SELECT section, input_hash, content
+                        FROM prd_section_cache
+                        WHERE product_id = :product_id
+                    """),
+                    {"product_id": product_id},
+                )
+                rows = result.fetchall()
+        except Exception as e:
+            logger.warning("prd_section_cache_read_failed", product_id=product_id, error=str(e))
+            return {}
+
+        return {
+            section: content
+            for section, input_hash, content in rows
+            if input_hashes.get(section) == input_hash
+        }
+
+    async def put(self, product_id: str, section: str, agent_type: str, input_hash: str, content: str) -> None:
+        """Store the latest content for a section, replacing any older version."""
+        if not settings.prd_section_cache_enabled:
+            return
+        try:
+            from backend.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    text("""
+                        INSERT INTO prd_section_cache (product_id, section, input_hash, agent_type, content)
+                        VALUES (:product_id, :section, :input_hash, :agent_type, :content)
+                        ON CONFLICT (product_id, section) DO UPDATE SET
+                            input_hash = EXCLUDED.input_hash,
+                            agent_type = EXCLUDED.agent_type,
+                            content = EXCLUDED.content,
+                            updated_at = now()
+                    """),
+                    {
+                        "product_id": product_id,
+                        "section": section,
+                        "input_hash": input_hash,
+                        "agent_type": agent_type,
+                        "content": content,
+                    },
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("prd_section_cache_write_failed", product_id=product_id, section=section, error=str(e))
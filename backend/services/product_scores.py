@@ -0,0 +1,160 @@
+"""
+Incremental product idea scoring.
+
+Scoring used to send the complete product context to the model in one call and
+store a full new product_idea_scores row on every run. Now each dimension is scored
+by its own call from only the inputs it depends on (DIMENSION_INPUTS), and the hash
+of those inputs is stored with the dimension in scoring_data. On the next run only
+dimensions whose input hash changed are re-scored (concurrently); the others are
+carried over from the latest score, and when nothing changed the latest score is
+returned without a model call or a new row.
+
+Tenant dashboards read the latest score per product from the tenant_product_scores
+materialized view, which is refreshed after each write (refresh_tenant_scores()).
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from sqlalchemy import text
+
+from backend.services.redis_cache import PerLoop
+
+logger = structlog.get_logger()
+
+# Bump when the dimension prompts change enough to invalidate stored dimension scores
+SCORING_VERSION = 1
+
+# Dimension -> (weight in the overall score, inputs it is scored from)
+DIMENSION_INPUTS = {
+    "market_opportunity": (25, ("product_summary", "market_context")),
+    "user_value": (25, ("product_summary", "user_feedback")),
+    "business_value": (20, ("product_summary", "market_context")),
+    "technical_feasibility": (15, ("product_summary", "technical_context")),
+    "risk_assessment": (15, ("product_summary", "market_context", "technical_context")),
+}
+
+TENANT_SCORES_VIEW = "tenant_product_scores"
+
+
+def dimension_inputs(dimension: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of the scoring context a dimension is scored from."""
+    _, names = DIMENSION_INPUTS[dimension]
+    return {name: context.get(name) for name in names}
+
+
+def input_hash(dimension: str, inputs: Dict[str, Any]) -> str:
+    payload = json.dumps({"version": SCORING_VERSION, "dimension": dimension, "inputs": inputs},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _number(value: Any) -> float:
+    try:
+        return max(0.0, min(100.0, float(value)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def combine_dimensions(dimensions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Overall score, success probability and merged lists from the dimension results."""
+    total_weight = sum(DIMENSION_INPUTS[name][0] for name in dimensions) or 1
+    overall = sum(_number(result.get("score")) * DIMENSION_INPUTS[name][0] for name, result in dimensions.items())
+    probability = sum(
+        _number(result.get("success_probability", result.get("score"))) * DIMENSION_INPUTS[name][0]
+        for name, result in dimensions.items()
+    )
+    recommendations: List[Dict[str, Any]] = []
+    success_factors: List[str] = []
+    risk_factors: List[str] = []
+    for name, result in dimensions.items():
+        recommendations.extend({"dimension": name, **item} for item in result.get("recommendations") or []
+                               if isinstance(item, dict))
+        success_factors.extend(f for f in result.get("success_factors") or [] if f not in success_factors)
+        risk_factors.extend(f for f in result.get("risk_factors") or [] if f not in risk_factors)
+    return {
+        "overall_score": round(overall / total_weight, 2),
+        "success_probability": round(probability / total_weight, 2),
+        "dimensions": dimensions,
+        "recommendations": recommendations,
+        "success_factors": success_factors,
+        "risk_factors": risk_factors,
+    }
+
+
+async def score_incrementally(
+    agent: Any,
+    context: Dict[str, Any],
+    previous_dimensions: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Score every dimension, re-scoring only those whose inputs changed since previous_dimensions.
+
+    The result has the combine_dimensions() fields plus "rescored" (dimension names scored
+    by this call); each dimension carries its "input_hash".
+    """
+    if not isinstance(previous_dimensions, dict):
+        previous_dimensions = {}
+    dimensions: Dict[str, Dict[str, Any]] = {}
+    stale: Dict[str, tuple] = {}
+    for name in DIMENSION_INPUTS:
+        inputs = dimension_inputs(name, context)
+        digest = input_hash(name, inputs)
+        previous = previous_dimensions.get(name)
+        if isinstance(previous, dict) and previous.get("input_hash") == digest and "error" not in previous:
+            dimensions[name] = previous
+        else:
+            stale[name] = (inputs, digest)
+
+    results = await asyncio.gather(*(agent.score_dimension(name, inputs) for name, (inputs, _) in stale.items()))
+    for (name, (_, digest)), result in zip(stale.items(), results):
+        dimensions[name] = {**result, "input_hash": digest}
+
+    combined = combine_dimensions({name: dimensions[name] for name in DIMENSION_INPUTS})
+    combined["rescored"] = list(stale)
+    logger.info("product_scored", rescored=len(stale), carried_over=len(DIMENSION_INPUTS) - len(stale))
+    return combined
+
+
+class ViewRefresher:
+    """Refreshes a materialized view, coalescing concurrent requests.
+
+    At most one refresh runs at a time; writes that land while it runs trigger one
+    more refresh, and every caller waits for a refresh that started after its write.
+    """
+
+    def __init__(self, view: str, session_factory: Optional[Callable[[], Any]] = None):
+        self.view = view
+        self.session_factory = session_factory
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        session_factory = self.session_factory
+        if session_factory is None:
+            from backend.database import AsyncSessionLocal as session_factory
+
+        while self._dirty:
+            self._dirty = False
+            try:
+                async with session_factory() as db:
+                    await db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self.view}"))
+                    await db.commit()
+            except Exception as e:
+                logger.warning("materialized_view_refresh_failed", view=self.view, error=str(e))
+
+    async def refresh(self) -> None:
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        # A cancelled caller must not cancel the refresh other writers are waiting on
+        await asyncio.shield(self._task)
+
+
+_refreshers = PerLoop(lambda: ViewRefresher(TENANT_SCORES_VIEW))
+
+
+async def refresh_tenant_scores() -> None:
+    """Bring the tenant_product_scores view up to date after a score was written."""
+    await _refreshers.get().refresh()
@@ -0,0 +1,120 @@
+"""
+Cache-friendly system prompt layout.
+
+Provider prompt caches (OpenAI automatic prefix caching, Anthropic cache_control)
+only match byte-identical prefixes, so system prompts are assembled in three tiers:
+
+1. static  - agent system prompt and fixed instructions (identical for every call)
+2. product - context that is stable for a product (form data, previous phases, KB)
+3. request - per-request context (conversation, current field, agent hand-offs)
+
+The layout of the prompt being sent is published through a ContextVar so model
+wrappers can place Anthropic cache_control breakpoints at the tier boundaries and
+keep volatile request context out of the cached blocks.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+
+TIER_SEPARATOR = "\n\n"
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """System prompt split into cacheable tiers."""
+
+    static: str
+    product: str = ""
+    request: str = ""
+
+    @property
+    def stable_prefix(self) -> str:
+        """Static and product tiers: the part worth caching."""
+        return TIER_SEPARATOR.join(part for part in (self.static, self.product) if part)
+
+    def render(self) -> str:
+        return TIER_SEPARATOR.join(part for part in (self.static, self.product, self.request) if part)
+
+
+current_prompt_layout: ContextVar[Optional[PromptLayout]] = ContextVar("current_prompt_layout", default=None)
+
+
+def cache_control_enabled(model_id: Optional[str]) -> bool:
+    """cache_control breakpoints are only understood by Anthropic models."""
+    if not settings.prompt_cache_control_enabled or not model_id:
+        return False
+    model_lower = str(model_id).lower()
+    return model_lower.startswith("claude") or "anthropic" in model_lower
+
+
+def system_content_parts(text: str, model_id: Optional[str]) -> Any:
+    """
+    Content for a system-derived message: plain text, or text parts with cache_control
+    on the static and product tiers when the text contains the current layout.
+    """
+    layout = current_prompt_layout.get()
+    rendered = layout.render() if layout is not None else ""
+    if not rendered or not cache_control_enabled(model_id) or rendered not in text:
+        return text
+
+    # Text the framework adds around the instructions stays with the neighbouring tier
+    start = text.index(rendered)
+    lead, tail = text[:start], text[start + len(rendered):]
+    tiers = [
+        (layout.static, True),
+        (layout.product, True),
+        (TIER_SEPARATOR.join(part for part in (layout.request, tail.strip()) if part), False),
+    ]
+    parts: List[Dict[str, Any]] = []
+    for tier_text, cached in tiers:
+        if not tier_text:
+            continue
+        part: Dict[str, Any] = {"type": "text", "text": tier_text if parts else lead + tier_text}
+        if cached:
+            part["cache_control"] = CACHE_CONTROL
+        parts.append(part)
+    return parts
+
+
+def request_context_blocks() -> List[Any]:
+    """
+    Volatile request tier as an uncached Agno Claude system block.
+
+    Used as Claude.system_prompt_blocks (evaluated per request) while the agent
+    instructions carry only the cached stable prefix.
+    """
+    layout = current_prompt_layout.get()
+    if layout is None or not layout.request:
+        return []
+    from agno.models.anthropic.claude import SystemPromptBlock
+
+    return [SystemPromptBlock(text=layout.request, cache=False)]
+
+
+def _read(usage: Any, key: str) -> int:
+    if usage is None:
+        return 0
+    value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+    return int(value or 0)
+
+
+def extract_cache_usage(usage: Any) -> Dict[str, int]:
+    """
+    Normalize cached-token counts from provider usage payloads or Agno metrics:
+    - OpenAI: usage.prompt_tokens_details.cached_tokens
+    - Anthropic: usage.cache_read_input_tokens / cache_creation_input_tokens
+    - Agno metrics: cache_read_tokens / cache_write_tokens
+    """
+    if usage is None:
+        return {"cached": 0, "cache_write": 0}
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    cached = (
+        _read(usage, "cache_read_tokens")
+        or _read(usage, "cache_read_input_tokens")
+        or _read(details, "cached_tokens")
+    )
+    cache_write = _read(usage, "cache_write_tokens") or _read(usage, "cache_creation_input_tokens")
+    return {"cached": cached, "cache_write": cache_write}
@@ -1,17 +1,39 @@
 from __future__ import annotations
 
 from threading import Lock
-from typing import List, Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, List, Optional
+import importlib
 import random
 import os
-
-from openai import OpenAI
-from anthropic import Anthropic
-import google.generativeai as genai
+import sys
 
 from backend.config import settings
 from backend.services.ai_gateway_client import AIGatewayClient
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from anthropic import Anthropic
+
+# Provider SDK modules. They are imported on first use rather than at startup:
+# together they account for several seconds of backend import time.
+PROVIDER_SDK_MODULES = {
+    "openai": "openai",
+    "claude": "anthropic",
+    "gemini": "google.generativeai",
+    "gemini_errors": "google.api_core.exceptions",
+}
+
+
+def import_provider_sdk(provider: str) -> ModuleType:
+    """Import (or return the already imported) SDK module for a provider."""
+    return importlib.import_module(PROVIDER_SDK_MODULES[provider])
+
+
+def loaded_provider_sdk(provider: str) -> Optional[ModuleType]:
+    """SDK module for a provider if something already imported it, without importing it."""
+    return sys.modules.get(PROVIDER_SDK_MODULES[provider])
+
 
 class ProviderRegistry:
     """Centralized registry for AI provider credentials and clients.
@@ -70,49 +92,11 @@ class ProviderRegistry:
 
     def _rebuild_clients(self) -> None:
         """Rebuild provider clients from current keys. Can be called to refresh clients after keys are updated."""
-        # Only create clients if keys are non-empty after stripping
-        # For OpenAI, we create a client with the primary key (first in list)
+        # SDK clients are created on first use (see get_openai_client / get_claude_client)
         self._openai_client = None
-        if self._openai_keys:
-            primary_key = self._openai_keys[0].strip()
-            if primary_key:
-                try:
-                    self._openai_client = OpenAI(api_key=primary_key)
-                except Exception as e:
-                    import structlog
-                    logger = structlog.get_logger()
-                    logger.warning("openai_client_creation_failed", error=str(e))
-                    self._openai_client = None
-        elif self._openai_key and self._openai_key.strip():
-            try:
-                self._openai_client = OpenAI(api_key=self._openai_key.strip())
-            except Exception as e:
-                import structlog
-                logger = structlog.get_logger()
-                logger.warning("openai_client_creation_failed", error=str(e))
-                self._openai_client = None
-        
         self._claude_client = None
-        if self._claude_key and self._claude_key.strip():
-            try:
-                self._claude_client = Anthropic(api_key=self._claude_key.strip())
-            except Exception as e:
-                import structlog
-                logger = structlog.get_logger()
-                logger.warning("claude_client_creation_failed", error=str(e))
-                self._claude_client = None
-        
         self._gemini_configured = False
-        if self._gemini_key and self._gemini_key.strip():
-            try:
-                genai.configure(api_key=self._gemini_key.strip())
-                self._gemini_configured = True
-            except Exception as e:
-                import structlog
-                logger = structlog.get_logger()
-                logger.warning("gemini_client_creation_failed", error=str(e))
-                self._gemini_configured = False
-        
+
         # Rebuild AI Gateway client (only if enabled)
         self._ai_gateway_client = None
         ai_gateway_enabled = getattr(settings, 'ai_gateway_enabled', False)
@@ -199,20 +183,59 @@ class ProviderRegistry:
 
         return self.get_configured_providers()
 
+    def _primary_openai_key(self) -> Optional[str]:
+        # For OpenAI, clients use the primary key (first in list)
+        if self._openai_keys:
+            return self._openai_keys[0].strip() or None
+        return (self._openai_key or "").strip() or None
+
     def get_openai_client(self) -> Optional[OpenAI]:
+        api_key = self._primary_openai_key()
+        if self._openai_client is None and api_key:
+            with self._lock:
+                if self._openai_client is None:
+                    try:
+                        self._openai_client = import_provider_sdk("openai").OpenAI(api_key=api_key)
+                    except Exception as e:
+                        import structlog
+                        logger = structlog.get_logger()
+                        logger.warning("openai_client_creation_failed", error=str(e))
         return self._openai_client
 
     def get_claude_client(self) -> Optional[Anthropic]:
+        api_key = (self._claude_key or "").strip()
+        if self._claude_client is None and api_key:
+            with self._lock:
+                if self._claude_client is None:
+                    try:
+                        self._claude_client = import_provider_sdk("claude").Anthropic(api_key=api_key)
+                    except Exception as e:
+                        import structlog
+                        logger = structlog.get_logger()
+                        logger.warning("claude_client_creation_failed", error=str(e))
         return self._claude_client
 
-    def has_gemini_key(self) -> bool:
+    def configure_gemini(self) -> bool:
+        """Configure the google.generativeai SDK with the current key (imports it on first call)."""
+        api_key = (self._gemini_key or "").strip()
+        if not self._gemini_configured and api_key:
+            try:
+                import_provider_sdk("gemini").configure(api_key=api_key)
+                self._gemini_configured = True
+            except Exception as e:
+                import structlog
+                logger = structlog.get_logger()
+                logger.warning("gemini_client_creation_failed", error=str(e))
         return self._gemini_configured
 
+    def has_gemini_key(self) -> bool:
+        return bool((self._gemini_key or "").strip())
+
     def has_openai_key(self) -> bool:
-        return self._openai_client is not None
+        return self._primary_openai_key() is not None
 
     def has_claude_key(self) -> bool:
-        return self._claude_client is not None
+        return bool((self._claude_key or "").strip())
 
     def get_configured_providers(self) -> List[str]:
         providers: List[str] = []
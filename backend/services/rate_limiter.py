@@ -0,0 +1,222 @@
+"""
+Distributed rate limiting with GCRA (generic cell rate algorithm) in Redis.
+
+Every check is a single Redis round trip: one Lua script evaluates all of a
+request's buckets (e.g. per user, per tenant, per user and endpoint) atomically,
+consumes from all of them only when every bucket allows the request, and
+otherwise returns how long to wait. A bucket stores one timestamp (its
+theoretical arrival time), so it costs one key regardless of its limit.
+Requests can be cost-weighted: a request with cost 5 consumes five units.
+
+A local token bucket per key runs first. A process can never legitimately use
+more than a bucket's whole limit, and keys Redis rejected stay blocked locally
+until their retry time, so rejected bursts are answered without touching Redis.
+When Redis is unavailable the local buckets alone apply, each worker enforcing its
+share of every limit (config.per_worker).
+"""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, List, Optional, Sequence, Tuple
+
+import structlog
+
+from backend.config import per_worker, settings
+from backend.services.redis_cache import PerLoop, RedisBackoff
+
+logger = structlog.get_logger()
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# KEYS: bucket keys. ARGV: limit, period (ms), cost for each key, in order.
+# Returns {allowed, retry_after_ms, remaining, index of the rejecting key (1-based) or 0}.
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local retry_after = 0
+local rejected = 0
+local remaining = -1
+local tats = {}
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 3 - 2])
+  local period = tonumber(ARGV[i * 3 - 1])
+  local cost = tonumber(ARGV[i * 3])
+  local interval = period / limit
+  local tat = tonumber(redis.call('GET', key)) or now
+  if tat < now then
+    tat = now
+  end
+  local new_tat = tat + cost * interval
+  local allowed_in = new_tat - period - now
+  if cost > limit then
+    allowed_in = period
+  end
+  if allowed_in > 0 then
+    if allowed_in > retry_after then
+      retry_after = allowed_in
+      rejected = i
+    end
+  else
+    local left = math.floor(-allowed_in / interval)
+    if remaining < 0 or left < remaining then
+      remaining = left
+    end
+  end
+  tats[i] = new_tat
+end
+if rejected > 0 then
+  return {0, math.ceil(retry_after), 0, rejected}
+end
+for i, key in ipairs(KEYS) do
+  redis.call('SET', key, tostring(tats[i]), 'PX', math.max(1, math.ceil(tats[i] - now)))
+end
+return {1, 0, remaining, 0}
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """"10/minute" -> (10, 60.0)."""
+    count, _, period = rate.partition("/")
+    return int(count), float(PERIODS[period.strip().rstrip("s")])
+
+
+@dataclass
+class Limit:
+    """A bucket: `limit` units per `period` seconds, of which a request takes `cost`."""
+
+    key: str
+    limit: int
+    period: float
+    cost: int = 1
+
+    @classmethod
+    def from_rate(cls, key: str, rate: str, cost: int = 1) -> "Limit":
+        limit, period = parse_rate(rate)
+        return cls(key=key, limit=limit, period=period, cost=cost)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: float = 0.0
+    remaining: Optional[int] = None
+    limit: Optional[Limit] = None  # The bucket that rejected the request
+    source: str = "redis"  # "local" when answered without Redis
+
+
+class LocalLimiter:
+    """Per-process token buckets and remembered Redis rejections, LRU-bounded."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max(1, max_keys)
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # key -> [tokens, updated, blocked_until]
+
+    def _bucket(self, limit: Limit, now: float) -> List[float]:
+        bucket = self.buckets.get(limit.key)
+        if bucket is None:
+            bucket = [float(limit.limit), now, 0.0]
+            self.buckets[limit.key] = bucket
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(limit.key)
+            bucket[0] = min(float(limit.limit), bucket[0] + (now - bucket[1]) * limit.limit / limit.period)
+            bucket[1] = now
+        return bucket
+
+    def acquire(self, limits: Sequence[Limit], now: Optional[float] = None) -> Optional[RateLimitResult]:
+        """Take each request's cost from every bucket, or none; a result only when rejected."""
+        now = time.monotonic() if now is None else now
+        buckets = [self._bucket(limit, now) for limit in limits]
+        for limit, bucket in zip(limits, buckets):
+            if bucket[2] > now:
+                return RateLimitResult(False, bucket[2] - now, 0, limit, "local")
+            if bucket[0] < limit.cost:
+                wait = (limit.cost - bucket[0]) * limit.period / limit.limit if limit.cost <= limit.limit else limit.period
+                return RateLimitResult(False, wait, 0, limit, "local")
+        for limit, bucket in zip(limits, buckets):
+            bucket[0] -= limit.cost
+        return None
+
+    def release(self, limits: Sequence[Limit]) -> None:
+        """Give back what acquire() took (the request was rejected elsewhere)."""
+        for limit in limits:
+            bucket = self.buckets.get(limit.key)
+            if bucket is not None:
+                bucket[0] = min(float(limit.limit), bucket[0] + limit.cost)
+
+    def block(self, limit: Limit, retry_after: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._bucket(limit, now)[2] = now + retry_after
+
+
+class RateLimiter:
+    """Checks a request against several buckets in one Redis round trip."""
+
+    def __init__(self, redis_client: Any = None, local: Optional[LocalLimiter] = None):
+        self._redis = RedisBackoff(redis_client)
+        self._script = None
+        self.local = local or LocalLimiter(settings.rate_limit_local_max_keys)
+        self.stats = {"allowed": 0, "rejected_local": 0, "rejected_redis": 0, "redis_errors": 0}
+
+    def _get_script(self):
+        if self._script is None:
+            client = self._redis.client()
+            if client is None:
+                return None
+            # EVALSHA, falling back to EVAL once when the script is not loaded yet
+            self._script = client.register_script(GCRA_SCRIPT)
+        return self._script
+
+    async def check(self, limits: Sequence[Limit]) -> RateLimitResult:
+        script = self._get_script()
+        if script is None:
+            # The local buckets are the only check, and every worker has its own
+            limits = [replace(limit, limit=per_worker(limit.limit)) for limit in limits]
+        rejected = self.local.acquire(limits)
+        if rejected is not None:
+            self.stats["rejected_local"] += 1
+            return rejected
+
+        if script is None:
+            self.stats["allowed"] += 1
+            return RateLimitResult(True, source="local")
+
+        args: List[Any] = []
+        for limit in limits:
+            args += [limit.limit, int(limit.period * 1000), limit.cost]
+        try:
+            allowed, retry_after_ms, remaining, index = await script(
+                keys=[f"ratelimit:{limit.key}" for limit in limits], args=args
+            )
+        except Exception as e:
+            # Fail open on the local buckets; retry Redis after a pause
+            self.stats["redis_errors"] += 1
+            logger.warning("rate_limit_redis_failed", error=str(e))
+            self._script = None
+            self._redis.failed()
+            self.stats["allowed"] += 1
+            return RateLimitResult(True, source="local")
+
+        if int(allowed):
+            self.stats["allowed"] += 1
+            return RateLimitResult(True, remaining=int(remaining))
+
+        self.stats["rejected_redis"] += 1
+        self.local.release(limits)
+        limit = limits[int(index) - 1]
+        retry_after = int(retry_after_ms) / 1000
+        self.local.block(limit, retry_after)
+        return RateLimitResult(False, retry_after, 0, limit)
+
+
+_limiters = PerLoop(RateLimiter)
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _limiters.get()
+
+
+def retry_after_header(retry_after: float) -> str:
+    return str(max(1, math.ceil(retry_after)))
@@ -1,38 +1,119 @@
-"""Redis-based response cache service for distributed caching across multiple backend pods."""
+"""
+Redis-based response cache service for distributed caching across multiple backend pods,
+plus the shared Redis client, its failure back-off and per-event-loop instances.
+"""
+import asyncio
 import json
+import time
+import weakref
 import structlog
-from typing import Optional, Dict, Any
+from typing import Callable, Generic, Optional, Dict, Any, TypeVar
 from datetime import datetime, timedelta
 import redis.asyncio as redis
-from backend.config import settings
+from backend.config import per_worker, settings
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+# Seconds to wait before trying to reach Redis again after a failure
+REDIS_RETRY_INTERVAL = 30
+
+# One connection pool per worker process, shared by every Redis client and sized to
+# the worker's share of REDIS_MAX_CONNECTIONS; callers wait for a free connection
+# (up to REDIS_POOL_TIMEOUT) instead of opening more
+_connection_pool: Optional[redis.BlockingConnectionPool] = None
+
+
+def create_redis_client() -> redis.Redis:
+    """Redis client on the process-wide connection pool."""
+    global _connection_pool
+    if _connection_pool is None:
+        _connection_pool = redis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=per_worker(settings.redis_max_connections),
+            timeout=settings.redis_pool_timeout,
+            encoding="utf-8",
+            decode_responses=True,
+        )
+    return redis.Redis(connection_pool=_connection_pool)
+
+
+class RedisBackoff:
+    """
+    Redis client created on first use. After a failure the caller runs without Redis
+    for REDIS_RETRY_INTERVAL seconds, then a new client is tried.
+    """
+
+    def __init__(self, client: Any = None):
+        self._client = client
+        self.retry_at = 0.0
+
+    def client(self) -> Any:
+        """The client, or None while backing off."""
+        if self._client is None:
+            if time.monotonic() < self.retry_at:
+                return None
+            self._client = create_redis_client()
+        return self._client
+
+    def failed(self) -> None:
+        """Drop the client after an error and back off."""
+        self._client = None
+        self.retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+    def disable(self) -> None:
+        """Never use Redis (tests and single-process benchmarks)."""
+        self._client = None
+        self.retry_at = float("inf")
+
+
+class PerLoop(Generic[T]):
+    """
+    One instance per event loop, built by factory on first use. Redis and httpx
+    clients, tasks, futures and asyncio primitives bind to the loop that first uses
+    them; an instance is dropped with its loop.
+    """
+
+    def __init__(self, factory: Callable[[], T], stale: Optional[Callable[[T], bool]] = None):
+        self._factory = factory
+        self._stale = stale  # Rebuilds an instance it returns True for (e.g. a closed client)
+        self._instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T]" = weakref.WeakKeyDictionary()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        instance = self._instances.get(loop)
+        if instance is None or (self._stale is not None and self._stale(instance)):
+            instance = self._factory()
+            self._instances[loop] = instance
+        return instance
+
+    def pop(self) -> Optional[T]:
+        """Forget the running loop's instance and return it (application shutdown)."""
+        return self._instances.pop(asyncio.get_running_loop(), None)
+
 
 class RedisCache:
     """Redis-based cache for agent responses with TTL support."""
     
-    def __init__(self, ttl: int = 3600):
+    def __init__(self, ttl: int = 3600, prefix: str = "agent_cache:"):
         """Initialize Redis cache.
         
         Args:
             ttl: Time-to-live in seconds (default: 1 hour)
+            prefix: Key namespace for this cache (default: agent responses)
         """
         self._redis_client: Optional[redis.Redis] = None
         self._fallback_cache: Dict[str, tuple] = {}  # Fallback in-memory storage: {key: (timestamp, value)}
         self.ttl = ttl
-        self._cache_prefix = "agent_cache:"
+        self._cache_prefix = prefix
     
     async def _get_redis_client(self) -> Optional[redis.Redis]:
         """Get or create Redis client."""
         if self._redis_client is None:
             try:
                 redis_url = settings.redis_url
-                self._redis_client = await redis.from_url(
-                    redis_url,
-                    encoding="utf-8",
-                    decode_responses=True
-                )
+                self._redis_client = create_redis_client()
                 # Test connection
                 await self._redis_client.ping()
                 logger.info("redis_cache_connected", url=redis_url)
@@ -0,0 +1,334 @@
+"""
+Circuit breakers and adaptive timeouts for upstream calls.
+
+There is one breaker per upstream (AI Gateway, OpenAI, Anthropic, Gemini, v0.dev,
+Lovable, Confluence, GitHub), credential and endpoint. Users bring their own API keys
+and Atlassian sites, so one tenant's exhausted quota or broken site opens only the
+circuit of that key and host:
+- After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failures (connection errors,
+  timeouts, 5xx, 429) the circuit opens for the cooldown, or for the upstream's
+  Retry-After when it sent one. Calls then fail fast with CircuitOpenError, which
+  the API turns into a 503 with a Retry-After header.
+- When the cooldown ends one probe call is let through (half-open): success closes
+  the circuit, failure opens it again.
+- The open state is written to Redis, so once one pod finds an upstream down the
+  other pods fail fast too instead of each rediscovering the outage at full cost.
+
+Client errors (other 4xx, e.g. a user's invalid API key) say nothing about the
+upstream's health and never open a circuit.
+
+Each breaker also keeps the latencies of recent successful calls; timeout() returns
+a multiple of their p99 (within bounds), so calls to an upstream that normally
+answers in 2 s give up long before a fixed 30-60 s timeout would.
+"""
+import asyncio
+import hashlib
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+import structlog
+
+from backend.config import settings
+from backend.services.redis_cache import RedisCache
+
+logger = structlog.get_logger()
+
+# Upstream names; the model providers match the lanes of llm_scheduler.model_lane
+UPSTREAM_AI_GATEWAY = "ai_gateway"
+UPSTREAM_OPENAI = "openai"
+UPSTREAM_ANTHROPIC = "claude"
+UPSTREAM_GEMINI = "gemini"
+UPSTREAM_V0 = "v0"
+UPSTREAM_LOVABLE = "lovable"
+UPSTREAM_CONFLUENCE = "confluence"
+UPSTREAM_GITHUB = "github"
+# Knowledge-base retrieval (vector DB + embeddings) in the coordinator
+UPSTREAM_RAG = "rag"
+
+# Host suffix -> upstream, for clients shared by several upstreams
+UPSTREAM_HOSTS = {
+    "v0.dev": UPSTREAM_V0,
+    "lovable.dev": UPSTREAM_LOVABLE,
+    "atlassian.net": UPSTREAM_CONFLUENCE,
+    "atlassian.com": UPSTREAM_CONFLUENCE,
+    "github.com": UPSTREAM_GITHUB,
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Below this many successful samples the p99 is not trusted and the default timeout applies
+MIN_TIMEOUT_SAMPLES = 20
+# Breakers kept per process; the oldest is dropped first (an open state comes back from Redis)
+MAX_BREAKERS = 1000
+
+_shared_state: Optional[RedisCache] = None
+
+
+def _get_shared_state() -> RedisCache:
+    global _shared_state
+    if _shared_state is None:
+        _shared_state = RedisCache(ttl=int(settings.circuit_breaker_max_cooldown), prefix="circuit:")
+    return _shared_state
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"{upstream} is temporarily unavailable; retry after {self.retry_after}s")
+
+
+def credential_hash(secret: Optional[str]) -> str:
+    """Stable, non-reversible key for a credential (API key or Authorization header)."""
+    return hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:32]
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an exception says the upstream is unhealthy (as opposed to a bad request)."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if not isinstance(status, int):
+        return True  # connection errors and timeouts
+    return status >= 500 or status in (408, 429)
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date)."""
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Failure tracking, open/half-open/closed state and latency window for one upstream."""
+
+    def __init__(self, name: str, upstream: Optional[str] = None):
+        self.name = name
+        self.upstream = upstream or name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_until = 0.0  # wall clock, comparable across pods
+        self.probing = False
+        self.latencies: Deque[float] = deque(maxlen=max(1, settings.adaptive_timeout_window))
+        self.synced_at = 0.0
+        self.opened_count = 0
+        self.rejected = 0
+
+    async def _sync(self) -> None:
+        """Adopt an open state published by another pod (read at most every sync interval)."""
+        now = time.monotonic()
+        if now - self.synced_at < settings.circuit_breaker_sync_interval:
+            return
+        self.synced_at = now
+        shared = await _get_shared_state().get(self.name)
+        if shared and shared.get("opened_until", 0) > self.opened_until:
+            self.opened_until = shared["opened_until"]
+            self.state = OPEN
+
+    async def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be sent now."""
+        if not settings.circuit_breaker_enabled:
+            return
+        await self._sync()
+        if self.state == CLOSED:
+            return
+        now = time.time()
+        if now < self.opened_until:
+            self.rejected += 1
+            raise CircuitOpenError(self.upstream, self.opened_until - now)
+        if self.probing:
+            # Half-open lets a single probe through; the rest keep failing fast
+            self.rejected += 1
+            raise CircuitOpenError(self.upstream, settings.circuit_breaker_sync_interval)
+        self.state = HALF_OPEN
+        self.probing = True
+
+    async def record_success(self, latency: Optional[float] = None) -> None:
+        """The upstream answered; latency is omitted for answers that are not representative (4xx)."""
+        if latency is not None:
+            self.latencies.append(latency)
+        self.failures = 0
+        self.probing = False
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.opened_until = 0.0
+            logger.info("circuit_closed", upstream=self.upstream, breaker=self.name)
+            await _get_shared_state().delete(self.name)
+
+    async def record_failure(self, retry_after: Optional[float] = None) -> None:
+        """The upstream failed; opens the circuit at the threshold or when a probe fails."""
+        self.failures += 1
+        self.probing = False
+        if self.state != HALF_OPEN and self.failures < settings.circuit_breaker_failure_threshold:
+            return
+        cooldown = min(retry_after or settings.circuit_breaker_cooldown, settings.circuit_breaker_max_cooldown)
+        self.opened_until = time.time() + cooldown
+        self.state = OPEN
+        self.opened_count += 1
+        logger.warning("circuit_opened", upstream=self.upstream, breaker=self.name, failures=self.failures, cooldown=round(cooldown, 1))
+        await _get_shared_state().set(self.name, {"opened_until": self.opened_until, "failures": self.failures})
+
+    def release(self) -> None:
+        """The call ended without an outcome (cancelled); let another probe through."""
+        self.probing = False
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Run the block as a call to the upstream: fail fast when open, record the outcome."""
+        await self.before_call()
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                await self.record_failure(retry_after_seconds(getattr(getattr(e, "response", None), "headers", None)))
+            else:
+                await self.record_success()
+            raise
+        await self.record_success(time.monotonic() - start)
+
+    def timeout(self, default: float, floor: Optional[float] = None, ceiling: Optional[float] = None) -> float:
+        """Timeout for the next call: p99 of recent latencies times the multiplier, within [floor, ceiling]."""
+        if not settings.adaptive_timeouts_enabled or len(self.latencies) < MIN_TIMEOUT_SAMPLES:
+            return default
+        latencies = sorted(self.latencies)
+        p99 = latencies[int(0.99 * (len(latencies) - 1))]
+        floor = settings.adaptive_timeout_min if floor is None else floor
+        ceiling = default if ceiling is None else ceiling
+        return min(ceiling, max(floor, p99 * settings.adaptive_timeout_multiplier))
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        retry_after = max(0.0, self.opened_until - time.time())
+        if state == OPEN and retry_after == 0:
+            state = HALF_OPEN  # the next call will probe
+        latencies = sorted(self.latencies)
+        return {
+            "state": state,
+            "consecutive_failures": self.failures,
+            "retry_after": math.ceil(retry_after) if state == OPEN else 0,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": round(latencies[len(latencies) // 2] * 1000) if latencies else None,
+                "p99": round(latencies[int(0.99 * (len(latencies) - 1))] * 1000) if latencies else None,
+            },
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(upstream: str, credential: Optional[str] = None, endpoint: Optional[str] = None) -> CircuitBreaker:
+    """
+    Breaker for calls to upstream made with credential (API key or Authorization header)
+    at endpoint (host); calls with neither share the upstream's breaker.
+    """
+    name = upstream
+    if credential or endpoint:
+        name = f"{upstream}:{endpoint or 'default'}:{credential_hash(credential)[:12]}"
+    breaker = _breakers.get(name)
+    if breaker is None:
+        if len(_breakers) >= MAX_BREAKERS:
+            _breakers.pop(next(iter(_breakers)))
+        breaker = CircuitBreaker(name, upstream)
+        _breakers[name] = breaker
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State of every breaker used by this process (for /health and /api/metrics)."""
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
+
+
+def upstream_for_host(host: str) -> Optional[str]:
+    host = (host or "").lower()
+    for suffix, upstream in UPSTREAM_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return upstream
+    return None
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends each request through its upstream's breaker."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: Optional[str] = None,
+                 adaptive_timeout: Optional[float] = None):
+        self.transport = transport
+        self.upstream = upstream
+        # When set, the read timeout adapts to the upstream's latency with this as the ceiling
+        self.adaptive_timeout = adaptive_timeout
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = self.upstream or upstream_for_host(request.url.host)
+        if upstream is None:
+            return await self.transport.handle_async_request(request)
+        credential = request.headers.get("authorization") or request.headers.get("x-api-key")
+        breaker = get_breaker(upstream, credential, request.url.host)
+        await breaker.before_call()
+        if self.adaptive_timeout is not None:
+            timeouts = dict(request.extensions.get("timeout") or {})
+            timeouts["read"] = breaker.timeout(self.adaptive_timeout)
+            request.extensions["timeout"] = timeouts
+
+        start = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            await breaker.record_failure()
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            await breaker.record_failure(retry_after_seconds(response.headers))
+        elif response.status_code >= 400:
+            await breaker.record_success()
+        else:
+            await breaker.record_success(time.monotonic() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def resilient_client(upstream: Optional[str] = None, *, timeout: Optional[float] = None,
+                     adaptive: Optional[bool] = None, verify: bool = True, **kwargs: Any) -> httpx.AsyncClient:
+    """
+    AsyncClient whose requests go through the circuit breaker of `upstream` (or of the
+    request host when None). The read timeout adapts to the upstream's observed latency,
+    up to `timeout` (UPSTREAM_HTTP_TIMEOUT when not given); an explicit timeout is used
+    as-is unless adaptive=True.
+    """
+    if adaptive is None:
+        adaptive = timeout is None
+    base_timeout = settings.upstream_http_timeout if timeout is None else timeout
+    transport_kwargs = {"limits": kwargs.pop("limits")} if "limits" in kwargs else {}
+    transport = CircuitBreakerTransport(
+        httpx.AsyncHTTPTransport(verify=verify, **transport_kwargs),
+        upstream=upstream,
+        adaptive_timeout=base_timeout if adaptive else None,
+    )
+    return httpx.AsyncClient(timeout=base_timeout, verify=verify, transport=transport, **kwargs)
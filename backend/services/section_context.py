@@ -0,0 +1,129 @@
+"""
+Per-section context selection for agent-army PRD generation.
+
+Instead of formatting every section prompt with the whole product corpus (phase
+submissions, conversation history, knowledge base), the corpus of one export is
+split into chunks and indexed in memory with embeddings. Each section then gets the
+chunks most similar to what the section asks for, up to a token budget, reassembled
+in their original order. When the corpus already fits the budget nothing is
+embedded and every section gets it whole; without an embedder, chunks are ranked by
+term overlap with the section instead.
+"""
+import re
+from dataclasses import dataclass
+from string import Formatter
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import structlog
+
+from backend.services.context_packer import count_tokens
+
+logger = structlog.get_logger()
+
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+# Template fields that carry the product corpus and are sliced per section
+SLICED_SOURCES = ("phase_submissions", "conversation_history", "knowledge_base")
+
+# Section query vectors depend only on the (static) templates and embedder model
+_query_vectors: Dict[str, np.ndarray] = {}
+
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+
+@dataclass
+class ArtifactChunk:
+    """A unit of product context: one phase submission, message window or article."""
+
+    source: str
+    position: int
+    text: str
+    tokens: int
+
+
+def section_query(section_def: Dict[str, str]) -> str:
+    """What a section asks for: its name plus the literal text of its template."""
+    literal = "".join(text for text, _, _, _ in Formatter().parse(section_def["prompt_template"]))
+    return f"{section_def['section']}\n{literal}"
+
+
+def build_chunks(pieces: Dict[str, Sequence[str]]) -> List[ArtifactChunk]:
+    """Chunks from already formatted pieces per source, in document order."""
+    chunks = []
+    for source, texts in pieces.items():
+        for position, text in enumerate(texts):
+            if text and text.strip():
+                chunks.append(ArtifactChunk(source, position, text, count_tokens(text)))
+    return chunks
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _terms(text: str) -> set:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+class SectionContextIndex:
+    """In-memory index over one export's artifact chunks."""
+
+    def __init__(self, chunks: List[ArtifactChunk], vectors: Optional[np.ndarray] = None,
+                 embed: Optional[EmbedFn] = None, embed_key: str = ""):
+        self.chunks = chunks
+        self.vectors = vectors
+        self.embed = embed
+        self.embed_key = embed_key
+        self.total_tokens = sum(chunk.tokens for chunk in chunks)
+
+    @classmethod
+    async def build(cls, chunks: List[ArtifactChunk], budget: int,
+                    embed: Optional[EmbedFn] = None, embed_key: str = "") -> "SectionContextIndex":
+        """Embed the chunks (skipped when the corpus fits the budget or no embedder is available)."""
+        index = cls(chunks, embed=embed, embed_key=embed_key)
+        if embed is None or index.total_tokens <= budget or not chunks:
+            return index
+        try:
+            vectors = await embed([chunk.text for chunk in chunks])
+            index.vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        except Exception as e:
+            logger.warning("section_context_embedding_failed", chunks=len(chunks), error=str(e))
+            index.embed = None
+        return index
+
+    async def _scores(self, query: str) -> np.ndarray:
+        if self.vectors is not None and self.embed is not None:
+            cache_key = f"{self.embed_key}:{query}"
+            query_vector = _query_vectors.get(cache_key)
+            if query_vector is None:
+                try:
+                    query_vector = _normalize(np.asarray((await self.embed([query]))[0], dtype=np.float32))
+                    _query_vectors[cache_key] = query_vector
+                except Exception as e:
+                    logger.warning("section_query_embedding_failed", error=str(e))
+            if query_vector is not None:
+                return self.vectors @ query_vector
+        query_terms = _terms(query)
+        return np.asarray(
+            [len(query_terms & _terms(chunk.text)) / (1 + len(query_terms)) for chunk in self.chunks],
+            dtype=np.float32,
+        )
+
+    async def select(self, section_def: Dict[str, str], budget: int) -> Dict[str, List[str]]:
+        """Most relevant chunks for a section within `budget` tokens, per source in original order."""
+        if self.total_tokens <= budget:
+            chosen = self.chunks
+        else:
+            scores = await self._scores(section_query(section_def))
+            chosen, used = [], 0
+            for i in np.argsort(-scores, kind="stable"):
+                chunk = self.chunks[int(i)]
+                if used + chunk.tokens <= budget:
+                    chosen.append(chunk)
+                    used += chunk.tokens
+        selected: Dict[str, List[str]] = {}
+        for chunk in sorted(chosen, key=lambda c: (c.source, c.position)):
+            selected.setdefault(chunk.source, []).append(chunk.text)
+        return selected
@@ -0,0 +1,260 @@
+"""
+Hierarchical, cached summarization of conversation sessions.
+
+Multi-session product summaries used to put every message of every selected
+session into one prompt and regenerate it from scratch on each request. Now:
+- Map: each session is summarized on its own, sessions concurrently (at most
+  SUMMARY_MAX_CONCURRENCY at a time). A session longer than
+  SUMMARY_SESSION_TOKEN_BUDGET is split into budget-sized chunks that are
+  summarized in parallel and then combined.
+- Session summaries are persisted in Postgres (session_summary_cache) together
+  with the id of the newest message they cover. While that is still the newest
+  message the summary is reused; when messages were added, only those are folded
+  into the stored summary (one small model call).
+  Callers pass those cache entries to summarize() and only need to load the
+  messages from each entry's last_message_id on.
+- Reduce: the session summaries are combined into the product summary, in
+  budget-sized groups when there are many. Every combine is cached in Redis by a
+  hash of its inputs, so an unchanged selection costs no model call at all. A new
+  message costs its update, the combine of its session's group, and the final
+  combine of the group summaries. The final combine cannot be skipped, because the
+  product summary has to reflect the change. Its input stays within the token
+  budget, so it costs about as much as the update call.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import text
+
+from backend.config import settings
+from backend.services.context_packer import count_tokens, truncate_to_tokens
+from backend.services.redis_cache import RedisCache
+
+logger = structlog.get_logger()
+
+# Bump when the combine prompt changes enough to invalidate cached product summaries
+SUMMARY_CACHE_VERSION = 1
+REDUCE_CACHE_TTL = 86400
+
+_reduce_cache: Optional[RedisCache] = None
+
+
+def _get_reduce_cache() -> RedisCache:
+    global _reduce_cache
+    if _reduce_cache is None:
+        _reduce_cache = RedisCache(ttl=REDUCE_CACHE_TTL, prefix="summary_reduce:")
+    return _reduce_cache
+
+
+def split_by_budget(items: List[Any], cost, budget: int) -> List[List[Any]]:
+    """Split items, in order, into groups whose total cost stays within budget (one item at least)."""
+    groups: List[List[Any]] = []
+    current: List[Any] = []
+    used = 0
+    for item in items:
+        item_cost = cost(item)
+        if current and used + item_cost > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += item_cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+class SessionSummaryCache:
+    """Postgres-backed store of the latest summary per conversation session."""
+
+    async def get_many(self, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not settings.summary_cache_enabled or not session_ids:
+            return {}
+        try:
+            from backend.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    text("""
+                        SELECT session_id, last_message_id, message_count, summary
+                        FROM session_summary_cache
+                        WHERE session_id = ANY(CAST(:session_ids AS uuid[]))
+                    """),
+                    {"session_ids": session_ids},
+                )
+                rows = result.fetchall()
+        except Exception as e:
+            logger.warning("session_summary_cache_read_failed", error=str(e))
+            return {}
+        return {
+            str(session_id): {"last_message_id": str(last_message_id), "message_count": message_count, "summary": summary}
+            for session_id, last_message_id, message_count, summary in rows
+        }
+
+    async def put(self, session_id: str, last_message_id: str, message_count: int, summary: str) -> None:
+        if not settings.summary_cache_enabled:
+            return
+        try:
+            from backend.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    text("""
+                        INSERT INTO session_summary_cache (session_id, last_message_id, message_count, summary)
+                        VALUES (:session_id, :last_message_id, :message_count, :summary)
+                        ON CONFLICT (session_id) DO UPDATE SET
+                            last_message_id = EXCLUDED.last_message_id,
+                            message_count = EXCLUDED.message_count,
+                            summary = EXCLUDED.summary,
+                            updated_at = now()
+                    """),
+                    {
+                        "session_id": session_id,
+                        "last_message_id": last_message_id,
+                        "message_count": message_count,
+                        "summary": summary,
+                    },
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("session_summary_cache_write_failed", session_id=session_id, error=str(e))
+
+
+class HierarchicalSummarizer:
+    """Map-reduce summarization of sessions with the summary agent."""
+
+    def __init__(self, agent: Any, cache: Optional[SessionSummaryCache] = None):
+        self.agent = agent
+        self.cache = cache or SessionSummaryCache()
+        self.budget = max(500, settings.summary_session_token_budget)
+        self.stats = {"cached": 0, "incremental": 0, "full": 0, "model_calls": 0, "combines_cached": 0}
+
+    def _message_tokens(self, message: Dict[str, Any]) -> int:
+        # Content plus the role/timestamp prefix added by the agent's formatting
+        return count_tokens(message.get("content") or "") + 16
+
+    def _fit(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Cut single messages that are larger than the whole budget."""
+        fitted = []
+        for message in messages:
+            if self._message_tokens(message) > self.budget:
+                message = {**message, "content": truncate_to_tokens(message.get("content") or "", self.budget - 16)}
+            fitted.append(message)
+        return fitted
+
+    async def _summarize_messages(self, session: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+        """Summary of a whole session: one call, or one per budget-sized chunk plus a combine."""
+        chunks = split_by_budget(self._fit(messages), self._message_tokens, self.budget)
+        partials = await asyncio.gather(*(
+            self.agent.create_session_summary(
+                session_id=session["session_id"],
+                messages=chunk,
+                participants=session.get("participants"),
+            )
+            for chunk in chunks
+        ))
+        self.stats["model_calls"] += len(chunks)
+        if len(partials) == 1:
+            return partials[0]
+        return await self._reduce(
+            [{"session_id": session["session_id"], "title": f"{session.get('title') or 'Session'} (part {i + 1})",
+              "summary": partial} for i, partial in enumerate(partials)],
+            product_context=None,
+        )
+
+    async def _update(self, session: Dict[str, Any], summary: str, new_messages: List[Dict[str, Any]]) -> str:
+        """Fold new messages into an existing summary, in budget-sized steps."""
+        for chunk in split_by_budget(self._fit(new_messages), self._message_tokens, self.budget):
+            summary = await self.agent.update_session_summary(
+                session_id=session["session_id"], previous_summary=summary, new_messages=chunk
+            )
+            self.stats["model_calls"] += 1
+        return summary
+
+    async def summarize_session(self, session: Dict[str, Any], cached: Optional[Dict[str, Any]]) -> str:
+        """
+        Summary of one session. With a cache entry, the messages may start at the entry's
+        last_message_id (those before it are already in the summary).
+        """
+        messages = session.get("messages") or []
+        if not messages:
+            return ""
+        ids = [str(message.get("id")) for message in messages]
+        last_id = ids[-1]
+
+        if cached and cached["last_message_id"] == last_id:
+            self.stats["cached"] += 1
+            return cached["summary"]
+        if cached and cached["last_message_id"] in ids:
+            self.stats["incremental"] += 1
+            new_messages = messages[ids.index(cached["last_message_id"]) + 1:]
+            summary = await self._update(session, cached["summary"], new_messages)
+            message_count = cached["message_count"] + len(new_messages)
+        else:
+            self.stats["full"] += 1
+            summary = await self._summarize_messages(session, messages)
+            message_count = len(messages)
+        await self.cache.put(session["session_id"], last_id, message_count, summary)
+        return summary
+
+    async def _combine(self, summaries: List[Dict[str, Any]], product_context: Optional[Dict[str, Any]]) -> str:
+        """One combine call, cached in Redis by a hash of its inputs."""
+        reduce_cache = _get_reduce_cache() if settings.summary_cache_enabled else None
+        key = hashlib.sha256(json.dumps(
+            {"version": SUMMARY_CACHE_VERSION, "context": product_context, "summaries": summaries},
+            sort_keys=True, default=str,
+        ).encode("utf-8")).hexdigest()
+        result = await reduce_cache.get(key) if reduce_cache is not None else None
+        if result is not None:
+            self.stats["combines_cached"] += 1
+            return result
+        self.stats["model_calls"] += 1
+        result = await self.agent.combine_session_summaries(summaries, product_context=product_context)
+        if reduce_cache is not None:
+            await reduce_cache.set(key, result)
+        return result
+
+    async def _reduce(self, summaries: List[Dict[str, Any]], product_context: Optional[Dict[str, Any]]) -> str:
+        """
+        Combine summaries, first in budget-sized groups when they do not fit one call.
+        Groups follow the session order, so a changed session only misses its own group's cache.
+        """
+        while True:
+            groups = split_by_budget(summaries, lambda item: count_tokens(item["summary"]) + 16, self.budget)
+            if len(groups) == len(summaries) > 1:
+                # No two summaries fit together: trim each to its share and combine in one call
+                share = max(64, self.budget // len(summaries) - 16)
+                summaries = [{**item, "summary": truncate_to_tokens(item["summary"], share)} for item in summaries]
+                groups = [summaries]
+            if len(groups) == 1:
+                return await self._combine(summaries, product_context)
+            combined = await asyncio.gather(*(self._combine(group, product_context) for group in groups))
+            summaries = [{"title": f"Sessions group {i + 1}", "summary": summary} for i, summary in enumerate(combined)]
+
+    async def summarize(self, sessions: List[Dict[str, Any]], product_context: Optional[Dict[str, Any]] = None,
+                        cached: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Summary of several sessions: cached/incremental session summaries, then one reduce.
+        cached is the cache.get_many() result when the caller already read it to load fewer messages.
+        """
+        sessions = [session for session in sessions if session.get("messages")]
+        if not sessions:
+            return ""
+        if cached is None:
+            cached = await self.cache.get_many([session["session_id"] for session in sessions])
+        semaphore = asyncio.Semaphore(max(1, settings.summary_max_concurrency))
+
+        async def map_session(session: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                summary = await self.summarize_session(session, cached.get(session["session_id"]))
+            return {"session_id": session["session_id"], "title": session.get("title"), "summary": summary}
+
+        summaries = await asyncio.gather(*(map_session(session) for session in sessions))
+        if len(summaries) == 1:
+            result = summaries[0]["summary"]
+        else:
+            result = await self._reduce(summaries, product_context)
+        logger.info("sessions_summarized", sessions=len(sessions), **self.stats)
+        return result
@@ -0,0 +1,403 @@
+"""
+Shared transport for server-sent event (SSE) endpoints.
+
+The SSE generators (coordinator chat, phase form help, design prompts) used to be
+handed straight to StreamingResponse: a closed tab was only noticed at the next
+write, a slow client made the generator wait inside the write, and nothing was
+sent while agents were thinking, so idle proxies cut long generations.
+sse_response() puts a transport between the generator and the socket:
+- the generator runs as its own task and feeds a bounded queue
+  (SSE_QUEUE_EVENTS). Events that queue up while the socket is busy go out together
+  in one write of up to SSE_COALESCE_BYTES. When the queue is full the generator
+  waits (backpressure). A client that has not read anything for
+  SSE_STALL_TIMEOUT seconds is dropped.
+- a client disconnect cancels the generator task, so the agent stops spending
+  tokens. With a replay buffer the run first gets SSE_RESUME_GRACE seconds for the
+  client to come back.
+- a comment line is sent every SSE_HEARTBEAT_SECONDS without events.
+- every event gets an id "<stream id>:<seq>" and is kept in a Redis stream
+  (the last SSE_REPLAY_EVENTS events for SSE_REPLAY_TTL seconds). Events are
+  written to Redis in batches, at most every REPLAY_FLUSH_INTERVAL while the
+  client is attached, and at once when it leaves or the run ends. A client that
+  reconnects with a Last-Event-ID header gets the events after that id from any
+  pod (resume_response), followed by the live ones until the run ends. Resumed
+  clients poll the Redis stream rather than blocking a pooled connection. The
+  stream's owner is stored alongside its events, and only that user can resume it.
+Without Redis, events are not replayable and a disconnect cancels the run at once.
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from backend.config import settings
+from backend.services.redis_cache import PerLoop, RedisBackoff
+
+logger = structlog.get_logger()
+
+HEARTBEAT = b": keep-alive\n\n"
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable nginx buffering
+}
+# Seconds between checks for a resumed client while a run is detached
+DETACHED_POLL_INTERVAL = 1.0
+# Seconds between replay writes while the client is attached
+REPLAY_FLUSH_INTERVAL = 1.0
+# Seconds between reads of the replay stream while a resumed client waits for events
+REPLAY_POLL_INTERVAL = 0.25
+
+_END = object()
+
+
+class ReplayBuffer:
+    """Recent events of each stream in a Redis stream, readable from any pod."""
+
+    def __init__(self, redis_client: Any = None):
+        self._redis = RedisBackoff(redis_client)
+
+    def _client(self) -> Any:
+        return self._redis.client()
+
+    @property
+    def available(self) -> bool:
+        return self._client() is not None
+
+    def _failed(self, error: Exception) -> None:
+        logger.warning("sse_replay_redis_failed", error=str(error))
+        self._redis.failed()
+
+    @staticmethod
+    def _key(stream_id: str) -> str:
+        return f"sse:{stream_id}:events"
+
+    @staticmethod
+    def _listener_key(stream_id: str) -> str:
+        return f"sse:{stream_id}:listener"
+
+    @staticmethod
+    def _owner_key(stream_id: str) -> str:
+        return f"sse:{stream_id}:owner"
+
+    async def append(self, stream_id: str, events: List[Tuple[int, str]], end_seq: Optional[int] = None,
+                     attached: bool = True, owner: Optional[str] = None) -> None:
+        """
+        Store events (and the end of the stream after end_seq) and the user the stream
+        belongs to; attached also renews the listener lease.
+        """
+        client = self._client()
+        if client is None:
+            return
+        key = self._key(stream_id)
+        try:
+            pipe = client.pipeline(transaction=False)
+            for seq, event in events:
+                pipe.xadd(key, {"e": event}, id=f"0-{seq}", maxlen=settings.sse_replay_events, approximate=True)
+            if end_seq is not None:
+                pipe.xadd(key, {"done": "1"}, id=f"0-{end_seq + 1}", maxlen=settings.sse_replay_events,
+                          approximate=True)
+            pipe.expire(key, settings.sse_replay_ttl)
+            if owner is not None:
+                pipe.set(self._owner_key(stream_id), owner, ex=settings.sse_replay_ttl)
+            if attached:
+                pipe.set(self._listener_key(stream_id), "1", px=int(settings.sse_resume_grace * 1000) + 1)
+            await pipe.execute()
+        except Exception as e:
+            self._failed(e)
+
+    async def touch(self, stream_id: str) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            await client.set(self._listener_key(stream_id), "1", px=int(settings.sse_resume_grace * 1000) + 1)
+        except Exception as e:
+            self._failed(e)
+
+    async def has_listener(self, stream_id: str) -> bool:
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            return bool(await client.exists(self._listener_key(stream_id)))
+        except Exception as e:
+            self._failed(e)
+            return False
+
+    async def owner(self, stream_id: str) -> Optional[str]:
+        """The user the stream belongs to, or None when it is not replayable."""
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return await client.get(self._owner_key(stream_id))
+        except Exception as e:
+            self._failed(e)
+            return None
+
+    async def exists(self, stream_id: str) -> bool:
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            return bool(await client.exists(self._key(stream_id)))
+        except Exception as e:
+            self._failed(e)
+            return False
+
+    async def read_after(self, stream_id: str, seq: int, block_ms: int) -> Tuple[List[Tuple[int, str]], bool]:
+        """(events after seq, whether the stream has ended); waits up to block_ms for new events."""
+        client = self._client()
+        if client is None:
+            return [], True
+        # Polled: a blocking XREAD would hold one of the shared pool's connections per resumed client
+        deadline = time.monotonic() + block_ms / 1000
+        try:
+            while True:
+                response = await client.xread({self._key(stream_id): f"0-{seq}"}, count=100)
+                if response or time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(REPLAY_POLL_INTERVAL)
+        except Exception as e:
+            self._failed(e)
+            return [], True
+        events, done = [], False
+        for _, entries in response or []:
+            for entry_id, fields in entries:
+                if "done" in fields:
+                    done = True
+                else:
+                    events.append((int(entry_id.split("-")[1]), fields["e"]))
+        return events, done
+
+
+class SSEStream:
+    """One connection's transport: producer task, bounded queue, coalesced writes and heartbeats."""
+
+    def __init__(self, events: AsyncIterator[str], replay: Optional[ReplayBuffer] = None,
+                 on_close: Optional[Callable[[], Awaitable[Any]]] = None, owner: Optional[str] = None):
+        self.stream_id = uuid.uuid4().hex
+        self.owner = owner
+        self.events = events
+        self.replay = replay if replay is not None and replay.available else None
+        self.on_close = on_close
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.sse_queue_events))
+        self.seq = 0
+        self.attached = True
+        self.finished = False
+        self._producer: Optional[asyncio.Task] = None
+        self._closed = False
+        self._unflushed: List[Tuple[int, str]] = []
+        self._flushed_at = 0.0
+        self.stats = {"events": 0, "writes": 0, "heartbeats": 0, "stalled": False, "cancelled": False}
+
+    async def _close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            if self.on_close is not None:
+                await self.on_close()
+
+    async def _produce(self) -> None:
+        try:
+            async for event in self.events:
+                if not self.queue.full():
+                    self.queue.put_nowait(event)
+                    continue
+                try:
+                    await asyncio.wait_for(self.queue.put(event), timeout=settings.sse_stall_timeout)
+                except asyncio.TimeoutError:
+                    self.stats["stalled"] = True
+                    logger.warning("sse_client_stalled", stream_id=self.stream_id)
+                    return
+        except asyncio.CancelledError:
+            self.stats["cancelled"] = True
+            raise
+        except Exception as e:
+            logger.error("sse_producer_failed", stream_id=self.stream_id, error=str(e))
+        finally:
+            try:
+                await self.events.aclose()
+            finally:
+                await self._close()
+                try:
+                    self.queue.put_nowait(_END)
+                except asyncio.QueueFull:
+                    pass  # The consumer ends once the producer is done and the queue drained
+
+    async def _flush(self, end_seq: Optional[int] = None) -> None:
+        """Write the events not yet in the replay buffer (and the end of the stream)."""
+        events, self._unflushed = self._unflushed, []
+        self._flushed_at = time.monotonic()
+        await self.replay.append(self.stream_id, events, end_seq=end_seq, attached=self.attached, owner=self.owner)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """Bytes to write: coalesced batches of numbered events, or a heartbeat while idle."""
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce())
+        while True:
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=settings.sse_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if self._producer.done() and self.queue.empty():
+                    item = _END
+                else:
+                    self.stats["heartbeats"] += 1
+                    if self.replay is not None and self._unflushed:
+                        await self._flush()
+                    elif self.replay is not None and self.attached:
+                        await self.replay.touch(self.stream_id)
+                    yield HEARTBEAT
+                    continue
+
+            batch, size, end = [], 0, item is _END
+            while not end:
+                self.seq += 1
+                batch.append((self.seq, f"id: {self.stream_id}:{self.seq}\n{item}"))
+                size += len(item)
+                if size >= settings.sse_coalesce_bytes or self.queue.empty():
+                    break
+                item = self.queue.get_nowait()
+                end = item is _END
+
+            if self.replay is not None:
+                self._unflushed.extend(batch)
+                if end or not self.attached or time.monotonic() - self._flushed_at >= REPLAY_FLUSH_INTERVAL:
+                    await self._flush(end_seq=self.seq if end else None)
+            if batch:
+                self.stats["events"] += len(batch)
+                self.stats["writes"] += 1
+                yield "".join(event for _, event in batch).encode("utf-8")
+            if end:
+                self.finished = True
+                return
+
+    def detach(self) -> None:
+        """The client went away: cancel the run, or keep it going briefly for a resume."""
+        if self.finished or not self.attached:
+            return
+        self.attached = False
+        if self._producer is None:
+            # Never started: the generator did not run, but its cleanup still has to
+            if self.on_close is not None:
+                asyncio.create_task(self._close())
+            return
+        if self.replay is None or not self.replay.available or settings.sse_resume_grace <= 0:
+            self._producer.cancel()
+            return
+        asyncio.create_task(self._run_detached())
+
+    async def _drain(self) -> None:
+        async for _ in self.frames():
+            pass
+
+    async def _run_detached(self) -> None:
+        """Keep recording the run while a resumed client (on any pod) holds the listener lease."""
+        if self._unflushed:
+            await self._flush()  # Everything already sent must be resumable
+        drain = asyncio.create_task(self._drain())
+        try:
+            while not drain.done():
+                await asyncio.wait({drain}, timeout=DETACHED_POLL_INTERVAL)
+                if not drain.done() and not await self.replay.has_listener(self.stream_id):
+                    break
+        finally:
+            if not self.finished:
+                logger.info("sse_client_gone", stream_id=self.stream_id, events=self.stats["events"])
+                self._producer.cancel()
+
+
+class ReplayFollower:
+    """A resumed connection: replays events after Last-Event-ID, then follows the run until it ends."""
+
+    def __init__(self, replay: ReplayBuffer, stream_id: str, seq: int):
+        self.replay = replay
+        self.stream_id = stream_id
+        self.seq = seq
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        block_ms = int(settings.sse_heartbeat_seconds * 1000)
+        while True:
+            await self.replay.touch(self.stream_id)
+            events, done = await self.replay.read_after(self.stream_id, self.seq, block_ms)
+            if events:
+                self.seq = events[-1][0]
+                yield "".join(event for _, event in events).encode("utf-8")
+            if done:
+                return
+            if not events:
+                if not await self.replay.exists(self.stream_id):
+                    return  # Expired or trimmed away: the run is gone
+                yield HEARTBEAT
+
+    def detach(self) -> None:
+        pass
+
+
+class SSEResponse(StreamingResponse):
+    """StreamingResponse over an SSE transport; detaches the transport when the client disconnects."""
+
+    def __init__(self, stream: Any, headers: Optional[Dict[str, str]] = None):
+        super().__init__(
+            stream.frames(),
+            media_type="text/event-stream",
+            headers={**SSE_HEADERS, "X-Stream-Id": stream.stream_id, **(headers or {})},
+        )
+        self.stream = stream
+
+    async def stream_response(self, send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            # Runs on disconnect too (the response task is cancelled); must not await
+            self.stream.detach()
+
+
+# Redis clients bind to the loop, so keep one replay buffer per loop
+_replay_buffers = PerLoop(ReplayBuffer)
+
+
+def get_replay_buffer() -> ReplayBuffer:
+    return _replay_buffers.get()
+
+
+def sse_response(events: AsyncIterator[str], headers: Optional[Dict[str, str]] = None,
+                 on_close: Optional[Callable[[], Awaitable[Any]]] = None,
+                 owner: Optional[str] = None) -> SSEResponse:
+    """
+    Serve an SSE generator through the transport; on_close runs once the generator has finished.
+    owner is the id of the user the stream belongs to (only they can resume it).
+    """
+    replay = get_replay_buffer() if settings.sse_replay_events > 0 else None
+    return SSEResponse(SSEStream(events, replay, on_close, owner), headers)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    stream_id, _, seq = (value or "").strip().rpartition(":")
+    if not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+async def resume_response(request: Request, current_user: dict,
+                          headers: Optional[Dict[str, str]] = None) -> Optional[SSEResponse]:
+    """
+    The resumed stream when the request carries a Last-Event-ID that is still replayable
+    and belongs to current_user, else None (the stream id alone does not grant access).
+    """
+    last_event = parse_last_event_id(request.headers.get("last-event-id"))
+    if last_event is None or settings.sse_replay_events <= 0:
+        return None
+    replay = get_replay_buffer()
+    owner = await replay.owner(last_event[0])
+    if owner is None:
+        return None
+    if owner != str(current_user["id"]):
+        logger.warning("sse_resume_denied", stream_id=last_event[0], user_id=str(current_user["id"]))
+        return None
+    logger.info("sse_stream_resumed", stream_id=last_event[0], after=last_event[1])
+    return SSEResponse(ReplayFollower(replay, *last_event), headers)
@@ -5,6 +5,7 @@ from typing import Optional, Dict
 from datetime import datetime, timedelta
 import redis.asyncio as redis
 from backend.config import settings
+from backend.services.redis_cache import create_redis_client
 
 logger = structlog.get_logger()
 
@@ -22,11 +23,7 @@ class TokenStorage:
             try:
                 # Parse Redis URL
                 redis_url = settings.redis_url
-                self._redis_client = await redis.from_url(
-                    redis_url,
-                    encoding="utf-8",
-                    decode_responses=True
-                )
+                self._redis_client = create_redis_client()
                 # Test connection
                 await self._redis_client.ping()
                 logger.info("redis_connected", url=redis_url)
@@ -0,0 +1,56 @@
+"""
+pgvector index configuration for Agno RAG knowledge bases.
+
+HNSW (pgvector >= 0.5) needs no training pass, so it can be built on an empty table
+and keeps recall stable as data grows, unlike IVFFlat whose lists are fixed from the
+rows present at build time. Search breadth (ef_search) is tunable per query.
+"""
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger()
+
+
+def build_vector_index() -> Optional[Any]:
+    """Build the Agno vector index described by settings (None if Agno is unavailable)."""
+    try:
+        from agno.vectordb.pgvector import HNSW, Ivfflat
+    except ImportError:
+        return None
+
+    if settings.vector_index_type.lower() == "ivfflat":
+        return Ivfflat()
+    return HNSW(
+        m=settings.vector_hnsw_m,
+        ef_construction=settings.vector_hnsw_ef_construction,
+        ef_search=settings.vector_hnsw_ef_search,
+    )
+
+
+def resolve_ef_search(top_k: int, ef_search: Optional[int] = None) -> int:
+    """HNSW returns at most ef_search candidates, so never search narrower than top_k."""
+    return max(ef_search or settings.vector_hnsw_ef_search, top_k)
+
+
+@contextmanager
+def ef_search_override(vector_db: Any, ef_search: int) -> Iterator[None]:
+    """
+    Temporarily widen/narrow HNSW search on an Agno PgVector for one synchronous search.
+
+    Agno applies vector_index.ef_search with SET LOCAL inside each search transaction,
+    so the override only has to hold for the duration of the call.
+    """
+    index = getattr(vector_db, "vector_index", None)
+    if index is None or not hasattr(index, "ef_search"):
+        yield
+        return
+    previous = index.ef_search
+    index.ef_search = ef_search
+    try:
+        yield
+    finally:
+        index.ef_search = previous
@@ -0,0 +1,170 @@
+"""
+Concurrent, cached crawler for documentation sites.
+
+- The frontier is a deque plus a set of every URL ever queued, so each page is
+  fetched once and lookups are O(1).
+- Up to CRAWL_CONCURRENCY pages are fetched at a time; a per-host token bucket
+  (CRAWL_HOST_RATE requests/s, bursts of CRAWL_HOST_BURST) keeps the crawl polite
+  instead of sleeping a fixed second after every page.
+- Pages are fetched with integration_http.fetch, so re-crawls send conditional
+  requests (ETag / Last-Modified) and unchanged pages come back as 304 with the
+  body from the cache.
+- HTML is parsed in the CPU pool (services.cpu_executor), off the event loop, and
+  parsed pages are cached by URL and content hash, so an unchanged page is not parsed
+  again.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import structlog
+
+from backend.config import settings
+from backend.services.cpu_executor import run_cpu_bound
+from backend.services.integration_http import fetch
+from backend.services.redis_cache import RedisCache
+
+logger = structlog.get_logger()
+
+# Text kept from a page that cannot be parsed as HTML
+MAX_RAW_CONTENT = 50000
+
+_parsed_cache: Optional[RedisCache] = None
+
+
+def _get_parsed_cache() -> RedisCache:
+    global _parsed_cache
+    if _parsed_cache is None:
+        _parsed_cache = RedisCache(ttl=settings.integration_cache_ttl, prefix="crawl_page:")
+    return _parsed_cache
+
+
+def parse_html(html: str, url: str) -> Dict[str, Any]:
+    """Title, main text and same-host links of a page (runs in the CPU pool)."""
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return {"title": "", "content": html[:MAX_RAW_CONTENT], "links": []}
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Extract main content
+    main_content = soup.find('main') or soup.find('article') or soup.find('div', class_='content')
+    content = (main_content or soup).get_text(separator='\n', strip=True)
+
+    title = ""
+    title_tag = soup.find('title') or soup.find('h1')
+    if title_tag:
+        title = title_tag.get_text(strip=True)
+
+    host = urlparse(url).netloc
+    links: List[str] = []
+    for link in soup.find_all('a', href=True):
+        full_url = urldefrag(urljoin(url, link['href']))[0]
+        if urlparse(full_url).netloc == host and full_url not in links:
+            links.append(full_url)
+    return {"title": title, "content": content, "links": links}
+
+
+class HostThrottle:
+    """Token bucket per host: `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(1, burst)
+        self.buckets: Dict[str, Tuple[float, float]] = {}  # host -> (tokens, updated)
+
+    async def acquire(self, host: str) -> None:
+        while True:
+            now = time.monotonic()
+            tokens, updated = self.buckets.get(host, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self.buckets[host] = (tokens - 1, now)
+                return
+            self.buckets[host] = (tokens, now)
+            await asyncio.sleep((1 - tokens) / self.rate)
+
+
+class WebCrawler:
+    """Breadth-first crawl from a start URL with bounded concurrency."""
+
+    def __init__(
+        self,
+        link_filter: Optional[Callable[[str], bool]] = None,
+        links_per_page: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        throttle: Optional[HostThrottle] = None,
+    ):
+        self.link_filter = link_filter or (lambda url: True)
+        self.links_per_page = links_per_page
+        self.concurrency = max(1, concurrency or settings.crawl_concurrency)
+        self.throttle = throttle or HostThrottle(settings.crawl_host_rate, settings.crawl_host_burst)
+        self.visited_urls: Set[str] = set()
+        self.stats = {"fetched": 0, "not_modified": 0, "parsed": 0, "failed": 0}
+
+    async def crawl_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch and parse one page; None when it cannot be fetched."""
+        self.visited_urls.add(url)
+        try:
+            await self.throttle.acquire(urlparse(url).netloc)
+            logger.info("crawling_page", url=url)
+            response = await fetch("GET", url, follow_redirects=True)
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}")
+            self.stats["fetched"] += 1
+            if response.not_modified:
+                self.stats["not_modified"] += 1
+
+            # Links are resolved against the page URL, so the same body at another URL
+            # parses differently
+            cache = _get_parsed_cache()
+            cache_key = f"{response.content_hash}:{url}" if response.content_hash else None
+            parsed = await cache.get(cache_key) if cache_key else None
+            if parsed is None:
+                parsed = await run_cpu_bound(parse_html, response.text, url, bulk=True)
+                self.stats["parsed"] += 1
+                if cache_key:
+                    await cache.set(cache_key, parsed)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning("crawl_page_error", url=url, error=str(e))
+            return None
+
+        links = [link for link in parsed["links"] if self.link_filter(link)]
+        return {
+            "url": url,
+            "title": parsed["title"],
+            "content": parsed["content"],
+            "links": links,
+            "html_length": len(response.text),
+        }
+
+    async def crawl(self, start_url: str, max_pages: int = 20) -> List[Dict[str, Any]]:
+        """Crawl up to max_pages pages (in completion order) following filtered links."""
+        frontier: Deque[str] = deque([start_url])
+        seen: Set[str] = {start_url}
+        pages: List[Dict[str, Any]] = []
+        in_flight: Set[asyncio.Task] = set()
+        try:
+            while (frontier or in_flight) and len(pages) < max_pages:
+                while frontier and len(in_flight) < self.concurrency and len(pages) + len(in_flight) < max_pages:
+                    in_flight.add(asyncio.create_task(self.crawl_page(frontier.popleft())))
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = task.result()
+                    if page is None or len(pages) >= max_pages:
+                        continue
+                    pages.append(page)
+                    for link in page["links"][:self.links_per_page]:
+                        if link not in seen:
+                            seen.add(link)
+                            frontier.append(link)
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+        return pages
@@ -0,0 +1,360 @@
+"""
+WebSocket hub: per-socket send queues and cross-pod fan-out over Redis pub/sub.
+
+The old ConnectionManager kept sockets in a per-process dict and broadcast by
+awaiting send_json on each socket in turn, so one slow client held up every
+other socket, and a message never reached users connected to another pod.
+The hub instead:
+- gives every socket its own bounded send queue (WS_QUEUE_SIZE) drained by its
+  own sender task. Messages are serialized once per fan-out, not once per socket.
+  When a queue is full during fan-out, WS_DROP_POLICY decides: drop the oldest
+  queued message (default; for progress-style updates), drop the new one, or
+  disconnect the socket. Direct replies (send) wait for space instead, and a
+  socket that accepts nothing for WS_SEND_TIMEOUT seconds is closed.
+- lets sockets subscribe to topics ("product:<id>", "job:<id>"). publish(topic)
+  goes through the Redis channel "ws:<topic>". Each pod subscribes to the
+  channels its own sockets need and delivers to them. Without Redis, delivery is
+  local to this pod.
+Connection counts, drops and send latency (queue plus write) are reported by
+snapshot() (GET /api/metrics/websockets).
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+import structlog
+
+from backend.config import settings
+from backend.services.redis_cache import PerLoop, RedisBackoff
+
+logger = structlog.get_logger()
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+DISCONNECT = "disconnect"
+
+TOPIC_PREFIXES = ("product:", "job:")
+BROADCAST_TOPIC = "broadcast"
+CHANNEL_PREFIX = "ws:"
+# Recent send latencies kept for the percentiles
+LATENCY_SAMPLE_SIZE = 1000
+# Close code for sockets dropped for falling behind ("try again later")
+CLOSE_TOO_SLOW = 1013
+CLOSE_GOING_AWAY = 1001
+
+
+def is_valid_topic(topic: str) -> bool:
+    return any(topic.startswith(prefix) and len(topic) > len(prefix) for prefix in TOPIC_PREFIXES)
+
+
+class _Client:
+    """One socket: its queue of (text, queued at) and the task writing them out."""
+
+    __slots__ = ("connection_id", "websocket", "user_id", "queue", "ready", "drained", "topics", "sender", "closing")
+
+    def __init__(self, connection_id: str, websocket: Any, user_id: Optional[str]):
+        self.connection_id = connection_id
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: Deque[Tuple[str, float]] = deque()
+        self.ready = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.topics: Set[str] = set()
+        self.sender: Optional[asyncio.Task] = None
+        self.closing = False
+
+
+class WebSocketHub:
+    """Sockets of this pod, their topic subscriptions and the Redis fan-out between pods."""
+
+    def __init__(self, redis_client: Any = None, queue_size: Optional[int] = None,
+                 drop_policy: Optional[str] = None):
+        self._redis = RedisBackoff(redis_client)
+        self.queue_size = max(1, queue_size or settings.ws_queue_size)
+        self.drop_policy = drop_policy or settings.ws_drop_policy
+        self.clients: Dict[str, _Client] = {}
+        self.topics: Dict[str, Set[str]] = {}
+        self._pubsub: Any = None
+        self._channels: Set[str] = set()
+        self._channel_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.stats = {"sent": 0, "dropped": 0, "slow_disconnects": 0, "send_errors": 0,
+                      "published": 0, "received": 0, "redis_errors": 0}
+
+    # Redis fan-out
+
+    def _client(self) -> Any:
+        return self._redis.client()
+
+    def _redis_failed(self, error: Exception) -> None:
+        self.stats["redis_errors"] += 1
+        logger.warning("websocket_hub_redis_failed", error=str(error))
+        pubsub, self._pubsub = self._pubsub, None
+        self._channels = set()
+        self._redis.failed()
+        if pubsub is not None:
+            asyncio.create_task(self._close_pubsub(pubsub))
+
+    @staticmethod
+    async def _close_pubsub(pubsub: Any) -> None:
+        try:
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+    async def _sync_channels(self) -> None:
+        """Subscribe this pod to exactly the channels its sockets need."""
+        async with self._channel_lock:
+            client = self._client()
+            if client is None:
+                return
+            wanted = {CHANNEL_PREFIX + topic for topic in self.topics}
+            if self.clients:
+                wanted.add(CHANNEL_PREFIX + BROADCAST_TOPIC)
+            try:
+                if self._pubsub is None and wanted:
+                    self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+                if self._pubsub is None:
+                    return
+                if wanted - self._channels:
+                    await self._pubsub.subscribe(*(wanted - self._channels))
+                if self._channels - wanted:
+                    await self._pubsub.unsubscribe(*(self._channels - wanted))
+                self._channels = wanted
+            except Exception as e:
+                self._redis_failed(e)
+                return
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Deliver messages other pods (and this one) published to this pod's sockets."""
+        while self._pubsub is not None and self._channels:
+            pubsub = self._pubsub
+            try:
+                message = await pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                if pubsub is self._pubsub:
+                    self._redis_failed(e)
+                return
+            if message and message.get("type") == "message":
+                self.stats["received"] += 1
+                self._deliver(message["channel"][len(CHANNEL_PREFIX):], message["data"])
+
+    # Connections and topics
+
+    async def connect(self, websocket: Any, connection_id: str, user_id: Optional[str] = None) -> None:
+        await websocket.accept()
+        previous = self.clients.get(connection_id)
+        if previous is not None:
+            self._remove(previous)
+        client = _Client(connection_id, websocket, user_id)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self.clients[connection_id] = client
+        if len(self.clients) == 1:
+            await self._sync_channels()
+        logger.info("websocket_connected", connection_id=connection_id, connections=len(self.clients))
+
+    def set_user(self, connection_id: str, user_id: Optional[str]) -> None:
+        client = self.clients.get(connection_id)
+        if client is not None:
+            client.user_id = user_id
+
+    def _remove(self, client: _Client) -> None:
+        if self.clients.get(client.connection_id) is client:
+            del self.clients[client.connection_id]
+        for topic in client.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client.connection_id)
+                if not subscribers:
+                    del self.topics[topic]
+        client.topics.clear()
+        client.queue.clear()
+        if client.sender is not None and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+
+    async def disconnect(self, connection_id: str, flush: bool = False) -> None:
+        """Forget a socket; with flush, first let it send what is queued (up to WS_SEND_TIMEOUT)."""
+        client = self.clients.get(connection_id)
+        if client is None:
+            return
+        if flush and client.queue and client.sender is not None and client.sender is not asyncio.current_task():
+            client.closing = True
+            client.ready.set()
+            await asyncio.wait({client.sender}, timeout=settings.ws_send_timeout)
+        had_topics = bool(client.topics)
+        self._remove(client)
+        logger.info("websocket_disconnected", connection_id=connection_id, connections=len(self.clients))
+        if had_topics or not self.clients:
+            await self._sync_channels()
+
+    async def subscribe(self, connection_id: str, topic: str) -> bool:
+        client = self.clients.get(connection_id)
+        if client is None or not is_valid_topic(topic):
+            return False
+        client.topics.add(topic)
+        subscribers = self.topics.setdefault(topic, set())
+        subscribers.add(connection_id)
+        if len(subscribers) == 1:
+            await self._sync_channels()
+        return True
+
+    async def unsubscribe(self, connection_id: str, topic: str) -> None:
+        client = self.clients.get(connection_id)
+        if client is None or topic not in client.topics:
+            return
+        client.topics.discard(topic)
+        subscribers = self.topics.get(topic, set())
+        subscribers.discard(connection_id)
+        if not subscribers:
+            self.topics.pop(topic, None)
+            await self._sync_channels()
+
+    # Sending
+
+    async def send(self, connection_id: str, message: Dict[str, Any]) -> bool:
+        """Queue a direct message, waiting for space (a reply must not be dropped)."""
+        client = self.clients.get(connection_id)
+        if client is None:
+            return False
+        deadline = time.monotonic() + settings.ws_send_timeout
+        while len(client.queue) >= self.queue_size:
+            client.drained.clear()
+            try:
+                await asyncio.wait_for(client.drained.wait(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                await self._drop_slow(client)
+                return False
+            if self.clients.get(connection_id) is not client:
+                return False
+        client.queue.append((json.dumps(message, default=str), time.monotonic()))
+        client.ready.set()
+        return True
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        """Send to every socket subscribed to the topic, on any pod."""
+        text = json.dumps(message, default=str)
+        self.stats["published"] += 1
+        client = self._client()
+        if client is not None:
+            try:
+                await client.publish(CHANNEL_PREFIX + topic, text)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        self._deliver(topic, text)
+
+    async def broadcast(self, message: Dict[str, Any]) -> None:
+        await self.publish(BROADCAST_TOPIC, message)
+
+    def _deliver(self, topic: str, text: str) -> None:
+        if topic == BROADCAST_TOPIC:
+            targets = list(self.clients.values())
+        else:
+            targets = [self.clients[cid] for cid in self.topics.get(topic, ()) if cid in self.clients]
+        now = time.monotonic()
+        for client in targets:
+            if len(client.queue) >= self.queue_size:
+                self.stats["dropped"] += 1
+                if self.drop_policy == DROP_NEWEST:
+                    continue
+                if self.drop_policy == DISCONNECT:
+                    asyncio.create_task(self._drop_slow(client))
+                    continue
+                client.queue.popleft()
+            client.queue.append((text, now))
+            client.ready.set()
+
+    async def _send_loop(self, client: _Client) -> None:
+        try:
+            while True:
+                if not client.queue:
+                    if client.closing:
+                        return
+                    client.ready.clear()
+                    await client.ready.wait()
+                    continue
+                text, queued_at = client.queue.popleft()
+                client.drained.set()
+                async with asyncio.timeout(settings.ws_send_timeout):  # No extra task per message, unlike wait_for
+                    await client.websocket.send_text(text)
+                self.stats["sent"] += 1
+                self.latencies.append(time.monotonic() - queued_at)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self._drop_slow(client)
+        except Exception as e:
+            self.stats["send_errors"] += 1
+            logger.info("websocket_send_failed", connection_id=client.connection_id, error=str(e))
+            if self.clients.get(client.connection_id) is client:
+                await self.disconnect(client.connection_id)
+
+    async def _drop_slow(self, client: _Client) -> None:
+        if self.clients.get(client.connection_id) is not client:
+            return
+        self.stats["slow_disconnects"] += 1
+        logger.warning("websocket_client_too_slow", connection_id=client.connection_id)
+        await self.disconnect(client.connection_id)
+        try:
+            await asyncio.wait_for(client.websocket.close(code=CLOSE_TOO_SLOW), timeout=1)
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Close every socket ("going away", so clients reconnect to another pod) and the pub/sub connection."""
+        for client in list(self.clients.values()):
+            self._remove(client)
+            try:
+                await asyncio.wait_for(client.websocket.close(code=CLOSE_GOING_AWAY), timeout=1)
+            except Exception:
+                pass
+        if self._listener is not None:
+            self._listener.cancel()
+        pubsub, self._pubsub, self._channels = self._pubsub, None, set()
+        if pubsub is not None:
+            await self._close_pubsub(pubsub)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return round(latencies[int(p * (len(latencies) - 1))] * 1000, 2) if latencies else 0.0
+
+        return {
+            "backend": "redis" if self._pubsub is not None else "local",
+            "connections": len(self.clients),
+            "topics": len(self.topics),
+            "subscriptions": sum(len(subscribers) for subscribers in self.topics.values()),
+            "queued": sum(len(client.queue) for client in self.clients.values()),
+            "drop_policy": self.drop_policy,
+            "send_latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99),
+                                "max": round(latencies[-1] * 1000, 2) if latencies else 0.0},
+            **self.stats,
+        }
+
+
+# Tasks, events and the pub/sub connection bind to the loop, so keep one hub per loop
+_hubs = PerLoop(WebSocketHub)
+
+
+def get_websocket_hub() -> WebSocketHub:
+    return _hubs.get()
+
+
+async def shutdown_websocket_hub() -> None:
+    hub = _hubs.pop()
+    if hub is not None:
+        await hub.close()
+
+
+async def publish(topic: str, message: Dict[str, Any]) -> None:
+    """Publish to a topic's sockets on every pod; never raises (notifications are best-effort)."""
+    try:
+        await get_websocket_hub().publish(topic, message)
+    except Exception as e:
+        logger.warning("websocket_publish_failed", topic=topic, error=str(e))
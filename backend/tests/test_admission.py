@@ -0,0 +1,202 @@
+"""
+Tests for per-tenant admission control of agent runs.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services import admission
+from backend.services.admission import AdmissionController, AdmissionRejectedError, KIND_CHAT, KIND_EXPORT
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    def configure(**values):
+        values.setdefault("backend_workers", 1)
+        for name, value in values.items():
+            monkeypatch.setattr(admission.settings, name, value)
+    return configure
+
+
+def _local_controller():
+    controller = AdmissionController()
+    controller._redis.disable()  # No Redis: per-worker budgets
+    return controller
+
+
+class _FakeRedis:
+    """Python version of ADMIT_SCRIPT / RENEW_SCRIPT over in-memory leases (token budget left out)."""
+
+    def __init__(self):
+        self.leases = {}
+        self.calls = 0
+
+    async def admit(self, keys, args):
+        self.calls += 1
+        runs = self.leases.setdefault(keys[0], set())
+        if len(runs) >= args[1]:
+            return [0, 1, len(runs), 0]
+        runs.add(args[0])
+        return [1, 0, len(runs), 0]
+
+    async def renew(self, keys, args):
+        return 1
+
+    async def zrem(self, key, run_id):
+        self.leases.get(key, set()).discard(run_id)
+
+
+@pytest.mark.asyncio
+async def test_queued_run_is_admitted_when_a_slot_is_released(budgets):
+    budgets(admission_tenant_concurrency=1, admission_max_wait=5, admission_tenant_tpm=10_000_000)
+    controller = _local_controller()
+
+    first = await controller.admit("tenant-a", KIND_CHAT, 1000)
+    waiter = asyncio.create_task(controller.admit("tenant-a", KIND_CHAT, 1000))
+    other = await controller.admit("tenant-b", KIND_CHAT, 1000)  # Other tenants are not held up
+    await asyncio.sleep(0.05)
+    assert not waiter.done() and controller.snapshot()["queued"] == 1
+
+    await first.release()
+    second = await asyncio.wait_for(waiter, timeout=1)
+    assert second.wait_seconds < 1
+
+    snapshot = controller.snapshot()
+    assert snapshot["decisions"] == {"admitted": 3, "queued": 1, "shed": 0}
+    assert snapshot["in_flight"][KIND_CHAT] == 2 and snapshot["queued"] == 0
+    await second.release()
+    await other.release()
+    assert controller.snapshot()["in_flight"][KIND_CHAT] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_over_token_budget_is_shed_with_retry_after(budgets):
+    budgets(admission_tenant_concurrency=10, admission_max_wait=1, admission_tenant_tpm=60_000)
+    controller = _local_controller()
+
+    ticket = await controller.admit("tenant-a", KIND_EXPORT, 50_000)
+    await ticket.release()
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await controller.admit("tenant-a", KIND_EXPORT, 40_000)  # 30s of budget missing
+
+    assert rejected.value.reason == "tokens"
+    assert 25 <= rejected.value.retry_after <= 31
+    assert controller.snapshot()["shed_by_reason"] == {"tokens": 1}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_immediately(budgets):
+    budgets(admission_tenant_concurrency=1, admission_max_wait=5, admission_max_queued=0,
+            admission_tenant_tpm=10_000_000)
+    controller = _local_controller()
+
+    ticket = await controller.admit("tenant-a", KIND_CHAT, 100)
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await asyncio.wait_for(controller.admit("tenant-a", KIND_CHAT, 100), timeout=1)
+    assert rejected.value.reason == "queue_full" and rejected.value.retry_after >= 1
+    await ticket.release()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_shared_through_redis(budgets):
+    budgets(admission_tenant_concurrency=2, admission_max_wait=0.2, admission_tenant_tpm=10_000_000)
+    redis = _FakeRedis()
+    pods = [AdmissionController(redis_client=redis) for _ in range(2)]
+    for pod in pods:
+        pod._scripts = (redis.admit, redis.renew)
+
+    tickets = [await pods[0].admit("tenant-a", KIND_CHAT, 100), await pods[1].admit("tenant-a", KIND_CHAT, 100)]
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await pods[1].admit("tenant-a", KIND_CHAT, 100)  # Both slots held, one on each pod
+    assert rejected.value.reason == "concurrency"
+
+    await tickets[0].release()
+    assert redis.leases["admission:tenant-a:runs"] == {tickets[1].run_id}
+    third = await pods[1].admit("tenant-a", KIND_CHAT, 100)
+    assert pods[1].snapshot()["backend"] == "redis"
+    for ticket in (tickets[1], third):
+        await ticket.release()
+    assert not redis.leases["admission:tenant-a:runs"]
+
+
+@pytest.mark.asyncio
+async def test_export_stream_dropped_before_iteration_releases_its_lease(budgets, monkeypatch):
+    from backend.api import export
+
+    budgets(admission_tenant_concurrency=2, admission_max_wait=0.2, admission_tenant_tpm=10_000_000)
+    redis = _FakeRedis()
+    controller = AdmissionController(redis_client=redis)
+    controller._scripts = (redis.admit, redis.renew)
+    admitted = []
+
+    async def admit_export(product_id, inputs, override_missing, current_user):
+        admitted.append(await controller.admit("tenant-a", KIND_EXPORT, 100))
+        return admitted[-1], None
+
+    async def allowed(*args):
+        return True
+
+    async def load_inputs(db, product_id, conversation_history):
+        return {"product_info": {"name": "Atlas"}}
+
+    monkeypatch.setattr(export, "check_product_permission", allowed)
+    monkeypatch.setattr(export, "_load_export_inputs", load_inputs)
+    monkeypatch.setattr(export, "_admit_export", admit_export)
+
+    response = await export.stream_export_prd_document(
+        export.UUID(int=1), export.ExportRequest(), current_user={"id": "u1"}, db=None
+    )
+    assert redis.leases["admission:tenant-a:runs"] == {admitted[0].run_id}
+
+    async def receive():
+        return {"type": "http.disconnect"}  # The client is gone before the first write
+
+    async def send(message):
+        await asyncio.Event().wait()  # Nothing is ever written
+
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=2)
+    assert admitted[0].released and not redis.leases["admission:tenant-a:runs"]
+
+
+@pytest.mark.asyncio
+async def test_cached_export_reads_the_artifact_once_and_admits_nothing(monkeypatch):
+    from backend.api import export
+
+    class _CountingCache:
+        def __init__(self):
+            self.gets = 0
+
+        async def get(self, key):
+            self.gets += 1
+            return "# Cached PRD"
+
+    async def allowed(*args):
+        return True
+
+    async def load_inputs(db, product_id, conversation_history):
+        return {"product_info": {"name": "Atlas"}}
+
+    async def no_admission(*args, **kwargs):
+        raise AssertionError("a cached export runs no agents")
+
+    cache = _CountingCache()
+    monkeypatch.setattr(export, "check_product_permission", allowed)
+    monkeypatch.setattr(export, "_load_export_inputs", load_inputs)
+    monkeypatch.setattr(export, "get_export_agent", lambda: object())
+    monkeypatch.setattr(export, "_prd_artifact_cache", cache)
+    monkeypatch.setattr(export, "admit_run", no_admission)
+
+    response = await export.export_prd_document(
+        export.UUID(int=1), export.ExportRequest(format="markdown"), current_user={"id": "u1"}, db=None
+    )
+    assert response.body == b"# Cached PRD" and cache.gets == 1
+
+    streamed = await export.stream_export_prd_document(
+        export.UUID(int=1), export.ExportRequest(format="markdown"), current_user={"id": "u1"}, db=None
+    )
+    body = "".join([chunk async for chunk in streamed.body_iterator])
+    assert "# Cached PRD" in body and cache.gets == 2
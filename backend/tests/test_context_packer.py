@@ -0,0 +1,101 @@
+"""
+Tests for token-budgeted prompt context packing.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services.context_packer import (
+    ContextPacker,
+    ContextSection,
+    compact_serialize,
+    count_tokens,
+    get_context_budget,
+    sections_from_context,
+)
+
+try:
+    from backend.agents.agno_export_agent import AgnoExportAgent
+    AGNO_AVAILABLE = True
+except ImportError:
+    AGNO_AVAILABLE = False
+
+
+def test_compact_serialize_avoids_indentation():
+    assert compact_serialize({"target_audience": "PMs", "empty": ""}) == "Target Audience: PMs"
+    assert compact_serialize({"a": [1, 2], "b": {"c": "d"}}) == '{"a":[1,2],"b":{"c":"d"}}'
+
+
+def test_packer_prefers_priority_and_keeps_input_order():
+    sections = [
+        ContextSection(name="low", body="low " * 400, header="Low:", priority=10),
+        ContextSection(name="high", body="high " * 50, header="High:", priority=90),
+        ContextSection(name="header", body="Phase: Ideation", required=True),
+    ]
+    packed = ContextPacker(budget_tokens=120).pack(sections)
+
+    assert packed.total_tokens <= 120
+    assert set(packed.section_tokens) == {"low", "high", "header"}
+    assert packed.truncated == ["low"]
+    # Output order follows the input order regardless of ranking
+    assert packed.text.index("Low:") < packed.text.index("High:") < packed.text.index("Phase: Ideation")
+
+
+def test_list_sections_keep_newest_items():
+    history = [f"USER: message number {i}" for i in range(100)]
+    packed = ContextPacker(budget_tokens=60).pack([ContextSection(name="history", body=history)])
+
+    assert "message number 99" in packed.text
+    assert "message number 0\n" not in packed.text
+    assert packed.section_tokens["history"] <= 60
+
+
+def test_sections_are_dropped_when_budget_is_spent():
+    sections = sections_from_context({"form_data": {"idea": "x " * 500}, "misc_notes": "y " * 500})
+    packed = ContextPacker(budget_tokens=200).pack(sections)
+
+    assert "form_data" in packed.section_tokens
+    assert packed.dropped == ["misc_notes"]
+    assert packed.report()["total"] == packed.total_tokens
+
+
+def test_budget_overrides_match_model_ids():
+    assert get_context_budget("gpt-5-mini-2025-08-07") < get_context_budget("gpt-5.1")
+
+
+def test_agent_prompt_stays_within_budget():
+    if not AGNO_AVAILABLE:
+        pytest.skip("Agno framework not available")
+    agent = AgnoExportAgent(enable_rag=False)
+    context = {
+        "form_data": {"problem_statement": "Teams lose track of product decisions."},
+        "knowledge_base": [{"content": "article " * 300} for _ in range(30)],
+        "agent_outputs": {"research": "finding " * 5000},
+    }
+    layout, packed = agent._pack_enhanced_system_prompt(agent.system_prompt, [], context)
+    prompt = layout.render()
+
+    assert "Teams lose track of product decisions." in prompt
+    assert packed.total_tokens <= get_context_budget(agent._get_model_id())
+    assert packed.report()["sections"]["form_data"] > 0
+
+
+def test_long_base_prompt_does_not_use_up_the_context_budget(monkeypatch):
+    if not AGNO_AVAILABLE:
+        pytest.skip("Agno framework not available")
+    from backend.config import settings
+
+    monkeypatch.setattr(settings, "context_token_budget", 2000)
+    monkeypatch.setattr(settings, "context_token_budgets", {})
+    agent = AgnoExportAgent(enable_rag=False)
+    base_prompt = "Follow the requirements template. " * 500  # Larger than the whole budget
+    context = {"form_data": {"problem_statement": "Teams lose track of product decisions."},
+               "conversation_history": ["user: we target enterprise buyers"]}
+
+    layout, packed = agent._pack_enhanced_system_prompt(base_prompt, [], context)
+
+    assert not packed.dropped
+    assert "we target enterprise buyers" in layout.render()
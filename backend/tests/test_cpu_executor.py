@@ -0,0 +1,139 @@
+"""
+Tests for the CPU pool used for password hashing.
+"""
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from backend.services import cpu_executor
+from backend.services.cpu_executor import CPUExecutor, CPUPoolBusyError
+from backend.services.passwords import hash_password, verify_password_async
+
+
+@pytest.mark.asyncio
+async def test_password_verification_runs_in_process_pool():
+    hashed = await asyncio.to_thread(hash_password, "correct horse")
+    try:
+        assert await verify_password_async("correct horse", hashed) is True
+        assert await verify_password_async("wrong", hashed) is False
+        assert await verify_password_async("anything", "") is False
+        assert cpu_executor.get_cpu_executor().snapshot()["completed"] == 2
+    finally:
+        cpu_executor.shutdown_cpu_executor()
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_then_rejects_when_full(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(cpu_executor, "_get_pool", lambda: pool)
+    monkeypatch.setattr(settings, "cpu_pool_max_queue", 1)
+    monkeypatch.setattr(settings, "cpu_pool_queue_timeout", 5)
+    release = threading.Event()
+
+    executor = CPUExecutor(slots=1)
+    running = asyncio.create_task(executor.run(release.wait, 5))
+    queued = asyncio.create_task(executor.run(sum, [1, 2]))
+    await asyncio.sleep(0.05)
+    assert executor.snapshot()["running"] == 1
+    assert executor.snapshot()["waiting"] == 1
+
+    with pytest.raises(CPUPoolBusyError) as exc_info:
+        await executor.run(sum, [3])
+    assert exc_info.value.retry_after >= 1
+
+    release.set()
+    assert await running is True
+    assert await queued == 3
+    assert executor.snapshot()["rejected"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_job_waiting_past_timeout_is_rejected(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(cpu_executor, "_get_pool", lambda: pool)
+    monkeypatch.setattr(settings, "cpu_pool_queue_timeout", 0.05)
+    release = threading.Event()
+
+    executor = CPUExecutor(slots=1)
+    running = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.01)
+    with pytest.raises(CPUPoolBusyError):
+        await executor.run(sum, [1])
+    assert executor.snapshot()["waiting"] == 0
+
+    release.set()
+    await running
+    pool.shutdown()
+
+
+class _UserRow:
+    async def execute(self, query, params=None):
+        return self
+
+    def fetchone(self):
+        return ("u1", "ada@example.com", "Ada", "$2b$12$hash", "t1", True, "Default")
+
+
+@pytest.mark.asyncio
+async def test_login_answers_503_with_retry_after_when_pool_is_saturated(monkeypatch):
+    import httpx
+
+    from backend.database import get_db
+    from backend.main import app
+
+    monkeypatch.setattr(settings, "cpu_pool_max_queue", 0)
+    executor = CPUExecutor(slots=1)
+    executor._take(bulk=False)  # Every slot busy hashing other logins
+    monkeypatch.setattr(cpu_executor, "get_cpu_executor", lambda: executor)
+
+    async def user_row():
+        yield _UserRow()
+
+    app.dependency_overrides[get_db] = user_row
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/auth/login", json={"email": "ada@example.com", "password": "pw"})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert executor.snapshot()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_is_started_before_queued_bulk_work(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(cpu_executor, "_get_pool", lambda: pool)
+    monkeypatch.setattr(settings, "cpu_pool_max_queue", 10)
+    monkeypatch.setattr(settings, "cpu_pool_queue_timeout", 5)
+    release = threading.Event()
+    started = []
+
+    def job(name):
+        started.append(name)
+        release.wait(5)
+        return name
+
+    executor = CPUExecutor(slots=2)
+    pages = [asyncio.create_task(executor.run(job, f"page{i}", bulk=True)) for i in range(3)]
+    await asyncio.sleep(0.05)
+    # Bulk work holds one slot less than the pool, so a login starts at once
+    assert executor.snapshot()["bulk_running"] == 1 and executor.snapshot()["waiting"] == 2
+    login = asyncio.create_task(executor.run(job, "login"))
+    await asyncio.sleep(0.05)
+    assert started == ["page0", "login"]
+
+    release.set()
+    assert await login == "login"
+    assert [await page for page in pages] == ["page0", "page1", "page2"]
+    assert executor.snapshot()["bulk_running"] == 0 and executor.free == 2
+    pool.shutdown()
@@ -0,0 +1,158 @@
+"""
+Tests for spooled uploads and page-parallel PDF extraction.
+"""
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from backend.services import cpu_executor, document_extraction
+from backend.services.document_extraction import (
+    UploadTooLargeError,
+    extract_pdf_pages_streaming,
+    spool_upload,
+)
+
+
+def _make_pdf(page_texts):
+    """Minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+class _Upload:
+    def __init__(self, content, size=None):
+        self.stream = io.BytesIO(content)
+        self.size = size
+
+    async def read(self, n=-1):
+        return self.stream.read(n)
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_enforces_size_limit():
+    path = await spool_upload(_Upload(b"x" * 3000), max_bytes=5000)
+    try:
+        assert os.path.getsize(path) == 3000
+    finally:
+        os.unlink(path)
+
+    with pytest.raises(UploadTooLargeError):
+        await spool_upload(_Upload(b"x" * 3000), max_bytes=2000)  # size unknown up front
+    with pytest.raises(UploadTooLargeError):
+        await spool_upload(_Upload(b"", size=10_000), max_bytes=2000)
+
+
+@pytest.mark.asyncio
+async def test_pages_stream_in_order_in_batches(monkeypatch, tmp_path):
+    async def run_inline(fn, *args, bulk=False):
+        return fn(*args)
+
+    # Run the pool functions inline; they are the same functions the pool processes run
+    monkeypatch.setattr(document_extraction, "run_cpu_bound", run_inline)
+    monkeypatch.setattr(document_extraction, "pool_size", lambda: 2)
+    monkeypatch.setattr(settings, "pdf_pages_per_task", 2)
+    path = tmp_path / "spec.pdf"
+    path.write_bytes(_make_pdf([f"Page {i}" for i in range(1, 6)]))
+
+    batches = [batch async for batch in extract_pdf_pages_streaming(str(path))]
+
+    assert [(b.start, b.end) for b in batches] == [(0, 2), (2, 4), (4, 5)]
+    assert all(b.total_pages == 5 for b in batches)
+    assert [text.strip() for b in batches for text in b.texts] == [f"Page {i}" for i in range(1, 6)]
+
+
+@pytest.mark.asyncio
+async def test_pages_are_extracted_in_process_pool(tmp_path):
+    path = tmp_path / "spec.pdf"
+    path.write_bytes(_make_pdf(["Alpha", "Beta", "Gamma"]))
+    try:
+        text = "\n".join([batch.text async for batch in extract_pdf_pages_streaming(str(path))])
+    finally:
+        cpu_executor.shutdown_cpu_executor()
+    assert [line.strip() for line in text.splitlines()] == ["Alpha", "Beta", "Gamma"]
+
+
+class _RecordingSession:
+    """AsyncSessionLocal stand-in that records the statements of every session."""
+
+    def __init__(self, statements):
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.statements.append((" ".join(str(statement).split()), params))
+
+    async def commit(self):
+        pass
+
+
+class _FakeRAG:
+    def __init__(self):
+        self.added, self.removed = [], []
+
+    async def add_knowledge(self, content, metadata):
+        self.added.append(metadata)
+        return True
+
+    async def remove_knowledge(self, metadata):
+        self.removed.append(metadata)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_deletes_its_article_and_indexed_segments(monkeypatch, tmp_path):
+    from backend.agents import rag_agent
+    from backend.api import documents
+
+    statements, rag = [], _FakeRAG()
+    monkeypatch.setattr(documents, "AsyncSessionLocal", lambda: _RecordingSession(statements))
+    monkeypatch.setattr(rag_agent, "RAGAgent", lambda: rag)
+    monkeypatch.setattr(settings, "document_segment_chars", 1)
+
+    async def pages_then_corrupt(path):
+        yield document_extraction.PageBatch(start=0, end=1, total_pages=2, texts=["page one"])
+        raise document_extraction.PDFExtractionError("corrupt page 2")
+
+    monkeypatch.setattr(documents, "extract_pdf_pages_streaming", pages_then_corrupt)
+    product_id = "00000000-0000-0000-0000-000000000001"
+    events = documents._ingest_local_upload(str(tmp_path / "a.pdf"), "a.pdf", "application/pdf", 10, product_id, "u1")
+    with pytest.raises(documents.HTTPException) as failed:
+        async for _ in events:
+            pass
+
+    assert failed.value.status_code == 400
+    inserted = next(params for sql, params in statements if sql.startswith("INSERT INTO knowledge_articles"))
+    assert ("DELETE FROM knowledge_articles WHERE id = :id", {"id": inserted["id"]}) in statements
+    assert not any(sql.startswith("UPDATE") for sql, _ in statements)
+    assert rag.added[0]["article_id"] == str(inserted["id"])
+    assert rag.removed == [{"article_id": str(inserted["id"])}]
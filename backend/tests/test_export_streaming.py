@@ -0,0 +1,162 @@
+"""
+Tests for streaming PRD export through the agent army.
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    from backend.agents.agno_export_agent import AgnoExportAgent, PRD_SECTIONS
+    AGNO_AVAILABLE = True
+except ImportError:
+    AGNO_AVAILABLE = False
+
+
+class FakeSectionAgent:
+    """Agent stub that answers slower for earlier sections to scramble completion order."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = []
+
+    async def process(self, messages, context):
+        section = context["section"]
+        self.calls.append(section)
+        await asyncio.sleep(self.delays.get(section, 0))
+        return SimpleNamespace(response=f"## {section}\n\ncontent for {section}")
+
+
+class InMemorySectionCache:
+    """Stand-in for the Postgres-backed PRD section cache."""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def get_many(self, product_id, input_hashes):
+        return {
+            section: content
+            for (pid, section), (input_hash, content) in self.rows.items()
+            if pid == product_id and input_hashes.get(section) == input_hash
+        }
+
+    async def put(self, product_id, section, agent_type, input_hash, content):
+        self.rows[(product_id, section)] = (input_hash, content)
+
+
+@pytest.fixture
+def export_agent():
+    if not AGNO_AVAILABLE:
+        pytest.skip("Agno framework not available")
+    agent = AgnoExportAgent(enable_rag=False)
+    agent.section_cache = InMemorySectionCache()
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_header_sections_in_order_and_appendices(export_agent):
+    delays = {section["section"]: 0.01 * (len(PRD_SECTIONS) - i) for i, section in enumerate(PRD_SECTIONS)}
+    fake_agent = FakeSectionAgent(delays)
+    coordinator = SimpleNamespace(agents={s["agent_type"]: fake_agent for s in PRD_SECTIONS})
+
+    pieces = []
+    async for piece in export_agent.stream_comprehensive_prd(
+        product_id="p1",
+        product_info={"name": "Demo", "description": "Demo product"},
+        phase_data=[],
+        conversation_history=[],
+        knowledge_base=[],
+        override_missing=True,
+        coordinator=coordinator,
+    ):
+        pieces.append(piece)
+
+    assert pieces[0].startswith("# Product Requirements Document")
+    assert "## APPENDICES" in pieces[-1]
+    section_pieces = pieces[1:-1]
+    assert len(section_pieces) == len(PRD_SECTIONS)
+    for piece, section in zip(section_pieces, PRD_SECTIONS):
+        assert f"content for {section['section']}" in piece
+
+
+@pytest.mark.asyncio
+async def test_generate_matches_streamed_document(export_agent):
+    fake_agent = FakeSectionAgent({})
+    coordinator = SimpleNamespace(agents={s["agent_type"]: fake_agent for s in PRD_SECTIONS})
+    kwargs = dict(
+        product_id="p1",
+        product_info={"name": "Demo", "description": ""},
+        phase_data=[],
+        conversation_history=[],
+        knowledge_base=[],
+        override_missing=True,
+        coordinator=coordinator,
+    )
+
+    streamed = "".join([piece async for piece in export_agent.stream_comprehensive_prd(**kwargs)])
+    generated = await export_agent.generate_comprehensive_prd(**kwargs)
+
+    # Only the generation timestamp may differ between the two documents
+    strip = lambda doc: "\n".join(line for line in doc.splitlines() if not line.startswith("**Generated:**"))
+    assert strip(streamed) == strip(generated)
+
+
+@pytest.mark.asyncio
+async def test_reexport_only_regenerates_sections_with_changed_inputs(export_agent):
+    fake_agent = FakeSectionAgent({})
+    coordinator = SimpleNamespace(agents={s["agent_type"]: fake_agent for s in PRD_SECTIONS})
+    kwargs = dict(
+        product_id="p1",
+        product_info={"name": "Demo", "description": ""},
+        phase_data=[{"phase_name": "Ideation", "form_data": {"idea": "x"}}],
+        conversation_history=[],
+        knowledge_base=[],
+        override_missing=True,
+        coordinator=coordinator,
+    )
+
+    await export_agent.generate_comprehensive_prd(**kwargs)
+    assert len(fake_agent.calls) == len(PRD_SECTIONS)
+
+    fake_agent.calls.clear()
+    await export_agent.generate_comprehensive_prd(**kwargs)
+    assert fake_agent.calls == []
+
+    # Only the technical architecture prompt consumes design mockups
+    await export_agent.generate_comprehensive_prd(
+        **kwargs, design_mockups=[{"provider": "v0", "project_url": "https://v0.dev/p"}]
+    )
+    assert fake_agent.calls == ["TECHNICAL ARCHITECTURE"]
+
+
+@pytest.mark.asyncio
+async def test_article_edit_only_regenerates_sections_that_select_it(export_agent, monkeypatch):
+    from backend.agents import agno_export_agent
+
+    fake_agent = FakeSectionAgent({})
+    coordinator = SimpleNamespace(agents={s["agent_type"]: fake_agent for s in PRD_SECTIONS})
+    export_agent._section_embed_fn = lambda: (None, "")  # Keyword scoring
+    monkeypatch.setattr(agno_export_agent.settings, "prd_section_slicing_enabled", True)
+    monkeypatch.setattr(agno_export_agent.settings, "prd_section_context_tokens", 70)  # One article per section
+    launch = {"title": "Launch plan", "content": "Go-to-market channels and launch pricing. " * 5}
+    risks = {"title": "Risk register", "content": "Risks and mitigations: vendor lock-in risk. " * 5}
+    kwargs = dict(
+        product_id="p1",
+        product_info={"name": "Demo", "description": ""},
+        phase_data=[],
+        conversation_history=[],
+        override_missing=True,
+        coordinator=coordinator,
+    )
+
+    await export_agent.generate_comprehensive_prd(**kwargs, knowledge_base=[launch, risks])
+    fake_agent.calls.clear()
+    edited = {**risks, "content": risks["content"] + "Supplier outage risk."}
+    await export_agent.generate_comprehensive_prd(**kwargs, knowledge_base=[launch, edited])
+
+    # Only the risks section's slice includes the risk register
+    assert fake_agent.calls == ["RISKS & MITIGATIONS"]
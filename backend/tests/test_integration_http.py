@@ -0,0 +1,95 @@
+"""
+Tests for the shared integration HTTP client and its conditional-request cache.
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services import integration_http
+from backend.services.integration_http import content_unchanged, fetch, fetch_all, mark_content_processed
+
+
+class _MemoryCache:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+        return True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Mock Confluence-like endpoint honouring If-None-Match; records request headers."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"title": "Page", "body": "hello"}, headers={"ETag": '"v1"'})
+
+    caches = (_MemoryCache(), _MemoryCache())
+    monkeypatch.setattr(integration_http, "_get_caches", lambda: caches)
+    monkeypatch.setattr(
+        integration_http,
+        "get_integration_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return seen
+
+
+@pytest.mark.asyncio
+async def test_unchanged_page_is_served_from_cache_on_304(server):
+    headers = {"Authorization": "Basic user-a"}
+    first = await fetch("GET", "https://x.atlassian.net/wiki/api/v2/pages/1", headers=headers)
+    second = await fetch("GET", "https://x.atlassian.net/wiki/api/v2/pages/1", headers=headers)
+
+    assert not first.not_modified and second.not_modified
+    assert second.json() == first.json() and second.content_hash == first.content_hash
+    assert server[1]["if-none-match"] == '"v1"'
+
+    # Validators are per credential: another user's request is unconditional
+    await fetch("GET", "https://x.atlassian.net/wiki/api/v2/pages/1", headers={"Authorization": "Basic user-b"})
+    assert "if-none-match" not in server[2]
+
+
+@pytest.mark.asyncio
+async def test_content_unchanged_tracks_last_processed_hash(server):
+    assert await content_unchanged("confluence:p1:1", "abc") is False
+    # A failed embed is never marked, so the next fetch tries again
+    assert await content_unchanged("confluence:p1:1", "abc") is False
+    await mark_content_processed("confluence:p1:1", "abc")
+    assert await content_unchanged("confluence:p1:1", "abc") is True
+    assert await content_unchanged("confluence:p2:1", "abc") is False
+    assert await content_unchanged("confluence:p1:1", "def") is False
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_bounds_concurrency_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def fetcher(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if item == 3:
+            raise ValueError("boom")
+        return item * 10
+
+    results = await fetch_all(range(6), fetcher, concurrency=2)
+
+    assert peak == 2
+    assert results[:3] == [0, 10, 20] and results[4:] == [40, 50]
+    assert isinstance(results[3], ValueError)
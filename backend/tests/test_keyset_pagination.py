@@ -0,0 +1,132 @@
+"""
+Tests for keyset (cursor) pagination of list endpoints.
+
+The EXPLAIN checks run against the configured Postgres and are skipped when it is
+unreachable; they guard against list queries regressing to sequential scans or sorts.
+"""
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.utils.pagination import (
+    InvalidCursorError,
+    apply_cursor,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+
+
+def test_cursor_round_trip():
+    ts = datetime(2025, 12, 3, 10, 30, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(ts, row_id)) == (ts, str(row_id))
+
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
+def test_split_page_and_apply_cursor():
+    ts = datetime(2025, 12, 3, tzinfo=timezone.utc)
+    rows = [(f"00000000-0000-0000-0000-00000000000{i}", ts) for i in range(3)]
+
+    page, next_cursor = split_page(rows, limit=2, sort_index=1)
+    assert page == rows[:2]
+    params = {}
+    clause = apply_cursor(next_cursor, params, "p.updated_at", "p.id")
+    assert clause.startswith(" AND (p.updated_at, p.id) < ")
+    assert params == {"cursor_ts": ts, "cursor_id": rows[1][0]}
+
+    assert split_page(rows, limit=3, sort_index=1) == (rows, None)
+    assert apply_cursor(None, {}, "p.updated_at", "p.id") == ""
+
+
+def test_clamp_limit_bounds():
+    from backend.config import settings
+    assert clamp_limit(None) == settings.pagination_default_limit
+    assert clamp_limit(10 ** 6) == settings.pagination_max_limit
+
+
+async def _explain(sql, params):
+    asyncpg = pytest.importorskip("asyncpg")
+    from backend.config import settings
+
+    dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    try:
+        conn = await asyncpg.connect(dsn, timeout=2)
+    except Exception:
+        pytest.skip("Postgres not reachable")
+    try:
+        async with conn.transaction():
+            # Tiny test tables make sequential scans cheapest; force the planner to show index usage
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            # asyncpg uses $n placeholders; rewrite the named parameters in order
+            values = []
+            for name, value in params.items():
+                sql = sql.replace(f":{name}", f"${len(values) + 1}")
+                values.append(value)
+            rows = await conn.fetch(f"EXPLAIN {sql}", *values)
+    except Exception as e:
+        pytest.skip(f"Schema not available: {e}")
+    finally:
+        await conn.close()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_portfolio_page_uses_keyset_index():
+    from backend.api.products import build_portfolio_query
+
+    params = {"tenant_id": uuid.uuid4(), "user_id": uuid.uuid4(), "limit": 101}
+    clause = apply_cursor(encode_cursor(datetime.now(timezone.utc), uuid.uuid4()), params, "p.updated_at", "p.id")
+    plan = await _explain(build_portfolio_query(clause), params)
+
+    assert "idx_products_tenant_updated_id" in plan
+    assert "Seq Scan on products" not in plan
+
+
+@pytest.mark.asyncio
+async def test_portfolio_stats_stay_within_the_tenant():
+    from backend.api.products import PORTFOLIO_STATS_QUERY
+
+    params = {"tenant_id": uuid.uuid4(), "user_id": uuid.uuid4()}
+    plan = await _explain(PORTFOLIO_STATS_QUERY, params)
+
+    assert "idx_products_tenant_updated_id" in plan
+    assert "Seq Scan on products" not in plan
+
+
+@pytest.mark.asyncio
+async def test_list_products_page_uses_keyset_index():
+    from backend.api.products import build_list_products_query
+
+    params = {"user_id": uuid.uuid4(), "tenant_id": uuid.uuid4(), "limit": 101}
+    plan = await _explain(build_list_products_query(), params)
+
+    assert "idx_products_tenant_updated_id" in plan
+    assert "Seq Scan on products" not in plan
+
+
+def test_cursor_after_null_sort_value():
+    row_id = uuid.uuid4()
+    rows = [(row_id, None), (uuid.uuid4(), None)]
+    page, next_cursor = split_page(rows, limit=1, sort_index=1)
+    assert page == rows[:1]
+    assert decode_cursor(next_cursor) == (None, str(row_id))
+
+    params = {}
+    clause = apply_cursor(next_cursor, params, "p.updated_at", "p.id")
+    # NULLs sort first in DESC order: the rest of the NULL rows by id, then every dated row
+    assert clause == " AND ((p.updated_at IS NULL AND p.id < CAST(:cursor_id AS uuid)) OR p.updated_at IS NOT NULL)"
+    assert params == {"cursor_id": str(row_id)}
+    assert apply_cursor(next_cursor, {}, "created_at", "id", descending=False) == (
+        " AND (created_at IS NULL AND id > CAST(:cursor_id AS uuid))"
+    )
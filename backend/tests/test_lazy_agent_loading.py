@@ -0,0 +1,57 @@
+"""
+Tests for lazy agent registration and deferred provider SDK imports.
+"""
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.agents.registry import LazyAgentRegistry
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+class _FakeAgent:
+    instances = 0
+
+    def __init__(self, enable_rag: bool = False):
+        type(self).instances += 1
+        self.enable_rag = enable_rag
+
+
+def test_registry_builds_agents_on_first_lookup_only():
+    _FakeAgent.instances = 0
+    created = []
+    registry = LazyAgentRegistry(
+        {
+            "a": (f"{__name__}:_FakeAgent", {"enable_rag": True}),
+            "b": (f"{__name__}:_FakeAgent", {}),
+        },
+        on_create=lambda agent_type, agent: created.append(agent_type),
+    )
+
+    assert "a" in registry and "missing" not in registry
+    assert list(registry.keys()) == ["a", "b"]
+    assert _FakeAgent.instances == 0
+
+    agent = registry["a"]
+    assert agent is registry["a"] and agent.enable_rag
+    assert _FakeAgent.instances == 1 and created == ["a"]
+    assert list(registry.loaded) == ["a"]
+
+    registry.reset()
+    assert registry["a"] is not agent
+
+
+def test_importing_api_does_not_load_agents_or_provider_sdks():
+    probe = (
+        "import sys, backend.main; "
+        "heavy = ['openai', 'anthropic', 'google.generativeai', 'google.genai', 'backend.agents.agno_base_agent']; "
+        "print('LOADED=' + ','.join(name for name in heavy if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    # structlog writes to stdout too; only the probe line matters
+    loaded = [line for line in result.stdout.splitlines() if line.startswith("LOADED=")]
+    assert loaded == ["LOADED="]
@@ -0,0 +1,120 @@
+"""
+Tests for the shared single-pass Markdown renderer.
+"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services.markdown_renderer import (
+    IncrementalMarkdownRenderer,
+    get_render_cache_stats,
+    render_markdown,
+    render_markdown_cached,
+)
+
+
+SAMPLE_PRD = """# Product Requirements Document
+
+## 1. Overview
+The **IdeaForge** assistant helps *product managers* ship faster.
+See [the docs](https://example.com/docs "Docs") and `inline code`.
+
+- Goal one
+- Goal two
+  - Nested detail
+- Goal three
+
+1. First step
+2. Second step
+
+| Metric | Target |
+|:-------|-------:|
+| NPS    | 50     |
+
+> Quoted insight
+
+```python
+print("<not html>")
+```
+"""
+
+
+def test_renders_headings_lists_and_inline_spans():
+    html = render_markdown(SAMPLE_PRD, theme="export")
+    assert '<h1 id="product-requirements-document">Product Requirements Document</h1>' in html
+    assert '<h2 id="1-overview">1. Overview</h2>' in html
+    assert "<strong>IdeaForge</strong>" in html
+    assert "<em>product managers</em>" in html
+    assert '<a href="https://example.com/docs" title="Docs">the docs</a>' in html
+    assert "<code>inline code</code>" in html
+    assert html.count("<ul>") == 2
+    assert "<ol>" in html
+    assert '<th style="text-align: left;">Metric</th>' in html
+    assert '<td style="text-align: right;">50</td>' in html
+    assert "<blockquote>" in html
+    assert "&lt;not html&gt;" in html
+
+
+def test_tailwind_theme_escapes_html_and_unsafe_links():
+    html = render_markdown("<script>alert(1)</script> [x](javascript:void)", theme="tailwind")
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+    assert 'href="#"' in html
+    assert 'class="mb-3 leading-relaxed"' in html
+
+
+def test_incremental_feed_matches_full_render():
+    renderer = IncrementalMarkdownRenderer(theme="tailwind")
+    parts = [renderer.feed(SAMPLE_PRD[i:i + 13]) for i in range(0, len(SAMPLE_PRD), 13)]
+    parts.append(renderer.close())
+    assert "".join(parts) == render_markdown(SAMPLE_PRD, theme="tailwind")
+
+
+def test_incremental_feed_emits_completed_blocks_early():
+    renderer = IncrementalMarkdownRenderer(theme="export")
+    assert renderer.feed("# Heading\nparagraph te") == '<h1 id="heading">Heading</h1>\n'
+    assert renderer.feed("xt\n\n") == "<p>paragraph text</p>\n"
+    assert renderer.close() == ""
+
+
+def test_unknown_theme_rejected():
+    with pytest.raises(ValueError):
+        IncrementalMarkdownRenderer(theme="nope")
+
+
+def test_cached_render_reuses_result():
+    text = SAMPLE_PRD + "\nunique cache marker\n"
+    first = render_markdown_cached(text)
+    hits_before = get_render_cache_stats()["hits"]
+    assert render_markdown_cached(text) == first
+    assert get_render_cache_stats()["hits"] == hits_before + 1
+
+
+def test_long_list_renders_in_linear_time():
+    # The previous regex implementation wrapped lists with a DOTALL pattern that went
+    # quadratic on long answers; 100 KB must render well under a second.
+    document = "\n".join(f"- item {i} with **bold** text" for i in range(4000))
+    assert len(document) > 100_000
+    start = time.perf_counter()
+    html = render_markdown(document)
+    assert time.perf_counter() - start < 1.0
+    assert html.count("<li") == 4000
+
+
+@pytest.mark.parametrize("line", ["**a " * 20000, "[" * 20000, "__a " * 20000, "``a" * 20000, "<!--" * 20000])
+def test_unclosed_inline_delimiters_render_in_linear_time(line):
+    # Each failed span used to rescan the rest of the line (36 s for 80 KB of "**a ")
+    start = time.perf_counter()
+    html = render_markdown(line, theme="export")
+    assert time.perf_counter() - start < 1.0
+    assert html.startswith("<p>")
+
+
+def test_link_urls_keep_balanced_parentheses():
+    html = render_markdown('[Foo](https://en.wikipedia.org/wiki/Foo_(bar)) ![i](a_(b).png "t")', theme="export")
+    assert '<a href="https://en.wikipedia.org/wiki/Foo_(bar)">Foo</a>' in html
+    assert '<img alt="i" src="a_(b).png" title="t" />' in html
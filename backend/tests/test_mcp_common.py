@@ -0,0 +1,67 @@
+"""
+Tests for the MCP servers' shared runtime helpers (thread offload, TTL cache, latency histogram).
+"""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'mcp-servers')))
+
+from mcp_common import LatencyHistogram, run_blocking, timed_tool, ttl_cached
+
+
+@pytest.mark.asyncio
+async def test_blocking_sdk_calls_do_not_stall_the_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    assert await run_blocking(lambda: time.sleep(0.2) or "done") == "done"
+    task.cancel()
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_coalesces_calls_and_skips_errors():
+    calls = []
+
+    @ttl_cached(ttl=60)
+    async def list_spaces(key: str):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"error": "denied"} if key == "bad" else {"spaces": [key]}
+
+    results = await asyncio.gather(list_spaces("a"), list_spaces("a"), list_spaces(key="a"))
+    assert results[0] == results[1] == {"spaces": ["a"]}
+    assert await list_spaces("a") == {"spaces": ["a"]}
+    assert calls == ["a", "a"]  # positional calls share one entry, keyword calls another
+
+    await list_spaces("bad")
+    await list_spaces("bad")
+    assert calls.count("bad") == 2
+
+
+@pytest.mark.asyncio
+async def test_latency_histogram_records_calls_and_errors():
+    histogram = LatencyHistogram(buckets_ms=(10, 100))
+
+    @timed_tool(histogram)
+    async def get_page(fail: bool = False):
+        await asyncio.sleep(0.02)
+        return {"error": "x"} if fail else {"id": 1}
+
+    await get_page()
+    await get_page(fail=True)
+
+    stats = histogram.snapshot()["tools"]["get_page"]
+    assert stats["count"] == 2 and stats["errors"] == 1
+    assert stats["buckets"] == {"le_10ms": 0, "le_100ms": 2, "le_inf": 0}
+    assert stats["p50_ms"] == 100
@@ -0,0 +1,95 @@
+"""
+Tests for write-behind batching of conversation messages.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services.persistence_queue import ConversationMessage, ConversationWrite, PersistenceQueue
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class _Session:
+    def __init__(self, log, existing_sessions):
+        self.log = log
+        self.existing_sessions = existing_sessions
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.log.append((sql, params))
+        if "FROM conversation_sessions" in sql:
+            return _Result(self.existing_sessions)
+        if "FROM user_profiles" in sql:
+            return _Result([(user_id, "tenant-1") for user_id in params["ids"]])
+        return _Result([])
+
+    async def commit(self):
+        self.log.append(("COMMIT", None))
+
+
+def _write(user_id, product_id=None):
+    return ConversationWrite(
+        user_id=user_id,
+        product_id=product_id,
+        messages=[ConversationMessage("user", "hi"), ConversationMessage("agent", "hello", agent_name="coordinator")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_writes_across_requests_are_flushed_as_one_batch():
+    log = []
+    queue = PersistenceQueue(session_factory=lambda: _Session(log, [("s-1", "p-1", "u-1")]))
+
+    await asyncio.gather(
+        queue.enqueue(_write("u-1", "p-1")),
+        queue.enqueue(_write("u-2", "p-1")),
+        queue.enqueue(_write("u-3")),
+    )
+    await queue.close()
+
+    statements = [sql for sql, _ in log]
+    assert statements.count("COMMIT") == 1
+    session_inserts = [params for sql, params in log if sql.startswith("INSERT INTO conversation_sessions")]
+    message_inserts = [params for sql, params in log if sql.startswith("INSERT INTO conversation_history")]
+    # u-1 reuses its latest session; u-2 and u-3 get new ones in a single statement
+    assert len(session_inserts) == 1 and "id_1" in session_inserts[0] and "id_2" not in session_inserts[0]
+    assert len(message_inserts) == 1
+    params = message_inserts[0]
+    assert params["session_id_0"] == params["session_id_1"] == "s-1"
+    assert params["tenant_id_5"] == "tenant-1"
+    assert params["created_at_0"] < params["created_at_1"]
+    assert queue.snapshot()["written"] == 6
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_write_by_write():
+    log = []
+
+    class _FlakySession(_Session):
+        async def execute(self, statement, params=None):
+            if str(statement).startswith("INSERT INTO conversation_history") and "session_id_2" in params:
+                raise RuntimeError("batch too large for this test")
+            return await super().execute(statement, params)
+
+    queue = PersistenceQueue(session_factory=lambda: _FlakySession(log, []))
+    await asyncio.gather(queue.enqueue(_write("u-1")), queue.enqueue(_write("u-2")))
+    await queue.close()
+
+    assert queue.snapshot() == {"queued": 0, "batches": 2, "written": 4, "failed": 0}
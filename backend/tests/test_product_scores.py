@@ -0,0 +1,97 @@
+"""
+Tests for incremental product scoring and the coalescing view refresher.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services.product_scores import DIMENSION_INPUTS, ViewRefresher, score_incrementally
+
+
+class _FakeScoringAgent:
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def score_dimension(self, dimension, inputs):
+        self.calls.append(dimension)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return {"score": 80, "success_probability": 60, "rationale": dimension,
+                "recommendations": [{"priority": "high", "recommendation": f"improve {dimension}"}],
+                "risk_factors": ["shared risk"]}
+
+
+@pytest.mark.asyncio
+async def test_only_dimensions_with_changed_inputs_are_rescored():
+    agent = _FakeScoringAgent()
+    context = {"product_summary": "A planner for PMs", "market_context": {"size": "large"},
+               "user_feedback": None, "technical_context": {"stack": "python"}}
+
+    first = await score_incrementally(agent, context)
+    assert agent.max_in_flight == len(DIMENSION_INPUTS)  # dimensions scored concurrently
+    assert sorted(first["rescored"]) == sorted(DIMENSION_INPUTS)
+    assert first["overall_score"] == 80 and first["success_probability"] == 60
+    assert len(first["recommendations"]) == len(DIMENSION_INPUTS)
+    assert first["risk_factors"] == ["shared risk"]
+
+    agent.calls.clear()
+    unchanged = await score_incrementally(agent, context, first["dimensions"])
+    assert agent.calls == [] and unchanged["rescored"] == []
+    assert unchanged["dimensions"] == first["dimensions"]
+
+    changed = await score_incrementally(agent, {**context, "technical_context": {"stack": "go"}}, first["dimensions"])
+    assert sorted(agent.calls) == ["risk_assessment", "technical_feasibility"]
+    assert changed["dimensions"]["user_value"] is first["dimensions"]["user_value"]
+    assert changed["dimensions"]["technical_feasibility"]["input_hash"] != \
+        first["dimensions"]["technical_feasibility"]["input_hash"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_scores_without_hashes_are_rescored():
+    agent = _FakeScoringAgent(latency=0)
+    legacy = {name: {"score": 50, "rationale": "old"} for name in DIMENSION_INPUTS}
+    result = await score_incrementally(agent, {"product_summary": "x"}, legacy)
+    assert sorted(result["rescored"]) == sorted(DIMENSION_INPUTS)
+
+
+class _FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.log.append(str(statement))
+        await asyncio.sleep(0.02)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_view_refresher_coalesces_concurrent_writes():
+    log = []
+    refresher = ViewRefresher("tenant_product_scores", session_factory=lambda: _FakeSession(log))
+
+    await refresher.refresh()
+    assert log == ["REFRESH MATERIALIZED VIEW CONCURRENTLY tenant_product_scores"]
+
+    log.clear()
+    # Ten writers while one refresh is running: one follow-up refresh covers them all
+    first = asyncio.create_task(refresher.refresh())
+    await asyncio.sleep(0.005)
+    await asyncio.gather(first, *(refresher.refresh() for _ in range(10)))
+    assert len(log) == 2
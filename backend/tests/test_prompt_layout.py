@@ -0,0 +1,66 @@
+"""
+Tests for the cache-friendly system prompt layout.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from backend.services.prompt_layout import (
+    PromptLayout,
+    current_prompt_layout,
+    extract_cache_usage,
+    system_content_parts,
+)
+
+try:
+    from backend.agents.agno_export_agent import AgnoExportAgent
+    AGNO_AVAILABLE = True
+except ImportError:
+    AGNO_AVAILABLE = False
+
+
+def test_stable_prefix_is_identical_across_requests():
+    if not AGNO_AVAILABLE:
+        pytest.skip("Agno framework not available")
+    agent = AgnoExportAgent(enable_rag=False)
+    product = {"form_data": {"problem_statement": "Decisions get lost"}, "previous_phases": "Ideation: ..."}
+
+    first, _ = agent._pack_enhanced_system_prompt(
+        agent.system_prompt, [], {**product, "current_prompt": "Write the vision"}
+    )
+    # Same product context built in a different key order, different request
+    second, _ = agent._pack_enhanced_system_prompt(
+        agent.system_prompt, [], {"current_prompt": "Write the goals", **dict(reversed(list(product.items())))}
+    )
+
+    assert first.stable_prefix == second.stable_prefix
+    assert first.render().startswith(first.stable_prefix)
+    assert "Write the vision" in first.request and "Write the vision" not in first.stable_prefix
+
+
+def test_system_content_parts_marks_stable_tiers(monkeypatch):
+    monkeypatch.setattr(settings, "prompt_cache_control_enabled", True)
+    layout = PromptLayout(static="You are an agent.", product="=== PRODUCT CONTEXT ===\nx", request="=== REQUEST CONTEXT ===\ny")
+    token = current_prompt_layout.set(layout)
+    try:
+        text = f"[System]: {layout.render()}"
+        parts = system_content_parts(text, "claude-sonnet-4")
+        assert [p.get("cache_control") is not None for p in parts] == [True, True, False]
+        assert "".join(p["text"] for p in parts).replace("\n", "") == text.replace("\n", "")
+        # Non-Anthropic models keep plain text (OpenAI caches prefixes automatically)
+        assert system_content_parts(text, "gpt-5.1") == text
+    finally:
+        current_prompt_layout.reset(token)
+
+
+def test_extract_cache_usage_from_provider_payloads():
+    assert extract_cache_usage({"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1536}})["cached"] == 1536
+    assert extract_cache_usage({"cache_read_input_tokens": 1200, "cache_creation_input_tokens": 300}) == {
+        "cached": 1200,
+        "cache_write": 300,
+    }
+    assert extract_cache_usage(None) == {"cached": 0, "cache_write": 0}
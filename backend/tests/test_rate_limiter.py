@@ -0,0 +1,210 @@
+"""
+Tests for the GCRA rate limiter and the rate limiting middleware.
+"""
+import math
+import os
+import sys
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.middleware import rate_limit
+from backend.services import rate_limiter, token_storage
+from backend.services.rate_limiter import Limit, LocalLimiter, RateLimiter
+
+
+class _FakeGCRAScript:
+    """Python version of GCRA_SCRIPT over an in-memory store, counting round trips."""
+
+    def __init__(self):
+        self.store = {}
+        self.calls = 0
+
+    async def __call__(self, keys, args):
+        self.calls += 1
+        now = time.monotonic() * 1000
+        retry_after, rejected, remaining, tats = 0, 0, -1, []
+        for i, key in enumerate(keys):
+            limit, period, cost = args[i * 3], args[i * 3 + 1], args[i * 3 + 2]
+            interval = period / limit
+            tat = max(self.store.get(key, now), now)
+            new_tat = tat + cost * interval
+            allowed_in = period if cost > limit else new_tat - period - now
+            if allowed_in > 0:
+                if allowed_in > retry_after:
+                    retry_after, rejected = allowed_in, i + 1
+            else:
+                left = math.floor(-allowed_in / interval)
+                remaining = left if remaining < 0 else min(remaining, left)
+            tats.append(new_tat)
+        if rejected:
+            return [0, math.ceil(retry_after), 0, rejected]
+        self.store.update(zip(keys, tats))
+        return [1, 0, remaining, 0]
+
+
+def _limiter(script):
+    limiter = RateLimiter(local=LocalLimiter())
+    limiter._script = script
+    return limiter
+
+
+def test_local_buckets_are_all_or_nothing_and_cost_weighted():
+    local = LocalLimiter()
+    user, export = Limit("user:1", 10, 60, cost=4), Limit("endpoint:export:user:1", 2, 60)
+
+    assert local.acquire([user, export], now=0) is None
+    assert local.acquire([user, export], now=0) is None
+    rejected = local.acquire([user, export], now=0)  # user bucket has 2 units left, cost is 4
+    assert not rejected.allowed and rejected.limit is user and rejected.source == "local"
+    assert rejected.retry_after == pytest.approx(12)
+    assert local.buckets["endpoint:export:user:1"][0] == 0  # nothing taken from the other bucket
+
+    local.release([user])
+    assert local.buckets["user:1"][0] == 6
+    local.block(export, 5, now=0)
+    assert local.acquire([Limit("endpoint:export:user:1", 2, 60, cost=0)], now=1).retry_after == pytest.approx(4)
+
+
+@pytest.mark.asyncio
+async def test_rejected_burst_only_reaches_redis_once():
+    script = _FakeGCRAScript()
+    limiter = _limiter(script)
+    # The bucket is shared with other pods: Redis already holds most of the budget
+    script.store["ratelimit:user:1"] = time.monotonic() * 1000 + 54_000
+    limits = [Limit("user:1", 10, 60)]
+
+    first = await limiter.check(limits)
+    assert first.allowed and first.remaining == 0
+    results = [await limiter.check(limits) for _ in range(50)]
+
+    assert not any(r.allowed for r in results)
+    assert script.calls == 2  # one allowed, one rejected; the rest of the burst stays local
+    assert results[0].source == "redis" and results[0].retry_after > 0
+    assert all(r.source == "local" for r in results[1:])
+    assert limiter.stats["rejected_local"] == 49
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_local_buckets():
+    async def broken(keys, args):
+        raise ConnectionError("redis down")
+
+    limiter = _limiter(broken)
+    limits = [Limit("user:1", 3, 60)]
+    results = [await limiter.check(limits) for _ in range(5)]
+    assert [r.allowed for r in results] == [True, True, True, False, False]
+    assert limiter.stats["redis_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_limits_per_user_and_weights_expensive_requests(monkeypatch):
+    class _Storage:
+        async def get_token(self, token):
+            return {"user_id": token.split("-")[1], "tenant_id": "tenant-a"}
+
+    async def fake_storage():
+        return _Storage()
+
+    script = _FakeGCRAScript()
+    limiter = _limiter(script)
+    monkeypatch.setattr(token_storage, "get_token_storage", fake_storage)
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(rate_limit, "_identities", type(rate_limit._identities)())
+    monkeypatch.setattr(rate_limit, "RATE_LIMITS", {"/api/products": "100/minute"})
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_user_budget", "20/minute")
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_tenant_budget", "1000/minute")
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", True)
+
+    app = FastAPI()
+    rate_limit.setup_rate_limiting(app)
+
+    @app.post("/api/products/{product_id}/export-prd")
+    async def export(product_id: str):
+        return {"ok": True}
+
+    @app.get("/api/products")
+    async def products():
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        alice = {"Authorization": "Bearer token-alice"}
+        assert (await client.post("/api/products/p1/export-prd", headers=alice)).status_code == 200
+        second = await client.post("/api/products/p1/export-prd", headers=alice)
+        assert second.status_code == 200 and second.headers["X-RateLimit-Remaining"] == "0"
+        third = await client.post("/api/products/p1/export-prd", headers=alice)  # 10 units each, budget 20
+        assert third.status_code == 429
+        assert third.json()["error"]["code"] == "RATE_LIMIT_EXCEEDED"
+        assert int(third.headers["Retry-After"]) >= 1
+
+        # Another user of the same tenant has their own budget
+        bob = await client.get("/api/products", headers={"Authorization": "Bearer token-bob"})
+        assert bob.status_code == 200
+        assert (await client.get("/health")).status_code == 404  # exempt, not limited
+
+    assert "ratelimit:user:alice" in script.store and "ratelimit:user:bob" in script.store
+    assert "ratelimit:tenant:tenant-a" in script.store
+    assert script.calls == 3  # the rejected export was answered by the local pre-check
+
+
+@pytest.mark.asyncio
+async def test_without_redis_each_worker_enforces_its_share(monkeypatch):
+    monkeypatch.setattr(rate_limiter.settings, "backend_workers", 4)
+    limiter = RateLimiter(local=LocalLimiter())
+    limiter._redis.disable()
+
+    results = [await limiter.check([Limit("user:1", 8, 60)]) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[-1].limit.limit == 2 and results[-1].source == "local"
+
+
+@pytest.mark.asyncio
+async def test_page_loads_stay_under_the_limits_and_writes_keep_endpoint_budgets(monkeypatch):
+    class _Storage:
+        async def get_token(self, token):
+            return {"user_id": "alice", "tenant_id": "tenant-a"}
+
+    async def fake_storage():
+        return _Storage()
+
+    script = _FakeGCRAScript()
+    limiter = _limiter(script)
+    monkeypatch.setattr(token_storage, "get_token_storage", fake_storage)
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(rate_limit, "_identities", type(rate_limit._identities)())
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_enabled", True)
+
+    app = FastAPI()
+    rate_limit.setup_rate_limiting(app)
+
+    @app.get("/api/products/{path:path}")
+    @app.get("/api/conversations/{path:path}")
+    async def read(path: str):
+        return {"ok": True}
+
+    @app.post("/api/products/{path:path}")
+    async def write(path: str):
+        return {"ok": True}
+
+    # Opening the dashboard and then a dozen products: lists, detail, sessions,
+    # progress and chat history, all GETs under the /api/products and /api/conversations limits
+    page_load = ["/api/products/", "/api/products/portfolio"]
+    for n in range(12):
+        page_load += [f"/api/products/p{n}", f"/api/products/p{n}/sessions",
+                      f"/api/products/p{n}/progress-report", f"/api/conversations/history?product_id=p{n}"]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Authorization": "Bearer token-alice"}
+        statuses = [(await client.get(path, headers=headers)).status_code for path in page_load]
+        assert statuses == [200] * len(page_load)
+
+        write_limit, _ = rate_limiter.parse_rate(rate_limit.RATE_LIMITS["/api/products"])
+        writes = [(await client.post("/api/products/p1/share", headers=headers)).status_code
+                  for _ in range(write_limit + 1)]
+        assert writes[:-1] == [200] * write_limit and writes[-1] == 429
@@ -0,0 +1,49 @@
+"""
+Tests for the shared Redis client back-off and per-loop instances.
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services import redis_cache
+from backend.services.redis_cache import PerLoop, RedisBackoff
+
+
+def test_backoff_skips_redis_after_a_failure_until_the_retry_interval(monkeypatch):
+    clients = []
+    monkeypatch.setattr(redis_cache, "create_redis_client", lambda: clients.append(object()) or clients[-1])
+    now = [100.0]
+    monkeypatch.setattr(redis_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+
+    backoff = RedisBackoff()
+    first = backoff.client()
+    assert backoff.client() is first and len(clients) == 1
+
+    backoff.failed()
+    assert backoff.client() is None
+    now[0] += redis_cache.REDIS_RETRY_INTERVAL
+    assert backoff.client() is clients[1]
+
+    backoff.disable()
+    now[0] += 3600
+    assert backoff.client() is None and len(clients) == 2
+
+
+def test_per_loop_keeps_one_instance_per_event_loop():
+    built = PerLoop(list, stale=lambda items: "closed" in items)
+
+    async def get():
+        return built.get()
+
+    async def same_loop():
+        first = built.get()
+        assert built.get() is first
+        first.append("closed")
+        assert built.get() is not first  # Stale instances are rebuilt
+        assert built.pop() is not None and built.pop() is None
+
+    asyncio.run(same_loop())
+    assert asyncio.run(get()) is not asyncio.run(get())
@@ -0,0 +1,114 @@
+"""
+Tests for upstream circuit breakers and adaptive timeouts.
+"""
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services import resilience
+from backend.services.resilience import (
+    MIN_TIMEOUT_SAMPLES,
+    CircuitBreaker,
+    CircuitBreakerTransport,
+    CircuitOpenError,
+)
+
+
+class _SharedState:
+    """Stands in for the Redis-backed state shared by all pods."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value):
+        self.values[key] = value
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+        return True
+
+
+@pytest.fixture(autouse=True)
+def shared_state(monkeypatch):
+    state = _SharedState()
+    monkeypatch.setattr(resilience, "_get_shared_state", lambda: state)
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience.settings, "circuit_breaker_failure_threshold", 3)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_opens_after_failures_and_other_pods_fail_fast(monkeypatch):
+    breaker = CircuitBreaker("v0")
+    for _ in range(3):
+        await breaker.before_call()
+        await breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError) as raised:
+        await breaker.before_call()
+    assert raised.value.retry_after > 0
+
+    # A breaker in another pod picks the open state up from the shared store
+    with pytest.raises(CircuitOpenError):
+        await CircuitBreaker("v0").before_call()
+
+    # After the cooldown a single probe goes through and its success closes the circuit
+    breaker.opened_until = 0.0
+    await breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        await breaker.before_call()
+    await breaker.record_success(0.1)
+    assert breaker.snapshot()["state"] == "closed"
+    await breaker.before_call()
+
+
+@pytest.mark.asyncio
+async def test_transport_counts_server_errors_but_not_client_errors():
+    statuses = iter([401, 401, 401, 503, 502, 500])
+    transport = CircuitBreakerTransport(
+        httpx.MockTransport(lambda request: httpx.Response(next(statuses))), upstream="github"
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(6):
+            await client.get("https://api.github.com/repos")
+        with pytest.raises(CircuitOpenError):
+            await client.get("https://api.github.com/repos")
+    assert [state["state"] for name, state in resilience.breaker_states().items()
+            if name.startswith("github:api.github.com:")] == ["open"]
+
+
+@pytest.mark.asyncio
+async def test_one_credentials_failures_leave_other_credentials_closed():
+    def respond(request):
+        # Tenant A's key is over its quota; tenant B's key is fine
+        return httpx.Response(429 if request.headers["authorization"] == "Basic tenant-a" else 200)
+
+    transport = CircuitBreakerTransport(httpx.MockTransport(respond), upstream="confluence")
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(3):
+            await client.get("https://acme.atlassian.net/wiki", headers={"Authorization": "Basic tenant-a"})
+        with pytest.raises(CircuitOpenError) as raised:
+            await client.get("https://acme.atlassian.net/wiki", headers={"Authorization": "Basic tenant-a"})
+        assert raised.value.upstream == "confluence"
+
+        response = await client.get("https://acme.atlassian.net/wiki", headers={"Authorization": "Basic tenant-b"})
+        assert response.status_code == 200
+        # The same key at another site has its own breaker too
+        response = await client.get("https://globex.atlassian.net/wiki", headers={"Authorization": "Basic tenant-a"})
+        assert response.status_code == 429
+
+
+def test_timeout_adapts_to_latency():
+    breaker = CircuitBreaker("confluence")
+    assert breaker.timeout(30.0) == 30.0
+    breaker.latencies.extend([2.0] * MIN_TIMEOUT_SAMPLES)
+    assert breaker.timeout(30.0) == 6.0
+    assert breaker.timeout(30.0, floor=10.0) == 10.0
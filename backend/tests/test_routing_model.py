@@ -0,0 +1,134 @@
+"""
+Tests for provider failover and hedging in RoutingModel.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from backend.models import routing_model
+from backend.models.routing_model import RoutingModel, routing_trace
+from backend.services import resilience
+
+
+class _Route:
+    def __init__(self, id, delay=0.0, error=None, api_key=None):
+        self.id = id
+        self.api_key = api_key
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def ainvoke(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"answer from {self.id}"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats(monkeypatch):
+    monkeypatch.setattr(routing_model, "_route_stats", {})
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience.settings, "circuit_breaker_enabled", False)
+
+
+@pytest.mark.asyncio
+async def test_fails_over_and_records_decision():
+    broken, healthy = _Route("a", error=RuntimeError("503")), _Route("b")
+    model = RoutingModel([broken, healthy])
+
+    with routing_trace() as decisions:
+        assert await model.ainvoke(messages=[]) == "answer from b"
+
+    assert decisions[0]["route"].endswith(":b")
+    assert [a["outcome"] for a in decisions[0]["attempts"]] == ["error", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "model_hedging_enabled", True)
+    monkeypatch.setattr(settings, "model_hedge_default_delay", 0.05)
+    slow, fast = _Route("a", delay=1.0), _Route("b")
+    model = RoutingModel([slow, fast])
+
+    with routing_trace() as decisions:
+        assert await model.ainvoke(messages=[]) == "answer from b"
+
+    assert decisions[0]["hedged"] is True
+    assert fast.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_route_is_tried_last():
+    flaky, steady = _Route("a", error=RuntimeError("boom")), _Route("b")
+    model = RoutingModel([flaky, steady])
+    for _ in range(6):
+        await model.ainvoke(messages=[])
+
+    assert model.preferred() is steady
+    flaky_calls = flaky.calls
+    await model.ainvoke(messages=[])
+    assert flaky.calls == flaky_calls
+
+
+class _StatusError(Exception):
+    status_code = 429
+
+
+@pytest.mark.asyncio
+async def test_failing_api_key_opens_only_its_own_circuit(monkeypatch):
+    monkeypatch.setattr(resilience.settings, "circuit_breaker_enabled", True)
+    monkeypatch.setattr(resilience.settings, "circuit_breaker_failure_threshold", 2)
+    monkeypatch.setattr(resilience, "_get_shared_state", lambda: _NoSharedState())
+    exhausted = RoutingModel([_Route("gpt", error=_StatusError("quota"), api_key="sk-tenant-a")])
+    other = RoutingModel([_Route("gpt", api_key="sk-tenant-b")])
+
+    for _ in range(2):
+        with pytest.raises(_StatusError):
+            await exhausted.ainvoke(messages=[])
+    with pytest.raises(resilience.CircuitOpenError):
+        await exhausted.ainvoke(messages=[])
+    assert await other.ainvoke(messages=[]) == "answer from gpt"
+
+
+class _NoSharedState:
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value):
+        return True
+
+    async def delete(self, key):
+        return True
+
+
+def test_coordinator_tier_switch_keeps_the_agents_routing_model(monkeypatch):
+    from types import SimpleNamespace
+
+    from backend.agents.agno_base_agent import AgnoBaseAgent
+    from backend.agents.agno_enhanced_coordinator import AgnoEnhancedCoordinator
+
+    monkeypatch.setattr(settings, "model_routing_enabled", True)
+    own_model = RoutingModel([_Route("fast")])
+    agent = SimpleNamespace(
+        model_tier="fast",
+        agno_agent=SimpleNamespace(model=own_model),
+        _get_primary_agno_model=lambda model_tier: _Route(f"{model_tier}-primary"),
+        _get_fallback_agno_models=lambda model_tier, exclude: [_Route(f"{model_tier}-fallback")],
+    )
+    agent._get_agno_model = lambda model_tier: AgnoBaseAgent._get_agno_model(agent, model_tier)
+    coordinator = object.__new__(AgnoEnhancedCoordinator)
+
+    original = coordinator._switch_model_tier(agent, "standard")
+
+    model = agent.agno_agent.model
+    assert isinstance(model, RoutingModel)
+    assert [route.id for route in model.routes] == ["standard-primary", "standard-fallback"]
+    assert agent.model_tier == "standard"  # The per-call key refresh rebuilds the same tier
+    assert original == ("fast", own_model)
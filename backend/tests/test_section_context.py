@@ -0,0 +1,61 @@
+"""
+Tests for per-section context selection in agent-army PRD generation.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services.section_context import SectionContextIndex, build_chunks
+
+TOPICS = ("persona", "pricing", "latency")
+
+
+def _one_hot(text):
+    lowered = text.lower()
+    return [float(topic in lowered) + 0.01 for topic in TOPICS]
+
+
+class _Embedder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(len(texts))
+        return [_one_hot(text) for text in texts]
+
+
+def _section(name):
+    return {"section": name, "prompt_template": "Generate the {product_name} section.\n\n{knowledge_base}"}
+
+
+@pytest.mark.asyncio
+async def test_each_section_gets_its_relevant_chunks_within_budget():
+    chunks = build_chunks({
+        "phase_submissions": ["persona: busy nurses " * 20, "pricing: per seat " * 20],
+        "knowledge_base": ["latency budget 200ms " * 20, "persona interviews " * 20],
+    })
+    budget = max(chunk.tokens for chunk in chunks) * 2
+    embed = _Embedder()
+    index = await SectionContextIndex.build(chunks, budget, embed, "fake")
+
+    personas = await index.select(_section("USER PERSONAS"), budget)
+    assert personas == {"phase_submissions": [chunks[0].text], "knowledge_base": [chunks[3].text]}
+
+    pricing = await index.select(_section("PRICING"), budget)
+    assert chunks[1].text in pricing["phase_submissions"]
+    # One batch for the corpus, then one query per distinct section
+    assert embed.calls == [4, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_small_corpus_is_passed_whole_without_embedding():
+    chunks = build_chunks({"conversation_history": ["**user**: hi", "**assistant**: hello"], "knowledge_base": [""]})
+    embed = _Embedder()
+    index = await SectionContextIndex.build(chunks, 1000, embed, "fake")
+
+    selected = await index.select(_section("ANY"), 1000)
+    assert selected == {"conversation_history": ["**user**: hi", "**assistant**: hello"]}
+    assert embed.calls == []
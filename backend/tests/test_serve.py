@@ -0,0 +1,34 @@
+"""Tests for the production launcher's worker sizing and per-worker budgets."""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend import serve
+from backend.config import per_worker, settings
+
+
+def test_worker_count_prefers_explicit_then_env_then_cpus(monkeypatch):
+    monkeypatch.setattr(serve, "available_cpus", lambda: 2.5)
+    monkeypatch.delenv("BACKEND_WORKERS", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert serve.worker_count() == 2  # whole CPUs of the quota
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert serve.worker_count() == 3
+    monkeypatch.setenv("BACKEND_WORKERS", "6")
+    assert serve.worker_count() == 6
+    assert serve.worker_count(1) == 1
+
+    monkeypatch.delenv("BACKEND_WORKERS")
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    monkeypatch.setattr(serve, "available_cpus", lambda: 0.5)
+    assert serve.worker_count() == 1
+
+
+def test_per_worker_splits_pod_budget(monkeypatch):
+    monkeypatch.setattr(settings, "backend_workers", 4)
+    assert per_worker(20) == 5
+    assert per_worker(5) == 1
+    assert per_worker(2) == 1  # never below one
+    monkeypatch.setattr(settings, "backend_workers", 1)
+    assert per_worker(20) == 20
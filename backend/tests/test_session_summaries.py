@@ -0,0 +1,150 @@
+"""
+Tests for hierarchical, cached session summarization.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from backend.services import session_summaries
+from backend.services.redis_cache import RedisCache
+from backend.services.session_summaries import HierarchicalSummarizer, split_by_budget
+
+
+class _FakeAgent:
+    """Records each model call by kind."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create_session_summary(self, session_id, messages, participants=None):
+        self.calls.append(("session", session_id, len(messages)))
+        return f"summary of {session_id}: " + " ".join(m["content"] for m in messages)
+
+    async def update_session_summary(self, session_id, previous_summary, new_messages):
+        self.calls.append(("update", session_id, len(new_messages)))
+        return previous_summary + " " + " ".join(m["content"] for m in new_messages)
+
+    async def combine_session_summaries(self, summaries, product_context=None):
+        self.calls.append(("combine", None, len(summaries)))
+        return " | ".join(item["summary"] for item in summaries)
+
+
+class _MemoryCache:
+    def __init__(self):
+        self.rows = {}
+
+    async def get_many(self, session_ids):
+        return {sid: dict(self.rows[sid]) for sid in session_ids if sid in self.rows}
+
+    async def put(self, session_id, last_message_id, message_count, summary):
+        self.rows[session_id] = {"last_message_id": last_message_id, "message_count": message_count, "summary": summary}
+
+
+def _session(session_id, count):
+    return {
+        "session_id": session_id,
+        "title": f"Session {session_id}",
+        "participants": ["user"],
+        "messages": [{"id": f"{session_id}-{i}", "role": "user", "content": f"m{i}"} for i in range(count)],
+    }
+
+
+@pytest.fixture(autouse=True)
+def memory_reduce_cache(monkeypatch):
+    cache = RedisCache(ttl=60, prefix="test_summary_reduce:")
+
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr(cache, "_get_redis_client", no_redis)
+    monkeypatch.setattr(session_summaries, "_reduce_cache", cache)
+    monkeypatch.setattr(settings, "summary_cache_enabled", True)
+
+
+@pytest.mark.asyncio
+async def test_only_new_messages_are_summarized_again():
+    agent, cache = _FakeAgent(), _MemoryCache()
+    sessions = [_session("a", 3), _session("b", 2), _session("c", 4)]
+
+    first = await HierarchicalSummarizer(agent, cache).summarize(sessions)
+    assert sorted(kind for kind, _, _ in agent.calls) == ["combine", "session", "session", "session"]
+    assert "m3" in first
+
+    agent.calls.clear()
+    assert await HierarchicalSummarizer(agent, cache).summarize(sessions) == first
+    assert agent.calls == []  # nothing changed: no model call
+
+    sessions[1]["messages"].append({"id": "b-2", "role": "user", "content": "new"})
+    summarizer = HierarchicalSummarizer(agent, cache)
+    updated = await summarizer.summarize(sessions)
+    assert agent.calls == [("update", "b", 1), ("combine", None, 3)]
+    assert summarizer.stats == {"cached": 2, "incremental": 1, "full": 0, "model_calls": 2, "combines_cached": 0}
+    assert "new" in updated
+    assert cache.rows["b"]["last_message_id"] == "b-2"
+
+
+@pytest.mark.asyncio
+async def test_new_message_recombines_only_its_sessions_group(monkeypatch):
+    monkeypatch.setattr(settings, "summary_session_token_budget", 500)
+
+    class _ShortCombineAgent(_FakeAgent):
+        async def combine_session_summaries(self, summaries, product_context=None):
+            self.calls.append(("combine", None, len(summaries)))
+            return " | ".join(item["summary"][-20:] for item in summaries)
+
+    agent, cache = _ShortCombineAgent(), _MemoryCache()
+    sessions = [_session(sid, 1) for sid in "abcd"]
+    for session in sessions:
+        session["messages"][0]["content"] = "word " * 150  # two session summaries fit one combine
+    await HierarchicalSummarizer(agent, cache).summarize(sessions)
+    assert [call for call in agent.calls if call[0] == "combine"] == [("combine", None, 2)] * 3
+
+    agent.calls.clear()
+    sessions[3]["messages"].append({"id": "d-1", "role": "user", "content": "new"})
+    summarizer = HierarchicalSummarizer(agent, cache)
+    assert (await summarizer.summarize(sessions)).endswith("new")
+    # The update, then the group of c and d, then the final combine; the group of a and b is reused
+    assert agent.calls == [("update", "d", 1), ("combine", None, 2), ("combine", None, 2)]
+    assert summarizer.stats["combines_cached"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sessions_loaded_from_the_cached_message_on_are_folded_incrementally():
+    agent, cache = _FakeAgent(), _MemoryCache()
+    await HierarchicalSummarizer(agent, cache).summarize([_session("a", 5)])
+    cached = await cache.get_many(["a"])
+
+    # Only the cached last message and the ones after it are loaded
+    session = _session("a", 7)
+    session["messages"] = session["messages"][4:]
+    agent.calls.clear()
+    summary = await HierarchicalSummarizer(agent, cache).summarize([session], cached=cached)
+
+    assert agent.calls == [("update", "a", 2)]
+    assert "m0" in summary and "m6" in summary
+    assert cache.rows["a"]["message_count"] == 7 and cache.rows["a"]["last_message_id"] == "a-6"
+
+
+@pytest.mark.asyncio
+async def test_long_session_is_chunked_by_token_budget(monkeypatch):
+    monkeypatch.setattr(settings, "summary_session_token_budget", 500)
+    agent = _FakeAgent()
+    session = _session("long", 6)
+    for message in session["messages"]:
+        message["content"] = "word " * 150  # roughly 150 tokens each
+
+    await HierarchicalSummarizer(agent, _MemoryCache()).summarize([session])
+
+    chunk_calls = [call for call in agent.calls if call[0] == "session"]
+    assert len(chunk_calls) > 1
+    assert sum(size for _, _, size in chunk_calls) == 6
+    assert agent.calls[-1][0] == "combine"
+
+
+def test_split_by_budget_keeps_order_and_oversized_items():
+    assert split_by_budget([1, 2, 3, 4, 10, 1], cost=lambda x: x, budget=5) == [[1, 2], [3], [4], [10], [1]]
+    assert split_by_budget([], cost=lambda x: x, budget=5) == []
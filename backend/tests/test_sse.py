@@ -0,0 +1,237 @@
+"""
+Tests for the SSE transport: coalescing, heartbeats, disconnects and Last-Event-ID resume.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import Request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services import sse
+from backend.services.sse import HEARTBEAT, ReplayBuffer, ReplayFollower, SSEStream
+
+
+class _MemoryReplay(ReplayBuffer):
+    """ReplayBuffer over dicts instead of Redis."""
+
+    def __init__(self):
+        super().__init__(redis_client=object())
+        self.streams = {}
+        self.ended = set()
+        self.listeners = set()
+        self.owners = {}
+
+    async def append(self, stream_id, events, end_seq=None, attached=True, owner=None):
+        self.streams.setdefault(stream_id, []).extend(events)
+        if owner is not None:
+            self.owners[stream_id] = owner
+        if end_seq is not None:
+            self.ended.add(stream_id)
+        if attached:
+            self.listeners.add(stream_id)
+
+    async def touch(self, stream_id):
+        self.listeners.add(stream_id)
+
+    async def has_listener(self, stream_id):
+        return stream_id in self.listeners
+
+    async def owner(self, stream_id):
+        return self.owners.get(stream_id)
+
+    async def exists(self, stream_id):
+        return stream_id in self.streams
+
+    async def read_after(self, stream_id, seq, block_ms):
+        if not any(e[0] > seq for e in self.streams.get(stream_id, [])) and stream_id not in self.ended:
+            await asyncio.sleep(block_ms / 1000)
+        return [e for e in self.streams.get(stream_id, []) if e[0] > seq], stream_id in self.ended
+
+
+@pytest.fixture
+def sse_settings(monkeypatch):
+    def configure(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(sse.settings, name, value)
+    return configure
+
+
+def _event(n):
+    return f"event: chunk\ndata: {n}\n\n"
+
+
+@pytest.mark.asyncio
+async def test_queued_events_are_coalesced_numbered_and_heartbeats_fill_gaps(sse_settings):
+    sse_settings(sse_heartbeat_seconds=0.05, sse_coalesce_bytes=16384)
+
+    async def events():
+        for n in range(3):
+            yield _event(n)
+        await asyncio.sleep(0.12)
+        yield _event(3)
+
+    stream = SSEStream(events())
+    frames = [frame async for frame in stream.frames()]
+
+    first = frames[0].decode()
+    assert first.count("event: chunk") == 3  # Produced together, written together
+    assert first.startswith(f"id: {stream.stream_id}:1\n") and f"id: {stream.stream_id}:3\n" in first
+    assert HEARTBEAT in frames[1:-1]
+    assert frames[-1].decode() == f"id: {stream.stream_id}:4\n{_event(3)}"
+    assert stream.stats["events"] == 4 and stream.stats["writes"] == 2 and stream.finished
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_upstream_run(sse_settings):
+    sse_settings(sse_heartbeat_seconds=10, sse_replay_events=0)
+    upstream = {"cancelled": False}
+    closed = asyncio.Event()
+
+    async def events():
+        try:
+            yield _event(0)
+            await asyncio.sleep(30)  # An agent still generating
+            yield _event(1)
+        except asyncio.CancelledError:
+            upstream["cancelled"] = True
+            raise
+
+    async def on_close():
+        closed.set()
+
+    response = sse.sse_response(events(), on_close=on_close)
+    sent = []
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message.get("body"):
+            disconnect.set()  # The tab closes after the first event
+
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=2)
+    await asyncio.wait_for(closed.wait(), timeout=2)
+
+    assert upstream["cancelled"] and response.stream.stats["cancelled"]
+    assert sent[0]["type"] == "http.response.start" and b"data: 0" in sent[1]["body"]
+
+
+@pytest.mark.asyncio
+async def test_slow_client_is_dropped_after_stall_timeout(sse_settings):
+    sse_settings(sse_queue_events=1, sse_stall_timeout=0.05)
+    finished = asyncio.Event()
+
+    async def events():
+        try:
+            for n in range(10):
+                yield _event(n)
+        finally:
+            finished.set()
+
+    stream = SSEStream(events())
+    frames = stream.frames()
+    await frames.__anext__()  # Read once, then stop reading
+    await asyncio.wait_for(finished.wait(), timeout=1)
+    assert stream.stats["stalled"]
+    await frames.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_after_last_event_id(sse_settings):
+    sse_settings(sse_heartbeat_seconds=0.05, sse_resume_grace=10)
+    replay = _MemoryReplay()
+    release = asyncio.Event()
+
+    async def events():
+        yield _event(0)
+        yield _event(1)
+        await release.wait()
+        yield _event(2)
+
+    stream = SSEStream(events(), replay)
+    frames = stream.frames()
+    first = (await frames.__anext__()).decode()
+    assert f"id: {stream.stream_id}:2\n" in first
+    stream.detach()  # Connection lost; the run keeps going for a resume
+    assert not stream.stats["cancelled"]
+
+    follower = ReplayFollower(replay, stream.stream_id, 1)
+    resumed = follower.frames()
+    assert (await resumed.__anext__()).decode() == f"id: {stream.stream_id}:2\n{_event(1)}"
+    release.set()
+    rest = [frame async for frame in resumed if frame != HEARTBEAT]
+    assert rest == [f"id: {stream.stream_id}:3\n{_event(2)}".encode()]
+    assert stream.finished
+
+
+@pytest.mark.asyncio
+async def test_only_the_streams_owner_can_resume_it(sse_settings, monkeypatch):
+    sse_settings(sse_heartbeat_seconds=0.05)
+    replay = _MemoryReplay()
+    monkeypatch.setattr(sse, "get_replay_buffer", lambda: replay)
+
+    async def events():
+        yield _event(0)
+
+    stream = SSEStream(events(), replay, owner="alice")
+    [frame async for frame in stream.frames()]
+    assert replay.owners[stream.stream_id] == "alice"
+
+    request = Request({"type": "http", "headers": [(b"last-event-id", f"{stream.stream_id}:0".encode())]})
+    assert await sse.resume_response(request, {"id": "mallory"}) is None
+    resumed = await sse.resume_response(request, {"id": "alice"})
+    assert resumed is not None and resumed.stream.stream_id == stream.stream_id
+
+
+@pytest.mark.asyncio
+async def test_replay_writes_are_batched_while_the_client_is_attached(sse_settings, monkeypatch):
+    sse_settings(sse_heartbeat_seconds=10, sse_coalesce_bytes=1)  # One write per event
+    monkeypatch.setattr(sse, "REPLAY_FLUSH_INTERVAL", 60)
+    replay = _MemoryReplay()
+    appends = []
+    append = replay.append
+
+    async def counting_append(stream_id, events, end_seq=None, attached=True, owner=None):
+        appends.append(len(events))
+        await append(stream_id, events, end_seq, attached, owner)
+
+    replay.append = counting_append
+
+    async def events():
+        for n in range(5):
+            yield _event(n)
+            await asyncio.sleep(0)
+
+    stream = SSEStream(events(), replay)
+    frames = [frame async for frame in stream.frames()]
+
+    assert len(frames) == 5
+    # The first event right away (the stream becomes resumable), the rest with the end marker
+    assert appends == [1, 4]
+    assert [seq for seq, _ in replay.streams[stream.stream_id]] == [1, 2, 3, 4, 5]
+    assert stream.stream_id in replay.ended
+
+
+@pytest.mark.asyncio
+async def test_resumed_reads_poll_instead_of_blocking_a_pooled_connection(monkeypatch):
+    monkeypatch.setattr(sse, "REPLAY_POLL_INTERVAL", 0.01)
+
+    class _PollingRedis:
+        def __init__(self):
+            self.reads = 0
+
+        async def xread(self, streams, count=None):  # No block argument
+            self.reads += 1
+            if self.reads < 3:
+                return []
+            return [("sse:s1:events", [("0-2", {"e": "data: x\n\n"}), ("0-3", {"done": "1"})])]
+
+    redis = _PollingRedis()
+    events, done = await ReplayBuffer(redis_client=redis).read_after("s1", 1, block_ms=1000)
+    assert events == [(2, "data: x\n\n")] and done and redis.reads == 3
@@ -0,0 +1,38 @@
+"""
+Tests for pgvector index configuration used by RAG knowledge bases.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from backend.services.vector_index import build_vector_index, ef_search_override, resolve_ef_search
+
+
+def test_build_vector_index_uses_hnsw_settings():
+    index = build_vector_index()
+    if index is None:
+        return  # Agno not installed
+    assert type(index).__name__ == "HNSW"
+    assert index.m == settings.vector_hnsw_m
+    assert index.ef_construction == settings.vector_hnsw_ef_construction
+    assert index.ef_search == settings.vector_hnsw_ef_search
+
+
+def test_resolve_ef_search_never_below_top_k():
+    assert resolve_ef_search(top_k=5) == max(settings.vector_hnsw_ef_search, 5)
+    assert resolve_ef_search(top_k=500, ef_search=10) == 500
+    assert resolve_ef_search(top_k=5, ef_search=300) == 300
+
+
+def test_ef_search_override_restores_previous_value():
+    vector_db = SimpleNamespace(vector_index=SimpleNamespace(ef_search=40))
+    with ef_search_override(vector_db, 200):
+        assert vector_db.vector_index.ef_search == 200
+    assert vector_db.vector_index.ef_search == 40
+
+    # Vector stores without an HNSW index are left untouched
+    with ef_search_override(SimpleNamespace(vector_index=None), 200):
+        pass
@@ -0,0 +1,138 @@
+"""
+Tests for the concurrent documentation crawler.
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services import web_crawler
+from backend.services.integration_http import IntegrationResponse
+from backend.services.web_crawler import HostThrottle, WebCrawler
+
+BASE = "https://docs.example.com"
+
+
+def _site(pages):
+    """HTML for each path, linking to its children."""
+    return {
+        f"{BASE}{path}": (
+            f"<html><head><title>{path}</title></head><body><main>Text of {path}</main>"
+            + "".join(f'<a href="{child}">{child}</a>' for child in children)
+            + '<a href="https://elsewhere.example.org/x">external</a></body></html>'
+        )
+        for path, children in pages.items()
+    }
+
+
+class _FakeFetch:
+    """Serves the site with simulated latency; the second round reports every page unchanged."""
+
+    def __init__(self, site, latency=0.05):
+        self.site = site
+        self.latency = latency
+        self.revalidate = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    async def __call__(self, method, url, **kwargs):
+        self.requests.append(url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if url not in self.site:
+            return IntegrationResponse(status_code=404, text="missing")
+        html = self.site[url]
+        return IntegrationResponse(status_code=200, text=html, not_modified=self.revalidate,
+                                   content_hash=hashlib.sha256(html.encode()).hexdigest())
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    calls = []
+
+    async def run_inline(fn, *args, bulk=False):
+        calls.append(args[1])
+        return fn(*args)
+
+    monkeypatch.setattr(web_crawler, "run_cpu_bound", run_inline)
+    monkeypatch.setattr(web_crawler, "_parsed_cache", None)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_crawl_is_concurrent_deduplicated_and_bounded(monkeypatch, parse_counter):
+    site = _site({
+        "/docs/a": ["/docs/b", "/docs/c", "/docs/d", "/blog/x"],
+        "/docs/b": ["/docs/a", "/docs/c", "/docs/e"],
+        "/docs/c": ["/docs/f", "/docs/missing"],
+        "/docs/d": [], "/docs/e": [], "/docs/f": ["/docs/a"],
+    })
+    fake = _FakeFetch(site)
+    monkeypatch.setattr(web_crawler, "fetch", fake)
+    crawler = WebCrawler(link_filter=lambda url: "/docs/" in url, concurrency=4,
+                         throttle=HostThrottle(rate=1000, burst=100))
+
+    pages = await crawler.crawl(f"{BASE}/docs/a", max_pages=10)
+
+    assert sorted(p["url"] for p in pages) == sorted(site)
+    assert len(fake.requests) == len(set(fake.requests))  # each URL fetched once
+    assert f"{BASE}/blog/x" not in fake.requests
+    assert 1 < fake.max_in_flight <= 4  # pages are fetched concurrently, within the limit
+    assert all("elsewhere" not in link for p in pages for link in p["links"])
+
+    limited = await WebCrawler(link_filter=lambda url: "/docs/" in url, concurrency=4).crawl(
+        f"{BASE}/docs/a", max_pages=3)
+    assert len(limited) == 3
+
+
+@pytest.mark.asyncio
+async def test_recrawl_reuses_parsed_pages(monkeypatch, parse_counter):
+    site = _site({"/docs/a": ["/docs/b"], "/docs/b": []})
+    fake = _FakeFetch(site, latency=0)
+    monkeypatch.setattr(web_crawler, "fetch", fake)
+
+    first = await WebCrawler().crawl(f"{BASE}/docs/a")
+    assert len(parse_counter) == 2
+
+    fake.revalidate = True
+    crawler = WebCrawler()
+    second = await crawler.crawl(f"{BASE}/docs/a")
+    assert len(parse_counter) == 2  # unchanged pages are not parsed again
+    assert crawler.stats["not_modified"] == 2
+    assert sorted(p["content"] for p in second) == sorted(p["content"] for p in first)
+
+
+@pytest.mark.asyncio
+async def test_identical_pages_resolve_links_against_their_own_url(monkeypatch, parse_counter):
+    html = '<html><body><main>Same</main><a href="next">next</a></body></html>'
+    site = {f"{BASE}/v1/intro": html, f"{BASE}/v2/intro": html}
+    monkeypatch.setattr(web_crawler, "fetch", _FakeFetch(site, latency=0))
+    crawler = WebCrawler()
+
+    v1 = await crawler.crawl_page(f"{BASE}/v1/intro")
+    v2 = await crawler.crawl_page(f"{BASE}/v2/intro")
+
+    assert v1["links"] == [f"{BASE}/v1/next"]
+    assert v2["links"] == [f"{BASE}/v2/next"]
+    assert len(parse_counter) == 2
+
+
+@pytest.mark.asyncio
+async def test_host_throttle_spaces_requests_after_burst():
+    throttle = HostThrottle(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        await throttle.acquire("docs.example.com")
+    await throttle.acquire("other.example.com")  # other hosts have their own bucket
+    # Two from the burst, then two at 50/s
+    assert 0.03 <= time.monotonic() - start < 0.5
@@ -0,0 +1,208 @@
+"""
+Tests for the WebSocket hub: per-socket queues, drop policies and cross-pod fan-out.
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.services.websocket_hub import DISCONNECT, DROP_OLDEST, WebSocketHub
+
+
+class _FakeSocket:
+    def __init__(self, blocked: bool = False):
+        self.received = []
+        self.closed_with = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblocked.wait()
+        self.received.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class _FakeRedis:
+    """In-memory pub/sub broker shared by the hubs of several 'pods'."""
+
+    def __init__(self):
+        self.subscriptions = {}
+
+    async def publish(self, channel, data):
+        for pubsub in self.subscriptions.get(channel, set()):
+            pubsub.messages.put_nowait({"type": "message", "channel": channel, "data": data})
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return _FakePubSub(self)
+
+
+class _FakePubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self.broker.subscriptions.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, *channels):
+        for channel in channels:
+            self.broker.subscriptions.get(channel, set()).discard(self)
+
+    async def get_message(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+def _local_hub(**kwargs):
+    hub = WebSocketHub(**kwargs)
+    hub._redis.disable()  # No Redis: delivery stays on this pod
+    return hub
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slow_socket_does_not_hold_up_the_others():
+    hub = _local_hub(queue_size=2, drop_policy=DROP_OLDEST)
+    fast = [_FakeSocket() for _ in range(3)]
+    slow = _FakeSocket(blocked=True)
+    for i, socket in enumerate(fast + [slow]):
+        await hub.connect(socket, f"c{i}")
+        await hub.subscribe(f"c{i}", "product:p1")
+
+    for n in range(5):
+        await hub.publish("product:p1", {"n": n})
+        await _settle()  # Messages arrive over time, not in one burst
+
+    assert all([m["n"] for m in socket.received] == [0, 1, 2, 3, 4] for socket in fast)
+    # The slow socket is writing message 0 and keeps only the newest two queued
+    slow.unblocked.set()
+    await asyncio.sleep(0.05)
+    assert [m["n"] for m in slow.received] == [0, 3, 4]
+    snapshot = hub.snapshot()
+    assert snapshot["connections"] == 4 and snapshot["subscriptions"] == 4
+    assert snapshot["dropped"] == 2 and snapshot["sent"] == 18
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_a_socket_that_falls_behind():
+    hub = _local_hub(queue_size=1, drop_policy=DISCONNECT)
+    slow = _FakeSocket(blocked=True)
+    await hub.connect(slow, "slow")
+    await hub.subscribe("slow", "job:j1")
+
+    for n in range(3):
+        await hub.publish("job:j1", {"n": n})
+    await _settle()
+
+    assert slow.closed_with == 1013
+    assert "slow" not in hub.clients and not hub.topics
+    assert hub.snapshot()["slow_disconnects"] == 1
+
+
+@pytest.mark.asyncio
+async def test_topics_fan_out_across_pods_through_redis():
+    redis = _FakeRedis()
+    pod_a, pod_b = WebSocketHub(redis_client=redis), WebSocketHub(redis_client=redis)
+    subscriber, bystander = _FakeSocket(), _FakeSocket()
+    await pod_b.connect(subscriber, "s1")
+    await pod_b.connect(bystander, "s2")
+    await pod_b.subscribe("s1", "product:p1")
+    assert not await pod_b.subscribe("s2", "secrets")  # Only product and job topics
+
+    await pod_a.publish("product:p1", {"type": "product_scored"})
+    for _ in range(20):
+        if subscriber.received:
+            break
+        await asyncio.sleep(0.01)
+
+    assert subscriber.received == [{"type": "product_scored"}]
+    assert not bystander.received
+    assert pod_b.snapshot()["backend"] == "redis" and pod_b.snapshot()["received"] == 1
+
+    await pod_b.unsubscribe("s1", "product:p1")
+    assert not redis.subscriptions["ws:product:p1"]
+    await pod_b.disconnect("s1")
+    await pod_b.disconnect("s2")
+    assert not redis.subscriptions["ws:broadcast"]
+    await pod_b.close()
+
+
+class _InactiveUserSession:
+    """Database session in which the token's user has been deactivated."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        return self
+
+    def fetchone(self):
+        return None
+
+
+class _TokenStorage:
+    def __init__(self, token_data):
+        self.tokens = {"t1": token_data}
+
+    async def get_token(self, token):
+        return self.tokens.get(token)
+
+    async def delete_token(self, token):
+        self.tokens.pop(token, None)
+
+
+def test_websocket_applies_session_checks_and_requires_a_token(monkeypatch):
+    from datetime import datetime, timedelta
+
+    from starlette.testclient import TestClient
+
+    from backend import database
+    from backend.api import auth, streaming
+    from backend.main import app
+
+    storage = _TokenStorage({"user_id": "11111111-1111-1111-1111-111111111111",
+                             "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()})
+
+    async def token_storage():
+        return storage
+
+    monkeypatch.setattr(auth, "get_token_storage", token_storage)
+    monkeypatch.setattr(database, "AsyncSessionLocal", _InactiveUserSession)
+    monkeypatch.setattr(streaming, "get_websocket_hub", _local_hub)
+    client = TestClient(app)
+
+    with client.websocket_connect("/api/streaming/ws/c1?token=t1") as websocket:
+        assert websocket.receive_json() == {"type": "error", "error": "Authentication failed"}
+    assert "t1" not in storage.tokens
+
+    with client.websocket_connect("/api/streaming/ws/c2") as websocket:
+        assert websocket.receive_json()["type"] == "connected"
+        websocket.send_json({"type": "multi_agent_request", "user_id": "11111111-1111-1111-1111-111111111111",
+                             "request": {"query": "hi"}})
+        assert websocket.receive_json() == {"type": "error", "error": "Authentication required"}
+        websocket.send_json({"type": "subscribe", "topic": "product:p1"})
+        assert websocket.receive_json()["type"] == "error"
@@ -0,0 +1,91 @@
+"""Keyset (cursor) pagination helpers for list endpoints.
+
+A cursor is an opaque, URL-safe token holding the sort timestamp and id of the last
+row of the previous page. Queries continue strictly after that (timestamp, id) pair,
+so pages stay stable while rows are inserted and each page is a single index range
+scan instead of an OFFSET walk.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.config import settings
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Bound a requested page size to the configured default/maximum."""
+    if not limit or limit < 1:
+        return settings.pagination_default_limit
+    return min(limit, settings.pagination_max_limit)
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: Any) -> str:
+    """Encode the (timestamp, id) of the last row on a page; the timestamp may be NULL."""
+    sort_text = sort_value.isoformat() if sort_value is not None else None
+    payload = json.dumps({"t": sort_text, "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value = datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        return sort_value, str(payload["id"])
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor}") from e
+
+
+def keyset_condition(sort_column: str, id_column: str, descending: bool = True, null_cursor: bool = False) -> str:
+    """
+    SQL predicate selecting rows strictly after the cursor in the given order.
+
+    Postgres sorts NULL sort values first in DESC order and last in ASC order; those
+    rows are ordered among themselves by id. null_cursor means the cursor row's own
+    sort value was NULL.
+    """
+    operator = "<" if descending else ">"
+    if null_cursor:
+        after_id = f"{sort_column} IS NULL AND {id_column} {operator} CAST(:cursor_id AS uuid)"
+        return f"(({after_id}) OR {sort_column} IS NOT NULL)" if descending else f"({after_id})"
+    condition = (
+        f"({sort_column}, {id_column}) {operator} "
+        f"(CAST(:cursor_ts AS timestamptz), CAST(:cursor_id AS uuid))"
+    )
+    return condition if descending else f"({condition} OR {sort_column} IS NULL)"
+
+
+def apply_cursor(
+    cursor: Optional[str],
+    params: Dict[str, Any],
+    sort_column: str,
+    id_column: str,
+    descending: bool = True,
+) -> str:
+    """Add cursor parameters to params and return the matching ' AND ...' clause ('' without cursor)."""
+    if not cursor:
+        return ""
+    cursor_ts, cursor_id = decode_cursor(cursor)
+    params["cursor_id"] = cursor_id
+    if cursor_ts is not None:
+        params["cursor_ts"] = cursor_ts
+    return f" AND {keyset_condition(sort_column, id_column, descending, null_cursor=cursor_ts is None)}"
+
+
+def split_page(rows: Sequence[Any], limit: int, sort_index: int, id_index: int = 0) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a result fetched with LIMIT limit + 1 to one page.
+
+    Returns the page rows and the cursor for the next page (None on the last page).
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last[sort_index], last[id_index])
@@ -190,7 +190,7 @@ CREATE INDEX IF NOT EXISTS idx_products_status ON products(status);
 CREATE INDEX IF NOT EXISTS idx_prd_documents_product_id ON prd_documents(product_id);
 CREATE INDEX IF NOT EXISTS idx_agent_messages_session_id ON agent_messages(session_id);
 CREATE INDEX IF NOT EXISTS idx_knowledge_articles_product_id ON knowledge_articles(product_id);
-CREATE INDEX IF NOT EXISTS idx_knowledge_articles_embedding ON knowledge_articles USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+CREATE INDEX IF NOT EXISTS idx_knowledge_articles_embedding ON knowledge_articles USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX IF NOT EXISTS idx_phase_submissions_product_id ON phase_submissions(product_id);
 CREATE INDEX IF NOT EXISTS idx_phase_submissions_phase_id ON phase_submissions(phase_id);
 CREATE INDEX IF NOT EXISTS idx_conversation_history_session_id ON conversation_history(session_id);
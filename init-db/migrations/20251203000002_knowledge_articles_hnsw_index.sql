@@ -0,0 +1,109 @@
+/*
+  # HNSW Vector Index for Knowledge Articles
+
+  Replaces the IVFFlat index on knowledge_articles.embedding. IVFFlat was built with
+  lists = 100 on an empty table at init time, so its centroids never reflected the
+  data and recall/latency degraded as articles were added. HNSW (pgvector >= 0.5)
+  needs no training step and is tuned with:
+    - m / ef_construction at build time (graph degree / build candidate list)
+    - hnsw.ef_search per query (search candidate list)
+
+  Product-scoped searches no longer post-filter ANN results:
+    - products with up to exact_search_max_rows embedded articles are searched
+      exactly over the product_id B-tree (small, always 100% recall)
+    - larger products use HNSW with iterative index scans (pgvector >= 0.8) so the
+      filter cannot starve the result set
+*/
+
+DROP INDEX IF EXISTS idx_knowledge_articles_embedding;
+
+CREATE INDEX IF NOT EXISTS idx_knowledge_articles_embedding
+  ON knowledge_articles USING hnsw (embedding vector_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
+-- Keep scanning the HNSW graph until filtered queries have enough rows (pgvector >= 0.8).
+-- Applies to Agno knowledge tables as well, which filter on metadata after the ANN scan.
+DO $$
+BEGIN
+  EXECUTE format('ALTER DATABASE %I SET hnsw.iterative_scan = relaxed_order', current_database());
+EXCEPTION WHEN OTHERS THEN
+  RAISE NOTICE 'hnsw.iterative_scan not supported by this pgvector version: %', SQLERRM;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS search_knowledge_articles(vector, float, int, uuid);
+
+CREATE OR REPLACE FUNCTION search_knowledge_articles(
+  query_embedding vector(1536),
+  match_threshold float DEFAULT 0.7,
+  match_count int DEFAULT 5,
+  filter_product_id uuid DEFAULT NULL,
+  ef_search int DEFAULT NULL,
+  exact_search_max_rows int DEFAULT 10000
+)
+RETURNS TABLE (
+  id uuid,
+  product_id uuid,
+  title text,
+  content text,
+  source text,
+  metadata jsonb,
+  created_at timestamptz,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  product_rows bigint;
+BEGIN
+  IF ef_search IS NOT NULL THEN
+    PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, match_count)::text, true);
+  END IF;
+
+  IF filter_product_id IS NOT NULL THEN
+    SELECT count(*) INTO product_rows
+    FROM (
+      SELECT 1 FROM knowledge_articles k
+      WHERE k.product_id = filter_product_id AND k.embedding IS NOT NULL
+      LIMIT exact_search_max_rows + 1
+    ) bounded;
+
+    IF product_rows <= exact_search_max_rows THEN
+      -- Exact search over the product's rows; MATERIALIZED keeps the planner off the ANN index
+      RETURN QUERY
+      WITH candidates AS MATERIALIZED (
+        SELECT ka.id, ka.product_id, ka.title, ka.content, ka.source, ka.metadata, ka.created_at,
+               ka.embedding <=> query_embedding AS distance
+        FROM knowledge_articles ka
+        WHERE ka.product_id = filter_product_id
+          AND ka.embedding IS NOT NULL
+      )
+      SELECT c.id, c.product_id, c.title, c.content, c.source, c.metadata, c.created_at,
+             1 - c.distance AS similarity
+      FROM candidates c
+      WHERE 1 - c.distance > match_threshold
+      ORDER BY c.distance
+      LIMIT match_count;
+      RETURN;
+    END IF;
+  END IF;
+
+  RETURN QUERY
+  SELECT
+    ka.id,
+    ka.product_id,
+    ka.title,
+    ka.content,
+    ka.source,
+    ka.metadata,
+    ka.created_at,
+    1 - (ka.embedding <=> query_embedding) AS similarity
+  FROM knowledge_articles ka
+  WHERE 
+    (filter_product_id IS NULL OR ka.product_id = filter_product_id)
+    AND ka.embedding IS NOT NULL
+    AND 1 - (ka.embedding <=> query_embedding) > match_threshold
+  ORDER BY ka.embedding <=> query_embedding
+  LIMIT match_count;
+END;
+$$;
@@ -0,0 +1,17 @@
+/*
+  # Session Summary Cache
+
+  Persists the latest summary of each conversation session for multi-session
+  product summaries. A row is valid while its last_message_id is still the
+  session's newest message; when messages were added since, only those are
+  folded into the stored summary instead of re-summarizing the whole session.
+*/
+
+CREATE TABLE IF NOT EXISTS session_summary_cache (
+  session_id uuid PRIMARY KEY REFERENCES conversation_sessions(id) ON DELETE CASCADE,
+  last_message_id uuid NOT NULL,
+  message_count integer NOT NULL,
+  summary text NOT NULL,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
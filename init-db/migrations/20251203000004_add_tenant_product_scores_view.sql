@@ -0,0 +1,41 @@
+/*
+  # Tenant Product Scores View
+
+  The Idea Score Dashboard (GET /api/products/tenant/{tenant_id}/scores) reads the
+  latest score of each product, with the number of scoring runs, from this
+  materialized view instead of scanning product_idea_scores on every request. The
+  backend refreshes it CONCURRENTLY after each new score, which needs the unique
+  index on id. product_name is as of the last refresh; the API joins products for
+  the current name.
+*/
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS tenant_product_scores AS
+SELECT DISTINCT ON (pis.tenant_id, pis.product_id)
+  pis.id,
+  pis.tenant_id,
+  pis.product_id,
+  p.name AS product_name,
+  pis.overall_score,
+  pis.success_probability,
+  pis.scoring_data,
+  pis.recommendations,
+  pis.success_factors,
+  pis.risk_factors,
+  pis.created_at,
+  pis.updated_at,
+  count(*) OVER (PARTITION BY pis.tenant_id, pis.product_id) AS score_count
+FROM product_idea_scores pis
+JOIN products p ON p.id = pis.product_id
+WHERE pis.tenant_id IS NOT NULL
+ORDER BY pis.tenant_id, pis.product_id, pis.created_at DESC, pis.id DESC;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tenant_product_scores_id
+  ON tenant_product_scores(id);
+
+-- Keyset pagination: newest first per tenant
+CREATE INDEX IF NOT EXISTS idx_tenant_product_scores_tenant_created_id
+  ON tenant_product_scores(tenant_id, created_at DESC, id DESC);
+
+-- Latest score per product when deciding which dimensions to re-score
+CREATE INDEX IF NOT EXISTS idx_product_idea_scores_product_created_id
+  ON product_idea_scores(product_id, created_at DESC, id DESC);
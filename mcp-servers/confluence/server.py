@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 import os
+import sys
 from fastmcp import FastMCP
 from atlassian import Confluence
 from typing import Dict, Any, List
 import structlog
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcp_common import LatencyHistogram, run_blocking, timed_tool, ttl_cached
+
 logger = structlog.get_logger()
 
 mcp = FastMCP("Confluence MCP Server")
+latency = LatencyHistogram()
 
 confluence_url = os.getenv("CONFLUENCE_URL", "")
 confluence_email = os.getenv("CONFLUENCE_EMAIL", "")
@@ -26,12 +32,14 @@ else:
 
 
 @mcp.tool()
+@timed_tool(latency)
+@ttl_cached()
 async def list_spaces() -> Dict[str, Any]:
     if not confluence_client:
         return {"error": "Confluence client not configured"}
 
     try:
-        spaces = confluence_client.get_all_spaces(limit=100)
+        spaces = await run_blocking(confluence_client.get_all_spaces, limit=100)
         space_list = []
 
         for space in spaces.get('results', []):
@@ -53,12 +61,14 @@ async def list_spaces() -> Dict[str, Any]:
 
 
 @mcp.tool()
+@timed_tool(latency)
+@ttl_cached()
 async def get_space(space_key: str) -> Dict[str, Any]:
     if not confluence_client:
         return {"error": "Confluence client not configured"}
 
     try:
-        space = confluence_client.get_space(space_key)
+        space = await run_blocking(confluence_client.get_space, space_key)
         return {
             "key": space.get('key'),
             "name": space.get('name'),
@@ -73,6 +83,7 @@ async def get_space(space_key: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def create_page(
     space_key: str,
     title: str,
@@ -83,7 +94,8 @@ async def create_page(
         return {"error": "Confluence client not configured"}
 
     try:
-        page = confluence_client.create_page(
+        page = await run_blocking(
+            confluence_client.create_page,
             space=space_key,
             title=title,
             body=content,
@@ -103,12 +115,14 @@ async def create_page(
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def get_page(page_id: str) -> Dict[str, Any]:
     if not confluence_client:
         return {"error": "Confluence client not configured"}
 
     try:
-        page = confluence_client.get_page_by_id(
+        page = await run_blocking(
+            confluence_client.get_page_by_id,
             page_id,
             expand='body.storage,version,space'
         )
@@ -128,6 +142,7 @@ async def get_page(page_id: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def update_page(
     page_id: str,
     title: str,
@@ -137,10 +152,11 @@ async def update_page(
         return {"error": "Confluence client not configured"}
 
     try:
-        page = confluence_client.get_page_by_id(page_id, expand='version')
+        page = await run_blocking(confluence_client.get_page_by_id, page_id, expand='version')
         current_version = page.get('version', {}).get('number', 1)
 
-        updated_page = confluence_client.update_page(
+        updated_page = await run_blocking(
+            confluence_client.update_page,
             page_id=page_id,
             title=title,
             body=content,
@@ -159,12 +175,14 @@ async def update_page(
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def search_content(query: str, limit: int = 20) -> Dict[str, Any]:
     if not confluence_client:
         return {"error": "Confluence client not configured"}
 
     try:
-        results = confluence_client.cql(
+        results = await run_blocking(
+            confluence_client.cql,
             f'text ~ "{query}"',
             limit=limit
         )
@@ -190,12 +208,14 @@ async def search_content(query: str, limit: int = 20) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def get_page_children(page_id: str) -> Dict[str, Any]:
     if not confluence_client:
         return {"error": "Confluence client not configured"}
 
     try:
-        children = confluence_client.get_page_child_by_type(
+        children = await run_blocking(
+            confluence_client.get_page_child_by_type,
             page_id,
             type='page',
             limit=100
@@ -227,5 +247,10 @@ async def spaces_resource() -> str:
     return f"Found {result['count']} Confluence spaces"
 
 
+@mcp.resource("confluence://metrics/tool-latency", mime_type="application/json")
+def tool_latency_resource() -> str:
+    return latency.to_json()
+
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
@@ -1,87 +1,167 @@
 #!/usr/bin/env python3
 import os
+import sys
 from fastmcp import FastMCP
 from github import Github
 from typing import Dict, Any, List
 import structlog
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcp_common import LatencyHistogram, run_blocking, timed_tool, ttl_cached
+
 logger = structlog.get_logger()
 
 mcp = FastMCP("GitHub MCP Server")
+latency = LatencyHistogram()
 
 github_token = os.getenv("GITHUB_TOKEN", "")
 github_org = os.getenv("GITHUB_ORG", "")
 
+# Tools return at most this many items; one page of this size is a single API request
+MAX_LIST_ITEMS = 50
+
 if github_token:
-    github_client = Github(github_token)
+    github_client = Github(github_token, per_page=MAX_LIST_ITEMS)
 else:
     github_client = None
     logger.warning("GitHub token not configured")
 
 
+def _first_page(paginated) -> list:
+    """First page of a PaginatedList in one request, instead of lazily paging while slicing."""
+    return list(paginated.get_page(0))[:MAX_LIST_ITEMS]
+
+
+def _fetch_repositories(target_org: str) -> Dict[str, Any]:
+    if target_org:
+        repos = github_client.get_organization(target_org).get_repos()
+    else:
+        repos = github_client.get_user().get_repos()
+
+    repo_list = []
+    for repo in _first_page(repos):
+        repo_list.append({
+            "name": repo.name,
+            "full_name": repo.full_name,
+            "description": repo.description,
+            "url": repo.html_url,
+            "stars": repo.stargazers_count,
+            "language": repo.language,
+            "created_at": repo.created_at.isoformat(),
+            "updated_at": repo.updated_at.isoformat()
+        })
+
+    return {
+        "repositories": repo_list,
+        "count": len(repo_list)
+    }
+
+
+def _fetch_repository(repo_name: str) -> Dict[str, Any]:
+    repo = github_client.get_repo(repo_name)
+    return {
+        "name": repo.name,
+        "full_name": repo.full_name,
+        "description": repo.description,
+        "url": repo.html_url,
+        "default_branch": repo.default_branch,
+        "stars": repo.stargazers_count,
+        "forks": repo.forks_count,
+        "open_issues": repo.open_issues_count,
+        "language": repo.language,
+        "topics": repo.get_topics(),
+        "created_at": repo.created_at.isoformat(),
+        "updated_at": repo.updated_at.isoformat(),
+        "pushed_at": repo.pushed_at.isoformat() if repo.pushed_at else None
+    }
+
+
+def _create_issue(repo_name: str, title: str, body: str, labels: List[str], assignees: List[str]) -> Dict[str, Any]:
+    # lazy=True skips the repository GET; only the create call hits the API
+    repo = github_client.get_repo(repo_name, lazy=True)
+    issue = repo.create_issue(
+        title=title,
+        body=body,
+        labels=labels,
+        assignees=assignees
+    )
+
+    return {
+        "number": issue.number,
+        "title": issue.title,
+        "url": issue.html_url,
+        "state": issue.state,
+        "created_at": issue.created_at.isoformat()
+    }
+
+
+def _fetch_pull_requests(repo_name: str, state: str) -> Dict[str, Any]:
+    repo = github_client.get_repo(repo_name, lazy=True)
+
+    pr_list = []
+    for pr in _first_page(repo.get_pulls(state=state)):
+        pr_list.append({
+            "number": pr.number,
+            "title": pr.title,
+            "state": pr.state,
+            "url": pr.html_url,
+            "author": pr.user.login,
+            "created_at": pr.created_at.isoformat(),
+            "updated_at": pr.updated_at.isoformat()
+        })
+
+    return {
+        "pull_requests": pr_list,
+        "count": len(pr_list)
+    }
+
+
+def _fetch_file_content(repo_name: str, file_path: str, branch: str) -> Dict[str, Any]:
+    repo = github_client.get_repo(repo_name, lazy=True)
+    # Without a ref the contents API already reads the default branch
+    content = repo.get_contents(file_path, ref=branch) if branch else repo.get_contents(file_path)
+
+    return {
+        "path": content.path,
+        "name": content.name,
+        "content": content.decoded_content.decode('utf-8'),
+        "size": content.size,
+        "sha": content.sha,
+        "url": content.html_url
+    }
+
+
 @mcp.tool()
+@timed_tool(latency)
+@ttl_cached()
 async def list_repositories(org: str = None) -> Dict[str, Any]:
     if not github_client:
         return {"error": "GitHub client not configured"}
 
     try:
-        target_org = org or github_org
-        if target_org:
-            organization = github_client.get_organization(target_org)
-            repos = organization.get_repos()
-        else:
-            repos = github_client.get_user().get_repos()
-
-        repo_list = []
-        for repo in repos[:50]:
-            repo_list.append({
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "url": repo.html_url,
-                "stars": repo.stargazers_count,
-                "language": repo.language,
-                "created_at": repo.created_at.isoformat(),
-                "updated_at": repo.updated_at.isoformat()
-            })
-
-        return {
-            "repositories": repo_list,
-            "count": len(repo_list)
-        }
+        return await run_blocking(_fetch_repositories, org or github_org)
     except Exception as e:
         logger.error("list_repositories_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
+@ttl_cached()
 async def get_repository(repo_name: str) -> Dict[str, Any]:
     if not github_client:
         return {"error": "GitHub client not configured"}
 
     try:
-        repo = github_client.get_repo(repo_name)
-        return {
-            "name": repo.name,
-            "full_name": repo.full_name,
-            "description": repo.description,
-            "url": repo.html_url,
-            "default_branch": repo.default_branch,
-            "stars": repo.stargazers_count,
-            "forks": repo.forks_count,
-            "open_issues": repo.open_issues_count,
-            "language": repo.language,
-            "topics": repo.get_topics(),
-            "created_at": repo.created_at.isoformat(),
-            "updated_at": repo.updated_at.isoformat(),
-            "pushed_at": repo.pushed_at.isoformat() if repo.pushed_at else None
-        }
+        return await run_blocking(_fetch_repository, repo_name)
     except Exception as e:
         logger.error("get_repository_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def create_issue(
     repo_name: str,
     title: str,
@@ -93,73 +173,33 @@ async def create_issue(
         return {"error": "GitHub client not configured"}
 
     try:
-        repo = github_client.get_repo(repo_name)
-        issue = repo.create_issue(
-            title=title,
-            body=body,
-            labels=labels or [],
-            assignees=assignees or []
-        )
-
-        return {
-            "number": issue.number,
-            "title": issue.title,
-            "url": issue.html_url,
-            "state": issue.state,
-            "created_at": issue.created_at.isoformat()
-        }
+        return await run_blocking(_create_issue, repo_name, title, body, labels or [], assignees or [])
     except Exception as e:
         logger.error("create_issue_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def list_pull_requests(repo_name: str, state: str = "open") -> Dict[str, Any]:
     if not github_client:
         return {"error": "GitHub client not configured"}
 
     try:
-        repo = github_client.get_repo(repo_name)
-        pulls = repo.get_pulls(state=state)
-
-        pr_list = []
-        for pr in pulls[:50]:
-            pr_list.append({
-                "number": pr.number,
-                "title": pr.title,
-                "state": pr.state,
-                "url": pr.html_url,
-                "author": pr.user.login,
-                "created_at": pr.created_at.isoformat(),
-                "updated_at": pr.updated_at.isoformat()
-            })
-
-        return {
-            "pull_requests": pr_list,
-            "count": len(pr_list)
-        }
+        return await run_blocking(_fetch_pull_requests, repo_name, state)
     except Exception as e:
         logger.error("list_pull_requests_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def get_file_content(repo_name: str, file_path: str, branch: str = None) -> Dict[str, Any]:
     if not github_client:
         return {"error": "GitHub client not configured"}
 
     try:
-        repo = github_client.get_repo(repo_name)
-        content = repo.get_contents(file_path, ref=branch or repo.default_branch)
-
-        return {
-            "path": content.path,
-            "name": content.name,
-            "content": content.decoded_content.decode('utf-8'),
-            "size": content.size,
-            "sha": content.sha,
-            "url": content.html_url
-        }
+        return await run_blocking(_fetch_file_content, repo_name, file_path, branch)
     except Exception as e:
         logger.error("get_file_content_error", error=str(e))
         return {"error": str(e)}
@@ -173,5 +213,10 @@ async def repositories_resource() -> str:
     return f"Found {result['count']} repositories"
 
 
+@mcp.resource("github://metrics/tool-latency", mime_type="application/json")
+def tool_latency_resource() -> str:
+    return latency.to_json()
+
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
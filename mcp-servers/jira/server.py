@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 import os
+import sys
 from fastmcp import FastMCP
 from jira import JIRA
 from typing import Dict, Any, List
 import structlog
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcp_common import LatencyHistogram, run_blocking, timed_tool, ttl_cached
+
 logger = structlog.get_logger()
 
 mcp = FastMCP("Jira MCP Server")
+latency = LatencyHistogram()
 
 jira_url = os.getenv("JIRA_URL", "")
 jira_email = os.getenv("JIRA_EMAIL", "")
@@ -23,53 +29,113 @@ else:
     logger.warning("Jira credentials not configured")
 
 
+
+def _fetch_projects() -> Dict[str, Any]:
+    project_list = []
+    for project in jira_client.projects():
+        project_list.append({
+            "key": project.key,
+            "name": project.name,
+            "id": project.id,
+            "lead": project.lead.displayName if hasattr(project, 'lead') else None
+        })
+
+    return {
+        "projects": project_list,
+        "count": len(project_list)
+    }
+
+
+def _fetch_project(project_key: str) -> Dict[str, Any]:
+    project = jira_client.project(project_key)
+    return {
+        "key": project.key,
+        "name": project.name,
+        "id": project.id,
+        "description": getattr(project, 'description', None),
+        "lead": project.lead.displayName if hasattr(project, 'lead') else None,
+        "url": f"{jira_url}/browse/{project.key}"
+    }
+
+
+def _fetch_issue(issue_key: str) -> Dict[str, Any]:
+    issue = jira_client.issue(issue_key)
+    return {
+        "key": issue.key,
+        "id": issue.id,
+        "summary": issue.fields.summary,
+        "description": issue.fields.description,
+        "type": issue.fields.issuetype.name,
+        "status": issue.fields.status.name,
+        "priority": issue.fields.priority.name if issue.fields.priority else None,
+        "assignee": issue.fields.assignee.displayName if issue.fields.assignee else None,
+        "reporter": issue.fields.reporter.displayName if issue.fields.reporter else None,
+        "created": issue.fields.created,
+        "updated": issue.fields.updated,
+        "url": f"{jira_url}/browse/{issue.key}"
+    }
+
+
+def _search_issues(jql: str, max_results: int) -> Dict[str, Any]:
+    issue_list = []
+    for issue in jira_client.search_issues(jql, maxResults=max_results):
+        issue_list.append({
+            "key": issue.key,
+            "summary": issue.fields.summary,
+            "type": issue.fields.issuetype.name,
+            "status": issue.fields.status.name,
+            "assignee": issue.fields.assignee.displayName if issue.fields.assignee else None,
+            "url": f"{jira_url}/browse/{issue.key}"
+        })
+
+    return {
+        "issues": issue_list,
+        "count": len(issue_list),
+        "jql": jql
+    }
+
+
+def _add_comment(issue_key: str, comment: str) -> Dict[str, Any]:
+    comment_obj = jira_client.add_comment(issue_key, comment)
+    return {
+        "id": comment_obj.id,
+        "issue_key": issue_key,
+        "body": comment_obj.body,
+        "created": comment_obj.created,
+        "author": comment_obj.author.displayName
+    }
+
+
 @mcp.tool()
+@timed_tool(latency)
+@ttl_cached()
 async def list_projects() -> Dict[str, Any]:
     if not jira_client:
         return {"error": "Jira client not configured"}
 
     try:
-        projects = jira_client.projects()
-        project_list = []
-
-        for project in projects:
-            project_list.append({
-                "key": project.key,
-                "name": project.name,
-                "id": project.id,
-                "lead": project.lead.displayName if hasattr(project, 'lead') else None
-            })
-
-        return {
-            "projects": project_list,
-            "count": len(project_list)
-        }
+        return await run_blocking(_fetch_projects)
     except Exception as e:
         logger.error("list_projects_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
+@ttl_cached()
 async def get_project(project_key: str) -> Dict[str, Any]:
     if not jira_client:
         return {"error": "Jira client not configured"}
 
     try:
-        project = jira_client.project(project_key)
-        return {
-            "key": project.key,
-            "name": project.name,
-            "id": project.id,
-            "description": getattr(project, 'description', None),
-            "lead": project.lead.displayName if hasattr(project, 'lead') else None,
-            "url": f"{jira_url}/browse/{project.key}"
-        }
+        return await run_blocking(_fetch_project, project_key)
     except Exception as e:
         logger.error("get_project_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def create_epic(
     project_key: str,
     epic_name: str,
@@ -88,7 +154,7 @@ async def create_epic(
             'customfield_10011': epic_name
         }
 
-        epic = jira_client.create_issue(fields=epic_dict)
+        epic = await run_blocking(jira_client.create_issue, fields=epic_dict)
 
         return {
             "key": epic.key,
@@ -104,6 +170,7 @@ async def create_epic(
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def create_story(
     project_key: str,
     summary: str,
@@ -130,7 +197,7 @@ async def create_story(
         if labels:
             story_dict['labels'] = labels
 
-        story = jira_client.create_issue(fields=story_dict)
+        story = await run_blocking(jira_client.create_issue, fields=story_dict)
 
         return {
             "key": story.key,
@@ -146,74 +213,39 @@ async def create_story(
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def get_issue(issue_key: str) -> Dict[str, Any]:
     if not jira_client:
         return {"error": "Jira client not configured"}
 
     try:
-        issue = jira_client.issue(issue_key)
-        return {
-            "key": issue.key,
-            "id": issue.id,
-            "summary": issue.fields.summary,
-            "description": issue.fields.description,
-            "type": issue.fields.issuetype.name,
-            "status": issue.fields.status.name,
-            "priority": issue.fields.priority.name if issue.fields.priority else None,
-            "assignee": issue.fields.assignee.displayName if issue.fields.assignee else None,
-            "reporter": issue.fields.reporter.displayName if issue.fields.reporter else None,
-            "created": issue.fields.created,
-            "updated": issue.fields.updated,
-            "url": f"{jira_url}/browse/{issue.key}"
-        }
+        return await run_blocking(_fetch_issue, issue_key)
     except Exception as e:
         logger.error("get_issue_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def search_issues(jql: str, max_results: int = 50) -> Dict[str, Any]:
     if not jira_client:
         return {"error": "Jira client not configured"}
 
     try:
-        issues = jira_client.search_issues(jql, maxResults=max_results)
-
-        issue_list = []
-        for issue in issues:
-            issue_list.append({
-                "key": issue.key,
-                "summary": issue.fields.summary,
-                "type": issue.fields.issuetype.name,
-                "status": issue.fields.status.name,
-                "assignee": issue.fields.assignee.displayName if issue.fields.assignee else None,
-                "url": f"{jira_url}/browse/{issue.key}"
-            })
-
-        return {
-            "issues": issue_list,
-            "count": len(issue_list),
-            "jql": jql
-        }
+        return await run_blocking(_search_issues, jql, max_results)
     except Exception as e:
         logger.error("search_issues_error", error=str(e))
         return {"error": str(e)}
 
 
 @mcp.tool()
+@timed_tool(latency)
 async def add_comment(issue_key: str, comment: str) -> Dict[str, Any]:
     if not jira_client:
         return {"error": "Jira client not configured"}
 
     try:
-        comment_obj = jira_client.add_comment(issue_key, comment)
-        return {
-            "id": comment_obj.id,
-            "issue_key": issue_key,
-            "body": comment_obj.body,
-            "created": comment_obj.created,
-            "author": comment_obj.author.displayName
-        }
+        return await run_blocking(_add_comment, issue_key, comment)
     except Exception as e:
         logger.error("add_comment_error", error=str(e))
         return {"error": str(e)}
@@ -227,5 +259,10 @@ async def projects_resource() -> str:
     return f"Found {result['count']} Jira projects"
 
 
+@mcp.resource("jira://metrics/tool-latency", mime_type="application/json")
+def tool_latency_resource() -> str:
+    return latency.to_json()
+
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
@@ -0,0 +1,188 @@
+"""
+Shared runtime helpers for the MCP servers.
+
+The GitHub, Jira and Confluence SDKs are synchronous, so calling them straight from
+an `async def` tool blocks the server's event loop for the whole upstream round trip.
+- run_blocking() runs SDK calls in a bounded thread pool (MCP_SDK_MAX_WORKERS).
+- ttl_cached() caches read-tool results for MCP_CACHE_TTL seconds and coalesces
+  concurrent identical calls into one upstream request.
+- timed_tool() records per-tool latency into a fixed-bucket histogram that each
+  server exposes as a `<server>://metrics/tool-latency` resource.
+"""
+import asyncio
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+MCP_SDK_MAX_WORKERS = int(os.getenv("MCP_SDK_MAX_WORKERS", "8"))
+MCP_CACHE_TTL = float(os.getenv("MCP_CACHE_TTL", "300"))
+MCP_CACHE_MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "256"))
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MCP_SDK_MAX_WORKERS, thread_name_prefix="mcp-sdk")
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a synchronous SDK call in the bounded pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+class TTLCache:
+    """Small in-process TTL cache with oldest-first eviction once max_entries is reached."""
+
+    def __init__(self, ttl: float = MCP_CACHE_TTL, max_entries: int = MCP_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def set(self, key: Any, value: Any) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def ttl_cached(ttl: float = MCP_CACHE_TTL) -> Callable:
+    """
+    Cache an async read tool's result per argument set for `ttl` seconds.
+    Error results ({"error": ...}) are not cached; concurrent misses for the same
+    arguments share a single call.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        cache = TTLCache(ttl=ttl)
+        in_flight: Dict[Any, asyncio.Future] = {}
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            pending = in_flight.get(key)
+            if pending is not None:
+                return await asyncio.shield(pending)
+
+            future = asyncio.get_running_loop().create_future()
+            in_flight[key] = future
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure is not reported at GC time
+                future.exception()
+                raise
+            else:
+                future.set_result(result)
+                if ttl > 0 and not (isinstance(result, dict) and "error" in result):
+                    cache.set(key, result)
+                return result
+            finally:
+                in_flight.pop(key, None)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+class LatencyHistogram:
+    """Per-tool call counts, errors and latency distribution."""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, tool: str, elapsed_ms: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self._tools.get(tool)
+            if stats is None:
+                stats = {"count": 0, "errors": 0, "sum_ms": 0.0, "max_ms": 0.0,
+                         "buckets": [0] * (len(self.buckets_ms) + 1)}
+                self._tools[tool] = stats
+            stats["count"] += 1
+            stats["errors"] += int(error)
+            stats["sum_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["buckets"][bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+
+    def _quantile(self, buckets: list, count: int, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when it is the +Inf bucket)."""
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {}
+            for tool, stats in sorted(self._tools.items()):
+                labels = [f"le_{bound:g}ms" for bound in self.buckets_ms] + ["le_inf"]
+                tools[tool] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["sum_ms"] / stats["count"], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                    "p50_ms": self._quantile(stats["buckets"], stats["count"], 0.5),
+                    "p95_ms": self._quantile(stats["buckets"], stats["count"], 0.95),
+                    "p99_ms": self._quantile(stats["buckets"], stats["count"], 0.99),
+                    "buckets": dict(zip(labels, stats["buckets"])),
+                }
+            return {"buckets_ms": list(self.buckets_ms), "tools": tools}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+
+def timed_tool(histogram: LatencyHistogram) -> Callable:
+    """Record each call of an async tool in `histogram`; an {"error": ...} result counts as an error."""
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await func(*args, **kwargs)
+                error = isinstance(result, dict) and "error" in result
+                return result
+            finally:
+                histogram.observe(func.__name__, (time.perf_counter() - start) * 1000, error=error)
+
+        return wrapper
+
+    return decorator
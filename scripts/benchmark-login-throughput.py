@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark: bcrypt on the event loop vs in the CPU pool.
+
+Runs a burst of password verifications (what /api/auth/login does per request)
+on one event loop while simulated SSE streams tick every --tick-ms, and reports for
+each mode:
+- logins/s and p50/p99 login latency
+- p99 and max event-loop lag seen by the streams (how long they were frozen)
+
+"inline" calls bcrypt directly in the coroutine (the old login path); "pool" uses
+services.passwords.verify_password_async (process pool + admission control).
+
+Usage:
+    python3 scripts/benchmark-login-throughput.py
+    python3 scripts/benchmark-login-throughput.py --logins 200 --concurrency 50 --streams 100
+    python3 scripts/benchmark-login-throughput.py --modes pool --pool-workers 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[int(pct * (len(values) - 1))]
+
+
+async def run_mode(mode: str, hashed: str, args) -> dict:
+    from backend.services.passwords import verify_password, verify_password_async
+
+    async def verify(password: str) -> bool:
+        if mode == "inline":
+            return verify_password(password, hashed)
+        return await verify_password_async(password, hashed)
+
+    # Start the pool's processes before measuring
+    if mode == "pool":
+        await asyncio.gather(*(verify("warmup") for _ in range(args.pool_workers or 1)))
+
+    lags = []
+    done = asyncio.Event()
+
+    async def stream():
+        interval = args.tick_ms / 1000
+        expected = time.perf_counter() + interval
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+            now = time.perf_counter()
+            lags.append(max(0.0, now - expected))
+            expected = now + interval
+
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def login(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            ok = await verify(args.password if i % 2 == 0 else "wrong-password")
+            latencies.append(time.perf_counter() - start)
+            assert ok == (i % 2 == 0)
+
+    streams = [asyncio.create_task(stream()) for _ in range(args.streams)]
+    await asyncio.sleep(args.tick_ms / 1000)
+    start = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(args.logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*streams)
+
+    return {
+        "mode": mode,
+        "logins_per_s": args.logins / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "lag_max_ms": max(lags) * 1000 if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare login throughput and loop lag with bcrypt inline vs pooled")
+    parser.add_argument("--modes", nargs="+", choices=["inline", "pool"], default=["inline", "pool"])
+    parser.add_argument("--logins", type=int, default=64, help="Password verifications in the burst")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent login requests")
+    parser.add_argument("--streams", type=int, default=50, help="Simulated SSE streams on the same loop")
+    parser.add_argument("--tick-ms", type=float, default=50.0, help="Interval between stream events")
+    parser.add_argument("--pool-workers", type=int, default=0, help="CPU pool size (0 = from the CPU quota)")
+    parser.add_argument("--password", default="benchmark-password")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "warning")
+    if args.pool_workers:
+        os.environ["CPU_POOL_WORKERS"] = str(args.pool_workers)
+    os.environ.setdefault("CPU_POOL_MAX_QUEUE", str(args.logins))
+    os.environ.setdefault("CPU_POOL_QUEUE_TIMEOUT", "600")
+
+    from backend.services.cpu_executor import pool_size, shutdown_cpu_executor
+    from backend.services.passwords import hash_password
+
+    hashed = hash_password(args.password)
+    results = []
+    try:
+        for mode in args.modes:
+            results.append(asyncio.run(run_mode(mode, hashed, args)))
+    finally:
+        shutdown_cpu_executor()
+
+    print(f"cpu pool workers: {pool_size()}, logins: {args.logins}, concurrency: {args.concurrency}, "
+          f"streams: {args.streams}")
+    print(f"{'mode':>8} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for r in results:
+        print(f"{r['mode']:>8} {r['logins_per_s']:>9.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['lag_p99_ms']:>11.1f} {r['lag_max_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared single-pass Markdown renderer against the previous implementations:
+- the multi-pass regex converter formerly in backend/api/phase_form_help.py
+- python-markdown with the extensions formerly used by the PRD export
+
+Usage:
+    python3 scripts/benchmark-markdown-renderer.py --size-kb 100 --iterations 20
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.services.markdown_renderer import render_markdown, render_markdown_cached  # noqa: E402
+
+
+def legacy_phase_form_markdown_to_html(markdown: str) -> str:
+    """Verbatim copy of the pre-refactor phase form help converter (kept for comparison)."""
+    import html as html_escape
+    html = html_escape.escape(markdown)
+    html = re.sub(r'^### (.*)$', r'<h3 class="text-xl font-semibold mt-4 mb-2">\1</h3>', html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.*)$', r'<h2 class="text-2xl font-semibold mt-6 mb-3">\1</h2>', html, flags=re.MULTILINE)
+    html = re.sub(r'^# (.*)$', r'<h1 class="text-3xl font-bold mt-8 mb-4">\1</h1>', html, flags=re.MULTILINE)
+    html = re.sub(r'\*\*(.*?)\*\*', r'<strong class="font-semibold">\1</strong>', html)
+    html = re.sub(r'\*(.*?)\*', r'<em class="italic">\1</em>', html)
+    html = re.sub(r'^\* (.*)$', r'<li class="ml-4 mb-1">\1</li>', html, flags=re.MULTILINE)
+    html = re.sub(r'^- (.*)$', r'<li class="ml-4 mb-1">\1</li>', html, flags=re.MULTILINE)
+    html = re.sub(r'^\d+\. (.*)$', r'<li class="ml-4 mb-1">\1</li>', html, flags=re.MULTILINE)
+    html = re.sub(r'(<li class="ml-4 mb-1">.*?</li>\n?)+', lambda m: f'<ul class="list-disc my-3">{m.group(0)}</ul>', html, flags=re.DOTALL)
+    html = re.sub(r'```(\w+)?\n(.*?)```', r'<pre class="bg-gray-100 p-3 rounded my-2 overflow-x-auto"><code class="text-sm">\2</code></pre>', html, flags=re.DOTALL)
+    html = re.sub(r'`([^`]+)`', r'<code class="bg-gray-100 px-1 rounded text-sm">\1</code>', html)
+    html = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2" class="text-blue-600 underline" target="_blank">\1</a>', html)
+    html_lines = []
+    for line in html.split('\n'):
+        trimmed = line.strip()
+        if trimmed and not trimmed.startswith('<'):
+            html_lines.append(f'<p class="mb-3 leading-relaxed">\1</p>')
+        else:
+            html_lines.append(line)
+    html = '\n'.join(html_lines)
+    html_lines = []
+    for line in html.split('\n'):
+        trimmed = line.strip()
+        if trimmed and not trimmed.startswith('<') and not trimmed.startswith('&'):
+            html_lines.append(f'<p class="mb-3 leading-relaxed">{trimmed}</p>')
+        else:
+            html_lines.append(line)
+    return '\n'.join(html_lines)
+
+
+def python_markdown_export(markdown_text: str) -> str:
+    import markdown
+    return markdown.markdown(markdown_text, extensions=['extra', 'codehilite', 'tables', 'toc'])
+
+
+def build_prd(size_kb: int) -> str:
+    """Build a synthetic PRD of roughly size_kb kilobytes."""
+    section = """## Section {n}: Functional Requirements
+
+The **{n}th capability** must support *incremental* rollout with `feature_flag_{n}` and
+link to [the spec](https://example.com/spec/{n}) for details.
+
+- Requirement {n}.1 with **acceptance criteria** defined
+- Requirement {n}.2 covering edge cases and *error handling*
+- Requirement {n}.3 with `api/v1/resource/{n}` contract
+  - Sub-requirement for latency under 200ms
+
+1. Step one of the user journey
+2. Step two of the user journey
+
+| Metric | Target | Owner |
+|--------|--------|-------|
+| Conversion | {n}% | Growth |
+| Latency p95 | 200ms | Platform |
+
+```json
+{{"section": {n}, "enabled": true}}
+```
+
+"""
+    parts = ["# Product Requirements Document\n\n"]
+    n = 0
+    while sum(len(p) for p in parts) < size_kb * 1024:
+        n += 1
+        parts.append(section.format(n=n))
+    return "".join(parts)
+
+
+def time_it(fn, text: str, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Markdown renderers")
+    parser.add_argument("--size-kb", type=int, default=100, help="Synthetic PRD size in KB")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations per renderer")
+    args = parser.parse_args()
+
+    text = build_prd(args.size_kb)
+    print(f"Synthetic PRD: {len(text) / 1024:.1f} KB, {text.count(chr(10))} lines\n")
+
+    candidates = [
+        ("legacy regex (phase form help)", legacy_phase_form_markdown_to_html),
+        ("single-pass (tailwind)", lambda t: render_markdown(t, theme="tailwind")),
+        ("single-pass (export)", lambda t: render_markdown(t, theme="export")),
+        ("single-pass cached (export)", lambda t: render_markdown_cached(t, theme="export")),
+    ]
+    try:
+        import markdown  # noqa: F401
+        candidates.insert(1, ("python-markdown (export)", python_markdown_export))
+    except ImportError:
+        print("python-markdown not installed; skipping export baseline\n")
+
+    print(f"{'renderer':<34} {'mean ms':>10} {'p50 ms':>10} {'min ms':>10}")
+    for name, fn in candidates:
+        samples = time_it(fn, text, args.iterations)
+        print(f"{name:<34} {statistics.mean(samples):>10.2f} {statistics.median(samples):>10.2f} {min(samples):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Rate limiter overhead micro-benchmark.
+
+Measures the cost the rate limiting middleware adds to each request, in
+microseconds per request, for:
+- "baseline": a minimal FastAPI app without the middleware
+- "local": the middleware with Redis unreachable (local token buckets only)
+- "redis": the middleware with the GCRA script in Redis (one EVALSHA per request);
+  skipped when --redis-url cannot be reached
+- "rejected": a burst over the limit after Redis rejected it once (answered by the
+  local pre-check, no Redis round trip)
+
+Requests go through httpx's in-process ASGI transport, so the numbers are the
+middleware's own overhead plus the Redis round trip, without network or server time.
+
+Usage:
+    python3 scripts/benchmark-rate-limiter.py
+    python3 scripts/benchmark-rate-limiter.py --requests 5000 --redis-url redis://localhost:6379/0
+    python3 scripts/benchmark-rate-limiter.py --modes baseline local rejected
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[int(pct * (len(values) - 1))]
+
+
+async def run_mode(mode: str, args) -> dict:
+    import httpx
+    from fastapi import FastAPI
+
+    from backend.config import settings
+    from backend.middleware import rate_limit
+    from backend.services.rate_limiter import RateLimiter
+
+    app = FastAPI()
+
+    @app.get("/api/products")
+    async def products():
+        return {"ok": True}
+
+    limiter = RateLimiter()
+    if mode != "baseline":
+        rate_limit.setup_rate_limiting(app)
+        rate_limit.get_rate_limiter = lambda: limiter
+    if mode == "local" or (mode == "rejected" and not args.redis_available):
+        limiter._redis.disable()
+    if mode in ("local", "redis"):
+        settings.rate_limit_user_budget = f"{args.requests * 10}/minute"
+        rate_limit.RATE_LIMITS["/api/products"] = f"{args.requests * 10}/minute"
+    if mode == "rejected":
+        rate_limit.RATE_LIMITS["/api/products"] = "1/minute"
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(args.warmup):
+            await client.get("/api/products")
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = await client.get("/api/products")
+            latencies.append(time.perf_counter() - start)
+        status = response.status_code
+
+    return {
+        "mode": mode,
+        "status": status,
+        "mean_us": sum(latencies) / len(latencies) * 1e6,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "stats": limiter.stats if mode != "baseline" else {},
+    }
+
+
+async def redis_reachable(url: str) -> bool:
+    import redis.asyncio as redis
+
+    client = redis.Redis.from_url(url)
+    try:
+        await asyncio.wait_for(client.ping(), timeout=1)
+        return True
+    except Exception:
+        return False
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request overhead of the rate limiting middleware")
+    parser.add_argument("--modes", nargs="+", choices=["baseline", "local", "redis", "rejected"],
+                        default=["baseline", "local", "redis", "rejected"])
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per mode")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    args = parser.parse_args()
+
+    os.environ["REDIS_URL"] = args.redis_url
+    os.environ.setdefault("LOG_LEVEL", "warning")
+    import logging
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+
+    args.redis_available = asyncio.run(redis_reachable(args.redis_url))
+    results = []
+    for mode in args.modes:
+        if mode == "redis" and not args.redis_available:
+            print(f"redis: skipped ({args.redis_url} not reachable)")
+            continue
+        results.append(asyncio.run(run_mode(mode, args)))
+
+    baseline = next((r["mean_us"] for r in results if r["mode"] == "baseline"), None)
+    print(f"requests per mode: {args.requests}")
+    print(f"{'mode':>9} {'status':>6} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'overhead us':>12}  limiter stats")
+    for r in results:
+        overhead = f"{r['mean_us'] - baseline:>12.1f}" if baseline is not None else f"{'-':>12}"
+        print(f"{r['mode']:>9} {r['status']:>6} {r['mean_us']:>9.1f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f} "
+              f"{overhead}  {r['stats']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the backend launcher with one vs several worker processes.
+
+For each --workers value it starts `python -m backend.serve --workers N`, waits until
+the path answers, drives it with --concurrency concurrent clients for --duration
+seconds, and reports requests/s and p50/p99 latency. The server is then stopped with
+SIGTERM, which also exercises the graceful drain.
+
+CPU-bound endpoints (password hashing, JSON-heavy listings, SSE fan-out) show the
+difference; an endpoint that only waits on the database or a model mostly does not.
+
+Usage:
+    python3 scripts/benchmark-server-workers.py
+    python3 scripts/benchmark-server-workers.py --workers 1 2 4 --concurrency 64 --duration 20
+    python3 scripts/benchmark-server-workers.py --path /health --port 8100
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[int(pct * (len(values) - 1))]
+
+
+async def wait_ready(url: str, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(url)
+                if response.status_code < 500:
+                    return True
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    return False
+
+
+async def run_load(url: str, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        async def user():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 500:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.monotonic()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.monotonic() - start
+    return latencies, errors, elapsed
+
+
+def benchmark(workers: int, args) -> dict:
+    pythonpath = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, PYTHONPATH=pythonpath, LOG_LEVEL="warning")
+    env.pop("BACKEND_WORKERS", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--app", args.app, "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    try:
+        if not asyncio.run(wait_ready(url, args.startup_timeout)):
+            raise SystemExit(f"server with {workers} worker(s) did not become ready at {url}")
+        if args.warmup:
+            asyncio.run(run_load(url, args.concurrency, args.warmup))
+        latencies, errors, elapsed = asyncio.run(run_load(url, args.concurrency, args.duration))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare backend throughput with one vs several workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Worker counts to compare")
+    parser.add_argument("--app", default="backend.main:app", help="ASGI application import string")
+    parser.add_argument("--path", default="/", help="Path to request")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of measured load per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unmeasured load before each run")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    results = [benchmark(workers, args) for workers in args.workers]
+
+    base = results[0]["rps"] or 1.0
+    print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+    for r in results:
+        print(f"{r['workers']:>8} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rps'] / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Backend cold-start import benchmark based on `python -X importtime`.
+
+Imports the backend entry module in fresh interpreters, reports the median total
+import time and the slowest modules, and exits non-zero when startup regresses:
+- the median import time exceeds --max-ms, or --baseline by more than --tolerance
+- a module that must stay lazy (provider SDKs, Agno models, agent modules) is
+  imported at startup
+
+Usage:
+    python3 scripts/benchmark-startup-imports.py
+    python3 scripts/benchmark-startup-imports.py --runs 5 --max-ms 4000 --top 15
+    python3 scripts/benchmark-startup-imports.py --write-baseline scripts/startup-baseline.json
+    python3 scripts/benchmark-startup-imports.py --baseline scripts/startup-baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that are loaded on first use and must not be imported by the API at startup
+DEFAULT_FORBIDDEN = [
+    "openai",
+    "anthropic",
+    "google.generativeai",
+    "google.genai",
+    "agno.models",
+    "backend.agents.agno_base_agent",
+]
+
+
+def parse_importtime(stderr: str):
+    """Parse -X importtime output into (module, self_us, cumulative_us, depth) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|", 2)
+        name = name.rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_part.split(":")[1]), int(cumulative_us), depth))
+    return rows
+
+
+def run_once(module: str):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-20:])
+        raise SystemExit(f"import {module} failed:\n{tail}")
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend import (cold start) time")
+    parser.add_argument("--module", default="backend.main", help="Entry module to import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to sample (median is used)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail when the median import time exceeds this")
+    parser.add_argument("--baseline", help="JSON file from --write-baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown over the baseline (fraction)")
+    parser.add_argument("--write-baseline", help="Write the measured median to this JSON file")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                        help="Module prefixes that must not be imported at startup")
+    args = parser.parse_args()
+
+    totals, last_rows = [], []
+    for _ in range(args.runs):
+        rows = run_once(args.module)
+        root = next((row for row in rows if row[0] == args.module), None)
+        totals.append(root[2] / 1000 if root else sum(row[1] for row in rows) / 1000)
+        last_rows = rows
+    median_ms = statistics.median(totals)
+
+    print(f"import {args.module}: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f})\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    modules = [row for row in last_rows if row[0] != args.module]
+    for name, self_us, cumulative_us, depth in sorted(modules, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+
+    failures = []
+    imported = {row[0] for row in last_rows}
+    for prefix in args.forbid or []:
+        hits = sorted(name for name in imported if name == prefix or name.startswith(prefix + "."))
+        if hits:
+            failures.append(f"{prefix} is imported at startup ({len(hits)} modules)")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds --max-ms {args.max_ms:.0f}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_ms = json.load(f)["median_ms"]
+        limit = baseline_ms * (1 + args.tolerance)
+        print(f"\nbaseline {baseline_ms:.0f} ms, limit {limit:.0f} ms (+{args.tolerance:.0%})")
+        if median_ms > limit:
+            failures.append(f"median import time {median_ms:.0f} ms regressed past {limit:.0f} ms")
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            json.dump({"module": args.module, "median_ms": round(median_ms, 1), "runs": args.runs}, f, indent=2)
+            f.write("\n")
+        print(f"\nwrote baseline to {args.write_baseline}")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
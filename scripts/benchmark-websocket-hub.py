@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+WebSocket fan-out load test with thousands of simulated sockets.
+
+Publishes a series of messages to a topic that every simulated socket is
+subscribed to and reports how long the healthy sockets take to receive them.
+Some sockets are "slow": each write takes --slow-delay seconds, like a client
+on a bad network.
+- "sequential": the old ConnectionManager.broadcast (awaits send_json on each
+  socket in turn, so every slow socket delays everyone after it)
+- "hub": the WebSocketHub on this pod (a queue and a sender task per socket)
+- "redis": two hubs ("pods") sharing Redis pub/sub, with the sockets split between
+  them and messages published from the first; skipped when --redis-url cannot be
+  reached
+
+Usage:
+    python3 scripts/benchmark-websocket-hub.py
+    python3 scripts/benchmark-websocket-hub.py --sockets 10000 --messages 20 --slow 0.05
+    python3 scripts/benchmark-websocket-hub.py --modes hub redis --redis-url redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+TOPIC = "product:benchmark"
+
+
+class SimulatedSocket:
+    def __init__(self, delay: float, expected: int, done: asyncio.Event, counter: list):
+        self.delay = delay
+        self.expected = expected
+        self.received = 0
+        self.done = done
+        self.counter = counter  # [healthy sockets still waiting]
+        self.last_latency = 0.0
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+    async def _received(self, payload: dict):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.last_latency = time.perf_counter() - payload["sent_at"]
+        if not self.delay and self.received == self.expected:
+            self.counter[0] -= 1
+            if not self.counter[0]:
+                self.done.set()
+
+    async def send_text(self, text: str):
+        await self._received(json.loads(text))
+
+    async def send_json(self, message: dict):
+        await self._received(json.loads(json.dumps(message)))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[int(pct * (len(values) - 1))]
+
+
+async def run_mode(mode: str, args) -> dict:
+    from backend.services.websocket_hub import WebSocketHub
+
+    done = asyncio.Event()
+    slow_count = int(args.sockets * args.slow)
+    counter = [args.sockets - slow_count]
+    step = args.sockets // slow_count if slow_count else 0  # Slow sockets spread evenly
+    sockets = [
+        SimulatedSocket(args.slow_delay if step and i % step == 0 and i // step < slow_count else 0.0,
+                        args.messages, done, counter)
+        for i in range(args.sockets)
+    ]
+
+    hubs = []
+    if mode == "hub":
+        hub = WebSocketHub(queue_size=args.queue_size)
+        hub._redis.disable()
+        hubs = [hub]
+    elif mode == "redis":
+        import redis.asyncio as redis
+
+        hubs = [WebSocketHub(redis_client=redis.Redis.from_url(args.redis_url, decode_responses=True),
+                             queue_size=args.queue_size) for _ in range(2)]
+    for i, socket in enumerate(sockets):
+        if hubs:
+            hub = hubs[i % len(hubs)]
+            await hub.connect(socket, f"socket-{i}")
+            await hub.subscribe(f"socket-{i}", TOPIC)
+
+    start = time.perf_counter()
+    for n in range(args.messages):
+        message = {"type": "progress", "n": n, "sent_at": time.perf_counter()}
+        if hubs:
+            await hubs[0].publish(TOPIC, message)
+        else:
+            for socket in sockets:  # ConnectionManager.broadcast
+                await socket.send_json(message)
+        await asyncio.sleep(args.interval)
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+        elapsed = time.perf_counter() - start
+    except asyncio.TimeoutError:
+        elapsed = float("nan")
+
+    healthy = [s.last_latency for s in sockets if not s.delay]
+    snapshots = [hub.snapshot() for hub in hubs]
+    for hub in hubs:
+        await hub.close()
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "p50_ms": percentile(healthy, 0.50) * 1000,
+        "p99_ms": percentile(healthy, 0.99) * 1000,
+        "dropped": sum(s["dropped"] for s in snapshots),
+        "hub_p95_ms": max((s["send_latency_ms"]["p95"] for s in snapshots), default=0.0),
+    }
+
+
+async def redis_reachable(url: str) -> bool:
+    import redis.asyncio as redis
+
+    client = redis.Redis.from_url(url)
+    try:
+        await asyncio.wait_for(client.ping(), timeout=1)
+        return True
+    except Exception:
+        return False
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan out messages to thousands of simulated WebSockets")
+    parser.add_argument("--modes", nargs="+", choices=["sequential", "hub", "redis"],
+                        default=["sequential", "hub", "redis"])
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between published messages")
+    parser.add_argument("--slow", type=float, default=0.01, help="Fraction of sockets that write slowly")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="Seconds per write on a slow socket")
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    args = parser.parse_args()
+
+    import logging
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+
+    results = []
+    for mode in args.modes:
+        if mode == "redis" and not asyncio.run(redis_reachable(args.redis_url)):
+            print(f"redis: skipped ({args.redis_url} not reachable)")
+            continue
+        results.append(asyncio.run(run_mode(mode, args)))
+
+    print(f"sockets: {args.sockets} ({int(args.sockets * args.slow)} slow), messages: {args.messages}")
+    print(f"{'mode':>10} {'all healthy s':>14} {'p50 ms':>9} {'p99 ms':>9} {'dropped':>8} {'hub p95 ms':>11}")
+    for r in results:
+        print(f"{r['mode']:>10} {r['elapsed_s']:>14.3f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+              f"{r['dropped']:>8} {r['hub_p95_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import { useAuth } from '../contexts/AuthContext';
 import { HorizontalAgentStatus } from './HorizontalAgentStatus';
 
 import { getValidatedApiUrl } from '../lib/runtime-config';
+import { fetchAllPages } from '../lib/api-client';
 const API_URL = getValidatedApiUrl();
 
 interface Conversation {
@@ -66,19 +67,11 @@ export function ConversationHistory() {
     if (!token) return;
 
     try {
-      const response = await fetch(`${API_URL}/api/products`, {
-        headers: { 'Authorization': `Bearer ${token}` },
-        credentials: 'include',
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        const allProducts = data.products || [];
-        setProducts(allProducts.map((p: any) => ({
-          id: p.id,
-          name: p.name,
-        })));
-      }
+      const allProducts = await fetchAllPages<any>('/api/products', 'products', token);
+      setProducts(allProducts.map((p: any) => ({
+        id: p.id,
+        name: p.name,
+      })));
     } catch (error) {
       console.error('Failed to load products:', error);
     }
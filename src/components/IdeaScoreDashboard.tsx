@@ -2,8 +2,7 @@ import { useState, useEffect } from 'react';
 import { TrendingUp, TrendingDown, Target, AlertCircle, CheckCircle2, XCircle, BarChart3, Lightbulb, AlertTriangle } from 'lucide-react';
 import { useAuth } from '../contexts/AuthContext';
 
-import { getValidatedApiUrl } from '../lib/runtime-config';
-const API_URL = getValidatedApiUrl();
+import { fetchAllPages } from '../lib/api-client';
 
 interface ScoreDimension {
   score: number;
@@ -62,29 +61,20 @@ export function IdeaScoreDashboard({ tenantId, productId, onProductSelect }: Ide
   const loadScores = async () => {
     try {
       setLoading(true);
-      let url = '';
+      let path = '';
       if (productId) {
-        url = `${API_URL}/api/products/${productId}/scores`;
+        path = `/api/products/${productId}/scores`;
       } else if (tenantId) {
-        url = `${API_URL}/api/products/tenant/${tenantId}/scores`;
+        // Tenant scores are paginated
+        path = `/api/products/tenant/${tenantId}/scores`;
       } else {
         return;
       }
 
-      const response = await fetch(url, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json',
-        },
-        credentials: 'include',
-      });
-
-      if (!response.ok) throw new Error('Failed to load scores');
-
-      const data = await response.json();
-      setScores(data.scores || []);
-      if (data.scores && data.scores.length > 0) {
-        setSelectedScore(data.scores[0]); // Select most recent
+      const loaded = await fetchAllPages<ProductScore>(path, 'scores', token);
+      setScores(loaded);
+      if (loaded.length > 0) {
+        setSelectedScore(loaded[0]); // Select most recent
       }
     } catch (error) {
       console.error('Error loading scores:', error);
@@ -2,8 +2,7 @@ import { useState, useEffect } from 'react';
 import { Building2, Users, Package, TrendingUp, Filter } from 'lucide-react';
 import { useAuth } from '../contexts/AuthContext';
 
-import { getValidatedApiUrl } from '../lib/runtime-config';
-const API_URL = getValidatedApiUrl();
+import { fetchPage } from '../lib/api-client';
 
 interface PortfolioItem {
   id: string;
@@ -19,6 +18,13 @@ interface PortfolioItem {
   shared_with_me: boolean;
 }
 
+interface PortfolioStats {
+  total: number;
+  mine: number;
+  shared: number;
+  by_status: Record<string, number>;
+}
+
 interface PortfolioViewProps {
   onProductSelect?: (productId: string) => void;
 }
@@ -26,7 +32,10 @@ interface PortfolioViewProps {
 export function PortfolioView({ onProductSelect }: PortfolioViewProps) {
   const { user, token } = useAuth();
   const [portfolio, setPortfolio] = useState<PortfolioItem[]>([]);
+  const [stats, setStats] = useState<PortfolioStats>({ total: 0, mine: 0, shared: 0, by_status: {} });
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [filter, setFilter] = useState<'all' | 'mine' | 'shared'>('all');
 
   useEffect(() => {
@@ -40,14 +49,12 @@ export function PortfolioView({ onProductSelect }: PortfolioViewProps) {
 
     setIsLoading(true);
     try {
-      const response = await fetch(`${API_URL}/api/products/portfolio`, {
-        headers: { 'Authorization': `Bearer ${token}` },
-        credentials: 'include',
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        setPortfolio(data.portfolio || []);
+      // The first page carries the tenant-wide stats; further pages load on demand
+      const page = await fetchPage<PortfolioItem>('/api/products/portfolio', 'portfolio', token);
+      setPortfolio(page.items);
+      setNextCursor(page.nextCursor);
+      if (page.data.stats) {
+        setStats(page.data.stats);
       }
     } catch (error) {
       console.error('Failed to load portfolio:', error);
@@ -56,22 +63,27 @@ export function PortfolioView({ onProductSelect }: PortfolioViewProps) {
     }
   };
 
+  const loadMore = async () => {
+    if (!token || !nextCursor) return;
+
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage<PortfolioItem>('/api/products/portfolio', 'portfolio', token, nextCursor);
+      setPortfolio((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load more of the portfolio:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const filteredPortfolio = Array.isArray(portfolio) ? portfolio.filter((item) => {
     if (filter === 'mine') return item.user_id === user?.id;
     if (filter === 'shared') return item.shared_with_me;
     return true;
   }) : [];
 
-  const stats = {
-    total: Array.isArray(portfolio) ? portfolio.length : 0,
-    mine: Array.isArray(portfolio) ? portfolio.filter((p) => p.user_id === user?.id).length : 0,
-    shared: Array.isArray(portfolio) ? portfolio.filter((p) => p.shared_with_me).length : 0,
-    byStatus: Array.isArray(portfolio) ? portfolio.reduce((acc, p) => {
-      acc[p.status] = (acc[p.status] || 0) + 1;
-      return acc;
-    }, {} as Record<string, number>) : {},
-  };
-
   const getStatusColor = (status: string) => {
     // Use theme-aware colors
     return 'px-2 py-1 text-xs font-medium rounded';
@@ -278,6 +290,19 @@ export function PortfolioView({ onProductSelect }: PortfolioViewProps) {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={isLoadingMore}
+            className="px-4 py-2 rounded-lg transition font-medium disabled:opacity-50"
+            style={{ backgroundColor: 'var(--card-bg)', color: 'var(--text-primary)', border: '1px solid var(--border-color)' }}
+          >
+            {isLoadingMore ? 'Loading...' : `Load more (${portfolio.length} of ${stats.total})`}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -4,6 +4,7 @@ import { SessionSelector } from './SessionSelector';
 import { useAuth } from '../contexts/AuthContext';
 
 import { getValidatedApiUrl } from '../lib/runtime-config';
+import { fetchAllPages } from '../lib/api-client';
 const API_URL = getValidatedApiUrl();
 
 interface ProductSummaryPRDGeneratorProps {
@@ -46,22 +47,13 @@ export function ProductSummaryPRDGenerator({
 
     try {
       // Get product details which includes access_level
-      const response = await fetch(`${API_URL}/api/products`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json',
-        },
-        credentials: 'include',
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        const product = data.products?.find((p: any) => p.id === productId);
-        if (product) {
-          // Check if user has edit or admin access
-          const hasEditAccess = ['owner', 'admin', 'edit'].includes(product.access_level);
-          setCanEdit(hasEditAccess);
-        }
+      // The product may be on any page of the list
+      const products = await fetchAllPages<any>('/api/products', 'products', token);
+      const product = products.find((p: any) => p.id === productId);
+      if (product) {
+        // Check if user has edit or admin access
+        const hasEditAccess = ['owner', 'admin', 'edit'].includes(product.access_level);
+        setCanEdit(hasEditAccess);
       }
     } catch (error) {
       console.error('Error checking permission:', error);
@@ -4,6 +4,7 @@ import { useAuth } from '../contexts/AuthContext';
 import { ProductShareModal } from './ProductShareModal';
 
 import { getValidatedApiUrl } from '../lib/runtime-config';
+import { fetchPage } from '../lib/api-client';
 const API_URL = getValidatedApiUrl();
 
 interface Product {
@@ -27,7 +28,9 @@ interface ProductsDashboardProps {
 export function ProductsDashboard({ onProductSelect, compact = false }: ProductsDashboardProps) {
   const { token } = useAuth();
   const [products, setProducts] = useState<Product[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
   const [editingProduct, setEditingProduct] = useState<Product | null>(null);
@@ -50,23 +53,34 @@ export function ProductsDashboard({ onProductSelect, compact = false }: Products
 
     setIsLoading(true);
     try {
-      const response = await fetch(`${API_URL}/api/products`, {
-        headers: { 'Authorization': `Bearer ${token}` },
-        credentials: 'include',
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        setProducts(Array.isArray(data.products) ? data.products : []);
-      }
+      // The list is paginated; further pages load on demand
+      const page = await fetchPage<Product>('/api/products', 'products', token);
+      setProducts(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Failed to load products:', error);
       setProducts([]); // Ensure products is always an array even on error
+      setNextCursor(null);
     } finally {
       setIsLoading(false);
     }
   };
 
+  const loadMoreProducts = async () => {
+    if (!token || !nextCursor) return;
+
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage<Product>('/api/products', 'products', token, nextCursor);
+      setProducts((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load more products:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleCreateProduct = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!token || !newProductName.trim()) return;
@@ -407,6 +421,19 @@ export function ProductsDashboard({ onProductSelect, compact = false }: Products
         </div>
       )}
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMoreProducts}
+            disabled={isLoadingMore}
+            className="px-4 py-2 rounded-lg border transition text-sm font-medium disabled:opacity-50"
+            style={{ backgroundColor: 'var(--card-bg)', color: 'var(--text-primary)', borderColor: 'var(--border-color)' }}
+          >
+            {isLoadingMore ? 'Loading...' : 'Load more products'}
+          </button>
+        </div>
+      )}
+
       {/* Create Modal */}
       {showCreateModal && (
         <div 
@@ -108,3 +108,61 @@ export const api = {
     }),
 };
 
+
+// Page size for list endpoints (the backend's PAGINATION_MAX_LIMIT), so a large tenant
+// needs as few requests as possible against the per-endpoint rate limits
+export const PAGE_LIMIT = 500;
+const MAX_RATE_LIMIT_RETRIES = 3;
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+  data: any;
+}
+
+/**
+ * Fetch one page of a cursor-paginated list endpoint.
+ * List endpoints return one page per call plus `next_cursor` (null on the last page);
+ * `key` names the array in each response. A 429 is retried after its Retry-After.
+ */
+export async function fetchPage<T>(
+  path: string,
+  key: string,
+  token: string | null,
+  cursor: string | null = null
+): Promise<Page<T>> {
+  const separator = path.includes('?') ? '&' : '?';
+  const query = `${separator}limit=${PAGE_LIMIT}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+  for (let attempt = 0; ; attempt++) {
+    const response = await fetch(`${API_URL}${path}${query}`, {
+      headers: token ? { 'Authorization': `Bearer ${token}` } : {},
+      credentials: 'include',
+    });
+    if (response.status === 429 && attempt < MAX_RATE_LIMIT_RETRIES) {
+      const retryAfter = Number(response.headers.get('Retry-After')) || 1;
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+      continue;
+    }
+    if (!response.ok) {
+      throw new Error(`Failed to load ${path}: ${response.status}`);
+    }
+    const data = await response.json();
+    return { items: data[key] || [], nextCursor: data.next_cursor || null, data };
+  }
+}
+
+/**
+ * Fetch every page of a cursor-paginated list endpoint. For short lists only (pickers,
+ * selectors); long lists should render the first page and load more on demand.
+ * Throws if any page fails.
+ */
+export async function fetchAllPages<T>(path: string, key: string, token: string | null): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const page: Page<T> = await fetchPage<T>(path, key, token, cursor);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+}
@@ -0,0 +1,20 @@
+/*
+  # PRD Section Cache
+
+  Persists agent-army PRD sections so exports only regenerate the sections whose
+  inputs changed. Each row holds the latest generated content for one section of a
+  product together with the hash of the prompt inputs it was generated from.
+*/
+
+CREATE TABLE IF NOT EXISTS prd_section_cache (
+  product_id uuid NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+  section text NOT NULL,
+  input_hash text NOT NULL,
+  agent_type text,
+  content text NOT NULL,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now(),
+  PRIMARY KEY (product_id, section)
+);
+
+CREATE INDEX IF NOT EXISTS idx_prd_section_cache_updated_at ON prd_section_cache(updated_at DESC);
@@ -0,0 +1,35 @@
+/*
+  # Keyset Pagination Indexes
+
+  List endpoints page with (sort timestamp, id) cursors instead of OFFSET. These
+  composite indexes match each endpoint's filter + ORDER BY so every page is a single
+  index range scan, and the share lookup used by access checks is index-only.
+*/
+
+-- GET /api/products and /api/products/portfolio
+CREATE INDEX IF NOT EXISTS idx_products_tenant_updated_id
+  ON products(tenant_id, updated_at DESC, id DESC);
+
+-- Access checks: "shared with me" probes
+CREATE INDEX IF NOT EXISTS idx_product_shares_user_product
+  ON product_shares(shared_with_user_id, product_id) INCLUDE (permission);
+
+-- Portfolio share counts per product use the existing UNIQUE(product_id, shared_with_user_id)
+
+-- GET /api/conversations/history and /api/db/conversation-history
+CREATE INDEX IF NOT EXISTS idx_conversation_history_product_created_id
+  ON conversation_history(product_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_history_tenant_created_id
+  ON conversation_history(tenant_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_history_session_created_id
+  ON conversation_history(session_id, created_at, id);
+
+-- GET /api/db/knowledge-articles
+CREATE INDEX IF NOT EXISTS idx_knowledge_articles_product_created_id
+  ON knowledge_articles(product_id, created_at DESC, id DESC);
+
+-- GET /api/products/tenant/{tenant_id}/scores
+CREATE INDEX IF NOT EXISTS idx_product_idea_scores_tenant_created_id
+  ON product_idea_scores(tenant_id, created_at DESC, id DESC);